@@ -18,11 +18,14 @@ Phase 2 Advanced Classification: LLM document type classification, content analy
 import os
 import sys
 import argparse
+import hashlib
 import json
+import tempfile
 import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -36,18 +39,173 @@ sys.path.insert(0, '.')
 from src.config.colored_logging import ColoredLogger, setup_colored_logging
 from src.config.settings import Settings
 from src.connectors.file_source_interface import FileSourceInterface
-from src.connectors.dropbox_client import DropboxClient, DocumentMetadata
+from src.connectors.dropbox_client import (
+    DropboxClient, DocumentMetadata, ListFolderCursorReset, ROOT_PARTITION
+)
 from src.connectors.local_filesystem_client import LocalFilesystemClient
 from src.connectors.salesforce_file_source import SalesforceFileSource
 from src.connectors.raw_salesforce_export_connector import RawSalesforceExportConnector
+from src.connectors.raw_salesforce_export_connector_pure_streaming import PureStreamingConnector
 from src.utils.discovery_persistence import DiscoveryPersistence
 
 # Discovery defaults
 DEFAULT_BATCH_SIZE: int = 100
+DEFAULT_SHARD_SIZE: int = 1000
 MIN_FILE_SIZE_KB_DEFAULT: float = 10.0
 
 __all__ = ["DocumentDiscovery", "create_argument_parser", "main"]
 
+
+def _detect_source_type(source_client: Any) -> str:
+    """Source type recorded in source_metadata, detected from the client's attributes."""
+    if hasattr(source_client, 'export_root_dir'):
+        return "salesforce_raw"
+    elif hasattr(source_client, 'base_path'):
+        return "local"
+    elif hasattr(source_client, 'organized_files_dir'):
+        return "salesforce"
+    return "dropbox"
+
+
+def _metadata_to_dict(doc_metadata: DocumentMetadata, source_type: str) -> Dict[str, Any]:
+    """Convert DocumentMetadata object to dictionary format with Phase 1 Basic Classification"""
+    return {
+        "source_metadata": {
+            "source_type": source_type,
+            "source_id": getattr(doc_metadata, 'salesforce_content_version_id', None) or 
+                       getattr(doc_metadata, 'dropbox_id', '') or 
+                       f"local_{hash(doc_metadata.path)}",
+            "source_path": doc_metadata.path,
+            # Absolute payload path: processing reads it directly instead of re-resolving source_path
+            "full_source_path": doc_metadata.full_path or None
+        },
+        "file_info": {
+            "path": doc_metadata.path,
+            "name": doc_metadata.name,
+            "size": doc_metadata.size,
+            "size_mb": round(doc_metadata.size / (1024 * 1024), 2),
+            "file_type": doc_metadata.file_type,
+            "modified_time": doc_metadata.modified_time,
+            "content_hash": doc_metadata.content_hash
+        },
+        "business_metadata": {
+            "deal_creation_date": doc_metadata.deal_creation_date,
+            "week_number": doc_metadata.week_number,
+            "week_date": doc_metadata.week_date,
+            "vendor": doc_metadata.vendor,
+            "client": doc_metadata.client,
+            "deal_number": doc_metadata.deal_number,
+            "deal_name": doc_metadata.deal_name,
+            "extraction_confidence": getattr(doc_metadata, 'extraction_confidence', 0.0),
+            "path_components": doc_metadata.path_components or []
+        },
+        "deal_metadata": {
+            # Core deal information
+            "deal_id": getattr(doc_metadata, 'deal_id', None),
+            "salesforce_deal_id": getattr(doc_metadata, 'salesforce_deal_id', None),
+            "deal_subject": getattr(doc_metadata, 'deal_subject', None),
+            "deal_status": getattr(doc_metadata, 'deal_status', None),
+            "deal_reason": getattr(doc_metadata, 'deal_reason', None),
+            "deal_start_date": getattr(doc_metadata, 'deal_start_date', None),
+            "negotiated_by": getattr(doc_metadata, 'negotiated_by', None),
+            
+            # Financial metrics
+            "proposed_amount": getattr(doc_metadata, 'proposed_amount', None),
+            "final_amount": getattr(doc_metadata, 'final_amount', None),
+            "savings_1yr": getattr(doc_metadata, 'savings_1yr', None),
+            "savings_3yr": getattr(doc_metadata, 'savings_3yr', None),
+            "savings_target": getattr(doc_metadata, 'savings_target', None),
+            "savings_percentage": getattr(doc_metadata, 'savings_percentage', None),
+            
+            # Client/Vendor information
+            "client_id": getattr(doc_metadata, 'client_id', None),
+            "client_name": getattr(doc_metadata, 'client_name', None),
+            "salesforce_client_id": getattr(doc_metadata, 'salesforce_client_id', None),
+            "vendor_id": getattr(doc_metadata, 'vendor_id', None),
+            "vendor_name": getattr(doc_metadata, 'vendor_name', None),
+            "salesforce_vendor_id": getattr(doc_metadata, 'salesforce_vendor_id', None),
+            
+            # Contract information
+            "contract_term": getattr(doc_metadata, 'contract_term', None),
+            "contract_start": getattr(doc_metadata, 'contract_start', None),
+            "contract_end": getattr(doc_metadata, 'contract_end', None),
+            "effort_level": getattr(doc_metadata, 'effort_level', None),
+            "has_fmv_report": getattr(doc_metadata, 'has_fmv_report', None),
+            "deal_origin": getattr(doc_metadata, 'deal_origin', None),
+            
+            # ENHANCED FINANCIAL FIELDS (Missing from original!)
+            "savings_achieved": getattr(doc_metadata, 'savings_achieved', None),
+            "fixed_savings": getattr(doc_metadata, 'fixed_savings', None),
+            "savings_target_full_term": getattr(doc_metadata, 'savings_target_full_term', None),
+            "final_amount_full_term": getattr(doc_metadata, 'final_amount_full_term', None),
+            
+            # RICH NARRATIVE CONTENT (Missing from original!)
+            "current_narrative": getattr(doc_metadata, 'current_narrative', None),
+            "customer_comments": getattr(doc_metadata, 'customer_comments', None),
+            "content_source": getattr(doc_metadata, 'content_source', None),
+            
+            # Deal classification fields (added December 2025)
+            "report_type": getattr(doc_metadata, 'report_type', None),
+            "description": getattr(doc_metadata, 'description', None),
+            "project_type": getattr(doc_metadata, 'project_type', None),
+            "competition": getattr(doc_metadata, 'competition', None),
+            "npi_analyst": getattr(doc_metadata, 'npi_analyst', None),
+            "dual_multi_sourcing": getattr(doc_metadata, 'dual_multi_sourcing', None),
+            "time_pressure": getattr(doc_metadata, 'time_pressure', None),
+            "advisor_network_used": getattr(doc_metadata, 'advisor_network_used', None),
+            
+            # Mapping status (for debugging)
+            "mapping_status": getattr(doc_metadata, 'mapping_status', None),
+            "mapping_method": getattr(doc_metadata, 'mapping_method', None),
+            "mapping_reason": getattr(doc_metadata, 'mapping_reason', None)
+        },
+        # Phase 2 Advanced Classification: LLM document types (added during processing)
+        "llm_classification": {
+            "document_type": None,  # Will be classified in Phase 2: IDD, FMV, Contract, etc.
+            "confidence": 0.0,
+            "reasoning": None,
+            "classification_method": "pending_phase_2_processing",
+            "alternative_types": [],
+            "tokens_used": 0
+        },
+        "processing_status": {
+            "processed": False,
+            "processing_date": None
+        }
+    }
+
+
+# Per-process connector for sharded discovery workers (set by _init_shard_worker)
+_shard_connector: Optional[RawSalesforceExportConnector] = None
+
+
+def _init_shard_worker(connector_args: Dict[str, Any]) -> None:
+    """Process pool initializer: build this worker's raw export connector once."""
+    global _shard_connector
+    _shard_connector = RawSalesforceExportConnector(**connector_args)
+
+
+def _discover_shard(shard_index: int, cv_ids: List[str],
+                    require_deal_association: bool) -> Tuple[int, List[Dict[str, Any]]]:
+    """Enrich and convert one shard of ContentVersion ids in a worker process.
+    
+    Args:
+        shard_index: Position of the shard in discovery order.
+        cv_ids: ContentVersion ids in the shard.
+        require_deal_association: Skip documents without a deal.
+    
+    Returns:
+        (shard_index, discovery document dicts in shard order)
+    """
+    documents = [
+        _metadata_to_dict(doc_metadata, "salesforce_raw")
+        for doc_metadata in _shard_connector.list_documents_as_metadata(
+            require_deal_association=require_deal_association, cv_ids=cv_ids
+        )
+    ]
+    return shard_index, documents
+
+
 class DocumentDiscovery:
     """Document discovery and metadata extraction (no LLM classification)"""
     
@@ -58,6 +216,7 @@ class DocumentDiscovery:
         self.settings = Settings()
         self.source_client: Optional[FileSourceInterface] = None
         self.persistence: Optional[DiscoveryPersistence] = None
+        self.connector_args: Optional[Dict[str, Any]] = None
         
     def run(self, args: argparse.Namespace) -> None:
         """Run document discovery based on arguments.
@@ -83,6 +242,16 @@ class DocumentDiscovery:
             # Initialize persistence
             self.persistence = DiscoveryPersistence(args.output)
             
+            # Incremental Dropbox discovery: apply changes since the saved cursor
+            if getattr(args, 'incremental', False):
+                if args.source != "dropbox":
+                    raise ValueError("--incremental is only supported for the dropbox source")
+                if self.persistence.data["documents"]:
+                    self._initialize_source_client(args)
+                    self._run_incremental_discovery(args)
+                    return
+                self.logger.info("📂 No existing discovery to update; running a full discovery")
+            
             # Resume logic
             if args.resume and Path(args.output).exists():
                 self.logger.info("🔄 Resuming from existing discovery file")
@@ -201,7 +370,7 @@ class DocumentDiscovery:
                 self.logger.warning("⚠️  Use: --client-mapping-csv /path/to/SF-Cust-Mapping.csv")
                 self.logger.warning("=" * 70)
             
-            self.source_client = RawSalesforceExportConnector(
+            connector_args = dict(
                 export_root_dir=args.export_root_dir,
                 content_versions_csv=args.content_versions_csv,
                 content_documents_csv=getattr(args, 'content_documents_csv', None),  # Optional
@@ -211,7 +380,19 @@ class DocumentDiscovery:
                 vendor_mapping_csv=getattr(args, 'vendor_mapping_csv', None),
                 deal_mapping_csv=getattr(args, 'deal_mapping_csv', None)
             )
-            self.logger.info("✅ Raw Salesforce export connector initialized")
+            if getattr(args, 'streaming', False):
+                # Bounded memory: mappings are indexed in SQLite instead of held in RAM
+                self.source_client = PureStreamingConnector(
+                    **connector_args,
+                    db_path=getattr(args, 'streaming_db', None)
+                )
+                self.logger.info("✅ Raw Salesforce export connector initialized (streaming mode)")
+            else:
+                connector_args.update(index_cache=getattr(args, 'index_cache', None))
+                self.source_client = RawSalesforceExportConnector(**connector_args)
+                # Sharded discovery workers rebuild the connector from the same arguments
+                self.connector_args = connector_args
+                self.logger.info("✅ Raw Salesforce export connector initialized")
             
             # Print export statistics
             if hasattr(self.source_client, 'print_export_statistics'):
@@ -251,12 +432,42 @@ class DocumentDiscovery:
             batch_mode=False
         )
         
-        # Run discovery
+        self.logger.info(f"🔍 Scanning {args.source} {'directory' if args.source == 'local' else 'folder'}: {folder_path}")
+        
+        workers = getattr(args, 'workers', 1) or 1
+        if workers > 1 and self.connector_args is not None:
+            self._run_sharded_discovery(args, start_time)
+        elif workers > 1 and args.source == "dropbox":
+            self._run_partitioned_dropbox_discovery(args, folder_path, start_time)
+        else:
+            if workers > 1:
+                self.logger.warning("⚠️ --workers is only supported for dropbox and salesforce_raw without --streaming; discovering serially")
+            self._run_serial_discovery(args, folder_path, start_time)
+        
+        # Mark discovery as complete
+        self.persistence.mark_discovery_complete()
+        
+        # Display final summary
+        elapsed = datetime.now() - start_time
+        self.logger.success("🎉 Phase 1: Basic Classification Complete!")
+        self.logger.info(f"⏱️ Time elapsed: {elapsed}")
+        
+        # Display detailed summary
+        detailed_summary = self.persistence.get_detailed_summary()
+        self._display_detailed_summary(detailed_summary)
+        self.logger.info(f"💾 Results saved to: {args.output}")
+    
+    def _run_serial_discovery(self, args: argparse.Namespace, folder_path: str, start_time: datetime) -> None:
+        """Consume the source's document generator in-process and persist it in batches.
+        
+        Args:
+            args: Parsed command line arguments.
+            folder_path: Folder (or export root) being discovered.
+            start_time: Discovery start, for rate reporting.
+        """
         total_discovered = 0
         batch_count = 0
         
-        self.logger.info(f"🔍 Scanning {args.source} {'directory' if args.source == 'local' else 'folder'}: {folder_path}")
-        
         # Discover documents (with business metadata)
         if hasattr(self.source_client, 'list_documents_as_metadata'):
             # Check if connector supports deal filtering
@@ -304,133 +515,361 @@ class DocumentDiscovery:
             self.logger.info(f"💾 Saved final batch {batch_count}: {len(current_batch)} documents")
             self.persistence.add_batch(current_batch, batch_count)
         
-        # Mark discovery as complete
+        # A complete Dropbox listing leaves a cursor that --incremental continues from
+        cursor = getattr(self.source_client, 'last_cursor', None)
+        if args.source == "dropbox" and cursor:
+            self.persistence.set_list_folder_cursor(folder_path, cursor)
+    
+    def _run_incremental_discovery(self, args: argparse.Namespace) -> None:
+        """Apply Dropbox changes since the saved list_folder cursor to the discovery file.
+        
+        Without a usable cursor (older discovery file, or Dropbox reset the cursor) the
+        folder is listed again and reconciled against the stored documents instead.
+        
+        Args:
+            args: Parsed command line arguments.
+        """
+        start_time = datetime.now()
+        folder_path = args.folder
+        cursor = self.persistence.get_list_folder_cursor(folder_path)
+        
+        if cursor is None:
+            self.logger.warning("⚠️ No saved list_folder cursor for this folder; reconciling with a full listing")
+            totals = self._reconcile_full_listing(args, folder_path)
+        else:
+            if args.longpoll:
+                self.logger.info(f"⏳ Waiting up to {args.longpoll}s for changes in {folder_path}")
+                if not self.source_client.wait_for_changes(cursor, timeout=args.longpoll):
+                    self.logger.info("✅ No changes since the last discovery")
+                    return
+            try:
+                totals = self._apply_change_stream(args, self.source_client.list_changes(cursor, folder_path))
+            except ListFolderCursorReset as e:
+                self.logger.warning(f"⚠️ {e}; reconciling with a full listing")
+                totals = self._reconcile_full_listing(args, folder_path)
+        
+        self.persistence.set_list_folder_cursor(folder_path, self.source_client.last_cursor)
         self.persistence.mark_discovery_complete()
         
-        # Display final summary
         elapsed = datetime.now() - start_time
-        self.logger.success("🎉 Phase 1: Basic Classification Complete!")
-        self.logger.info(f"⏱️ Time elapsed: {elapsed}")
-        
-        # Display detailed summary
-        detailed_summary = self.persistence.get_detailed_summary()
-        self._display_detailed_summary(detailed_summary)
+        self.logger.success(f"🔁 Incremental discovery complete in {elapsed}: "
+                            f"{totals['added']} added, {totals['modified']} modified, "
+                            f"{totals['deleted']} deleted, {totals['unchanged']} unchanged")
+        pending = len(self.persistence.get_documents_pending_vector_cleanup())
+        if pending:
+            self.logger.warning(f"🧹 {pending} documents have stale vectors pending cleanup (see vector_cleanup)")
         self.logger.info(f"💾 Results saved to: {args.output}")
     
-    def _convert_metadata_to_dict(self, doc_metadata: DocumentMetadata) -> Dict[str, Any]:
-        """Convert DocumentMetadata object to dictionary format with Phase 1 Basic Classification"""
+    def _apply_change_stream(self, args: argparse.Namespace, changes) -> Dict[str, int]:
+        """Apply ("upsert", metadata) / ("delete", path) changes in order, in batches.
         
-        # Detect source type more accurately
-        source_type = "dropbox"
-        if hasattr(self.source_client, 'export_root_dir'):
-            source_type = "salesforce_raw"
-        elif hasattr(self.source_client, 'base_path'):
-            source_type = "local"
-        elif hasattr(self.source_client, 'organized_files_dir'):
-            source_type = "salesforce"
-        
-        return {
-            "source_metadata": {
-                "source_type": source_type,
-                "source_id": getattr(doc_metadata, 'salesforce_content_version_id', None) or 
-                           getattr(doc_metadata, 'dropbox_id', '') or 
-                           f"local_{hash(doc_metadata.path)}",
-                "source_path": doc_metadata.path
-            },
-            "file_info": {
-                "path": doc_metadata.path,
-                "name": doc_metadata.name,
-                "size": doc_metadata.size,
-                "size_mb": round(doc_metadata.size / (1024 * 1024), 2),
-                "file_type": doc_metadata.file_type,
-                "modified_time": doc_metadata.modified_time,
-                "content_hash": doc_metadata.content_hash
-            },
-            "business_metadata": {
-                "deal_creation_date": doc_metadata.deal_creation_date,
-                "week_number": doc_metadata.week_number,
-                "week_date": doc_metadata.week_date,
-                "vendor": doc_metadata.vendor,
-                "client": doc_metadata.client,
-                "deal_number": doc_metadata.deal_number,
-                "deal_name": doc_metadata.deal_name,
-                "extraction_confidence": getattr(doc_metadata, 'extraction_confidence', 0.0),
-                "path_components": doc_metadata.path_components or []
-            },
-            "deal_metadata": {
-                # Core deal information
-                "deal_id": getattr(doc_metadata, 'deal_id', None),
-                "salesforce_deal_id": getattr(doc_metadata, 'salesforce_deal_id', None),
-                "deal_subject": getattr(doc_metadata, 'deal_subject', None),
-                "deal_status": getattr(doc_metadata, 'deal_status', None),
-                "deal_reason": getattr(doc_metadata, 'deal_reason', None),
-                "deal_start_date": getattr(doc_metadata, 'deal_start_date', None),
-                "negotiated_by": getattr(doc_metadata, 'negotiated_by', None),
-                
-                # Financial metrics
-                "proposed_amount": getattr(doc_metadata, 'proposed_amount', None),
-                "final_amount": getattr(doc_metadata, 'final_amount', None),
-                "savings_1yr": getattr(doc_metadata, 'savings_1yr', None),
-                "savings_3yr": getattr(doc_metadata, 'savings_3yr', None),
-                "savings_target": getattr(doc_metadata, 'savings_target', None),
-                "savings_percentage": getattr(doc_metadata, 'savings_percentage', None),
-                
-                # Client/Vendor information
-                "client_id": getattr(doc_metadata, 'client_id', None),
-                "client_name": getattr(doc_metadata, 'client_name', None),
-                "salesforce_client_id": getattr(doc_metadata, 'salesforce_client_id', None),
-                "vendor_id": getattr(doc_metadata, 'vendor_id', None),
-                "vendor_name": getattr(doc_metadata, 'vendor_name', None),
-                "salesforce_vendor_id": getattr(doc_metadata, 'salesforce_vendor_id', None),
+        Args:
+            args: Parsed command line arguments.
+            changes: Iterable of change tuples from DropboxClient.list_changes.
+            
+        Returns:
+            Summed apply_changes counts.
+        """
+        totals = {"added": 0, "modified": 0, "unchanged": 0, "deleted": 0}
+        upserts: List[Dict[str, Any]] = []
+        deletes: List[str] = []
+        
+        def flush() -> None:
+            if upserts or deletes:
+                for key, value in self.persistence.apply_changes(upserts, deletes).items():
+                    totals[key] += value
+                upserts.clear()
+                deletes.clear()
+        
+        for kind, payload in changes:
+            # Keep delete/re-add order intact: a batch holds one kind of change at a time
+            if kind == "delete":
+                if upserts:
+                    flush()
+                deletes.append(payload)
+            else:
+                if deletes:
+                    flush()
+                upserts.append(self._convert_metadata_to_dict(payload))
+            if len(upserts) + len(deletes) >= args.batch_size:
+                flush()
+        flush()
+        return totals
+    
+    def _reconcile_full_listing(self, args: argparse.Namespace, folder_path: str) -> Dict[str, int]:
+        """List the folder again, upsert what is there and mark stored documents that are gone.
+        
+        Args:
+            args: Parsed command line arguments.
+            folder_path: Dropbox folder being discovered.
+            
+        Returns:
+            Summed apply_changes counts.
+        """
+        seen = set()
+        
+        def listing():
+            for doc_metadata in self.source_client.list_documents(folder_path):
+                seen.add(doc_metadata.path.lower())
+                yield "upsert", doc_metadata
+        
+        totals = self._apply_change_stream(args, listing())
+        
+        prefix = folder_path.lower().rstrip("/") + "/"
+        missing = [
+            doc["file_info"]["path"] for doc in self.persistence.get_documents()
+            if not doc.get("source_deleted")
+            and (doc.get("file_info", {}).get("path") or "").lower().startswith(prefix)
+            and doc["file_info"]["path"].lower() not in seen
+        ]
+        if missing:
+            totals["deleted"] += self.persistence.apply_changes([], missing)["deleted"]
+        return totals
+    
+    def _run_sharded_discovery(self, args: argparse.Namespace, start_time: datetime) -> None:
+        """Discover a raw Salesforce export in ContentVersion id shards across a process pool.
+        
+        Shards are contiguous slices of the connector's discovery order. Workers enrich
+        and convert their shard; the main process is the single writer and persists
+        shards strictly in order. The resume cursor records the number of completed
+        shards and the document count they account for; --resume truncates the stored
+        documents to that count (dropping a partially written shard) and skips the
+        completed shards. Without a usable cursor the stored documents are cleared.
+        
+        Args:
+            args: Parsed command line arguments.
+            start_time: Discovery start, for rate reporting.
+        """
+        require_deal = getattr(args, 'require_deal_association', False)
+        shard_size = max(1, getattr(args, 'shard_size', DEFAULT_SHARD_SIZE) or DEFAULT_SHARD_SIZE)
+        cv_ids = self.source_client.list_content_version_ids()
+        shards = [cv_ids[i:i + shard_size] for i in range(0, len(cv_ids), shard_size)]
+        plan = hashlib.sha1("\n".join(map(str, cv_ids)).encode('utf-8')).hexdigest()
+        
+        next_shard, total_discovered = self._completed_shards(plan, shard_size) if args.resume else (0, 0)
+        stored = self.persistence.data["documents"]
+        if len(stored) > total_discovered:
+            # Documents past the cursor belong to a partially written shard or an earlier run
+            self.logger.info(f"🧹 Dropping {len(stored) - total_discovered:,} stored documents not covered by completed shards")
+            del stored[total_discovered:]
+        if next_shard:
+            progress = self.persistence.data["discovery_progress"]
+            batch_count = progress.get("current_batch") or 0
+            self.logger.info(f"🔄 Resuming at shard {next_shard + 1}/{len(shards)} ({total_discovered:,} documents already saved)")
+        else:
+            batch_count = 0
+        
+        workers = args.workers
+        self.logger.info(f"⚡ Sharded discovery: {len(shards)} shards of up to {shard_size:,} ContentVersions, {workers} workers")
+        
+        ready: Dict[int, List[Dict[str, Any]]] = {}
+        in_flight = set()
+        to_submit = iter(range(next_shard, len(shards)))
+        
+        with tempfile.TemporaryDirectory(prefix='discovery_index_') as scratch_dir, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker,
+                                    initargs=(self._shard_worker_args(scratch_dir),)) as executor:
+            def submit_more() -> None:
+                # Bound the number of finished-but-unwritten shards held in memory
+                while len(in_flight) + len(ready) < workers * 2:
+                    index = next(to_submit, None)
+                    if index is None:
+                        return
+                    in_flight.add(executor.submit(_discover_shard, index, shards[index], require_deal))
+            
+            submit_more()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.discard(future)
+                    index, documents = future.result()
+                    ready[index] = documents
                 
-                # Contract information
-                "contract_term": getattr(doc_metadata, 'contract_term', None),
-                "contract_start": getattr(doc_metadata, 'contract_start', None),
-                "contract_end": getattr(doc_metadata, 'contract_end', None),
-                "effort_level": getattr(doc_metadata, 'effort_level', None),
-                "has_fmv_report": getattr(doc_metadata, 'has_fmv_report', None),
-                "deal_origin": getattr(doc_metadata, 'deal_origin', None),
+                # Single writer: persist completed shards in shard order
+                while next_shard in ready:
+                    documents = ready.pop(next_shard)
+                    complete = True
+                    if args.max_docs and total_discovered + len(documents) >= args.max_docs:
+                        complete = total_discovered + len(documents) == args.max_docs
+                        documents = documents[:args.max_docs - total_discovered]
+                    
+                    batches = [documents[i:i + args.batch_size] for i in range(0, len(documents), args.batch_size)]
+                    for batch in batches[:-1]:
+                        batch_count += 1
+                        self.persistence.add_batch(batch, batch_count)
+                    if complete:
+                        # Recorded before the shard's last batch so the cursor is flushed with it
+                        last_path = documents[-1]["file_info"]["path"] if documents else shards[next_shard][-1]
+                        self.persistence.save_progress(last_path, json.dumps({
+                            "plan": plan,
+                            "shard_size": shard_size,
+                            "shards_completed": next_shard + 1,
+                            "documents_saved": total_discovered + len(documents),
+                            "total_shards": len(shards)
+                        }))
+                    if batches:
+                        batch_count += 1
+                        self.persistence.add_batch(batches[-1], batch_count)
+                    
+                    total_discovered += len(documents)
+                    next_shard += 1
+                    elapsed = datetime.now() - start_time
+                    rate = total_discovered / max(elapsed.total_seconds(), 1e-6)
+                    self.logger.info(f"📈 Shard {next_shard}/{len(shards)} saved | {total_discovered} documents | Rate: {rate:.1f} docs/sec")
+                    
+                    if args.max_docs and total_discovered >= args.max_docs:
+                        self.logger.warning(f"⚠️ Reached max documents limit: {args.max_docs}")
+                        for pending in in_flight:
+                            pending.cancel()
+                        return
                 
-                # ENHANCED FINANCIAL FIELDS (Missing from original!)
-                "savings_achieved": getattr(doc_metadata, 'savings_achieved', None),
-                "fixed_savings": getattr(doc_metadata, 'fixed_savings', None),
-                "savings_target_full_term": getattr(doc_metadata, 'savings_target_full_term', None),
-                "final_amount_full_term": getattr(doc_metadata, 'final_amount_full_term', None),
+                submit_more()
+    
+    def _shard_worker_args(self, scratch_dir: str) -> Dict[str, Any]:
+        """Connector arguments for shard workers, pointing them at a parsed index.
+        
+        Workers open the --index-cache when one is configured (the main process has
+        already brought it up to date). Otherwise the main process writes the index it
+        has already built to a temporary cache in scratch_dir, so no worker re-parses
+        the export CSVs or rescans the payload directories.
+        
+        Args:
+            scratch_dir: Directory for the temporary cache, removed after discovery.
+        
+        Returns:
+            Keyword arguments for RawSalesforceExportConnector in each worker.
+        """
+        if self.connector_args.get('index_cache'):
+            return self.connector_args
+        cache_path = os.path.join(scratch_dir, 'index_cache.sqlite')
+        self.source_client.save_index_cache(cache_path)
+        self.logger.info("💾 Wrote the parsed export index to a temporary cache for shard workers")
+        return {**self.connector_args, 'index_cache': cache_path}
+    
+    def _run_partitioned_dropbox_discovery(self, args: argparse.Namespace, folder_path: str,
+                                           start_time: datetime) -> None:
+        """List a Dropbox folder's first-level subfolders concurrently and persist pages as they arrive.
+        
+        A page's per-partition cursors are flushed with its last batch, together with
+        the number of documents saved up to and including that page, so --resume
+        truncates the stored documents to that count (dropping a partially written
+        page) and continues every subfolder from its own cursor. Without a usable
+        state the stored documents are cleared.
+        
+        Args:
+            args: Parsed command line arguments.
+            folder_path: Dropbox folder being discovered.
+            start_time: Discovery start, for rate reporting.
+        """
+        state = self._partition_listing_state(folder_path) if args.resume else None
+        if state:
+            done = sum(1 for p in state["partitions"].values() if p["complete"])
+            self.logger.info(f"🔄 Resuming partitioned listing ({done}/{len(state['partitions'])} folders complete)")
+        state = state or {}
+        
+        total_discovered = state.pop("documents_saved", 0)
+        stored = self.persistence.data["documents"]
+        if len(stored) > total_discovered:
+            # Documents past the cursor belong to a partially written page or an earlier run
+            self.logger.info(f"🧹 Dropping {len(stored) - total_discovered:,} stored documents not covered by saved cursors")
+            del stored[total_discovered:]
+        progress = self.persistence.data["discovery_progress"]
+        batch_count = (progress.get("current_batch") or 0) if state else 0
+        
+        pages = self.source_client.list_documents_partitioned(folder_path, max_workers=args.workers, state=state)
+        try:
+            for page in pages:
+                documents = [self._convert_metadata_to_dict(m) for m in page.documents]
+                complete = True
+                if args.max_docs and total_discovered + len(documents) >= args.max_docs:
+                    complete = total_discovered + len(documents) == args.max_docs
+                    documents = documents[:args.max_docs - total_discovered]
                 
-                # RICH NARRATIVE CONTENT (Missing from original!)
-                "current_narrative": getattr(doc_metadata, 'current_narrative', None),
-                "customer_comments": getattr(doc_metadata, 'customer_comments', None),
-                "content_source": getattr(doc_metadata, 'content_source', None),
+                batches = [documents[i:i + args.batch_size] for i in range(0, len(documents), args.batch_size)]
+                for batch in batches[:-1]:
+                    batch_count += 1
+                    self.persistence.add_batch(batch, batch_count)
+                if complete:
+                    # Recorded before the page's last batch so the cursors are flushed with it
+                    DropboxClient.advance_listing_state(state, page)
+                    last_path = documents[-1]["file_info"]["path"] if documents else page.partition
+                    self.persistence.save_progress(last_path, json.dumps({
+                        "mode": "dropbox_partitions",
+                        **state,
+                        "documents_saved": total_discovered + len(documents)
+                    }))
+                if batches:
+                    batch_count += 1
+                    self.persistence.add_batch(batches[-1], batch_count)
+                total_discovered += len(documents)
                 
-                # Deal classification fields (added December 2025)
-                "report_type": getattr(doc_metadata, 'report_type', None),
-                "description": getattr(doc_metadata, 'description', None),
-                "project_type": getattr(doc_metadata, 'project_type', None),
-                "competition": getattr(doc_metadata, 'competition', None),
-                "npi_analyst": getattr(doc_metadata, 'npi_analyst', None),
-                "dual_multi_sourcing": getattr(doc_metadata, 'dual_multi_sourcing', None),
-                "time_pressure": getattr(doc_metadata, 'time_pressure', None),
-                "advisor_network_used": getattr(doc_metadata, 'advisor_network_used', None),
+                if documents:
+                    elapsed = datetime.now() - start_time
+                    rate = total_discovered / max(elapsed.total_seconds(), 1e-6)
+                    where = "(root)" if page.partition == ROOT_PARTITION else page.partition
+                    self.logger.info(f"📈 {where}: +{len(documents)} | {total_discovered} documents | Rate: {rate:.1f} docs/sec")
                 
-                # Mapping status (for debugging)
-                "mapping_status": getattr(doc_metadata, 'mapping_status', None),
-                "mapping_method": getattr(doc_metadata, 'mapping_method', None),
-                "mapping_reason": getattr(doc_metadata, 'mapping_reason', None)
-            },
-            # Phase 2 Advanced Classification: LLM document types (added during processing)
-            "llm_classification": {
-                "document_type": None,  # Will be classified in Phase 2: IDD, FMV, Contract, etc.
-                "confidence": 0.0,
-                "reasoning": None,
-                "classification_method": "pending_phase_2_processing",
-                "alternative_types": [],
-                "tokens_used": 0
-            },
-            "processing_status": {
-                "processed": False,
-                "processing_date": None
-            }
-        }
+                if args.max_docs and total_discovered >= args.max_docs:
+                    self.logger.warning(f"⚠️ Reached max documents limit: {args.max_docs}")
+                    return
+        finally:
+            pages.close()
+        
+        # A complete listing leaves a cursor that --incremental continues from
+        if self.source_client.last_cursor:
+            self.persistence.set_list_folder_cursor(folder_path, self.source_client.last_cursor)
+    
+    def _partition_listing_state(self, folder_path: str) -> Optional[Dict[str, Any]]:
+        """Per-partition cursors saved by an interrupted partitioned Dropbox listing of folder_path (None if none)."""
+        cursor = self.persistence.data.get("discovery_progress", {}).get("resume_cursor")
+        if not cursor:
+            return None
+        try:
+            state = json.loads(cursor)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(state, dict) or state.pop("mode", None) != "dropbox_partitions":
+            return None
+        if state.get("folder") != folder_path:
+            self.logger.warning("⚠️ Saved listing state is for another folder; listing from scratch")
+            return None
+        saved = state.get("documents_saved")
+        if not isinstance(saved, int) or saved > len(self.persistence.data.get("documents", [])):
+            self.logger.warning("⚠️ Saved listing state does not match the stored documents; listing from scratch")
+            return None
+        return state
+    
+    def _completed_shards(self, plan: str, shard_size: int) -> Tuple[int, int]:
+        """Resume point of an interrupted sharded run: (shards completed, documents they saved).
+        
+        Returns (0, 0) when there is no cursor or it is incompatible with this run.
+        
+        Args:
+            plan: Fingerprint of the current run's ContentVersion id order.
+            shard_size: Current shard size.
+        """
+        cursor = self.persistence.data.get("discovery_progress", {}).get("resume_cursor")
+        if not cursor:
+            return 0, 0
+        try:
+            state = json.loads(cursor)
+        except (TypeError, ValueError):
+            return 0, 0
+        if not isinstance(state, dict) or "documents_saved" not in state:
+            return 0, 0
+        if state.get("plan") != plan or state.get("shard_size") != shard_size:
+            self.logger.warning("⚠️ Export or --shard-size changed since the interrupted run; restarting sharded discovery")
+            return 0, 0
+        shards_completed = int(state.get("shards_completed") or 0)
+        documents_saved = int(state["documents_saved"])
+        if documents_saved > len(self.persistence.data["documents"]):
+            self.logger.warning("⚠️ Discovery file has fewer documents than the resume cursor; restarting sharded discovery")
+            return 0, 0
+        return shards_completed, documents_saved
+    
+    def _convert_metadata_to_dict(self, doc_metadata: DocumentMetadata) -> Dict[str, Any]:
+        """Convert DocumentMetadata object to dictionary format with Phase 1 Basic Classification"""
+        return _metadata_to_dict(doc_metadata, _detect_source_type(self.source_client))
     
     def _display_summary(self, summary: Dict[str, Any]) -> None:
         """Display discovery summary.
@@ -547,11 +986,20 @@ Phase 1: Basic Classification Examples:
     --deal-mapping-csv "organized_files_to_deal_mapping.csv" \\
     --output "raw_salesforce_discovery.json"
 
+  # Enrich a large raw export in parallel (resumable per shard with --resume)
+  python discover_documents.py --source salesforce_raw ... --index-cache export_index.db --workers 8
+
   # Limit discovery for testing
   python discover_documents.py --source local --path "/docs" --max-docs 100
 
   # Resume interrupted discovery
   python discover_documents.py --source local --path "/docs" --resume
+  
+  # List a large Dropbox tree with 8 concurrent folder listings (resumable per folder with --resume)
+  python discover_documents.py --source dropbox --folder "/2024 Deal Docs" --workers 8
+  
+  # Apply only Dropbox changes since an earlier discovery (deletions are marked for vector cleanup)
+  python discover_documents.py --source dropbox --folder "/2024 Deal Docs" --output discovery_12_05_2025.json --incremental
 
 Classification Phases:
   Phase 1 (Basic): File paths → business metadata + file types (THIS TOOL)
@@ -595,12 +1043,23 @@ Classification Phases:
                        help="Path to content_documents.csv (for salesforce_raw source)")
     parser.add_argument("--content-document-links-csv", type=str,
                        help="Path to content_document_links.csv (for salesforce_raw source)")
+    parser.add_argument("--index-cache", type=str,
+                       help="SQLite file to persist parsed export mappings between runs; reused while the CSVs are unchanged (for salesforce_raw source)")
+    parser.add_argument("--streaming", action="store_true",
+                       help="Bounded-memory discovery: stream the export CSVs into a SQLite index (for salesforce_raw source)")
+    parser.add_argument("--streaming-db", type=str,
+                       help="SQLite index file for --streaming (default: <deal-metadata-csv>.streaming.db)")
     
     # Discovery options
     parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
                        help=f"Number of documents per batch (default: {DEFAULT_BATCH_SIZE})")
     parser.add_argument("--max-docs", type=int,
                        help="Maximum documents to discover (for testing)")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Worker processes for sharded discovery (salesforce_raw without --streaming), or threads "
+                            "listing first-level folders concurrently (dropbox); default: 1 = serial")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE,
+                       help=f"ContentVersions per discovery shard with --workers (default: {DEFAULT_SHARD_SIZE})")
     
     # Output options
     parser.add_argument("--output", type=str, default="discovery.json",
@@ -612,6 +1071,13 @@ Classification Phases:
     parser.add_argument("--resume", action="store_true",
                        help="Resume from previous discovery")
     
+    # Incremental Dropbox discovery
+    parser.add_argument("--incremental", action="store_true",
+                       help="Update an existing Dropbox discovery file (--output) with only the files added, "
+                            "modified or deleted since its saved list_folder cursor")
+    parser.add_argument("--longpoll", type=int, default=0,
+                       help="With --incremental, wait up to this many seconds (30-480) for a change before listing")
+    
     return parser
 
 
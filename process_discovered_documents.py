@@ -34,7 +34,7 @@ sys.path.insert(0, '.')
 # Import components
 from src.config.colored_logging import ColoredLogger
 from src.config.settings import Settings
-from src.connectors.dropbox_client import DropboxClient
+from src.connectors.dropbox_client import DropboxClient, DEFAULT_SPOOL_THRESHOLD_MB
 from src.models.document_models import DocumentMetadata
 from src.connectors.local_filesystem_client import LocalFilesystemClient
 from src.connectors.salesforce_file_source import SalesforceFileSource
@@ -44,11 +44,15 @@ from src.utils.discovery_persistence import DiscoveryPersistence
 from src.pipeline.processing_batch_manager import ProcessingBatchManager
 from src.config.progress_logger import ProcessingProgressLogger
 from src.chunking.chunker_factory import ChunkerFactory
+from src.pipeline.document_prefetcher import (
+    DEFAULT_PREFETCH_DEPTH, DEFAULT_PREFETCH_MEMORY_MB, DocumentPrefetcher
+)
 
 # Processing defaults
 DEFAULT_BATCH_SIZE: int = 50
 DEFAULT_NAMESPACE: str = "documents"
 DEFAULT_REDACTION_MODEL: str = "gpt-5-mini-2025-08-07"
+DEFAULT_REDACTION_BACKEND: str = "llm"
 EXCLUDED_FILE_TYPES_DEFAULT: str = ".png"
 
 __all__ = ["DiscoveredDocumentProcessor", "create_argument_parser", "main"]
@@ -146,7 +150,8 @@ class DiscoveredDocumentProcessor:
         if source_type == "dropbox":
             self.source_client = DropboxClient(
                 self.settings.DROPBOX_ACCESS_TOKEN,
-                openai_api_key=self.settings.OPENAI_API_KEY
+                openai_api_key=self.settings.OPENAI_API_KEY,
+                spool_threshold_mb=args.spool_threshold_mb
             )
             self.logger.info("✅ Dropbox client initialized")
         elif source_type == "local":
@@ -281,14 +286,18 @@ class DiscoveredDocumentProcessor:
         if args.enable_redaction and args.client_redaction_csv:
             try:
                 from src.redaction.client_registry import ClientRegistry
-                from src.redaction.llm_span_detector import LLMSpanDetector
+                from src.redaction.span_detector_factory import SpanDetectorFactory
                 from src.redaction.redaction_service import RedactionService
                 
                 client_registry = ClientRegistry(args.client_redaction_csv)
-                llm_detector = LLMSpanDetector(
-                    api_key=self.settings.OPENAI_API_KEY,
-                    model=args.redaction_model or DEFAULT_REDACTION_MODEL
-                )
+                llm_detector = SpanDetectorFactory.create_detector({
+                    "backend": args.redaction_backend,
+                    "api_key": self.settings.OPENAI_API_KEY,
+                    "model": args.redaction_model or DEFAULT_REDACTION_MODEL,
+                    "ner_engine": args.redaction_ner_engine,
+                    "ner_model": args.redaction_ner_model,
+                    "escalation_threshold": args.redaction_escalation_threshold,
+                })
                 redaction_service = RedactionService(
                     client_registry=client_registry,
                     llm_span_detector=llm_detector,
@@ -314,9 +323,22 @@ class DiscoveredDocumentProcessor:
         
         # Initialize and set the chunker using the factory
         chunker_factory = ChunkerFactory(self.pinecone_client)
-        chunker = chunker_factory.create_chunker(args.chunking_strategy)
+        chunker = chunker_factory.create_chunker(
+            args.chunking_strategy, max_chunk_tokens=args.max_chunk_tokens
+        )
         self.document_processor.set_chunker(chunker)
         
+        if args.dedup_policy != "off":
+            from src.pipeline.chunk_deduplicator import ChunkDeduplicator
+            self.document_processor.set_deduplicator(ChunkDeduplicator(policy=args.dedup_policy))
+        
+        if args.prefetch_depth > 0:
+            self.document_processor.set_prefetcher(DocumentPrefetcher(
+                self.source_client.download_document,
+                depth=args.prefetch_depth,
+                memory_budget_mb=args.prefetch_memory_mb
+            ))
+        
         self.logger.info(f"✅ Document processor initialized with {args.chunking_strategy} chunking")
     
     def _get_documents_to_process(self, args: argparse.Namespace) -> List[Dict[str, Any]]:
@@ -388,6 +410,7 @@ class DiscoveredDocumentProcessor:
             f"in={stats.get('input_total')} "
             f"out={len(filtered_docs)} "
             f"excluded_processed={stats.get('excluded_processed')} "
+            f"excluded_deleted={stats.get('excluded_source_deleted')} "
             f"excluded_type={stats.get('excluded_file_type')} "
             f"excluded_date_invalid={stats.get('excluded_modified_time_missing_or_invalid')} "
             f"excluded_after={stats.get('excluded_modified_after')} "
@@ -427,14 +450,23 @@ class DiscoveredDocumentProcessor:
             if start_index > 0:
                 self.logger.info(f"🔄 Resuming from document {start_index + 1}/{total_docs}")
         
+        # Convert lazily so the prefetcher (when enabled) downloads the next documents
+        # while the current one is parsed
+        converted = (
+            (i, doc_data, self._convert_to_document_metadata(doc_data))
+            for i, doc_data in enumerate(documents[start_index:], start_index)
+        )
+        prefetcher = self.document_processor.prefetcher
+        if prefetcher is not None:
+            queued = prefetcher.iterate(converted, self._prefetch_request)
+        else:
+            queued = ((entry, None) for entry in converted)
+        
         try:
             processed_count = 0
             batch_start_time = datetime.now()
             
-            for i, doc_data in enumerate(documents[start_index:], start_index):
-                # Convert discovery data to DocumentMetadata
-                doc_metadata = self._convert_to_document_metadata(doc_data)
-                
+            for (i, doc_data, doc_metadata), prefetched in queued:
                 if not doc_metadata:
                     self.stats["documents_skipped"] += 1
                     continue
@@ -444,7 +476,8 @@ class DiscoveredDocumentProcessor:
                 
                 result = self.document_processor.process_document(
                     doc_metadata, 
-                    namespace=args.namespace
+                    namespace=args.namespace,
+                    prefetched=prefetched
                 )
                 
                 # Update processing status
@@ -522,6 +555,8 @@ class DiscoveredDocumentProcessor:
             # Final summary
             elapsed = datetime.now() - start_time
             self._display_final_summary(elapsed)
+            if prefetcher is not None:
+                self.logger.info(f"📥 {prefetcher.summary()}")
             
         except KeyboardInterrupt:
             self.logger.warning("\n⚠️ Processing interrupted by user")
@@ -531,6 +566,16 @@ class DiscoveredDocumentProcessor:
             self.logger.error(f"❌ Processing error: {e}")
             self.persistence.flush_buffer()
             raise
+        finally:
+            # Drops downloads still queued ahead (limit reached or interrupted)
+            queued.close()
+    
+    def _prefetch_request(self, entry):
+        """Prefetch request for a (index, discovery dict, DocumentMetadata) entry; None skips the download."""
+        doc_metadata = entry[2]
+        if not doc_metadata or not self.document_processor.converter.can_process(doc_metadata.path, doc_metadata.name):
+            return None
+        return doc_metadata.path, {}
     
     def _collect_batch_requests_only(self, documents: List[Dict[str, Any]], args: argparse.Namespace) -> None:
         """Collect LLM requests for batch processing without processing documents"""
@@ -710,9 +755,9 @@ class DiscoveredDocumentProcessor:
         Returns:
             Dictionary with file-related fields for DocumentMetadata.
         """
-            file_info = doc_data.get("file_info", {})
-            source_meta = doc_data.get("source_metadata", {})
-            
+        file_info = doc_data.get("file_info", {})
+        source_meta = doc_data.get("source_metadata", {})
+        
         return {
             "path": file_info.get("path", ""),
             "name": file_info.get("name", ""),
@@ -736,8 +781,8 @@ class DiscoveredDocumentProcessor:
             Dictionary with business-related fields for DocumentMetadata.
         """
         business_meta = doc_data.get("business_metadata", {})
-            deal_meta = doc_data.get("deal_metadata", {})
-            
+        deal_meta = doc_data.get("deal_metadata", {})
+        
         return {
             "deal_creation_date": business_meta.get("deal_creation_date") or deal_meta.get("deal_creation_date"),
             "week_number": business_meta.get("week_number"),
@@ -860,6 +905,9 @@ class DiscoveredDocumentProcessor:
         self.logger.info(f"❌ Documents failed: {self.stats['documents_failed']}")
         self.logger.info(f"⏭️ Documents skipped: {self.stats['documents_skipped']}")
         self.logger.info(f"🧩 Total chunks created: {self.stats['total_chunks_created']}")
+        deduplicator = getattr(self.document_processor, "deduplicator", None) if hasattr(self, "document_processor") else None
+        if deduplicator is not None:
+            self.logger.info(f"♻️ {deduplicator.summary()}")
         self.logger.info(f"⏱️ Total processing time: {self.stats['total_processing_time']:.2f}s")
         self.logger.info(f"⏱️ Wall clock time: {elapsed}")
         
@@ -973,6 +1021,43 @@ Examples:
         default='business_aware',
         help="The chunking strategy to use: 'business_aware' (default) or 'semantic' (LangChain)."
     )
+    parser.add_argument(
+        "--max-chunk-tokens",
+        type=int,
+        default=None,
+        help="Size business_aware chunks by embedding-model tokens instead of characters "
+             "(e.g. 480 for multilingual-e5-large's 512-token window). Requires transformers."
+    )
+    parser.add_argument(
+        "--dedup-policy",
+        type=str,
+        choices=["off", "reuse", "skip"],
+        default="off",
+        help="Cross-document duplicate chunks (same deal, exact or near-identical): 'reuse' the first "
+             "copy's vectors, 'skip' embedding and upserting them, or 'off' (default: off). "
+             "Each parallel worker keeps its own index."
+    )
+    parser.add_argument(
+        "--prefetch-depth",
+        type=int,
+        default=DEFAULT_PREFETCH_DEPTH,
+        help=f"Download this many upcoming documents in the background while the current one is "
+             f"parsed; 0 disables prefetching (default: {DEFAULT_PREFETCH_DEPTH})."
+    )
+    parser.add_argument(
+        "--prefetch-memory-mb",
+        type=float,
+        default=DEFAULT_PREFETCH_MEMORY_MB,
+        help=f"Prefetched bytes held in memory per process; the rest spool to temp files "
+             f"(default: {DEFAULT_PREFETCH_MEMORY_MB})."
+    )
+    parser.add_argument(
+        "--spool-threshold-mb",
+        type=float,
+        default=DEFAULT_SPOOL_THRESHOLD_MB,
+        help=f"Dropbox files larger than this are streamed to a temp file that the parser reads "
+             f"by path instead of being held in memory; 0 disables (default: {DEFAULT_SPOOL_THRESHOLD_MB})."
+    )
     
     # Parser backend selection
     parser.add_argument(
@@ -1058,6 +1143,35 @@ Examples:
         default=DEFAULT_REDACTION_MODEL,
         help=f"OpenAI model for PERSON entity detection (default: {DEFAULT_REDACTION_MODEL}).",
     )
+    parser.add_argument(
+        "--redaction-backend",
+        type=str,
+        choices=["llm", "local", "hybrid"],
+        default=DEFAULT_REDACTION_BACKEND,
+        help="PERSON/ORG span detector: 'llm' (OpenAI), 'local' (CPU NER, no API calls), or 'hybrid' "
+             f"(local NER, escalating low-confidence windows to the LLM) (default: {DEFAULT_REDACTION_BACKEND}).",
+    )
+    parser.add_argument(
+        "--redaction-ner-engine",
+        type=str,
+        choices=["spacy", "transformers", "onnx"],
+        default=None,
+        help="Local NER engine for --redaction-backend local/hybrid (default: spacy for local, "
+             "transformers for hybrid). Hybrid requires transformers or onnx, the engines that "
+             "produce the confidence scores escalation is based on.",
+    )
+    parser.add_argument(
+        "--redaction-ner-model",
+        type=str,
+        default=None,
+        help="spaCy package or Hugging Face model id for the local NER engine (default: engine-specific).",
+    )
+    parser.add_argument(
+        "--redaction-escalation-threshold",
+        type=float,
+        default=0.85,
+        help="Hybrid mode: escalate windows with any entity scored below this to the LLM (default: 0.85).",
+    )
     
     return parser
 
@@ -1103,6 +1217,14 @@ def main() -> None:
             client_redaction_csv=args.client_redaction_csv,
             redaction_model=args.redaction_model,
             enable_redaction=args.enable_redaction,
+            redaction_backend=args.redaction_backend,
+            redaction_ner_engine=args.redaction_ner_engine,
+            redaction_ner_model=args.redaction_ner_model,
+            redaction_escalation_threshold=args.redaction_escalation_threshold,
+            max_chunk_tokens=args.max_chunk_tokens,
+            dedup_policy=args.dedup_policy,
+            prefetch_depth=args.prefetch_depth,
+            prefetch_memory_mb=args.prefetch_memory_mb,
         )
     else:
         # Serial processing (existing behavior)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Local Discovery Benchmark
+=========================
+Builds a synthetic deal-folder tree and times local discovery: the previous
+os.walk scan (two stats per file) against LocalFilesystemClient's scandir
+scanner, serially and with concurrent directory listing.
+
+Usage:
+    python scripts/benchmark_local_discovery.py [--files 1000000] [--root /tmp/discovery_bench]
+
+Options:
+    --files     Number of synthetic files (default: 1,000,000)
+    --root      Directory for the synthetic tree (reused if it already has the tree;
+                any other non-empty directory is refused)
+    --workers   Scan threads for the concurrent run (default: 8)
+    --keep      Keep the synthetic tree after the benchmark
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.connectors.local_filesystem_client import LocalFilesystemClient
+
+# Week folders -> vendor folders -> deal folders -> files (mirrors organized deal docs)
+WEEKS = 50
+VENDORS_PER_WEEK = 20
+EXTENSIONS = ['.pdf', '.docx', '.xlsx', '.msg', '.png']
+
+
+def build_tree(root: Path, total_files: int) -> None:
+    """Create total_files small files spread over WEEKS x VENDORS_PER_WEEK deal folders."""
+    marker = root / f".tree_{total_files}"
+    if marker.exists():
+        print(f"♻️  Reusing synthetic tree at {root}")
+        return
+    if root.exists() and any(root.iterdir()):
+        if not any(root.glob(".tree_*")):
+            # Never delete a directory this script did not build
+            sys.exit(f"❌ {root} is not empty and is not a synthetic tree; pick another --root")
+        shutil.rmtree(root)
+
+    deals = WEEKS * VENDORS_PER_WEEK
+    per_deal = max(1, total_files // deals)
+    print(f"🏗️  Building {deals * per_deal:,} files in {deals:,} deal folders under {root} ...")
+    start = time.time()
+    for week in range(WEEKS):
+        for vendor in range(VENDORS_PER_WEEK):
+            deal_dir = root / f"Week{week + 1}-2024" / f"Vendor{vendor}" / f"Deal-{week * VENDORS_PER_WEEK + vendor}"
+            deal_dir.mkdir(parents=True, exist_ok=True)
+            for i in range(per_deal):
+                with open(deal_dir / f"doc_{i}{EXTENSIONS[i % len(EXTENSIONS)]}", 'wb') as f:
+                    f.write(b'x')
+    marker.touch()
+    print(f"   built in {time.time() - start:.1f}s")
+
+
+def legacy_scan(base_path: Path) -> int:
+    """The previous list_documents loop: os.walk plus two stat() calls per file."""
+    client = LocalFilesystemClient.__new__(LocalFilesystemClient)
+    client._supported_extensions = {'.pdf', '.docx', '.doc', '.xlsx', '.xls', '.csv', '.txt', '.msg',
+                                    '.png', '.jpg', '.jpeg', '.tiff', '.ppt', '.pptx'}
+    count = 0
+    for root, _, files in os.walk(base_path):
+        root_path = Path(root)
+        for file_name in files:
+            if file_name.startswith('.') or not client.is_supported_file_type(file_name):
+                continue
+            file_path = root_path / file_name
+            stat = file_path.stat()
+            file_path.relative_to(base_path)
+            datetime.fromtimestamp(stat.st_mtime).isoformat()
+            file_path.stat().st_ino
+            count += 1
+    return count
+
+
+def timed(label: str, fn) -> None:
+    start = time.time()
+    count = fn()
+    elapsed = time.time() - start
+    print(f"   {label:<32} {count:>10,} files  {elapsed:8.2f}s  ({count / elapsed:,.0f} files/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark local filesystem discovery")
+    parser.add_argument("--files", type=int, default=1_000_000, help="Number of synthetic files")
+    parser.add_argument("--root", type=str, default="/tmp/discovery_bench", help="Synthetic tree directory")
+    parser.add_argument("--workers", type=int, default=8, help="Scan threads for the concurrent run")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic tree")
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    build_tree(root, args.files)
+
+    print("⏱️  Scanning (run order: legacy, serial, concurrent; page cache is warm after the first run)")
+    try:
+        timed("os.walk + 2x stat (previous)", lambda: legacy_scan(root))
+        serial = LocalFilesystemClient(str(root), scan_workers=1)
+        timed("scandir, serial", lambda: sum(len(b) for b in serial.batch_list_documents("", batch_size=1000)))
+        concurrent = LocalFilesystemClient(str(root), scan_workers=args.workers)
+        timed(f"scandir, {args.workers} threads",
+              lambda: sum(len(b) for b in concurrent.batch_list_documents("", batch_size=1000)))
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
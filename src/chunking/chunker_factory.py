@@ -5,7 +5,7 @@ This module provides a factory for creating different types of text chunkers.
 It allows the pipeline to dynamically select a chunking strategy at runtime.
 """
 
-from typing import Literal
+from typing import Literal, Optional
 from src.chunking.semantic_chunker import SemanticChunker as BusinessAwareChunker
 import logging
 
@@ -22,12 +22,15 @@ class ChunkerFactory:
         self.pinecone_client = pinecone_client
         self.logger = logging.getLogger(__name__)
 
-    def create_chunker(self, strategy: Literal['business_aware', 'semantic']):
+    def create_chunker(self, strategy: Literal['business_aware', 'semantic'],
+                       max_chunk_tokens: Optional[int] = None):
         """
         Creates a chunker based on the specified strategy.
         
         Args:
             strategy: The chunking strategy to use.
+            max_chunk_tokens: Optional token budget for business_aware chunks
+                              (sizes chunks by embedding-model tokens instead of characters).
             
         Returns:
             An instance of a configured text chunker.
@@ -39,18 +42,18 @@ class ChunkerFactory:
         
         if strategy == 'business_aware':
             # Our existing, highly customized business-aware chunker
-            return BusinessAwareChunker()
+            return BusinessAwareChunker(max_chunk_tokens=max_chunk_tokens)
             
         elif strategy == 'semantic':
-            # The LangChain Semantic Chunker is optional; import lazily
+            # The embedding-similarity chunker needs NumPy; import lazily
             try:
                 from src.chunking.langchain_chunker_adapter import LangchainChunkerAdapter  # type: ignore
                 return LangchainChunkerAdapter(self.pinecone_client)
             except Exception as e:
                 self.logger.warning(
-                    f"LangChain semantic chunker unavailable ({e}); falling back to business_aware."
+                    f"Semantic chunker unavailable ({e}); falling back to business_aware."
                 )
-                return BusinessAwareChunker()
+                return BusinessAwareChunker(max_chunk_tokens=max_chunk_tokens)
             
         else:
             self.logger.error(f"Unknown chunking strategy: {strategy}")
@@ -1,66 +1,99 @@
 """
 LangChain Chunker Adapter
 
-This module provides an adapter to make the LangChain SemanticChunker
-compatible with our existing document processing pipeline.
+This module provides an adapter that runs LangChain-style semantic chunking
+(embedding-similarity breakpoints) inside our document processing pipeline.
+
+The breakpoint algorithm mirrors langchain_experimental's SemanticChunker
+(sentence windows, cosine distance between neighbours, percentile threshold),
+but sentence windows are embedded in one batched call through our Pinecone
+client and distances are computed with NumPy.
+
+Chunks are embedded from their own text at upsert time, like every other
+chunker. Mean-pooling the sentence-window embeddings into chunk embeddings
+(pool_chunk_embeddings=True) saves that second dense pass, but a pooled vector
+is not the embedding of the chunk text that queries are compared against, so
+it is opt-in and should only be enabled after checking retrieval quality on
+the target corpus.
 """
 
-from typing import List, Dict, Any
-from langchain_experimental.text_splitter import SemanticChunker as LangchainSemanticChunker
-from src.chunking.semantic_chunker import Chunk
-from src.embeddings.langchain_embedding_wrapper import LangchainEmbeddingWrapper
+import re
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 
+import numpy as np
+
+from src.chunking.semantic_chunker import Chunk
+
+
+# Same sentence split LangChain's SemanticChunker uses
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.?!])\s+')
+
+
 class LangchainChunkerAdapter:
     """
-    An adapter for the LangChain SemanticChunker to make it compatible
-    with our pipeline's expected Chunk structure.
+    An adapter for LangChain-style semantic chunking that produces our
+    pipeline's Chunk structure.
     """
 
-    def __init__(self, pinecone_client):
+    def __init__(self, pinecone_client, buffer_size: int = 1,
+                 breakpoint_percentile: float = 95.0,
+                 pool_chunk_embeddings: bool = False):
         """
         Initializes the adapter.
-        
+
         Args:
             pinecone_client: Our internal Pinecone client.
+            buffer_size: Neighbouring sentences on each side included in a sentence window
+            breakpoint_percentile: Distance percentile above which a breakpoint is placed
+                                   (LangChain's "percentile" threshold type)
+            pool_chunk_embeddings: Attach mean-pooled window embeddings to chunks so they
+                                   are not re-embedded (off by default: pooled vectors
+                                   differ from embeddings of the chunk text); chunks with
+                                   no window fully inside them are re-embedded either way
         """
         self.logger = logging.getLogger(__name__)
-        
-        # Wrap our Pinecone client to be compatible with LangChain
-        langchain_embeddings = LangchainEmbeddingWrapper(pinecone_client)
-        
-        # Instantiate the LangChain SemanticChunker
-        # Using recommended defaults for our document types.
-        self.langchain_chunker = LangchainSemanticChunker(
-            embeddings=langchain_embeddings,
-            breakpoint_threshold_type="percentile" # A good starting point
-        )
+        self.pinecone_client = pinecone_client
+        self.buffer_size = buffer_size
+        self.breakpoint_percentile = breakpoint_percentile
+        self.pool_chunk_embeddings = pool_chunk_embeddings
 
     def chunk_document(self, content: str, metadata: Dict[str, Any]) -> List[Chunk]:
         """
-        Chunks the document using the LangChain SemanticChunker and adapts
-        the output to our pipeline's Chunk format.
-        
+        Chunks the document at semantic breakpoints and adapts the output to
+        our pipeline's Chunk format.
+
         Args:
             content: The text content of the document to chunk.
             metadata: The metadata associated with the document.
-            
+
         Returns:
             A list of structured Chunk objects.
         """
-        self.logger.info("Chunking document using LangChain's SemanticChunker...")
-        
+        self.logger.info("Chunking document using semantic (embedding-similarity) strategy...")
+
         if not content or len(content.strip()) < 50:
             self.logger.warning("Content too short for semantic chunking, returning empty list.")
             return []
 
         try:
-            # Use the LangChain chunker to split the text
-            texts = self.langchain_chunker.split_text(content)
-            
+            sentence_spans = self._split_sentence_spans(content)
+            if not sentence_spans:
+                return []
+
+            embeddings = None
+            groups = [(0, len(sentence_spans))]
+            if len(sentence_spans) > 1:
+                embeddings = self._embed_sentence_windows(content, sentence_spans)
+                groups = self._group_by_breakpoints(self._neighbour_distances(embeddings))
+
             chunks = []
-            for i, text_chunk in enumerate(texts):
-                # Adapt the simple text chunk to our structured Chunk object
+            for i, (first, last) in enumerate(groups):
+                start_index = sentence_spans[first][0]
+                end_index = sentence_spans[last - 1][1]
+                text_chunk = " ".join(content[s:e] for s, e in sentence_spans[first:last])
+
+                # Adapt the text chunk to our structured Chunk object
                 chunk_metadata = {
                     **metadata,
                     "chunk_index": i,
@@ -69,19 +102,99 @@ class LangchainChunkerAdapter:
                     "section_name": "semantic",  # Sectioning is handled by the chunker itself
                     "chunk_type": "semantic",
                 }
-                
+
                 chunk = Chunk(
                     text=text_chunk,
                     metadata=chunk_metadata,
-                    start_index=0,  # Start index isn't critical for this method
-                    end_index=len(text_chunk)
+                    start_index=start_index,
+                    end_index=end_index,
+                    embedding=self._pooled_embedding(embeddings, first, last)
                 )
                 chunks.append(chunk)
-            
+
             self.logger.info(f"Successfully created {len(chunks)} chunks using semantic strategy.")
             return chunks
-            
+
         except Exception as e:
-            self.logger.error(f"Error using LangChain SemanticChunker: {e}")
+            self.logger.error(f"Error in semantic chunking: {e}")
             # In case of an error, return an empty list to prevent pipeline failure
-            return [] 
\ No newline at end of file
+            return []
+
+    def _split_sentence_spans(self, content: str) -> List[Tuple[int, int]]:
+        """Split content into sentence (start, end) offsets, skipping empty pieces."""
+        spans = []
+        start = 0
+        for match in _SENTENCE_SPLIT_RE.finditer(content):
+            if match.start() > start:
+                spans.append((start, match.start()))
+            start = match.end()
+        end = len(content.rstrip())
+        if end > start:
+            spans.append((start, end))
+        return spans
+
+    def _embed_sentence_windows(self, content: str, sentence_spans: List[Tuple[int, int]]) -> np.ndarray:
+        """
+        Embed each sentence together with its buffer_size neighbours in one batched call.
+
+        Returns:
+            L2-normalized (n_sentences, dim) matrix
+        """
+        n = len(sentence_spans)
+        windows = []
+        for i in range(n):
+            lo = max(0, i - self.buffer_size)
+            hi = min(n, i + self.buffer_size + 1)
+            windows.append(" ".join(content[s:e] for s, e in sentence_spans[lo:hi]))
+
+        result = self.pinecone_client._generate_embeddings(
+            windows, input_type="passage", include_sparse=False
+        )
+        matrix = np.asarray(result["dense_embeddings"], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+    @staticmethod
+    def _neighbour_distances(embeddings: np.ndarray) -> np.ndarray:
+        """Cosine distance between each sentence window and the next (rows are normalized)."""
+        return 1.0 - np.einsum('ij,ij->i', embeddings[:-1], embeddings[1:])
+
+    def _group_by_breakpoints(self, distances: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        Group sentences into (first, last) ranges split where the distance to the next
+        sentence exceeds the configured percentile.
+        """
+        n_sentences = len(distances) + 1
+        threshold = np.percentile(distances, self.breakpoint_percentile)
+        breakpoints = np.flatnonzero(distances > threshold)
+
+        groups = []
+        first = 0
+        for index in breakpoints.tolist():
+            groups.append((first, index + 1))
+            first = index + 1
+        if first < n_sentences:
+            groups.append((first, n_sentences))
+        return groups
+
+    def _pooled_embedding(self, embeddings: Optional[np.ndarray], first: int, last: int) -> Optional[List[float]]:
+        """
+        Mean-pool the sentence windows that lie entirely inside sentences[first:last].
+
+        Windows that straddle a chunk boundary carry text from the neighbouring chunk,
+        so a chunk with no fully contained window returns None and is re-embedded.
+        """
+        if embeddings is None or not self.pool_chunk_embeddings:
+            return None
+
+        n = len(embeddings)
+        lo = first if first == 0 else first + self.buffer_size
+        hi = last if last == n else last - self.buffer_size
+        if lo >= hi:
+            return None
+
+        pooled = embeddings[lo:hi].mean(axis=0)
+        norm = np.linalg.norm(pooled)
+        if norm == 0:
+            return None
+        return (pooled / norm).tolist()
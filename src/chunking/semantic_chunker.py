@@ -4,19 +4,120 @@ Intelligent text chunking for business documents without external dependencies
 Uses Pinecone embedding models for semantic analysis
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 import re
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 import logging
 
+from src.chunking.token_counter import TokenCounter, DEFAULT_TOKENIZER_MODEL
+
+
+# Sentence-ending punctuation, scanned once per segment
+_SENTENCE_END_RE = re.compile(r'[.!?]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'\S+')
+
+# Common business abbreviations that end in "." but do not end a sentence.
+# Matched as plain suffixes of the running sentence (same as str.endswith).
+BUSINESS_ABBREVIATIONS = frozenset([
+    'inc.', 'corp.', 'ltd.', 'llc.', 'co.', 'vs.', 'etc.',
+    'dept.', 'div.', 'mgmt.', 'admin.', 'svcs.', 'govt.',
+    'no.', 'nos.', 'vol.', 'ch.', 'sec.', 'subsec.',
+    'fig.', 'tbl.', 'ref.', 'app.', 'ex.', 'exh.'
+])
+_ABBREVIATION_LENGTHS = sorted({len(abbr) for abbr in BUSINESS_ABBREVIATIONS})
+_MAX_ABBREVIATION_LENGTH = _ABBREVIATION_LENGTHS[-1]
+
+# Per-line markers recorded by _LineScan (bit flags)
+_LINE_TABLE_TITLE = 1   # "=== Name ===" unified table header
+_LINE_PIPE_ROW = 2      # starts with "|" and has >= 2 pipes (markdown table row)
+_LINE_STARTS_PIPE = 4
+_LINE_HAS_PIPE = 8
+_LINE_BLANK = 16
+_LINE_STARTS_DASH = 32
+
+
+class _LineScan:
+    """
+    Single pass over a text's lines recording table markers and section headers.
+    
+    Section detection and text/table segmentation both read these per-line flags
+    instead of re-splitting and re-stripping the content, keeping segmentation
+    linear in the number of lines.
+    """
+    
+    def __init__(self, lines: List[str], section_matcher=None, text: Optional[str] = None):
+        """
+        Args:
+            lines: Lines of the text (text.split('\n'))
+            section_matcher: Optional callable(line) -> section name or None
+            text: The scanned text (joined from lines when omitted)
+        """
+        self.lines = lines
+        self.text = text if text is not None else '\n'.join(lines)
+        self.starts: List[int] = []
+        self.flags: List[int] = []
+        self.section_names: List[Optional[str]] = []
+        
+        offset = 0
+        for line in lines:
+            self.starts.append(offset)
+            offset += len(line) + 1
+            
+            stripped = line.strip()
+            flag = 0
+            if not stripped:
+                flag = _LINE_BLANK
+            else:
+                first = stripped[0]
+                if first == '=' and stripped.startswith('===') and stripped.endswith('==='):
+                    flag |= _LINE_TABLE_TITLE
+                elif first == '-':
+                    flag |= _LINE_STARTS_DASH
+                if '|' in stripped:
+                    flag |= _LINE_HAS_PIPE
+                    if first == '|':
+                        flag |= _LINE_STARTS_PIPE
+                        if stripped.count('|') >= 2:
+                            flag |= _LINE_PIPE_ROW
+            self.flags.append(flag)
+            
+            name = None
+            if section_matcher is not None and len(stripped) < 100:
+                name = section_matcher(line)
+            self.section_names.append(name)
+        
+        # next_nonblank[i]: first line index >= i that is not blank (len(lines) if none)
+        n = len(lines)
+        self.next_nonblank = [n] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            self.next_nonblank[i] = i if not self.flags[i] & _LINE_BLANK else self.next_nonblank[i + 1]
+    
+    def span(self, first: int, last: int) -> Tuple[int, int]:
+        """Character span of lines[first:last] (excluding the trailing newline)."""
+        return self.starts[first], self.starts[last - 1] + len(self.lines[last - 1])
+
 
 @dataclass
 class Chunk:
-    """Represents a semantically coherent chunk of text"""
+    """
+    Represents a semantically coherent chunk of text
+    
+    start_index/end_index are character offsets into the text passed to
+    `chunk_document`: content[start_index:end_index] is the source region the
+    chunk was built from (whitespace in `text` may be normalized). Table chunks
+    span their whole source table block.
+    
+    embedding is an optional dense vector computed while chunking (semantic
+    chunking with pooled embeddings enabled); when set, embedding it again is
+    skipped.
+    """
     text: str
     metadata: Dict[str, Any]
     start_index: int
     end_index: int
+    embedding: Optional[List[float]] = None
 
 
 class SemanticChunker:
@@ -33,6 +134,10 @@ class SemanticChunker:
     - Natural break point detection (tables, lists, etc.)
     - Excel sheet preservation as single chunks
     
+    Token-budget mode (`max_chunk_tokens`) sizes text and table chunks by the
+    embedding model's tokenizer instead of characters/words, packing each chunk
+    close to the model window (multilingual-e5-large: 512 tokens) without truncation.
+    
     True semantic chunking would group content by semantic similarity using embeddings,
     creating variable-sized chunks based on topic coherence rather than character counts.
     
@@ -46,7 +151,22 @@ class SemanticChunker:
     def __init__(self, max_chunk_size: int = 500, 
                  overlap_size: int = 75,
                  similarity_threshold: float = 0.7,
-                 excel_sheet_max_size: int = 2000):
+                 excel_sheet_max_size: int = 2000,
+                 max_chunk_tokens: Optional[int] = None,
+                 overlap_tokens: Optional[int] = None,
+                 tokenizer_name: str = DEFAULT_TOKENIZER_MODEL,
+                 token_counter: Optional[TokenCounter] = None):
+        """
+        Args:
+            max_chunk_size: Character limit for text chunks (character mode)
+            overlap_size: Character overlap between text chunks (character mode)
+            excel_sheet_max_size: Word limit for table blocks (character mode)
+            max_chunk_tokens: Enables token-budget mode; token limit for text and table
+                              chunks (clamped to what the embedding model accepts)
+            overlap_tokens: Token overlap between text chunks (default: 15% of budget)
+            tokenizer_name: Hugging Face tokenizer used to count tokens
+            token_counter: Optional preconfigured TokenCounter (shared cache/tokenizer)
+        """
         
         self.max_chunk_size = max_chunk_size
         self.overlap_size = overlap_size
@@ -54,6 +174,23 @@ class SemanticChunker:
         self.excel_sheet_max_size = excel_sheet_max_size  # Allow larger chunks for Excel sheets
         self.logger = logging.getLogger(__name__)
         
+        # Token-budget mode (None = character/word limits)
+        self.token_counter = None
+        self.max_chunk_tokens = None
+        self.overlap_tokens = None
+        if max_chunk_tokens:
+            self.token_counter = token_counter or TokenCounter(model_name=tokenizer_name)
+            limit = self.token_counter.max_content_tokens
+            if max_chunk_tokens > limit:
+                self.logger.warning(
+                    f"max_chunk_tokens={max_chunk_tokens} exceeds the {self.token_counter.model_name} "
+                    f"window; clamping to {limit}"
+                )
+            self.max_chunk_tokens = min(max_chunk_tokens, limit)
+            self.overlap_tokens = (
+                overlap_tokens if overlap_tokens is not None else int(self.max_chunk_tokens * 0.15)
+            )
+        
         # Business-specific separators (in order of preference)
         self.business_separators = [
             "\n\n",  # Paragraph breaks (strongest)
@@ -94,22 +231,37 @@ class SemanticChunker:
             return []
         
         try:
-            # First, identify major section boundaries
-            sections = self._identify_business_sections(content)
+            # Scan lines once; sections and text/table segments both come from this scan
+            scan = self._scan_lines(content)
+            
+            # First, identify major section boundaries as (start, end) spans
+            sections = self._identify_business_section_spans(content, scan)
             
             # Process each section separately to maintain business context
             all_chunks = []
             
-            for section_name, section_content in sections.items():
+            for section_name, (section_start, section_end) in sections.items():
+                section_content = content[section_start:section_end]
                 if len(section_content.strip()) < 50:
                     continue
                 
+                # Segment the section's lines from the document scan (section-relative offsets)
+                first_line = bisect_left(scan.starts, section_start)
+                last_line = bisect_right(scan.starts, section_end)
+                segments = [
+                    (seg_type, seg_content, seg_start - section_start, seg_end - section_start)
+                    for seg_type, seg_content, seg_start, seg_end
+                    in self._segment_lines(scan, first_line, last_line)
+                ]
+                
                 # Create chunks for this section
                 section_chunks = self._process_section(
                     section_content, 
                     section_name, 
                     metadata,
-                    start_chunk_index=len(all_chunks)
+                    start_chunk_index=len(all_chunks),
+                    base_offset=section_start,
+                    segments=segments
                 )
                 all_chunks.extend(section_chunks)
             
@@ -121,62 +273,235 @@ class SemanticChunker:
             # Fallback to simple chunking
             return self._fallback_chunking(content, metadata)
     
+    def chunk_table_stream(self, tables: Iterable[Tuple[str, Optional[str], Optional[str], Iterable[str]]],
+                           metadata: Dict[str, Any], section_name: str = "main") -> Iterator[Chunk]:
+        """
+        Chunk streamed spreadsheet sheets directly into header-repeating table chunks.
+        
+        Consumes `DocumentConverter.iter_spreadsheet_tables` output row by row and
+        yields chunks as they fill, so neither the workbook text nor its chunk list is
+        held in memory. Rows are packed greedily under the table limit
+        (excel_sheet_max_size words, or max_chunk_tokens in token-budget mode); a sheet
+        that fits whole stays a single "=== Sheet ===" chunk, larger sheets become
+        "=== Sheet (part i) ===" chunks (no "/N" total, which is only known at the end
+        of the sheet).
+        
+        Chunk start/end indices are offsets into the streamed text: each sheet's title,
+        header, separator and row lines joined by newlines, with a blank line between
+        sheets.
+        
+        Args:
+            tables: Iterable of (sheet_name, header_line, separator_line, row_lines)
+            metadata: Base metadata for every chunk
+            section_name: Section name recorded on the chunks
+            
+        Yields:
+            Chunk objects in document order
+        """
+        chunk_count = 0
+        offset = 0
+        row_batch_size = 512
+        
+        for sheet_name, header_line, separator_line, row_lines in tables:
+            title = f"=== {sheet_name} ==="
+            if header_line is None:
+                offset += len(title) + len("(Empty sheet)") + 2
+                continue
+            
+            block_start = offset
+            offset += len(title) + len(header_line) + len(separator_line) + 3
+            
+            # Budget for rows in each part (part marker, header and separator repeat)
+            if self.token_counter:
+                part_marker = f"=== {sheet_name} (part 99999) ==="
+                fixed_sizes = self.token_counter.count_batch([title, part_marker, header_line, separator_line])
+                limit = self.max_chunk_tokens
+                whole_size = fixed_sizes[0] + fixed_sizes[2] + fixed_sizes[3]
+                available = limit - sum(fixed_sizes[1:])
+            else:
+                limit = self.excel_sheet_max_size
+                whole_size = len(title.split()) + len(header_line.split()) + len(separator_line.split())
+                available = limit - (len(header_line.split()) + len(separator_line.split()) + 10)
+            available = max(available, 1)  # Oversized header: one row per part
+            
+            # Finished parts are held only while the sheet could still fit whole
+            pending: List[Tuple[List[str], int, int]] = []
+            current: List[str] = []
+            current_start = current_end = offset
+            current_size = 0
+            part_count = 0
+            
+            def part_chunk(part: Tuple[List[str], int, int]) -> Chunk:
+                nonlocal chunk_count, part_count
+                rows, start, end = part
+                part_count += 1
+                chunk_count += 1
+                return self._create_chunk(
+                    "\n".join([f"=== {sheet_name} (part {part_count}) ===", header_line, separator_line] + rows),
+                    section_name, metadata, chunk_count - 1,
+                    start_index=start, end_index=end
+                )
+            
+            def pack(batch: List[Tuple[str, int]]) -> Iterator[Chunk]:
+                nonlocal current, current_start, current_end, current_size, whole_size
+                if self.token_counter:
+                    sizes = self.token_counter.count_batch([row for row, _ in batch])
+                else:
+                    sizes = [len(row.split()) for row, _ in batch]
+                for (row, row_start), size in zip(batch, sizes):
+                    whole_size += size
+                    if current and current_size + size > available:
+                        pending.append((current, current_start, current_end))
+                        current = []
+                        current_size = 0
+                    if not current:
+                        current_start = row_start
+                    current.append(row)
+                    current_end = row_start + len(row)
+                    current_size += size
+                if whole_size > limit:
+                    for part in pending:
+                        yield part_chunk(part)
+                    pending.clear()
+            
+            batch: List[Tuple[str, int]] = []
+            for row in row_lines:
+                batch.append((row, offset))
+                offset += len(row) + 1
+                if len(batch) >= row_batch_size:
+                    yield from pack(batch)
+                    batch = []
+            if batch:
+                yield from pack(batch)
+            if current:
+                pending.append((current, current_start, current_end))
+            
+            block_end = offset - 1
+            offset += 1  # Empty line between sheets
+            
+            if whole_size <= limit:
+                rows = [row for part in pending for row in part[0]]
+                chunk_count += 1
+                yield self._create_chunk(
+                    "\n".join([title, header_line, separator_line] + rows).strip(),
+                    section_name, metadata, chunk_count - 1,
+                    start_index=block_start, end_index=block_end
+                )
+                continue
+            
+            for part in pending:
+                yield part_chunk(part)
+            self.logger.info(f"Split sheet '{sheet_name}' into {part_count} chunks with repeated headers")
+        
+        self.logger.info(f"Created {chunk_count} chunks from streamed spreadsheet")
+    
     def _identify_business_sections(self, content: str) -> Dict[str, str]:
         """Identify major business document sections"""
+        return {
+            name: content[start:end]
+            for name, (start, end) in self._identify_business_section_spans(content).items()
+        }
+    
+    def _identify_business_section_spans(self, content: str,
+                                         scan: Optional[_LineScan] = None) -> Dict[str, Tuple[int, int]]:
+        """
+        Identify major business document sections as offsets into content.
+        
+        Args:
+            content: Document text
+            scan: Optional precomputed `_scan_lines(content)`
+        
+        Returns:
+            Dict of section_name -> (start, end). As with `_identify_business_sections`,
+            a repeated section name keeps its last occurrence.
+        """
+        if scan is None:
+            scan = self._scan_lines(content)
+        
         sections = {}
-        lines = content.split('\n')
         current_section = "main"
-        current_content = []
+        current_start = 0
         
-        for line in lines:
-            line_lower = line.lower().strip()
-            
+        for line_start, boundary in zip(scan.starts, scan.section_names):
             # Check if this line starts a new section
-            section_found = False
-            for boundary in self.section_boundaries:
-                if boundary in line_lower and len(line.strip()) < 100:
-                    # Save previous section
-                    if current_content:
-                        sections[current_section] = '\n'.join(current_content)
-                    
-                    current_section = boundary.replace(' ', '_')
-                    current_content = [line]
-                    section_found = True
-                    break
-            
-            if not section_found:
-                current_content.append(line)
+            if boundary is not None:
+                # Save previous section (excluding the newline before this header)
+                if line_start > current_start:
+                    sections[current_section] = (current_start, line_start - 1)
+                
+                current_section = boundary.replace(' ', '_')
+                current_start = line_start
         
         # Save final section
-        if current_content:
-            sections[current_section] = '\n'.join(current_content)
+        sections[current_section] = (current_start, len(content))
         
         return sections
     
+    def _section_header_matcher(self):
+        """
+        Return a callable mapping a line to the section boundary it starts, or None.
+        
+        All boundaries are compiled into one alternation so most lines are rejected
+        by a single regex search; lines that match resolve to the first boundary in
+        `section_boundaries` order, as a per-boundary substring scan would.
+        """
+        boundaries = tuple(self.section_boundaries)
+        if getattr(self, '_section_matcher_key', None) != boundaries:
+            pattern = re.compile('|'.join(re.escape(b) for b in sorted(set(boundaries), key=len, reverse=True)))
+            
+            def match(line: str) -> Optional[str]:
+                line_lower = line.lower()
+                if not pattern.search(line_lower):
+                    return None
+                for boundary in boundaries:
+                    if boundary in line_lower:
+                        return boundary
+                return None
+            
+            self._section_matcher_key = boundaries
+            self._section_matcher = match
+        return self._section_matcher
+    
+    def _scan_lines(self, content: str) -> _LineScan:
+        """Scan content once for table markers and section headers."""
+        return _LineScan(content.split('\n'), self._section_header_matcher(), content)
+    
     def _process_section(self, section_content: str, section_name: str, 
-                        metadata: Dict[str, Any], start_chunk_index: int = 0) -> List[Chunk]:
-        """Process a single business section into semantically coherent chunks"""
+                        metadata: Dict[str, Any], start_chunk_index: int = 0,
+                        base_offset: int = 0,
+                        segments: Optional[List[Tuple[str, str, int, int]]] = None) -> List[Chunk]:
+        """
+        Process a single business section into semantically coherent chunks
+        
+        Args:
+            base_offset: Offset of section_content within the document, so chunk
+                         start/end indices refer to the original text
+            segments: Optional precomputed `_segment_section(section_content)`
+        """
         
         # First, segment content into text vs table blocks (handles mixed content)
-        segments = self._split_section_into_segments(section_content)
+        if segments is None:
+            segments = self._segment_section(section_content)
         
         all_chunks = []
         current_chunk_index = start_chunk_index
         
-        for segment_type, segment_content in segments:
+        for segment_type, segment_content, seg_start, seg_end in segments:
             if segment_type == "table":
                 # Process table block (unified format or normalized from markdown)
                 table_chunks = self._process_table_block(
-                    segment_content, section_name, metadata, current_chunk_index
+                    segment_content, section_name, metadata, current_chunk_index,
+                    span=(base_offset + seg_start, base_offset + seg_end)
                 )
                 all_chunks.extend(table_chunks)
                 current_chunk_index += len(table_chunks)
             else:
-                # Process normal text segment
-                sentences = self._split_into_sentences(segment_content)
-                if sentences:
+                # Process normal text segment as sentence spans over the section
+                sentence_spans = self._split_into_sentence_spans(section_content, seg_start, seg_end)
+                if sentence_spans:
                     text_chunks = self._create_business_chunks(
-                        sentences, section_name, metadata, current_chunk_index
+                        section_content, sentence_spans, section_name, metadata,
+                        current_chunk_index, base_offset=base_offset
                     )
                     all_chunks.extend(text_chunks)
                     current_chunk_index += len(text_chunks)
@@ -184,49 +509,101 @@ class SemanticChunker:
         return all_chunks
     
     def _split_into_sentences(self, text: str) -> List[str]:
-        """Split text into sentences using business-aware rules"""
-        # Clean text
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # Business document sentence patterns
-        sentence_endings = r'[.!?]'
+        """Split text into sentences using business-aware rules (whitespace-collapsed)"""
+        return [
+            _WHITESPACE_RE.sub(' ', text[start:end])
+            for start, end in self._split_into_sentence_spans(text)
+        ]
+    
+    def _split_into_sentence_spans(self, text: str, start: int = 0,
+                                   end: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Split text[start:end] into sentences, returned as (start, end) offsets into text.
+        
+        Boundaries come from a single scan for [.!?]; each candidate is checked
+        against the abbreviation set, a trailing list number ("3.") and a minimum
+        word count for the running sentence (via bisect over word start offsets).
+        Whitespace runs behave as single spaces, so collapsing each span's whitespace
+        gives the same sentences as splitting the collapsed text. Each span starts
+        and ends on non-whitespace.
+        """
+        if end is None:
+            end = len(text)
         
-        # Split into potential sentences
-        potential_sentences = re.split(f'({sentence_endings})', text)
+        word_starts = [m.start() for m in _WORD_RE.finditer(text, start, end)]
+        if not word_starts:
+            return []
         
-        sentences = []
-        current = ""
+        spans = []
+        seg_start = start
+        
+        for match in _SENTENCE_END_RE.finditer(text, start, end):
+            punct_end = match.end()
+            if self._is_boundary_at(text, seg_start, punct_end, word_starts, start):
+                spans.append((self._first_word_start(text, seg_start, word_starts), punct_end))
+                seg_start = punct_end
+        
+        # Add remaining text (trimmed to non-whitespace)
+        remainder_start = self._first_word_start(text, seg_start, word_starts)
+        remainder_end = end
+        while remainder_end > remainder_start and text[remainder_end - 1].isspace():
+            remainder_end -= 1
+        if remainder_end > remainder_start and not text[remainder_start].isspace():
+            spans.append((remainder_start, remainder_end))
+        
+        # Filter very short sentences (more than 3 words required)
+        return [
+            (s, e) for s, e in spans
+            if self._count_words(text, s, e, word_starts, start) > 3
+        ]
+    
+    @staticmethod
+    def _first_word_start(text: str, seg_start: int, word_starts: List[int]) -> int:
+        """First non-whitespace offset at or after seg_start (seg_start itself if it is mid-word)."""
+        if seg_start < len(text) and not text[seg_start].isspace():
+            return seg_start
+        i = bisect_left(word_starts, seg_start)
+        return word_starts[i] if i < len(word_starts) else seg_start
+    
+    @staticmethod
+    def _count_words(text: str, seg_start: int, seg_end: int,
+                     word_starts: List[int], region_start: int) -> int:
+        """Number of whitespace-separated words in text[seg_start:seg_end]."""
+        count = bisect_left(word_starts, seg_end) - bisect_left(word_starts, seg_start)
+        # A word that began before seg_start (e.g. "qux.Next") still counts once here
+        if (seg_start > region_start and seg_start < seg_end
+                and not text[seg_start].isspace() and not text[seg_start - 1].isspace()):
+            count += 1
+        return count
+    
+    def _is_boundary_at(self, text: str, seg_start: int, end: int,
+                        word_starts: List[int], region_start: int) -> bool:
+        """
+        Offset-based equivalent of `_is_sentence_boundary(text[seg_start:end])`.
         
-        for i, part in enumerate(potential_sentences):
-            current += part
+        Assumes text[end - 1] is [.!?].
+        """
+        if text[end - 1] == '.':
+            # Avoid splitting on common business abbreviations (none contain
+            # whitespace, so raw and collapsed suffixes match the same way)
+            tail = text[max(seg_start, end - _MAX_ABBREVIATION_LENGTH):end].lower()
+            for length in _ABBREVIATION_LENGTHS:
+                if len(tail) >= length and tail[-length:] in BUSINESS_ABBREVIATIONS:
+                    return False
             
-            # If this is a sentence ending
-            if re.match(sentence_endings, part):
-                # Check if this is a real sentence boundary
-                if self._is_sentence_boundary(current):
-                    sentences.append(current.strip())
-                    current = ""
-        
-        # Add remaining text
-        if current.strip():
-            sentences.append(current.strip())
+            # Numbered lists (1. 2. etc.)
+            if end - seg_start >= 2 and text[end - 2].isdecimal():
+                return False
         
-        # Filter very short or empty sentences
-        return [s for s in sentences if len(s.split()) > 3]
+        # Must have reasonable length (more than 3 words)
+        return self._count_words(text, seg_start, end, word_starts, region_start) > 3
     
     def _is_sentence_boundary(self, text: str) -> bool:
         """Determine if this is a true sentence boundary in business context"""
-        # Avoid splitting on common business abbreviations
-        business_abbreviations = [
-            'inc.', 'corp.', 'ltd.', 'llc.', 'co.', 'vs.', 'etc.',
-            'dept.', 'div.', 'mgmt.', 'admin.', 'svcs.', 'govt.',
-            'no.', 'nos.', 'vol.', 'ch.', 'sec.', 'subsec.',
-            'fig.', 'tbl.', 'ref.', 'app.', 'ex.', 'exh.'
-        ]
-        
         text_lower = text.lower().strip()
-        for abbr in business_abbreviations:
-            if text_lower.endswith(abbr):
+        # Avoid splitting on common business abbreviations
+        for length in _ABBREVIATION_LENGTHS:
+            if text_lower[-length:] in BUSINESS_ABBREVIATIONS:
                 return False
         
         # Check for numbered lists (1. 2. etc.)
@@ -236,58 +613,131 @@ class SemanticChunker:
         # Must have reasonable length
         return len(text.split()) > 3
     
-    def _create_business_chunks(self, sentences: List[str], section_name: str, 
-                               metadata: Dict[str, Any], start_chunk_index: int) -> List[Chunk]:
-        """Group sentences into business-aware chunks"""
+    def _create_business_chunks(self, text: str, sentence_spans: List[Tuple[int, int]],
+                               section_name: str, metadata: Dict[str, Any],
+                               start_chunk_index: int, base_offset: int = 0) -> List[Chunk]:
+        """
+        Group sentences into business-aware chunks
+        
+        The current chunk is tracked as an index range over sentence_spans, so
+        overlap sentences are never copied; chunk text is materialized once per
+        emitted chunk.
+        
+        Args:
+            text: Text the sentence spans index into
+            sentence_spans: (start, end) offsets from `_split_into_sentence_spans`
+            base_offset: Offset of text within the document (for chunk indices)
+        """
+        # Whitespace-collapsed sentences drive sizing and break detection
+        sentences = [_WHITESPACE_RE.sub(' ', text[start:end]) for start, end in sentence_spans]
+        
+        if self.token_counter:
+            # Token-budget mode: sizes are tokenizer counts (batched, LRU-cached)
+            lengths = self.token_counter.count_batch(sentences)
+            if max(lengths) > self.max_chunk_tokens:
+                sentence_spans, sentences, lengths = self._split_oversized_sentences(
+                    text, sentence_spans, sentences, lengths
+                )
+            max_length = self.max_chunk_tokens
+            overlap_budget = self.overlap_tokens
+            natural_break_min = self.max_chunk_tokens * 2 // 5
+        else:
+            lengths = [len(sentence) for sentence in sentences]
+            max_length = self.max_chunk_size
+            overlap_budget = self.overlap_size
+            natural_break_min = 200
         
         chunks = []
-        current_chunk_sentences = []
+        chunk_first = 0  # Current chunk is sentences[chunk_first:i]
         current_chunk_length = 0
         
-        for sentence in sentences:
-            sentence_length = len(sentence)
+        def emit(first: int, last: int) -> None:
+            chunks.append(self._create_chunk(
+                " ".join(sentences[first:last]), section_name, metadata,
+                len(chunks) + start_chunk_index,
+                start_index=base_offset + sentence_spans[first][0],
+                end_index=base_offset + sentence_spans[last - 1][1]
+            ))
+        
+        for i, sentence in enumerate(sentences):
+            sentence_length = lengths[i]
             
             # If adding this sentence would exceed max chunk size, finalize current chunk
-            if (current_chunk_length + sentence_length > self.max_chunk_size and 
-                current_chunk_sentences):
+            if (current_chunk_length + sentence_length > max_length and 
+                chunk_first < i):
                 
-                chunk_text = " ".join(current_chunk_sentences)
-                chunks.append(self._create_chunk(
-                    chunk_text, section_name, metadata, 
-                    len(chunks) + start_chunk_index
-                ))
+                emit(chunk_first, i)
                 
-                # Start new chunk with overlap
-                overlap_sentences = self._get_overlap_sentences(current_chunk_sentences)
-                current_chunk_sentences = overlap_sentences
-                current_chunk_length = sum(len(s) for s in overlap_sentences)
+                # Start new chunk with overlap; in token mode never so much overlap
+                # that this sentence no longer fits the model window
+                if self.token_counter:
+                    overlap = min(overlap_budget, max_length - sentence_length)
+                else:
+                    overlap = overlap_budget
+                chunk_first = self._get_overlap_start(lengths, chunk_first, i, overlap)
+                current_chunk_length = sum(lengths[chunk_first:i])
             
             # Add current sentence
-            current_chunk_sentences.append(sentence)
             current_chunk_length += sentence_length
             
             # Check for natural business breaks (lists, tables, etc.)
             if self._is_natural_break_point(sentence):
                 # If we have enough content, consider ending chunk here
-                if current_chunk_length > 200 and len(current_chunk_sentences) > 2:
-                    chunk_text = " ".join(current_chunk_sentences)
-                    chunks.append(self._create_chunk(
-                        chunk_text, section_name, metadata, 
-                        len(chunks) + start_chunk_index
-                    ))
-                    current_chunk_sentences = []
+                if current_chunk_length > natural_break_min and i + 1 - chunk_first > 2:
+                    emit(chunk_first, i + 1)
+                    chunk_first = i + 1
                     current_chunk_length = 0
         
         # Add final chunk
-        if current_chunk_sentences:
-            chunk_text = " ".join(current_chunk_sentences)
-            chunks.append(self._create_chunk(
-                chunk_text, section_name, metadata, 
-                len(chunks) + start_chunk_index
-            ))
+        if chunk_first < len(sentences):
+            emit(chunk_first, len(sentences))
         
         return chunks
     
+    def _split_oversized_sentences(self, text: str, sentence_spans: List[Tuple[int, int]],
+                                   sentences: List[str], lengths: List[int]
+                                   ) -> Tuple[List[Tuple[int, int]], List[str], List[int]]:
+        """
+        Split sentences longer than max_chunk_tokens at word boundaries.
+        
+        A single sentence over the budget would otherwise be truncated by the
+        embedding model. Pieces are sized from the sentence's tokens-per-word ratio
+        and re-counted, shrinking until every piece fits.
+        
+        Returns:
+            (sentence_spans, sentences, lengths) with oversized entries replaced
+        """
+        out_spans: List[Tuple[int, int]] = []
+        out_sentences: List[str] = []
+        out_lengths: List[int] = []
+        
+        for span, sentence, length in zip(sentence_spans, sentences, lengths):
+            if length <= self.max_chunk_tokens:
+                out_spans.append(span)
+                out_sentences.append(sentence)
+                out_lengths.append(length)
+                continue
+            
+            words = [m.span() for m in _WORD_RE.finditer(text, span[0], span[1])]
+            words_per_piece = max(1, int(len(words) * self.max_chunk_tokens / length * 0.9))
+            while True:
+                piece_spans = [
+                    (words[i][0], words[min(i + words_per_piece, len(words)) - 1][1])
+                    for i in range(0, len(words), words_per_piece)
+                ]
+                pieces = [_WHITESPACE_RE.sub(' ', text[s:e]) for s, e in piece_spans]
+                piece_lengths = self.token_counter.count_batch(pieces)
+                # A single "word" over budget (e.g. a base64 blob) can't be split further
+                if words_per_piece == 1 or max(piece_lengths) <= self.max_chunk_tokens:
+                    break
+                words_per_piece = max(1, words_per_piece * 3 // 4)
+            
+            out_spans.extend(piece_spans)
+            out_sentences.extend(pieces)
+            out_lengths.extend(piece_lengths)
+        
+        return out_spans, out_sentences, out_lengths
+    
     def _is_natural_break_point(self, sentence: str) -> bool:
         """Check if this sentence represents a natural break point in business documents"""
         sentence_lower = sentence.lower()
@@ -308,29 +758,45 @@ class SemanticChunker:
     
     def _get_overlap_sentences(self, sentences: List[str]) -> List[str]:
         """Get overlap sentences for chunk continuity"""
-        if not sentences:
-            return []
+        first = self._get_overlap_start([len(s) for s in sentences], 0, len(sentences))
+        return sentences[first:]
+    
+    def _get_overlap_start(self, lengths: List[int], first: int, last: int,
+                           overlap_size: Optional[int] = None) -> int:
+        """
+        Index where the overlap for sentences[first:last] begins.
+        
+        Takes sentences from the end until the overlap target (in the same unit as
+        lengths, defaulting to self.overlap_size characters) is reached; returns
+        `last` when no sentence fits.
+        """
+        if first >= last:
+            return last
+        
+        if overlap_size is None:
+            overlap_size = self.overlap_size
         
-        # Calculate overlap based on character count
-        total_chars = sum(len(s) for s in sentences)
-        target_overlap_chars = min(self.overlap_size, total_chars // 2)
+        # Calculate overlap based on total size
+        total_chars = sum(lengths[first:last])
+        target_overlap_chars = min(overlap_size, total_chars // 2)
         
-        overlap_sentences = []
+        overlap_start = last
         current_chars = 0
         
         # Take sentences from the end until we reach target overlap
-        for sentence in reversed(sentences):
-            if current_chars + len(sentence) <= target_overlap_chars:
-                overlap_sentences.insert(0, sentence)
-                current_chars += len(sentence)
-            else:
+        while overlap_start > first:
+            length = lengths[overlap_start - 1]
+            if current_chars + length > target_overlap_chars:
                 break
+            overlap_start -= 1
+            current_chars += length
         
-        return overlap_sentences
+        return overlap_start
     
     def _create_chunk(self, text: str, section_name: str, metadata: Dict[str, Any], 
-                     chunk_index: int) -> Chunk:
-        """Create a chunk with enhanced metadata"""
+                     chunk_index: int, start_index: int = 0,
+                     end_index: Optional[int] = None) -> Chunk:
+        """Create a chunk with enhanced metadata (offsets default to the chunk text itself)"""
         
         chunk_metadata = {
             **metadata,
@@ -343,8 +809,8 @@ class SemanticChunker:
         return Chunk(
             text=text,
             metadata=chunk_metadata,
-            start_index=0,  # Could calculate actual position if needed
-            end_index=len(text)
+            start_index=start_index,
+            end_index=end_index if end_index is not None else start_index + len(text)
         )
     
     def _classify_chunk_type(self, text: str) -> str:
@@ -377,31 +843,30 @@ class SemanticChunker:
         """Ultimate fallback for when all sophisticated methods fail"""
         
         chunks = []
-        words = content.split()
+        word_spans = [m.span() for m in _WORD_RE.finditer(content)]
         
-        # Simple word-based chunking
-        current_chunk_words = []
+        # Simple word-based chunking over word offsets
+        chunk_first = 0  # Current chunk is word_spans[chunk_first:i + 1]
         target_words = self.max_chunk_size // 6  # Rough estimate: 6 chars per word
         
-        for word in words:
-            current_chunk_words.append(word)
-            
-            if len(current_chunk_words) >= target_words:
-                chunk_text = " ".join(current_chunk_words)
-                chunks.append(self._create_chunk(
-                    chunk_text, "main", metadata, len(chunks)
-                ))
+        def emit(first: int, last: int) -> None:
+            start, end = word_spans[first][0], word_spans[last - 1][1]
+            chunks.append(self._create_chunk(
+                " ".join(content[s:e] for s, e in word_spans[first:last]), "main", metadata, len(chunks),
+                start_index=start, end_index=end
+            ))
+        
+        for i in range(len(word_spans)):
+            if i + 1 - chunk_first >= target_words:
+                emit(chunk_first, i + 1)
                 
                 # Simple overlap
-                overlap_size = min(self.overlap_size // 6, len(current_chunk_words) // 4)
-                current_chunk_words = current_chunk_words[-overlap_size:] if overlap_size > 0 else []
+                overlap_size = min(self.overlap_size // 6, (i + 1 - chunk_first) // 4)
+                chunk_first = i + 1 - overlap_size if overlap_size > 0 else i + 1
         
         # Add final chunk
-        if current_chunk_words:
-            chunk_text = " ".join(current_chunk_words)
-            chunks.append(self._create_chunk(
-                chunk_text, "main", metadata, len(chunks)
-            ))
+        if chunk_first < len(word_spans):
+            emit(chunk_first, len(word_spans))
         
         self.logger.warning("Used fallback chunking due to processing errors")
         return chunks 
@@ -460,170 +925,183 @@ class SemanticChunker:
         Returns:
             List of (segment_type, segment_content) tuples where segment_type is "text" or "table"
         """
+        return [(seg_type, seg_content) for seg_type, seg_content, _, _ in self._segment_section(content)]
+    
+    def _segment_section(self, content: str) -> List[Tuple[str, str, int, int]]:
+        """
+        Split section content into text and table segments with source offsets.
+        
+        Returns:
+            List of (segment_type, segment_content, start, end). For text and unified
+            table segments, segment_content == content[start:end]; normalized markdown
+            tables keep the offsets of the original markdown block.
+        """
+        scan = _LineScan(content.split('\n'), text=content)
+        return self._segment_lines(scan, 0, len(scan.lines))
+    
+    def _segment_lines(self, scan: _LineScan, first: int, last: int) -> List[Tuple[str, str, int, int]]:
+        """
+        Segment scan.lines[first:last] into text and table segments in a single pass.
+        
+        Table detection reads the precomputed line flags, and each markdown table is
+        measured once, so the cost is linear in the number of lines (no guardrail
+        needed for large spreadsheet dumps).
+        
+        Returns:
+            List of (segment_type, segment_content, start, end) with offsets into the
+            text the scan was built from
+        """
+        if first >= last:
+            return []
+        
+        content_start, content_end = scan.span(first, last)
+        flags = scan.flags
+        lines = scan.lines
         segments = []
-        lines = content.split('\n')
-
-        # Guardrail: extremely large line counts (common with spreadsheet dumps) can
-        # make table detection expensive. In those cases, skip table detection and
-        # treat the section as plain text to ensure forward progress.
-        if len(lines) > 20000:
-            self.logger.warning(
-                "Segmenting guardrail: section has %d lines; skipping table detection",
-                len(lines),
-            )
-            return [("text", content)]
-        i = 0
         
-        while i < len(lines):
+        # The text loop stops on a markdown table that the next pass then consumes;
+        # remember the last lookup so the table is only measured once
+        md_memo = [-1, -1]
+        
+        def markdown_end(i: int) -> int:
+            if md_memo[0] != i:
+                md_memo[0] = i
+                md_memo[1] = self._markdown_table_end(scan, i, last)
+            return md_memo[1]
+        
+        i = first
+        while i < last:
             # Check if we're at a unified table block start
-            if i < len(lines) and lines[i].strip().startswith('===') and lines[i].strip().endswith('==='):
-                # Found unified table block - extract it
-                table_lines, next_i = self._extract_unified_table_block(lines, i)
-                if table_lines:
-                    segments.append(("table", "\n".join(table_lines)))
-                    i = next_i
-                    continue
+            if flags[i] & _LINE_TABLE_TITLE:
+                next_i = self._unified_table_end(scan, i, last)
+                start, end = scan.span(i, next_i)
+                segments.append(("table", scan.text[start:end], start, end))
+                i = next_i
+                continue
             
             # Check if we're at a markdown pipe table start
-            markdown_table_lines, next_i = self._find_markdown_table_at(lines, i)
-            if markdown_table_lines:
+            md_end = markdown_end(i)
+            if md_end >= 0:
                 # Normalize markdown table to unified format
-                normalized = self._normalize_markdown_table(markdown_table_lines)
+                normalized = self._normalize_markdown_table(lines[i:md_end])
                 if normalized:
-                    segments.append(("table", normalized))
-                    i = next_i
+                    segments.append(("table", normalized, *scan.span(i, md_end)))
+                    i = md_end
                     continue
             
             # Collect text lines until we hit a table or end
-            text_lines = []
-            while i < len(lines):
+            text_first = i
+            if md_end >= 0:
+                # Markdown block that could not be normalized (e.g. all header cells
+                # empty): keep it as text rather than re-detecting it forever
+                i = md_end
+            while i < last:
                 # Check if next line starts a table
-                if i < len(lines) and lines[i].strip().startswith('===') and lines[i].strip().endswith('==='):
+                if flags[i] & _LINE_TABLE_TITLE:
                     break
-                markdown_check, _ = self._find_markdown_table_at(lines, i)
-                if markdown_check:
+                if flags[i] & _LINE_PIPE_ROW and markdown_end(i) >= 0:
                     break
-                
-                text_lines.append(lines[i])
                 i += 1
             
-            if text_lines:
-                text_content = "\n".join(text_lines).strip()
-                if text_content:
-                    segments.append(("text", text_content))
-        
-        return segments if segments else [("text", content)]
+            if i > text_first:
+                start, end = scan.span(text_first, i)
+                text = scan.text[start:end]
+                stripped = text.strip()
+                if stripped:
+                    start += len(text) - len(text.lstrip())
+                    segments.append(("text", stripped, start, start + len(stripped)))
+        
+        if segments:
+            return segments
+        return [("text", scan.text[content_start:content_end], content_start, content_end)]
     
-    def _extract_unified_table_block(self, lines: List[str], start_i: int) -> tuple:
+    def _unified_table_end(self, scan: _LineScan, start_i: int, stop: int) -> int:
         """
-        Extract a unified table block starting at start_i.
+        Index just past the unified table block starting at start_i.
         
-        Returns:
-            (table_lines, next_index) where table_lines is the complete table block
-            and next_index is where to continue scanning
+        The block is the "=== Name ===" line, an optional header row and dash
+        separator, then pipe/blank rows until other content, another table title,
+        or the start of a markdown table.
         """
-        if start_i >= len(lines):
-            return ([], start_i)
-        
-        # Must start with === ... ===
-        if not (lines[start_i].strip().startswith('===') and lines[start_i].strip().endswith('===')):
-            return ([], start_i)
-        
-        table_lines = [lines[start_i]]
+        flags = scan.flags
         i = start_i + 1
         
         # Collect header row
-        if i < len(lines) and '|' in lines[i]:
-            table_lines.append(lines[i])
+        if i < stop and flags[i] & _LINE_HAS_PIPE:
             i += 1
         
         # Collect separator line
-        if i < len(lines) and lines[i].strip().startswith('-'):
-            table_lines.append(lines[i])
+        if i < stop and flags[i] & _LINE_STARTS_DASH:
             i += 1
         
         # Collect data rows (until we hit non-table content)
-        while i < len(lines):
-            line = lines[i]
-            stripped = line.strip()
+        while i < stop:
+            flag = flags[i]
             
             # Stop if we hit another table block start
-            if stripped.startswith('===') and stripped.endswith('==='):
+            if flag & _LINE_TABLE_TITLE:
                 break
             
             # Stop if we hit a markdown table (different format)
-            if stripped.startswith('|') and i + 1 < len(lines):
-                next_stripped = lines[i + 1].strip()
-                if next_stripped.startswith('|') or (next_stripped.startswith('-') and '|' in next_stripped):
+            if flag & _LINE_STARTS_PIPE and i + 1 < stop:
+                next_flag = flags[i + 1]
+                if next_flag & _LINE_STARTS_PIPE or (next_flag & _LINE_STARTS_DASH and next_flag & _LINE_HAS_PIPE):
                     # Could be markdown table - let that handler deal with it
                     break
             
-            # Continue if this looks like a table row
-            if '|' in line:
-                table_lines.append(line)
-                i += 1
-            elif not stripped:  # Empty line - might be part of table
-                table_lines.append(line)
+            # Continue on table rows and empty lines (might be part of table)
+            if flag & (_LINE_HAS_PIPE | _LINE_BLANK):
                 i += 1
             else:
                 # Non-table content - stop
                 break
         
-        return (table_lines, i)
+        return i
     
-    def _find_markdown_table_at(self, lines: List[str], start_i: int) -> tuple:
+    def _markdown_table_end(self, scan: _LineScan, start_i: int, stop: int) -> int:
         """
-        Detect if a markdown pipe table starts at start_i.
+        Index just past the markdown pipe table starting at start_i, or -1 if none.
         
-        Returns:
-            (table_lines, next_index) if found, ([], start_i) otherwise
+        A table is a pipe header row, a separator containing pipes, and at least one
+        more row; blank lines are kept when the next non-blank line starts with a pipe.
         """
-        if start_i >= len(lines):
-            return ([], start_i)
+        flags = scan.flags
         
         # Markdown table starts with a pipe-separated header row
-        header_line = lines[start_i].strip()
-        if not header_line.startswith('|') or header_line.count('|') < 2:
-            return ([], start_i)
+        if start_i >= stop or not flags[start_i] & _LINE_PIPE_ROW:
+            return -1
         
         # Next line should be separator (|---|---| or similar)
-        if start_i + 1 >= len(lines):
-            return ([], start_i)
-        
-        separator_line = lines[start_i + 1].strip()
-        if not (separator_line.startswith('|') or separator_line.startswith('-')):
-            return ([], start_i)
+        if start_i + 1 >= stop:
+            return -1
         
         # IMPORTANT: avoid false positives on "Excel-like" table dumps that include a
         # long dashed divider line but are not markdown pipe tables.
         # A real markdown pipe table separator must include pipes.
-        if '|' not in separator_line:
-            return ([], start_i)
+        separator = flags[start_i + 1]
+        if not separator & (_LINE_STARTS_PIPE | _LINE_STARTS_DASH) or not separator & _LINE_HAS_PIPE:
+            return -1
         
-        # Collect header and separator
-        table_lines = [lines[start_i], lines[start_i + 1]]
+        n_lines = 2
         i = start_i + 2
         
         # Collect data rows
-        while i < len(lines):
-            line = lines[i]
-            stripped = line.strip()
+        while i < stop:
+            flag = flags[i]
             
             # Stop if we hit another table block start
-            if stripped.startswith('===') and stripped.endswith('==='):
+            if flag & _LINE_TABLE_TITLE:
                 break
             
             # Continue if this looks like a markdown table row
-            if stripped.startswith('|') and stripped.count('|') >= 2:
-                table_lines.append(line)
+            if flag & _LINE_PIPE_ROW:
+                n_lines += 1
                 i += 1
-            elif not stripped:  # Empty line might separate tables
-                # Check if next non-empty line is a table row
-                j = i + 1
-                while j < len(lines) and not lines[j].strip():
-                    j += 1
-                if j < len(lines) and lines[j].strip().startswith('|'):
-                    table_lines.append(line)  # Keep empty line
+            elif flag & _LINE_BLANK:  # Empty line might separate tables
+                # Keep it if the next non-empty line is a table row
+                j = scan.next_nonblank[i]
+                if j < stop and flags[j] & _LINE_STARTS_PIPE:
+                    n_lines += 1
                     i += 1
                 else:
                     break
@@ -632,10 +1110,43 @@ class SemanticChunker:
                 break
         
         # Must have at least header + separator + 1 data row
-        if len(table_lines) >= 3:
-            return (table_lines, i)
+        return i if n_lines >= 3 else -1
+    
+    def _extract_unified_table_block(self, lines: List[str], start_i: int) -> tuple:
+        """
+        Extract a unified table block starting at start_i.
         
-        return ([], start_i)
+        Returns:
+            (table_lines, next_index) where table_lines is the complete table block
+            and next_index is where to continue scanning
+        """
+        if start_i >= len(lines):
+            return ([], start_i)
+        
+        scan = _LineScan(lines[start_i:])
+        
+        # Must start with === ... ===
+        if not scan.flags[0] & _LINE_TABLE_TITLE:
+            return ([], start_i)
+        
+        end = self._unified_table_end(scan, 0, len(scan.lines))
+        return (scan.lines[:end], start_i + end)
+    
+    def _find_markdown_table_at(self, lines: List[str], start_i: int) -> tuple:
+        """
+        Detect if a markdown pipe table starts at start_i.
+        
+        Returns:
+            (table_lines, next_index) if found, ([], start_i) otherwise
+        """
+        if start_i >= len(lines):
+            return ([], start_i)
+        
+        scan = _LineScan(lines[start_i:])
+        end = self._markdown_table_end(scan, 0, len(scan.lines))
+        if end < 0:
+            return ([], start_i)
+        return (scan.lines[:end], start_i + end)
     
     def _normalize_markdown_table(self, markdown_lines: List[str]) -> str:
         """
@@ -691,7 +1202,8 @@ class SemanticChunker:
         return "\n".join(parts)
     
     def _process_table_block(self, table_content: str, section_name: str,
-                            metadata: Dict[str, Any], start_chunk_index: int) -> List[Chunk]:
+                            metadata: Dict[str, Any], start_chunk_index: int,
+                            span: Optional[Tuple[int, int]] = None) -> List[Chunk]:
         """
         Process a unified table block: preserve if small, split with header repetition if large.
         
@@ -700,10 +1212,13 @@ class SemanticChunker:
             section_name: Section name for metadata
             metadata: Chunk metadata
             start_chunk_index: Starting chunk index
+            span: Optional (start, end) of the source table block in the document
             
         Returns:
             List of Chunk objects
         """
+        span_start, span_end = span if span else (0, None)
+        
         # Ensure it's a unified table block
         if not self._is_table_section(table_content):
             # Try normalizing if it looks like markdown
@@ -717,6 +1232,18 @@ class SemanticChunker:
             else:
                 return []
         
+        if self.token_counter:
+            # Token-budget mode: count per line (rows repeat across sheets, so the LRU hits)
+            token_count = sum(self.token_counter.count_batch(table_content.split('\n')))
+            if token_count <= self.max_chunk_tokens:
+                self.logger.info(f"Table block ({token_count} tokens) - preserving as single chunk")
+                return [self._create_chunk(
+                    table_content.strip(), section_name, metadata, start_chunk_index,
+                    start_index=span_start, end_index=span_end
+                )]
+            self.logger.info(f"Table block ({token_count} tokens) exceeds token budget ({self.max_chunk_tokens}) - splitting with header repetition")
+            return self._split_large_table_block(table_content, section_name, metadata, start_chunk_index, span=span)
+        
         word_count = len(table_content.split())
         
         # Small table: preserve as single chunk
@@ -726,15 +1253,18 @@ class SemanticChunker:
                 table_content.strip(),
                 section_name,
                 metadata,
-                start_chunk_index
+                start_chunk_index,
+                start_index=span_start,
+                end_index=span_end
             )]
         
         # Large table: split with header repetition
         self.logger.info(f"Table block ({word_count} words) exceeds max size ({self.excel_sheet_max_size}) - splitting with header repetition")
-        return self._split_large_table_block(table_content, section_name, metadata, start_chunk_index)
+        return self._split_large_table_block(table_content, section_name, metadata, start_chunk_index, span=span)
     
     def _split_large_table_block(self, table_content: str, section_name: str,
-                                metadata: Dict[str, Any], start_chunk_index: int) -> List[Chunk]:
+                                metadata: Dict[str, Any], start_chunk_index: int,
+                                span: Optional[Tuple[int, int]] = None) -> List[Chunk]:
         """
         Split a large unified table block into multiple chunks with repeated headers.
         
@@ -747,10 +1277,11 @@ class SemanticChunker:
         Returns:
             List of Chunk objects
         """
+        span_start, span_end = span if span else (0, None)
         lines = table_content.split('\n')
         if len(lines) < 4:
             # Too small to split meaningfully
-            return [self._create_chunk(table_content.strip(), section_name, metadata, start_chunk_index)]
+            return [self._create_chunk(table_content.strip(), section_name, metadata, start_chunk_index, start_index=span_start, end_index=span_end)]
         
         # Extract table name from first line
         first_line = lines[0].strip()
@@ -765,7 +1296,7 @@ class SemanticChunker:
         
         if not header_row:
             # Fallback: can't split without header
-            return [self._create_chunk(table_content.strip(), section_name, metadata, start_chunk_index)]
+            return [self._create_chunk(table_content.strip(), section_name, metadata, start_chunk_index, start_index=span_start, end_index=span_end)]
         
         # Extract data rows (skip header and separator)
         data_rows = []
@@ -774,33 +1305,23 @@ class SemanticChunker:
                 data_rows.append(line)
         
         if not data_rows:
-            return [self._create_chunk(table_content.strip(), section_name, metadata, start_chunk_index)]
-        
-        # Calculate rows per chunk to stay under word limit
-        # Estimate: header + separator + N rows should be <= excel_sheet_max_size words
-        header_words = len(header_row.split())
-        separator_words = len(separator_line.split())
-        avg_row_words = sum(len(row.split()) for row in data_rows[:10]) / min(10, len(data_rows)) if data_rows else 5
+            return [self._create_chunk(table_content.strip(), section_name, metadata, start_chunk_index, start_index=span_start, end_index=span_end)]
         
-        # Reserve words for header + separator + part marker
-        reserved_words = header_words + separator_words + 10  # +10 for part marker
-        available_words = self.excel_sheet_max_size - reserved_words
+        # Group rows so header + separator + part marker + rows stay under the limit
+        if self.token_counter:
+            row_groups = self._pack_table_rows_by_tokens(table_name, header_row, separator_line, data_rows)
+        else:
+            row_groups = self._pack_table_rows_by_words(header_row, separator_line, data_rows)
         
-        if available_words <= 0:
+        if row_groups is None:
             # Even header alone is too large - return as-is
-            return [self._create_chunk(table_content.strip(), section_name, metadata, start_chunk_index)]
-        
-        rows_per_chunk = max(1, int(available_words / avg_row_words)) if avg_row_words > 0 else 10
+            return [self._create_chunk(table_content.strip(), section_name, metadata, start_chunk_index, start_index=span_start, end_index=span_end)]
         
         # Split into chunks
         chunks = []
-        total_chunks = (len(data_rows) + rows_per_chunk - 1) // rows_per_chunk
+        total_chunks = len(row_groups)
         
-        for chunk_idx in range(total_chunks):
-            start_row = chunk_idx * rows_per_chunk
-            end_row = min(start_row + rows_per_chunk, len(data_rows))
-            chunk_rows = data_rows[start_row:end_row]
-            
+        for chunk_idx, chunk_rows in enumerate(row_groups):
             # Build chunk content with part marker
             chunk_lines = [
                 f"=== {table_name} (part {chunk_idx + 1}/{total_chunks}) ===",
@@ -814,8 +1335,67 @@ class SemanticChunker:
                 chunk_text,
                 section_name,
                 metadata,
-                start_chunk_index + chunk_idx
+                start_chunk_index + chunk_idx,
+                start_index=span_start,
+                end_index=span_end
             ))
         
         self.logger.info(f"Split table '{table_name}' into {len(chunks)} chunks with repeated headers")
-        return chunks
\ No newline at end of file
+        return chunks
+    
+    def _pack_table_rows_by_words(self, header_row: str, separator_line: str,
+                                  data_rows: List[str]) -> Optional[List[List[str]]]:
+        """
+        Group data rows into fixed-size parts under excel_sheet_max_size words.
+        
+        Returns:
+            List of row groups, or None if the header alone exceeds the limit
+        """
+        # Calculate rows per chunk to stay under word limit
+        # Estimate: header + separator + N rows should be <= excel_sheet_max_size words
+        header_words = len(header_row.split())
+        separator_words = len(separator_line.split())
+        avg_row_words = sum(len(row.split()) for row in data_rows[:10]) / min(10, len(data_rows)) if data_rows else 5
+        
+        # Reserve words for header + separator + part marker
+        reserved_words = header_words + separator_words + 10  # +10 for part marker
+        available_words = self.excel_sheet_max_size - reserved_words
+        
+        if available_words <= 0:
+            return None
+        
+        rows_per_chunk = max(1, int(available_words / avg_row_words)) if avg_row_words > 0 else 10
+        return [data_rows[i:i + rows_per_chunk] for i in range(0, len(data_rows), rows_per_chunk)]
+    
+    def _pack_table_rows_by_tokens(self, table_name: str, header_row: str, separator_line: str,
+                                   data_rows: List[str]) -> Optional[List[List[str]]]:
+        """
+        Greedily pack data rows into parts that fit max_chunk_tokens.
+        
+        Each part repeats the part marker, header and separator, so their tokens are
+        reserved up front; rows are counted in one batch.
+        
+        Returns:
+            List of row groups, or None if the header alone exceeds the budget
+        """
+        part_marker = f"=== {table_name} (part {len(data_rows)}/{len(data_rows)}) ==="
+        marker_tokens, header_tokens, separator_tokens = self.token_counter.count_batch(
+            [part_marker, header_row, separator_line]
+        )
+        available_tokens = self.max_chunk_tokens - marker_tokens - header_tokens - separator_tokens
+        if available_tokens <= 0:
+            return None
+        
+        row_groups: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        for row, row_tokens in zip(data_rows, self.token_counter.count_batch(data_rows)):
+            if current and current_tokens + row_tokens > available_tokens:
+                row_groups.append(current)
+                current = []
+                current_tokens = 0
+            current.append(row)
+            current_tokens += row_tokens
+        if current:
+            row_groups.append(current)
+        return row_groups
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""
+Token counting for token-budget chunking
+
+Counts tokens with the embedding model's own tokenizer (loaded once per process
+from the local Hugging Face cache) so chunks can be packed against the model's
+token window instead of a character estimate. Sentence counts are memoized in
+an LRU and cache misses are tokenized in a single batch call.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+
+# Hugging Face tokenizer matching Pinecone's hosted multilingual-e5-large
+DEFAULT_TOKENIZER_MODEL = "intfloat/multilingual-e5-large"
+DEFAULT_MODEL_MAX_TOKENS = 512
+
+# e5 models expect a "passage: " prefix plus <s> ... </s> around each input
+DEFAULT_INPUT_PREFIX = "passage: "
+
+# Loaded tokenizers, shared by every counter in the process (one load per worker)
+_TOKENIZER_CACHE: Dict[str, Any] = {}
+
+
+def _load_tokenizer(model_name: str) -> Any:
+    """Load (or reuse) a fast tokenizer for model_name."""
+    tokenizer = _TOKENIZER_CACHE.get(model_name)
+    if tokenizer is not None:
+        return tokenizer
+
+    try:
+        from transformers import AutoTokenizer
+    except ImportError as e:
+        raise ImportError(f"transformers is required for token-budget chunking: {e}")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    _TOKENIZER_CACHE[model_name] = tokenizer
+    return tokenizer
+
+
+class TokenCounter:
+    """Counts embedding-model tokens with a batched, LRU-cached tokenizer"""
+
+    def __init__(self, model_name: str = DEFAULT_TOKENIZER_MODEL,
+                 model_max_tokens: int = DEFAULT_MODEL_MAX_TOKENS,
+                 input_prefix: str = DEFAULT_INPUT_PREFIX,
+                 cache_size: int = 50_000,
+                 tokenizer: Optional[Any] = None):
+        """
+        Initialize token counter.
+
+        Args:
+            model_name: Hugging Face tokenizer id/path (read from the local HF cache
+                        after the first download)
+            model_max_tokens: Embedding model context window, including special tokens
+            input_prefix: Text the embedding service prepends to each passage
+            cache_size: Maximum number of memoized text -> token count entries
+            tokenizer: Optional preloaded tokenizer (skips loading model_name)
+        """
+        self.model_name = model_name
+        self.model_max_tokens = model_max_tokens
+        self.cache_size = max(0, cache_size)
+        self.logger = logging.getLogger(__name__)
+        self._tokenizer = tokenizer if tokenizer is not None else _load_tokenizer(model_name)
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+
+        # Tokens the model spends on each input besides the chunk text itself
+        self.reserved_tokens = len(self._encode([input_prefix], add_special_tokens=True)[0])
+
+    @property
+    def max_content_tokens(self) -> int:
+        """Largest chunk (in tokens) that embeds without truncation."""
+        return self.model_max_tokens - self.reserved_tokens
+
+    def count(self, text: str) -> int:
+        """Count tokens in a single text (no special tokens)."""
+        return self.count_batch([text])[0]
+
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        """
+        Count tokens for many texts, tokenizing only cache misses (in one batch).
+
+        Args:
+            texts: Texts to count
+
+        Returns:
+            Token counts aligned with texts
+        """
+        counts: List[Optional[int]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        for i, text in enumerate(texts):
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+                counts[i] = cached
+                self.hits += 1
+            else:
+                missing.setdefault(text, []).append(i)
+
+        if missing:
+            unique_texts = list(missing)
+            self.misses += len(unique_texts)
+            for text, ids in zip(unique_texts, self._encode(unique_texts)):
+                n_tokens = len(ids)
+                for i in missing[text]:
+                    counts[i] = n_tokens
+                self._remember(text, n_tokens)
+
+        return counts  # type: ignore[return-value]
+
+    def _encode(self, texts: List[str], add_special_tokens: bool = False) -> List[List[int]]:
+        """Tokenize texts in a single batch call."""
+        encoded = self._tokenizer(
+            texts,
+            add_special_tokens=add_special_tokens,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )
+        return encoded["input_ids"]
+
+    def _remember(self, text: str, n_tokens: int) -> None:
+        """Insert into the LRU, evicting the least recently used entry when full."""
+        if self.cache_size == 0:
+            return
+        self._cache[text] = n_tokens
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
@@ -0,0 +1,268 @@
+"""
+Persisted connector index cache
+
+Discovery over a raw Salesforce export rebuilds the same ContentVersion,
+ContentDocument, ContentDocumentLink, ContentVersion → Deal, valid file path and
+deal metadata mappings on every run. This module stores those mappings in a
+single SQLite file keyed by the source CSVs' size + mtime, and serves them back
+as read-only, memory-mapped Mapping views, so a repeated run over an unchanged
+export (or a discovery worker process) only opens the database instead of
+re-parsing the CSVs.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+
+# Bump when the layout or the meaning of a cached mapping changes
+INDEX_CACHE_VERSION = 2
+
+# Address space SQLite may memory-map for reads
+_MMAP_SIZE = 1 << 34
+
+_MAPPING_TABLES = ('content_versions', 'content_documents', 'content_document_links',
+                   'cv_to_deal', 'valid_file_paths',
+                   'deal_metadata', 'client_mapping', 'vendor_mapping', 'deal_id_to_number')
+
+
+def _encode(value: Any) -> str:
+    """JSON-encode a key or value (keeps NaN, bools and ints distinct)."""
+    return json.dumps(value, separators=(',', ':'))
+
+
+class SqliteMapping(Mapping):
+    """Read-only dict-like view over one key/value table of the index cache"""
+
+    def __init__(self, connection: sqlite3.Connection, lock: threading.Lock, table: str,
+                 decode: Optional[Callable[[Any], Any]] = None):
+        self._connection = connection
+        self._lock = lock
+        self._table = table
+        self._decode = decode
+        self._length: Optional[int] = None
+
+    def _value(self, raw: str) -> Any:
+        value = json.loads(raw)
+        return self._decode(value) if self._decode else value
+
+    def __getitem__(self, key: Any) -> Any:
+        try:
+            encoded = _encode(key)
+        except (TypeError, ValueError):
+            raise KeyError(key)
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT value FROM {self._table} WHERE key = ?", (encoded,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._value(row[0])
+
+    def __contains__(self, key: Any) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self) -> int:
+        if self._length is None:
+            with self._lock:
+                self._length = self._connection.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
+        return self._length
+
+    def _rows(self, columns: str) -> Iterator[Tuple]:
+        """Fetch rows in insertion order, in batches (holding the lock per batch only)."""
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    f"SELECT rowid, {columns} FROM {self._table} WHERE rowid > ? ORDER BY rowid LIMIT 10000",
+                    (last_rowid,)
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            yield from rows
+
+    def __iter__(self) -> Iterator[Any]:
+        for _, key in self._rows("key"):
+            yield json.loads(key)
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:  # type: ignore[override]
+        """Stream (key, value) pairs with one query instead of a lookup per key."""
+        for _, key, value in self._rows("key, value"):
+            yield json.loads(key), self._value(value)
+
+    def values(self) -> Iterator[Any]:  # type: ignore[override]
+        """Stream values with one query instead of a lookup per key."""
+        for _, value in self._rows("value"):
+            yield self._value(value)
+
+
+class ConnectorIndexCache:
+    """SQLite-backed cache of a connector's CSV-derived mappings"""
+
+    def __init__(self, cache_path: str):
+        """
+        Initialize index cache.
+
+        Args:
+            cache_path: SQLite file holding the cached mappings
+        """
+        self.cache_path = Path(cache_path)
+        self.logger = logging.getLogger(__name__)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def source_signature(paths: List[Optional[str]]) -> Dict[str, List[int]]:
+        """
+        Size + mtime of each source file; any change invalidates the cache.
+
+        Args:
+            paths: Source CSV paths (None entries are skipped)
+        """
+        signature = {'version': [INDEX_CACHE_VERSION]}
+        for path in paths:
+            if not path:
+                continue
+            stat = os.stat(path)
+            signature[str(Path(path).resolve())] = [stat.st_size, stat.st_mtime_ns]
+        return signature
+
+    def load(self, signature: Dict[str, Any],
+             decoders: Optional[Dict[str, Callable[[Any], Any]]] = None) -> Optional[Dict[str, SqliteMapping]]:
+        """
+        Open the cache if it was built from the same source files.
+
+        Args:
+            signature: Signature from source_signature()
+            decoders: Optional table name -> function applied to each value read
+
+        Returns:
+            Dict of table name -> SqliteMapping, or None when the cache is missing or stale
+        """
+        if not self.cache_path.exists():
+            return None
+        try:
+            connection = sqlite3.connect(f"file:{self.cache_path}?mode=ro", uri=True, check_same_thread=False)
+            connection.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
+            meta = dict(connection.execute("SELECT key, value FROM meta").fetchall())
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not open connector index cache {self.cache_path}: {e}")
+            return None
+
+        if meta.get('signature') != _encode(signature):
+            connection.close()
+            self.logger.info(f"Connector index cache {self.cache_path} is stale, rebuilding")
+            return None
+
+        self._connection = connection
+        return {
+            table: SqliteMapping(connection, self._lock, table, (decoders or {}).get(table))
+            for table in _MAPPING_TABLES
+        }
+
+    def get_meta(self, key: str) -> Optional[Any]:
+        """Read a JSON meta value stored by save()/update() (None if absent)."""
+        if self._connection is None:
+            return None
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, signature: Dict[str, Any], mappings: Dict[str, Mapping],
+             extra_meta: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Write all mappings to a fresh cache file (atomically replacing the old one).
+
+        Args:
+            signature: Signature from source_signature()
+            mappings: Table name -> mapping (keys and values must be JSON-serializable)
+            extra_meta: Additional JSON values retrievable with get_meta()
+        """
+        self.close()
+        tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        if tmp_path.exists():
+            tmp_path.unlink()
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+        connection = sqlite3.connect(str(tmp_path))
+        try:
+            connection.execute("PRAGMA journal_mode=OFF")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            for table in _MAPPING_TABLES:
+                connection.execute(f"CREATE TABLE {table} (key TEXT PRIMARY KEY, value TEXT)")
+                mapping = mappings.get(table) or {}
+                connection.executemany(
+                    f"INSERT OR REPLACE INTO {table} (key, value) VALUES (?, ?)",
+                    ((_encode(key), _encode(value)) for key, value in mapping.items())
+                )
+            meta = {'signature': signature, **(extra_meta or {})}
+            connection.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                ((key, _encode(value)) for key, value in meta.items())
+            )
+            connection.commit()
+        finally:
+            connection.close()
+        os.replace(tmp_path, self.cache_path)
+        self.logger.info(f"💾 Saved connector index cache to {self.cache_path}")
+
+    def update(self, table: str, mapping: Mapping, extra_meta: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Replace one table of an existing cache in place (e.g. after the export's files changed).
+
+        Args:
+            table: Table name
+            mapping: New contents (keys and values must be JSON-serializable)
+            extra_meta: Meta values to set alongside
+        """
+        if table not in _MAPPING_TABLES:
+            raise ValueError(f"Unknown index cache table: {table}")
+        connection = sqlite3.connect(str(self.cache_path))
+        try:
+            connection.execute(f"DELETE FROM {table}")
+            connection.executemany(
+                f"INSERT OR REPLACE INTO {table} (key, value) VALUES (?, ?)",
+                ((_encode(key), _encode(value)) for key, value in mapping.items())
+            )
+            self._write_meta(connection, extra_meta or {})
+            connection.commit()
+        finally:
+            connection.close()
+
+    def set_meta(self, values: Dict[str, Any]) -> None:
+        """
+        Set meta values of an existing cache in place.
+
+        Args:
+            values: Meta key -> JSON value, retrievable with get_meta()
+        """
+        connection = sqlite3.connect(str(self.cache_path))
+        try:
+            self._write_meta(connection, values)
+            connection.commit()
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _write_meta(connection: sqlite3.Connection, values: Dict[str, Any]) -> None:
+        connection.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            ((key, _encode(value)) for key, value in values.items())
+        )
+
+    def close(self) -> None:
+        """Close the read connection (views obtained from load() stop working)."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -8,10 +8,14 @@ import re
 import csv
 import json
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any, Generator
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple, Any, Generator, Iterator, Union
+from dataclasses import dataclass, asdict, field
 import logging
 
 # Import LLM classifier (with try/except for optional dependency)
@@ -45,9 +49,35 @@ except ImportError:
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
     from models.document_models import DocumentMetadata
 
+from src.utils.spooled_document import SpooledDocument, spool_chunks
+
 # REMOVED DUPLICATE CLASS - using models.document_models.DocumentMetadata
 
 
+class ListFolderCursorReset(Exception):
+    """A saved list_folder cursor was invalidated by Dropbox; the folder must be listed again"""
+
+
+# Partitioned listing: threads paginating first-level subfolders concurrently
+DEFAULT_LISTING_WORKERS = 4
+LISTING_MAX_RETRIES = 5
+ROOT_PARTITION = "."  # Partition key for files directly in the listed folder
+
+# Downloads larger than this are streamed to a spool file instead of held in memory
+DEFAULT_SPOOL_THRESHOLD_MB = 32
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class ListingPage:
+    """One page of a partitioned folder listing (see DropboxClient.list_documents_partitioned)"""
+    partition: str  # First-level subfolder path, or ROOT_PARTITION
+    documents: List[DocumentMetadata]
+    cursor: Optional[str]  # Continues the partition after this page
+    complete: bool  # Last page of the partition
+    subfolders: List[str] = field(default_factory=list)  # Partitions found (root pages only)
+
+
 class BusinessMetadataExtractor:
     """Extract business metadata from Dropbox folder structure"""
     
@@ -207,7 +237,8 @@ class DropboxClient:
     
     def __init__(self, access_token: str = None, openai_api_key: Optional[str] = None,
                  refresh_token: Optional[str] = None, app_key: Optional[str] = None, 
-                 app_secret: Optional[str] = None, use_auth_manager: bool = True):
+                 app_secret: Optional[str] = None, use_auth_manager: bool = True,
+                 spool_threshold_mb: float = DEFAULT_SPOOL_THRESHOLD_MB, spool_dir: Optional[str] = None):
         """
         Initialize DropboxClient with enhanced authentication.
         
@@ -218,6 +249,8 @@ class DropboxClient:
             app_key: Dropbox app key for OAuth2 flow
             app_secret: Dropbox app secret for OAuth2 flow
             use_auth_manager: Whether to use enhanced authentication manager
+            spool_threshold_mb: download_document streams larger files to a spool file (0 = never)
+            spool_dir: Directory for spool files (default: system temp dir)
         """
         self.logger = logging.getLogger(__name__)
         self.metadata_extractor = BusinessMetadataExtractor()
@@ -255,6 +288,12 @@ class DropboxClient:
             self.logger.warning("⚠️ OpenAI API key provided but LLM classifier module not available")
         else:
             self.logger.info("ℹ️ LLM document classification disabled (no API key provided)")
+        
+        # Cursor at the end of the last fully consumed listing (see list_documents/list_changes)
+        self.last_cursor: Optional[str] = None
+        self._refresh_lock = threading.Lock()
+        self.spool_threshold_bytes = int(spool_threshold_mb * 1024 * 1024)
+        self.spool_dir = spool_dir
     
     def parse_document_path(self, path: str, size: int = 0, modified_time: str = "", 
                           dropbox_id: str = "", content_hash: str = None) -> DocumentMetadata:
@@ -329,29 +368,11 @@ class DropboxClient:
             while True:
                 for entry in result.entries:
                     if isinstance(entry, dropbox.files.FileMetadata):
-                        metadata = self.parse_document_path(
-                            entry.path_display,
-                            entry.size,
-                            entry.server_modified.isoformat(),
-                            entry.id,
-                            getattr(entry, 'content_hash', None)
-                        )
-                        
-                        # Additional safety check: verify document is in expected folder
-                        if not entry.path_display.startswith(folder_path):
-                            self.logger.warning(
-                                f"🚨 SAFETY WARNING: Document outside target folder detected! "
-                                f"Expected: {folder_path}, Got: {entry.path_display}"
-                            )
-                        
-                        # Validate metadata quality
-                        validation = self.validate_extracted_metadata(metadata)
-                        if validation['warnings']:
-                            self.logger.warning(f"Metadata validation warnings for {entry.path_display}: {validation['warnings']}")
-                        
-                        yield metadata
+                        yield self._file_entry_metadata(entry, folder_path)
                 
                 if not result.has_more:
+                    # Only a fully consumed listing yields a cursor list_changes can continue from
+                    self.last_cursor = result.cursor
                     break
                     
                 result = self.client.files_list_folder_continue(result.cursor)
@@ -360,6 +381,235 @@ class DropboxClient:
             self.logger.error(f"Dropbox API error: {e}")
             raise
     
+    def list_changes(self, cursor: str, folder_path: str = "") -> Generator[Tuple[str, Any], None, None]:
+        """Changes to a recursively listed folder since a saved list_folder cursor
+        
+        Args:
+            cursor: Cursor saved from a previous list_documents/list_changes (last_cursor)
+            folder_path: Folder the cursor was created for (only used for the safety warning)
+            
+        Yields:
+            ("upsert", DocumentMetadata) for added or modified files and
+            ("delete", path_display) for deleted files or folders
+            
+        Raises:
+            ListFolderCursorReset: Dropbox invalidated the cursor; list the folder again
+        """
+        try:
+            result = self.client.files_list_folder_continue(cursor)
+            
+            while True:
+                for entry in result.entries:
+                    if isinstance(entry, dropbox.files.FileMetadata):
+                        yield "upsert", self._file_entry_metadata(entry, folder_path)
+                    elif isinstance(entry, dropbox.files.DeletedMetadata):
+                        yield "delete", entry.path_display or entry.path_lower
+                
+                if not result.has_more:
+                    self.last_cursor = result.cursor
+                    break
+                
+                result = self.client.files_list_folder_continue(result.cursor)
+                
+        except dropbox.exceptions.ApiError as e:
+            error = getattr(e, 'error', None)
+            if error is not None and getattr(error, 'is_reset', lambda: False)():
+                raise ListFolderCursorReset(f"list_folder cursor was reset by Dropbox: {e}") from e
+            self.logger.error(f"Dropbox API error: {e}")
+            raise
+    
+    def list_documents_partitioned(self, folder_path: str, max_workers: int = DEFAULT_LISTING_WORKERS,
+                                   state: Optional[Dict[str, Any]] = None) -> Generator[ListingPage, None, None]:
+        """List a folder by paginating its first-level subfolders concurrently
+        
+        Files directly in folder_path come first, then pages from up to max_workers
+        subfolder listings, interleaved as they arrive. After persisting a page, pass
+        it to advance_listing_state(state, page); handing the saved state back in
+        resumes every partition from its own cursor. last_cursor is set (for
+        list_changes) once every partition is complete.
+        
+        Args:
+            folder_path: Dropbox folder to list recursively
+            max_workers: Concurrent subfolder listings
+            state: Resume state from an interrupted listing (updated in place)
+            
+        Yields:
+            ListingPage objects
+        """
+        state = state if state is not None else {}
+        state.setdefault("folder", folder_path)
+        state.setdefault("root", {"cursor": None, "complete": False})
+        state.setdefault("partitions", {})
+        if not state.get("changes_cursor"):
+            # Taken before listing, so changes made meanwhile are re-applied by list_changes, never missed
+            state["changes_cursor"] = self._api_call(
+                "files_list_folder_get_latest_cursor", folder_path, recursive=True
+            ).cursor
+        
+        found: List[str] = []
+        root = state["root"]
+        if not root["complete"]:
+            if root["cursor"]:
+                result = self._api_call("files_list_folder_continue", root["cursor"])
+            else:
+                result = self._api_call("files_list_folder", folder_path, recursive=False)
+            while True:
+                documents, subfolders = [], []
+                for entry in result.entries:
+                    if isinstance(entry, dropbox.files.FileMetadata):
+                        documents.append(self._file_entry_metadata(entry, folder_path))
+                    elif isinstance(entry, dropbox.files.FolderMetadata):
+                        subfolders.append(entry.path_display)
+                found.extend(subfolders)
+                yield ListingPage(ROOT_PARTITION, documents, result.cursor, not result.has_more, subfolders)
+                if not result.has_more:
+                    break
+                result = self._api_call("files_list_folder_continue", result.cursor)
+        
+        partitions = [(path, p["cursor"]) for path, p in state["partitions"].items() if not p["complete"]]
+        partitions += [(path, None) for path in found if path not in state["partitions"]]
+        self.logger.info(f"📂 Listing {len(partitions)} folders under '{folder_path}' with {max_workers} threads")
+        
+        yield from self._list_partitions(partitions, folder_path, max(1, max_workers))
+        self.last_cursor = state["changes_cursor"]
+    
+    @staticmethod
+    def advance_listing_state(state: Dict[str, Any], page: ListingPage) -> None:
+        """Record a persisted page in a list_documents_partitioned resume state."""
+        if page.partition == ROOT_PARTITION:
+            state["root"] = {"cursor": page.cursor, "complete": page.complete}
+            for subfolder in page.subfolders:
+                state["partitions"].setdefault(subfolder, {"cursor": None, "complete": False})
+        else:
+            state["partitions"][page.partition] = {"cursor": page.cursor, "complete": page.complete}
+    
+    def _list_partitions(self, partitions: List[Tuple[str, Optional[str]]], folder_path: str,
+                         max_workers: int) -> Generator[ListingPage, None, None]:
+        """Paginate partitions on a thread pool, handing pages over through a bounded queue."""
+        if not partitions:
+            return
+        
+        # Bounded so listing threads can't run far ahead of the consumer persisting pages
+        pages: "queue.Queue[Any]" = queue.Queue(maxsize=max_workers * 2)
+        stop = threading.Event()
+        
+        def put(item: Any) -> None:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+        
+        def list_partition(path: str, cursor: Optional[str]) -> None:
+            try:
+                if cursor:
+                    result = self._api_call("files_list_folder_continue", cursor)
+                else:
+                    result = self._api_call("files_list_folder", path, recursive=True)
+                while not stop.is_set():
+                    documents = [
+                        self._file_entry_metadata(entry, folder_path) for entry in result.entries
+                        if isinstance(entry, dropbox.files.FileMetadata)
+                    ]
+                    put(ListingPage(path, documents, result.cursor, not result.has_more))
+                    if not result.has_more:
+                        return
+                    result = self._api_call("files_list_folder_continue", result.cursor)
+            except dropbox.exceptions.ApiError as e:
+                error = getattr(e, 'error', None)
+                if error is not None and getattr(error, 'is_path', lambda: False)() \
+                        and error.get_path().is_not_found():
+                    # Folder deleted since the root listing: nothing left to list
+                    put(ListingPage(path, [], None, True))
+                elif error is not None and getattr(error, 'is_reset', lambda: False)():
+                    put(ListFolderCursorReset(f"list_folder cursor for '{path}' was reset by Dropbox: {e}"))
+                else:
+                    put(e)
+            except BaseException as e:
+                # Always hand the failure over, or the consumer would wait forever
+                put(e)
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(partitions)),
+                                thread_name_prefix="dropbox-list") as executor:
+            futures = [executor.submit(list_partition, path, cursor) for path, cursor in partitions]
+            remaining = len(partitions)
+            try:
+                while remaining:
+                    item = pages.get()
+                    if isinstance(item, BaseException):
+                        raise item
+                    if item.complete:
+                        remaining -= 1
+                    yield item
+            finally:
+                # Consumer stopped early (e.g. --max-docs) or a listing failed
+                stop.set()
+                for future in futures:
+                    future.cancel()
+    
+    def _api_call(self, method: str, *args, **kwargs) -> Any:
+        """Call a Dropbox API method, backing off on rate limits and refreshing an expired token."""
+        for attempt in range(LISTING_MAX_RETRIES):
+            client = self.client
+            try:
+                return getattr(client, method)(*args, **kwargs)
+            except dropbox.exceptions.RateLimitError as e:
+                if attempt == LISTING_MAX_RETRIES - 1:
+                    raise
+                backoff = e.backoff or min(2 ** attempt, 60)
+                self.logger.warning(f"⏳ Dropbox rate limit on {method}, retrying in {backoff}s")
+                time.sleep(backoff)
+            except dropbox.exceptions.AuthError:
+                if attempt == LISTING_MAX_RETRIES - 1:
+                    raise
+                with self._refresh_lock:
+                    # Another thread may already have swapped in a refreshed client
+                    if self.client is client and not self.refresh_authentication():
+                        raise
+        raise RuntimeError(f"Dropbox {method} failed after {LISTING_MAX_RETRIES} attempts")
+    
+    def wait_for_changes(self, cursor: str, timeout: int = 30) -> bool:
+        """Long-poll until the folder behind a cursor changes (no content is returned)
+        
+        Args:
+            cursor: Cursor saved from a previous listing
+            timeout: Seconds to wait (Dropbox accepts 30-480)
+            
+        Returns:
+            True if changes are available
+        """
+        timeout = min(max(timeout, 30), 480)
+        result = self.client.files_list_folder_longpoll(cursor, timeout=timeout)
+        if result.backoff:
+            # Dropbox asks clients to wait this long before calling again
+            time.sleep(result.backoff)
+        return result.changes
+    
+    def _file_entry_metadata(self, entry, folder_path: str) -> DocumentMetadata:
+        """DocumentMetadata for a listed file entry (with safety and quality checks)."""
+        metadata = self.parse_document_path(
+            entry.path_display,
+            entry.size,
+            entry.server_modified.isoformat(),
+            entry.id,
+            getattr(entry, 'content_hash', None)
+        )
+        
+        # Additional safety check: verify document is in expected folder
+        if not entry.path_display.startswith(folder_path):
+            self.logger.warning(
+                f"🚨 SAFETY WARNING: Document outside target folder detected! "
+                f"Expected: {folder_path}, Got: {entry.path_display}"
+            )
+        
+        # Validate metadata quality
+        validation = self.validate_extracted_metadata(metadata)
+        if validation['warnings']:
+            self.logger.warning(f"Metadata validation warnings for {entry.path_display}: {validation['warnings']}")
+        
+        return metadata
+    
     def validate_extracted_metadata(self, metadata: DocumentMetadata) -> Dict[str, Any]:
         """Validate the quality of extracted metadata"""
         
@@ -399,23 +649,67 @@ class DropboxClient:
         
         return validation_result
     
-    def download_document(self, path: str) -> bytes:
-        """Download document content"""
+    def download_document(self, path: str) -> Union[bytes, SpooledDocument]:
+        """
+        Download document content.
+
+        Files above spool_threshold_bytes are streamed to a spool file (hash-verified
+        against Dropbox's content_hash) and returned as a SpooledDocument; the caller
+        owns it and should cleanup() when done. Smaller files are returned as bytes.
+        """
+        metadata, chunks = self.get_document_stream(path)
+        if self.spool_threshold_bytes and metadata.size > self.spool_threshold_bytes:
+            return self._spool_download(path, metadata, chunks)
         try:
-            _, response = self.client.files_download(path)
-            return response.content
+            return b"".join(chunks)
         except dropbox.exceptions.ApiError as e:
             self.logger.error(f"Error downloading {path}: {e}")
             raise
-    
-    def get_document_stream(self, path: str):
-        """Get document as a stream for large files"""
+
+    def download_to_spool(self, path: str) -> SpooledDocument:
+        """Stream a document to a hash-verified spool file regardless of its size."""
+        metadata, chunks = self.get_document_stream(path)
+        return self._spool_download(path, metadata, chunks)
+
+    def get_document_stream(self, path: str,
+                            chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> Tuple[Any, Iterator[bytes]]:
+        """
+        Start a streamed download.
+
+        Args:
+            path: Dropbox file path
+            chunk_size: Bytes per yielded chunk
+
+        Returns:
+            (FileMetadata, iterator of content chunks); the HTTP response is closed
+            once the iterator is exhausted or discarded
+        """
         try:
             metadata, response = self.client.files_download(path)
-            return response.content, metadata
         except dropbox.exceptions.ApiError as e:
             self.logger.error(f"Error streaming {path}: {e}")
             raise
+
+        def chunks() -> Iterator[bytes]:
+            try:
+                yield from response.iter_content(chunk_size=chunk_size)
+            finally:
+                response.close()
+
+        return metadata, chunks()
+
+    def _spool_download(self, path: str, metadata, chunks: Iterator[bytes]) -> SpooledDocument:
+        """Write a streamed download to a spool file, verifying metadata.content_hash."""
+        try:
+            spooled = spool_chunks(chunks, suffix=Path(path).suffix, spool_dir=self.spool_dir,
+                                   expected_hash=getattr(metadata, "content_hash", None))
+        except Exception as e:
+            self.logger.error(f"Error downloading {path}: {e}")
+            raise
+        finally:
+            chunks.close()
+        self.logger.debug(f"Spooled {path} ({spooled.size / 1024 / 1024:.1f} MB) to {spooled.path}")
+        return spooled
     
     def export_metadata_report(self, folder_path: str = "", output_format: str = "csv") -> str:
         """Export comprehensive metadata report for all documents"""
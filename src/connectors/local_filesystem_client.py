@@ -7,9 +7,12 @@ implementing the FileSourceInterface for seamless source switching.
 
 import os
 import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Generator, Any
+from typing import Dict, List, Optional, Generator, Any, Tuple
 import logging
 from dataclasses import dataclass
 
@@ -32,20 +35,35 @@ except ImportError:
     LLMDocumentClassifier = None
 
 
+# Threads listing directories concurrently during discovery
+DEFAULT_SCAN_WORKERS = 8
+
+# ContentVersion id -> payload path entries kept per client by download_file
+RESOLVED_PATH_CACHE_SIZE = 4096
+
+
 class LocalFilesystemClient(FileSourceInterface):
     """Local filesystem implementation of FileSourceInterface"""
     
-    def __init__(self, base_path: str, openai_api_key: Optional[str] = None):
+    def __init__(self, base_path: str, openai_api_key: Optional[str] = None,
+                 scan_workers: int = DEFAULT_SCAN_WORKERS):
         """
         Initialize local filesystem client.
         
         Args:
             base_path: Root directory for document discovery
             openai_api_key: Optional OpenAI API key for LLM classification
+            scan_workers: Threads listing directories concurrently in list_documents
+                          (1 walks serially)
         """
         super().__init__()
         self.base_path = Path(base_path).resolve()
         self.openai_api_key = openai_api_key
+        self.scan_workers = max(1, scan_workers)
+        
+        # download_file's ContentVersion id -> payload path LRU (clients may be shared by threads)
+        self._resolved_content_versions: "OrderedDict[str, Path]" = OrderedDict()
+        self._resolved_lock = threading.Lock()
         
         # Reuse business metadata extractor from DropboxClient
         self.metadata_extractor = BusinessMetadataExtractor()
@@ -153,108 +171,280 @@ class LocalFilesystemClient(FileSourceInterface):
         
         self.logger.info(f"🔍 Scanning local directory: {search_path}")
         
-        # Walk directory tree
-        for root, dirs, files in os.walk(search_path):
-            root_path = Path(root)
+        for batch in self._scan_batches(search_path, file_types):
+            yield from batch
+    
+    def batch_list_documents(self, folder_path: str, 
+                           batch_size: int = 100,
+                           file_types: Optional[List[str]] = None) -> Generator[List[FileMetadata], None, None]:
+        """
+        List documents in batches for memory efficiency.
+        
+        Args:
+            folder_path: Path to scan
+            batch_size: Number of documents per batch
+            file_types: Optional file type filter
             
-            for file_name in files:
-                # Skip hidden files and system files
-                if file_name.startswith('.'):
-                    continue
-                
-                # Check file type filter
-                if not self.is_supported_file_type(file_name):
-                    continue
+        Yields:
+            Lists of FileMetadata objects
+        """
+        search_path = self.base_path / folder_path if folder_path else self.base_path
+        if not search_path.exists():
+            self.logger.error(f"Path does not exist: {search_path}")
+            return
+        
+        self.logger.info(f"🔍 Scanning local directory: {search_path}")
+        
+        batch: List[FileMetadata] = []
+        for scanned in self._scan_batches(search_path, file_types):
+            batch.extend(scanned)
+            while len(batch) >= batch_size:
+                yield batch[:batch_size]
+                batch = batch[batch_size:]
+        
+        # Yield final partial batch
+        if batch:
+            yield batch
+    
+    def _scan_batches(self, search_path: Path,
+                      file_types: Optional[List[str]] = None) -> Generator[List[FileMetadata], None, None]:
+        """
+        Scan search_path with os.scandir, listing directories concurrently at every level.
+        
+        Batches come out lazily in os.walk (top-down) order, one per directory with
+        documents. With scan_workers > 1 the next directories in walk order (at most
+        2 * scan_workers ahead of the consumer) are listed on a thread pool, so a tree
+        with a single top-level directory is still scanned in parallel and a consumer
+        that stops early (e.g. --max-docs) leaves the rest of the tree unread.
+        
+        Args:
+            search_path: Directory to scan
+            file_types: Optional list of file extensions to filter
+            
+        Yields:
+            Lists of FileMetadata objects (one per directory)
+        """
+        root = str(search_path)
+        relative_root = os.path.relpath(root, self.base_path)
+        if relative_root == os.curdir:
+            relative_root = ""
+        
+        if self.scan_workers == 1:
+            stack = [(root, relative_root)]
+            while stack:
+                files, subdirs = self._scan_directory(*stack.pop(), file_types)
+                stack.extend(reversed(subdirs))
+                if files:
+                    yield files
+            return
+        
+        # Walk-order stack of [directory, listing future or None]; the top is listed next
+        window = self.scan_workers * 2
+        stack = [[(root, relative_root), None]]
+        with ThreadPoolExecutor(max_workers=self.scan_workers,
+                                thread_name_prefix="local-scan") as executor:
+            def prefetch() -> None:
+                for entry in stack[:-window - 1:-1]:
+                    if entry[1] is None:
+                        entry[1] = executor.submit(self._scan_directory, *entry[0], file_types)
+            
+            try:
+                prefetch()
+                while stack:
+                    files, subdirs = stack.pop()[1].result()
+                    stack.extend([subdir, None] for subdir in reversed(subdirs))
+                    prefetch()
+                    if files:
+                        yield files
+            finally:
+                # Consumer stopped early: don't start directories that were only queued
+                for _, future in stack:
+                    if future is not None:
+                        future.cancel()
+    
+    def _scan_directory(self, path: str, relative_path: str,
+                        file_types: Optional[List[str]] = None) -> Tuple[List[FileMetadata], List[Tuple[str, str]]]:
+        """
+        List one directory: FileMetadata for its documents and (path, relative path) of its subdirectories.
+        
+        Uses one stat per document (the DirEntry's cached stat); like os.walk, symlinked
+        directories are not followed and unreadable directories are skipped.
+        """
+        files: List[FileMetadata] = []
+        subdirs: List[Tuple[str, str]] = []
+        supported_extensions = self._supported_extensions
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return files, subdirs
+        
+        for entry in entries:
+            file_name = entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            
+            if is_dir:
+                try:
+                    is_symlink = entry.is_symlink()
+                except OSError:
+                    is_symlink = False
+                if not is_symlink:
+                    subdirs.append((entry.path, relative_path + os.sep + file_name if relative_path else file_name))
+                continue
+            
+            # Skip hidden files and system files
+            if file_name.startswith('.'):
+                continue
+            
+            # Check file type filter (same test as is_supported_file_type)
+            ext = os.path.splitext(file_name)[1].lower()
+            if ext not in supported_extensions:
+                continue
+            
+            if file_types and ext not in file_types:
+                continue
+            
+            relative_file_path = relative_path + os.sep + file_name if relative_path else file_name
+            try:
+                # Get file metadata (size, mtime and inode from a single stat)
+                stat = entry.stat()
                 
-                if file_types:
-                    ext = os.path.splitext(file_name)[1].lower()
-                    if ext not in file_types:
-                        continue
+                files.append(FileMetadata(
+                    path=relative_file_path,
+                    name=file_name,
+                    size=stat.st_size,
+                    modified_time=datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                    file_type=ext,
+                    source_id=f"local_{stat.st_ino}",  # Use inode as ID
+                    source_type="local",
+                    full_source_path=entry.path,
+                    is_downloadable=True
+                ))
                 
-                try:
-                    file_path = root_path / file_name
-                    
-                    # Get file metadata
-                    stat = file_path.stat()
-                    
-                    # Calculate relative path from base
-                    relative_path = file_path.relative_to(self.base_path)
-                    
-                    # Create FileMetadata
-                    metadata = FileMetadata(
-                        path=str(relative_path),
-                        name=file_name,
-                        size=stat.st_size,
-                        modified_time=datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        file_type=os.path.splitext(file_name)[1].lower(),
-                        source_id=f"local_{file_path.stat().st_ino}",  # Use inode as ID
-                        source_type="local",
-                        full_source_path=str(file_path),
-                        is_downloadable=True
-                    )
-                    
-                    yield metadata
-                    
-                except Exception as e:
-                    self.logger.warning(f"⚠️ Error processing file {file_name}: {e}")
-                    # Still yield metadata with error
-                    yield FileMetadata(
-                        path=str(root_path.relative_to(self.base_path) / file_name),
-                        name=file_name,
-                        size=0,
-                        modified_time=datetime.now().isoformat(),
-                        file_type=os.path.splitext(file_name)[1].lower(),
-                        source_id="error",
-                        source_type="local",
-                        full_source_path=str(root_path / file_name),
-                        is_downloadable=False,
-                        error_message=str(e)
-                    )
+            except Exception as e:
+                self.logger.warning(f"⚠️ Error processing file {file_name}: {e}")
+                # Still yield metadata with error
+                files.append(FileMetadata(
+                    path=relative_file_path,
+                    name=file_name,
+                    size=0,
+                    modified_time=datetime.now().isoformat(),
+                    file_type=ext,
+                    source_id="error",
+                    source_type="local",
+                    full_source_path=entry.path,
+                    is_downloadable=False,
+                    error_message=str(e)
+                ))
+        
+        return files, subdirs
     
-    def download_file(self, file_path: str) -> bytes:
-        """Download (read) file content"""
+    def download_file(self, file_path: str, full_source_path: Optional[str] = None) -> bytes:
+        """
+        Download (read) file content.
+        
+        Args:
+            file_path: Path relative to base_path (as recorded by discovery)
+            full_source_path: Optional absolute path recorded by discovery; tried first
+            
+        Returns:
+            File content as bytes
+        """
         try:
-            full_path = self.base_path / file_path
-
-            if not full_path.exists():
-                # Salesforce raw exports: discovery paths are often ContentVersion/<ContentVersionId>
-                # but payloads live under ContentVersions/VersionData/<ContentVersionId>/<filename>.
-                path_str = str(file_path)
-
-                # Strategy 0: ContentVersion/<id> flat file (some exports)
-                if path_str.startswith("ContentVersion/"):
-                    cv_id = path_str.split("/", 1)[1].strip()
-                    flat_candidate = self.base_path / "ContentVersion" / cv_id
-                    if flat_candidate.exists() and flat_candidate.is_file():
-                        full_path = flat_candidate
-                    else:
-                        # Strategy 1: ContentVersions/VersionData/<id>/... (common)
-                        version_dir = self.base_path / "ContentVersions" / "VersionData" / cv_id
-                        if version_dir.exists() and version_dir.is_dir():
-                            # Choose the first non-hidden file found (there is usually one)
-                            for candidate in version_dir.rglob("*"):
-                                if candidate.is_file() and not candidate.name.startswith("."):
-                                    full_path = candidate
-                                    break
-
-                # Strategy 2: Already a VersionData path but different casing/pluralization
-                if not full_path.exists() and path_str.startswith("ContentVersions/"):
-                    # If caller passed ContentVersions/... relative path, re-evaluate with base_path
-                    candidate = self.base_path / path_str
-                    if candidate.exists():
-                        full_path = candidate
-
-            if not full_path.exists():
-                raise FileNotFoundError(f"File not found: {file_path}")
+            if full_source_path:
+                content = self._read_if_present(Path(full_source_path))
+                if content is not None:
+                    return content
             
-            with open(full_path, 'rb') as f:
-                return f.read()
+            content = self._read_if_present(self.base_path / file_path)
+            if content is not None:
+                return content
+            
+            # Salesforce raw exports: discovery paths are often ContentVersion/<ContentVersionId>
+            # but payloads live under ContentVersions/VersionData/<ContentVersionId>/<filename>.
+            path_str = str(file_path)
+            if path_str.startswith("ContentVersion/"):
+                cv_id = path_str.split("/", 1)[1].strip()
+                for _ in range(2):
+                    resolved = self._resolve_content_version(cv_id)
+                    if resolved is None:
+                        break
+                    content = self._read_if_present(resolved)
+                    if content is not None:
+                        return content
+                    # Payload moved since it was cached: drop the entry and resolve again
+                    self._forget_content_version(cv_id)
+            
+            raise FileNotFoundError(f"File not found: {file_path}")
                 
         except PermissionError:
             raise PermissionError(f"Permission denied reading file: {file_path}")
         except Exception as e:
             raise FileSourceError(f"Error reading file: {e}")
     
+    @staticmethod
+    def _read_if_present(path: Path) -> Optional[bytes]:
+        """Read a file with a single open(); None if it does not exist."""
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+    
+    def _resolve_content_version(self, cv_id: str) -> Optional[Path]:
+        """
+        Payload path for a ContentVersion id, memoized in a bounded per-client LRU.
+        
+        Strategy 0: ContentVersion/<id> flat file (some exports)
+        Strategy 1: first non-hidden file under ContentVersions/VersionData/<id>/ (common)
+        """
+        with self._resolved_lock:
+            resolved = self._resolved_content_versions.get(cv_id)
+            if resolved is not None:
+                self._resolved_content_versions.move_to_end(cv_id)
+                return resolved
+        
+        flat_candidate = self.base_path / "ContentVersion" / cv_id
+        if flat_candidate.is_file():
+            resolved = flat_candidate
+        else:
+            resolved = self._first_file(self.base_path / "ContentVersions" / "VersionData" / cv_id)
+        
+        # Only hits are cached, so a payload that appears later is still found
+        if resolved is not None:
+            with self._resolved_lock:
+                self._resolved_content_versions[cv_id] = resolved
+                if len(self._resolved_content_versions) > RESOLVED_PATH_CACHE_SIZE:
+                    self._resolved_content_versions.popitem(last=False)
+        return resolved
+    
+    def _forget_content_version(self, cv_id: str) -> None:
+        with self._resolved_lock:
+            self._resolved_content_versions.pop(cv_id, None)
+    
+    @staticmethod
+    def _first_file(directory: Path) -> Optional[Path]:
+        """First non-hidden file under directory, in the order rglob('*') would find it."""
+        stack = [str(directory)]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except OSError:
+                continue
+            subdirs = []
+            for entry in entries:
+                try:
+                    if entry.is_file() and not entry.name.startswith("."):
+                        return Path(entry.path)
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                except OSError:
+                    continue
+            stack.extend(reversed(subdirs))
+        return None
+    
     def download_document(self, file_path: str) -> bytes:
         """Compatibility method for DocumentProcessor (same as download_file)"""
         return self.download_file(file_path)
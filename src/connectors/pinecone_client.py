@@ -15,6 +15,16 @@ from datetime import datetime, timezone
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import time
 import math
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+from .query_embedding_cache import QueryEmbeddingCache, get_shared_query_cache
+
+# Cache key for query embeddings: both models that embed a search query
+QUERY_EMBEDDING_MODELS = "multilingual-e5-large+pinecone-sparse-english-v0"
+
+# Concurrent namespace queries per hybrid search
+MAX_NAMESPACE_QUERY_WORKERS = 8
 
 
 def _sanitize_str(value: Any, default: str = "") -> str:
@@ -250,13 +260,20 @@ def setup_logger():
 class PineconeDocumentClient:
     """Enhanced Pinecone client for business document processing with proven hybrid search"""
     
-    def __init__(self, api_key: str, index_name: str = "business-documents", environment: str = "us-east-1"):
-        """Initialize Pinecone client using proven working pattern from Quick_Check"""
+    def __init__(self, api_key: str, index_name: str = "business-documents", environment: str = "us-east-1",
+                 query_cache: Optional[QueryEmbeddingCache] = None):
+        """Initialize Pinecone client using proven working pattern from Quick_Check
+        
+        Args:
+            query_cache: Cache for search query embeddings (default: the process-wide
+                         cache shared by all clients; see get_shared_query_cache)
+        """
         self.pc = Pinecone(api_key=api_key)
         self.index_name = index_name
         self.environment = environment
         self.index = self.pc.Index(index_name)
         self.logger = setup_logger()
+        self.query_cache = query_cache if query_cache is not None else get_shared_query_cache()
         
         self.logger.info(f"Initialized PineconeDocumentClient with index: {index_name}")
     
@@ -289,13 +306,19 @@ class PineconeDocumentClient:
             return False
     
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def _generate_embeddings(self, texts, input_type: str = None) -> Dict:
+    def _generate_embeddings(self, texts, input_type: str = None,
+                             include_dense: bool = True, include_sparse: bool = True) -> Dict:
         """Generate dense and sparse embeddings using Pinecone's inference API with batch size limits.
 
         Args:
             texts: A single query string or a list of passage strings.
             input_type: Optional override. Use "query" for searches and "passage" for document writes.
                         If not provided, will auto-detect: string → "query", list → "passage".
+            include_dense: Call the dense model (skip when dense vectors are already known)
+            include_sparse: Call the sparse model (skip when only dense vectors are needed)
+        
+        Returns:
+            Dict with 'dense_embeddings' and 'sparse_embeddings' lists (a skipped model's list is empty)
         """
         try:
             # Convert single string to list for consistent processing
@@ -336,9 +359,13 @@ class PineconeDocumentClient:
                         yield items[start:end]
                         start = end
 
+            # A skipped model gets no batches (its result list stays empty)
+            dense_texts = texts if include_dense else []
+            sparse_texts = texts if include_sparse else []
+
             # Process dense embeddings in batches with size guard and adaptive retry
             batch_index = 0
-            for batch_texts in _yield_sized_batches(texts, DENSE_MODEL_BATCH_SIZE):
+            for batch_texts in _yield_sized_batches(dense_texts, DENSE_MODEL_BATCH_SIZE):
                 batch_index += 1
                 self.logger.debug(
                     f"Processing dense embedding batch {batch_index}: {len(batch_texts)} texts (total: {len(texts)})"
@@ -369,7 +396,7 @@ class PineconeDocumentClient:
             
             # Process sparse embeddings in batches with same guards
             batch_index = 0
-            for batch_texts in _yield_sized_batches(texts, SPARSE_MODEL_BATCH_SIZE):
+            for batch_texts in _yield_sized_batches(sparse_texts, SPARSE_MODEL_BATCH_SIZE):
                 batch_index += 1
                 self.logger.debug(
                     f"Processing sparse embedding batch {batch_index}: {len(batch_texts)} texts (total: {len(texts)})"
@@ -438,6 +465,56 @@ class PineconeDocumentClient:
             self.logger.error(f"Error generating embeddings: {str(e)}")
             raise
 
+    def generate_chunk_embeddings(self, texts: List[str],
+                                  dense_embeddings: Optional[List[Optional[List[float]]]] = None) -> Dict:
+        """Generate passage embeddings for chunks, reusing dense vectors the chunker already has.
+
+        Chunkers that embed while splitting (semantic chunking) hand their pooled vectors
+        back here, so only chunks without one are sent to the dense model; sparse vectors
+        are always generated.
+
+        Args:
+            texts: Chunk texts
+            dense_embeddings: Optional per-chunk dense vectors aligned with texts (None entries
+                              are embedded)
+
+        Returns:
+            Dict with 'dense_embeddings' and 'sparse_embeddings' aligned with texts
+        """
+        if not dense_embeddings or all(vec is None for vec in dense_embeddings):
+            return self._generate_embeddings(texts, input_type="passage")
+
+        result = self._generate_embeddings(texts, input_type="passage", include_dense=False)
+        dense = list(dense_embeddings)
+        missing = [i for i, vec in enumerate(dense) if vec is None]
+        if missing:
+            fresh = self._generate_embeddings(
+                [texts[i] for i in missing], input_type="passage", include_sparse=False
+            )['dense_embeddings']
+            for i, vec in zip(missing, fresh):
+                dense[i] = vec
+        self.logger.info(f"Reused {len(texts) - len(missing)}/{len(texts)} chunk dense embeddings from chunking")
+
+        result['dense_embeddings'] = dense
+        return result
+
+    def _embed_query(self, query: str) -> Tuple[List[float], Dict[str, List]]:
+        """Dense and sparse query embeddings, served from the query cache when possible.
+        
+        Returns:
+            (dense_values, sparse_values) with sparse_values as {'indices', 'values'}
+        """
+        cached = self.query_cache.get(QUERY_EMBEDDING_MODELS, query)
+        if cached is not None:
+            return cached['dense'], cached['sparse']
+        
+        embeddings = self._generate_embeddings(query)
+        dense_values = list(embeddings['dense_embeddings'][0])
+        sparse = embeddings['sparse_embeddings'][0]
+        sparse_values = {'indices': list(sparse['indices']), 'values': list(sparse['values'])}
+        self.query_cache.put(QUERY_EMBEDDING_MODELS, query, {'dense': dense_values, 'sparse': sparse_values})
+        return dense_values, sparse_values
+
     def _truncate_enhanced_fields(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Safely truncate enhanced metadata fields to stay under limits."""
         truncated = dict(metadata)
@@ -757,18 +834,16 @@ class PineconeDocumentClient:
         Args:
             query: Search query
             filter_metadata: Pinecone filter conditions
-            top_k: Number of results from vector search
-            namespaces: List of namespaces to search
+            top_k: Number of results from vector search (across all namespaces)
+            namespaces: List of namespaces to search (queried concurrently)
             alpha: Weight for dense vs sparse (0.60 = 60% dense, 40% sparse)
             rerank: Whether to apply reranking
             rerank_top_n: Number of results to rerank
             include_business_filters: Whether to add business-specific filtering
         """
         try:
-            # Generate embeddings using proven method
-            embeddings = self._generate_embeddings(query)
-            dense_values = embeddings['dense_embeddings'][0]
-            sparse_values = embeddings['sparse_embeddings'][0]
+            # Generate embeddings using proven method (repeat queries hit the cache)
+            dense_values, sparse_values = self._embed_query(query)
             
             # Apply hybrid scoring weights
             dense_values = [v * alpha for v in dense_values]
@@ -784,22 +859,10 @@ class PineconeDocumentClient:
             # pass explicit filters via `filter_metadata` when needed.
             final_filter = filter_metadata or {}
             
-            # Search across namespaces
-            all_results = []
-            for namespace in namespaces:
-                try:
-                    results = self.index.query(
-                        namespace=namespace,
-                        top_k=top_k,
-                        vector=dense_values,
-                        sparse_vector=sparse_values,
-                        include_metadata=True,
-                        filter=final_filter if final_filter else None
-                    )
-                    all_results.extend(results['matches'])
-                except Exception as e:
-                    self.logger.error(f"Error searching namespace {namespace}: {str(e)}")
-                    continue
+            # Search all namespaces concurrently and keep the overall top_k by score
+            all_results, _ = self._query_namespaces(
+                namespaces, top_k, dense_values, sparse_values, final_filter if final_filter else None
+            )
             
             # Convert to DocumentSearchResult objects
             search_results = []
@@ -908,6 +971,58 @@ class PineconeDocumentClient:
             self.logger.error(f"Error in hybrid_search_documents: {str(e)}")
             return []
     
+    def _query_namespaces(self, namespaces: List[str], top_k: int, dense_values: List[float],
+                          sparse_values: Dict[str, List],
+                          filter: Optional[Dict]) -> Tuple[List[Any], Dict[str, Dict[str, Any]]]:
+        """Query each namespace concurrently and merge the matches into one top_k by score.
+        
+        Failed namespaces are logged and skipped. Per-namespace latency is logged and
+        returned with the matches (not kept on the client, which concurrent searches share).
+        
+        Returns:
+            (up to top_k matches across all namespaces, highest score first;
+             per-namespace {'latency_ms', 'matches', 'error'})
+        """
+        def query(namespace: str) -> Tuple[str, List[Any], float, Optional[str]]:
+            start = time.time()
+            try:
+                results = self.index.query(
+                    namespace=namespace,
+                    top_k=top_k,
+                    vector=dense_values,
+                    sparse_vector=sparse_values,
+                    include_metadata=True,
+                    filter=filter
+                )
+                return namespace, results['matches'], time.time() - start, None
+            except Exception as e:
+                self.logger.error(f"Error searching namespace {namespace}: {str(e)}")
+                return namespace, [], time.time() - start, str(e)
+        
+        namespaces = list(dict.fromkeys(namespaces))
+        if len(namespaces) <= 1:
+            outcomes = [query(namespace) for namespace in namespaces]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(namespaces), MAX_NAMESPACE_QUERY_WORKERS),
+                                    thread_name_prefix="ns-query") as executor:
+                outcomes = list(executor.map(query, namespaces))
+        
+        timings = {}
+        for namespace, matches, elapsed, error in outcomes:
+            timings[namespace] = {'latency_ms': round(elapsed * 1000, 1), 'matches': len(matches), 'error': error}
+        if len(timings) > 1:
+            self.logger.info("Namespace query latency: " + ", ".join(
+                f"{namespace}={t['latency_ms']:.0f}ms ({t['matches']} matches)" for namespace, t in timings.items()
+            ))
+        
+        # Matches from every namespace compete for the same top_k slots
+        top_matches = heapq.nlargest(
+            top_k,
+            (match for _, matches, _, _ in outcomes for match in matches),
+            key=lambda match: match.score if match.score is not None else float('-inf')
+        )
+        return top_matches, timings
+    
     def search_by_business_criteria(
         self,
         query: str,
@@ -1038,6 +1153,21 @@ class PineconeDocumentClient:
             self.logger.error(f"Error getting index stats: {e}")
             return {}
     
+    def get_query_cache_stats(self) -> Dict[str, Any]:
+        """Get query embedding cache statistics (hits, misses, size, hit rate)"""
+        return self.query_cache.get_stats()
+    
+    def delete_by_ids(self, ids: List[str], namespace: str = "documents", batch_size: int = 1000) -> bool:
+        """Delete vectors by id (ids that do not exist are ignored)"""
+        try:
+            for i in range(0, len(ids), batch_size):
+                self.index.delete(ids=ids[i:i + batch_size], namespace=namespace)
+            self.logger.info(f"Deleted {len(ids)} vector ids in namespace '{namespace}'")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting by ids: {e}")
+            return False
+    
     def delete_by_filter(self, filter_conditions: Dict[str, Any], namespace: str = "documents") -> bool:
         """Delete vectors matching filter conditions"""
         try:
@@ -0,0 +1,210 @@
+"""
+Query embedding cache
+
+Every hybrid search embeds its query with two inference calls (dense + sparse),
+even when the same query was just searched: repeated user questions, HyDE A/B
+arms that share the original query, and target comparisons that run one query
+against several indexes. QueryEmbeddingCache keeps recent query embeddings in an
+in-process LRU keyed by (model, normalized query text) with a TTL, optionally
+backed by a SQLite file so the cache survives restarts and is shared between
+processes.
+
+Queries are normalized by Unicode NFC and whitespace collapsing only; case is
+kept because the embedding models are case-sensitive.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+
+DEFAULT_QUERY_CACHE_SIZE = 1024
+DEFAULT_QUERY_CACHE_TTL_SECONDS = 24 * 3600
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Cache key form of a query: NFC, trimmed, internal whitespace collapsed."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU + TTL cache of query embeddings with an optional SQLite layer"""
+
+    def __init__(self, max_entries: int = DEFAULT_QUERY_CACHE_SIZE,
+                 ttl_seconds: float = DEFAULT_QUERY_CACHE_TTL_SECONDS,
+                 cache_path: Optional[str] = None):
+        """
+        Initialize query embedding cache.
+
+        Args:
+            max_entries: Embeddings kept in memory (0 disables the in-memory layer)
+            ttl_seconds: Age after which an entry is treated as missing (0 = never expires)
+            cache_path: Optional SQLite file for a persistent layer shared across processes
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.logger = logging.getLogger(__name__)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        # Every lookup counts as exactly one of hits / disk_hits / misses / expired
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "evictions": 0, "stores": 0}
+        if self.cache_path:
+            self._open_disk()
+
+    def _open_disk(self) -> None:
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.cache_path), check_same_thread=False, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings "
+                "(model TEXT, query TEXT, created REAL, value TEXT, PRIMARY KEY (model, query))"
+            )
+            connection.commit()
+            self._connection = connection
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not open query embedding cache {self.cache_path}: {e}")
+
+    def _expired(self, created: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created > self.ttl_seconds
+
+    def get(self, model: str, query: str) -> Optional[Any]:
+        """
+        Cached embedding for a query.
+
+        Args:
+            model: Model identifier the embedding was produced with
+            query: Query text (normalized internally)
+
+        Returns:
+            The stored embedding, or None on a miss or expired entry
+        """
+        key = (model, normalize_query(query))
+        now = time.time()
+        expired = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                expired = True
+
+            if self._connection is not None:
+                try:
+                    row = self._connection.execute(
+                        "SELECT created, value FROM query_embeddings WHERE model = ? AND query = ?", key
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    self.logger.debug(f"Query embedding cache read failed: {e}")
+                    row = None
+                if row is not None and not self._expired(row[0], now):
+                    value = json.loads(row[1])
+                    self._remember(key, row[0], value)
+                    self.stats["disk_hits"] += 1
+                    return value
+                expired = expired or row is not None
+
+            self.stats["expired" if expired else "misses"] += 1
+            return None
+
+    def put(self, model: str, query: str, value: Any) -> None:
+        """
+        Store a query embedding.
+
+        Args:
+            model: Model identifier the embedding was produced with
+            query: Query text (normalized internally)
+            value: JSON-serializable embedding
+        """
+        key = (model, normalize_query(query))
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, value)
+            self.stats["stores"] += 1
+            if self._connection is not None:
+                try:
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO query_embeddings (model, query, created, value) VALUES (?, ?, ?, ?)",
+                        (*key, created, json.dumps(value, separators=(",", ":")))
+                    )
+                    self._connection.commit()
+                except sqlite3.Error as e:
+                    self.logger.debug(f"Query embedding cache write failed: {e}")
+
+    def _remember(self, key: Tuple[str, str], created: float, value: Any) -> None:
+        """Insert into the in-memory LRU (caller holds the lock)."""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop every cached embedding (memory and disk)."""
+        with self._lock:
+            self._entries.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM query_embeddings")
+                self._connection.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, current size and hit rate."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"] + stats["expired"]
+        stats.update({
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "cache_path": str(self.cache_path) if self.cache_path else None,
+            "hit_rate": (stats["hits"] + stats["disk_hits"]) / lookups if lookups else 0.0,
+        })
+        return stats
+
+    def close(self) -> None:
+        """Close the SQLite layer (the in-memory layer keeps working)."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+_shared_cache: Optional[QueryEmbeddingCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_query_cache() -> QueryEmbeddingCache:
+    """
+    Process-wide cache used by PineconeDocumentClient instances by default.
+
+    Entries are keyed by model, not index, so clients for different indexes share
+    them. Configured from QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL_SECONDS
+    and QUERY_EMBEDDING_CACHE_PATH (unset = memory only).
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = QueryEmbeddingCache(
+                max_entries=int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", str(DEFAULT_QUERY_CACHE_SIZE))),
+                ttl_seconds=float(os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS",
+                                            str(DEFAULT_QUERY_CACHE_TTL_SECONDS))),
+                cache_path=os.getenv("QUERY_EMBEDDING_CACHE_PATH") or None,
+            )
+        return _shared_cache
@@ -29,9 +29,9 @@ from typing import Generator, Dict, Optional, List, Any, Set
 from datetime import datetime
 import logging
 import hashlib
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .file_source_interface import FileSourceInterface, FileMetadata
+from .connector_index_cache import ConnectorIndexCache
 try:
     from models.document_models import DocumentMetadata
 except ImportError:
@@ -41,6 +41,27 @@ except ImportError:
     from models.document_models import DocumentMetadata
 
 
+# ContentVersion columns used by the connector (other export columns are not loaded)
+CONTENT_VERSION_COLUMNS = [
+    'Id', 'ContentDocumentId', 'Title', 'PathOnClient', 'FileType', 'ContentSize',
+    'Deal__c', 'ContentModifiedDate', 'CreatedDate', 'IsLatest', 'IsDeleted'
+]
+
+# Salesforce FileType -> extension, used when PathOnClient has no extension
+FILETYPE_EXTENSIONS = {
+    'PDF': '.pdf', 'WORD_X': '.docx', 'WORD': '.doc',
+    'EXCEL_X': '.xlsx', 'EXCEL': '.xls',
+    'POWER_POINT_X': '.pptx', 'POWER_POINT': '.ppt',
+    'MSG': '.msg', 'EML': '.eml',
+    'TEXT': '.txt', 'CSV': '.csv',
+    'PNG': '.png', 'JPEG': '.jpg', 'GIF': '.gif',
+    'HTML': '.html', 'XML': '.xml', 'JSON': '.json'
+}
+
+# Files enriched per join in list_documents_as_metadata()
+ENRICHMENT_BATCH_SIZE = 500
+
+
 class RawSalesforceExportConnector(FileSourceInterface):
     """File source for raw Salesforce differential export bundles"""
     
@@ -52,7 +73,8 @@ class RawSalesforceExportConnector(FileSourceInterface):
                  deal_metadata_csv: str,
                  client_mapping_csv: Optional[str] = None,
                  vendor_mapping_csv: Optional[str] = None,
-                 deal_mapping_csv: Optional[str] = None):
+                 deal_mapping_csv: Optional[str] = None,
+                 index_cache: Optional[str] = None):
         """
         Initialize raw Salesforce export connector.
         
@@ -66,6 +88,9 @@ class RawSalesforceExportConnector(FileSourceInterface):
             client_mapping_csv: Optional path to Client ID -> Name mapping CSV
             vendor_mapping_csv: Optional path to Vendor ID -> Name mapping CSV
             deal_mapping_csv: Optional path to organized_files_to_deal_mapping.csv for user-friendly deal numbers
+            index_cache: Optional SQLite path to persist the CSV-derived mappings, deal metadata
+                         and valid file paths between runs (rebuilt when a source CSV's size or
+                         mtime changes; valid file paths also when the payload signature changes)
         """
         super().__init__()
         
@@ -77,6 +102,7 @@ class RawSalesforceExportConnector(FileSourceInterface):
         self.client_mapping_csv = client_mapping_csv
         self.vendor_mapping_csv = vendor_mapping_csv
         self.deal_mapping_csv = deal_mapping_csv
+        self.index_cache = index_cache
         
         # Loaded data caches
         self._content_versions: Optional[Dict] = None
@@ -86,6 +112,12 @@ class RawSalesforceExportConnector(FileSourceInterface):
         self._client_mapping: Optional[Dict] = None
         self._vendor_mapping: Optional[Dict] = None
         self._cv_to_deal_mapping: Optional[Dict] = None
+        self._file_index: Optional[Dict[str, Dict[str, str]]] = None
+        self._payload_signature: Optional[Dict[str, Any]] = None
+        self._index_cache: Optional[ConnectorIndexCache] = None
+        self._cached_mappings: Optional[Dict[str, Any]] = None
+        # Deal id -> DocumentMetadata deal fields, filled by enrich_batch()
+        self._deal_fields_memo: Dict[str, Dict[str, Any]] = {}
         
         self.logger = logging.getLogger(__name__)
         
@@ -128,77 +160,159 @@ class RawSalesforceExportConnector(FileSourceInterface):
         """Load all CSV mappings into memory for fast lookup"""
         self.logger.info("Loading raw Salesforce export metadata...")
         
-        # Load ContentVersions
+        # Reuse the persisted ContentVersion/ContentDocument/link mappings when the CSVs are unchanged
+        cache_signature = None
+        if self.index_cache:
+            self._index_cache = ConnectorIndexCache(self.index_cache)
+            cache_signature = self._content_signature()
+            self._cached_mappings = self._index_cache.load(
+                cache_signature,
+                decoders={'valid_file_paths': lambda rel_path: self.export_root_dir / rel_path}
+            )
+        
+        if self._cached_mappings:
+            self._content_versions = self._cached_mappings['content_versions']
+            self._content_documents = self._cached_mappings['content_documents']
+            self._content_document_links = self._cached_mappings['content_document_links']
+            self._cv_to_deal_mapping = self._cached_mappings['cv_to_deal']
+            self.logger.info(f"⚡ Loaded {len(self._content_versions):,} ContentVersion records and "
+                             f"{len(self._cv_to_deal_mapping):,} Deal mappings from index cache {self.index_cache}")
+        else:
+            self._load_content_mappings()
+        
+        if self._cached_mappings and self._index_cache.get_meta('deal_signature') == self._deal_signature():
+            self._deal_metadata = self._cached_mappings['deal_metadata']
+            self._client_mapping = self._cached_mappings['client_mapping'] or None
+            self._vendor_mapping = self._cached_mappings['vendor_mapping'] or None
+            self._deal_id_to_number = self._cached_mappings['deal_id_to_number']
+            self.logger.info(f"⚡ Loaded {len(self._deal_metadata):,} deal records from index cache")
+        else:
+            self._load_deal_mappings()
+            if self._cached_mappings:
+                # ContentVersion CSVs unchanged but the deal CSVs changed: refresh just the deal tables
+                for table, mapping in self._deal_tables().items():
+                    self._index_cache.update(table, mapping)
+                self._index_cache.set_meta({'deal_signature': self._deal_signature()})
+        
+        # OPTIMIZATION: Resolve every ContentVersion against a single scan of the payload directories
+        self._precompute_valid_file_paths()
+        
+        if self._index_cache and not self._cached_mappings:
+            self._save_index_cache(self._index_cache, cache_signature)
+    
+    def _content_signature(self) -> Dict[str, Any]:
+        """Index cache key: the ContentVersion, ContentDocument and link CSVs."""
+        return ConnectorIndexCache.source_signature([
+            self.content_versions_csv, self.content_documents_csv, self.content_document_links_csv
+        ])
+    
+    def _deal_signature(self) -> Dict[str, Any]:
+        """Signature of the deal and name mapping CSVs the cached deal tables were built from."""
+        return ConnectorIndexCache.source_signature([
+            self.deal_metadata_csv, self.client_mapping_csv, self.vendor_mapping_csv, self.deal_mapping_csv
+        ])
+    
+    def _deal_tables(self) -> Dict[str, Any]:
+        """Deal-side mappings as stored in the index cache (absent name mappings as empty tables)."""
+        return {
+            'deal_metadata': self._deal_metadata,
+            'client_mapping': self._client_mapping or {},
+            'vendor_mapping': self._vendor_mapping or {},
+            'deal_id_to_number': self._deal_id_to_number,
+        }
+    
+    def _save_index_cache(self, cache: ConnectorIndexCache, signature: Dict[str, Any]) -> None:
+        """Write every loaded mapping to cache."""
+        cache.save(signature, {
+            'content_versions': self._content_versions,
+            'content_documents': self._content_documents,
+            'content_document_links': self._content_document_links,
+            'cv_to_deal': self._cv_to_deal_mapping,
+            'valid_file_paths': self._relative_valid_paths(),
+            **self._deal_tables(),
+        }, extra_meta={
+            'file_index_signature': self._file_index_signature(),
+            'deal_signature': self._deal_signature(),
+        })
+    
+    def save_index_cache(self, cache_path: str) -> None:
+        """
+        Persist the loaded mappings to an index cache file.
+        
+        A connector built with index_cache=cache_path then opens these mappings instead
+        of parsing the CSVs and scanning the payload directories (sharded discovery
+        hands its workers such a cache).
+        
+        Args:
+            cache_path: SQLite file to (over)write
+        """
+        self._save_index_cache(ConnectorIndexCache(cache_path), self._content_signature())
+    
+    def _load_content_mappings(self):
+        """Load ContentVersion/ContentDocument/ContentDocumentLink CSVs and build ContentVersion → Deal mapping"""
+        # Load ContentVersions (only the columns we use)
         self.logger.info(f"Loading ContentVersions from {self.content_versions_csv}")
-        # Use utf-8-sig to handle BOM (Byte Order Mark) if present, fallback to latin1 for compatibility
-        try:
-            cv_df = pd.read_csv(self.content_versions_csv, encoding='utf-8-sig', low_memory=False)
-        except UnicodeDecodeError:
-            # Fallback to latin1 if utf-8-sig fails
-            self.logger.warning("utf-8-sig encoding failed, falling back to latin1")
-            cv_df = pd.read_csv(self.content_versions_csv, encoding='latin1', low_memory=False)
-        self._content_versions = {}
-        
-        for _, row in cv_df.iterrows():
-            cv_id = row['Id']
-            # Only process latest versions (IsLatest can be bool True, string 'true', '1', or numeric 1)
-            is_latest = row.get('IsLatest', False)
-            if isinstance(is_latest, bool):
-                if not is_latest:
-                    continue
-            elif isinstance(is_latest, str):
-                # Handle 'true', 'True', '1', 'TRUE', etc.
-                if is_latest.lower() not in ['true', '1', 'yes']:
-                    continue
-            elif isinstance(is_latest, (int, float)):
-                # Handle numeric 1/0
-                if is_latest != 1:
-                    continue
-            else:
-                # If IsLatest is missing or None, skip (assume not latest)
-                continue
-            
-            # Get Deal__c and handle NaN properly
-            deal_c_value = row.get('Deal__c', '')
-            if pd.isna(deal_c_value):
-                deal_c_value = None
-            elif deal_c_value:
-                deal_c_value = str(deal_c_value).strip()
-            
-            # Derive file extension from PathOnClient or FileType
-            path_on_client = row.get('PathOnClient', '') or row.get('Title', '')
-            file_type_raw = row.get('FileType', '')
-            
-            # First try to get extension from filename
-            file_ext = ''
-            if path_on_client and '.' in str(path_on_client):
-                file_ext = '.' + str(path_on_client).rsplit('.', 1)[-1].lower()
-            
-            # Fallback: map FileType to extension if no extension found
-            if not file_ext and file_type_raw:
-                filetype_map = {
-                    'PDF': '.pdf', 'WORD_X': '.docx', 'WORD': '.doc',
-                    'EXCEL_X': '.xlsx', 'EXCEL': '.xls',
-                    'POWER_POINT_X': '.pptx', 'POWER_POINT': '.ppt',
-                    'MSG': '.msg', 'EML': '.eml',
-                    'TEXT': '.txt', 'CSV': '.csv',
-                    'PNG': '.png', 'JPEG': '.jpg', 'GIF': '.gif',
-                    'HTML': '.html', 'XML': '.xml', 'JSON': '.json'
-                }
-                file_ext = filetype_map.get(str(file_type_raw).upper(), '')
-            
-            self._content_versions[cv_id] = {
-                'content_document_id': row.get('ContentDocumentId', ''),
-                'title': row.get('Title', ''),
-                'path_on_client': path_on_client,
-                'file_type': file_type_raw,
-                'file_extension': file_ext,  # Derived from filename or FileType
-                'content_size': row.get('ContentSize', 0),
-                'deal_id': deal_c_value,  # Properly handled Deal__c link
-                'content_modified_date': row.get('ContentModifiedDate', ''),
-                'created_date': row.get('CreatedDate', ''),
-                'is_deleted': self._parse_boolean(row.get('IsDeleted', False))
+        cv_df = self._read_csv(self.content_versions_csv, usecols=CONTENT_VERSION_COLUMNS)
+        
+        # Only process latest versions (IsLatest can be bool True, string 'true', '1', or numeric 1)
+        if 'IsLatest' in cv_df.columns:
+            cv_df = cv_df[self._is_latest_mask(cv_df['IsLatest'])]
+        else:
+            cv_df = cv_df.iloc[0:0]
+        
+        # Deal__c: NaN -> None, other falsy values (e.g. 0) unchanged, otherwise stripped string
+        deal_c = self._column(cv_df, 'Deal__c', '')
+        if 'Deal__c' in cv_df.columns:
+            deal_c = deal_c.astype(object)
+            present = deal_c.notna()
+            deal_c = deal_c.where(present, None)
+            truthy = present & deal_c.astype(bool)
+            deal_c[truthy] = deal_c[truthy].map(str).str.strip()
+        
+        # PathOnClient falls back to Title only when empty (NaN is kept, as before)
+        path_on_client = self._column(cv_df, 'PathOnClient', '')
+        title = self._column(cv_df, 'Title', '')
+        path_on_client = path_on_client.where(path_on_client.astype(object).fillna(True).astype(bool), title)
+        
+        # Derive file extension from the filename, falling back to FileType
+        # (map(str) like the old per-row str(): astype(str) keeps NaN missing on newer pandas)
+        file_type_raw = self._column(cv_df, 'FileType', '')
+        path_text = path_on_client.map(str).astype(object)
+        has_ext = path_on_client.astype(object).fillna(True).astype(bool) & path_text.str.contains('.', regex=False)
+        file_ext = ('.' + path_text.str.rsplit('.', n=1).str[-1].str.lower()).where(has_ext, '')
+        type_ext = file_type_raw.map(str).astype(object).str.upper().map(FILETYPE_EXTENSIONS).fillna('')
+        file_ext = file_ext.where(file_ext != '', type_ext)
+        
+        is_deleted = self._boolean_series(self._column(cv_df, 'IsDeleted', False))
+        
+        self._content_versions = {
+            cv_id: {
+                'content_document_id': content_document_id,
+                'title': cv_title,
+                'path_on_client': cv_path,
+                'file_type': file_type,
+                'file_extension': ext,  # Derived from filename or FileType
+                'content_size': content_size,
+                'deal_id': deal_id,  # Properly handled Deal__c link
+                'content_modified_date': content_modified_date,
+                'created_date': created_date,
+                'is_deleted': deleted
             }
+            for cv_id, content_document_id, cv_title, cv_path, file_type, ext, content_size,
+                deal_id, content_modified_date, created_date, deleted in zip(
+                cv_df['Id'].tolist(),
+                self._column(cv_df, 'ContentDocumentId', '').tolist(),
+                title.tolist(),
+                path_on_client.tolist(),
+                file_type_raw.tolist(),
+                file_ext.tolist(),
+                self._column(cv_df, 'ContentSize', 0).tolist(),
+                deal_c.tolist(),
+                self._column(cv_df, 'ContentModifiedDate', '').tolist(),
+                self._column(cv_df, 'CreatedDate', '').tolist(),
+                is_deleted.tolist()
+            )
+        }
         
         self.logger.info(f"Loaded {len(self._content_versions)} ContentVersion records (latest versions only)")
         
@@ -208,13 +322,9 @@ class RawSalesforceExportConnector(FileSourceInterface):
         if self.content_documents_csv:
             # Load from separate ContentDocument.csv file
             self.logger.info(f"Loading ContentDocuments from {self.content_documents_csv}")
-            try:
-                cd_df = pd.read_csv(self.content_documents_csv, encoding='utf-8-sig', low_memory=False)
-            except UnicodeDecodeError:
-                self.logger.warning("utf-8-sig encoding failed, falling back to latin1")
-                cd_df = pd.read_csv(self.content_documents_csv, encoding='latin1', low_memory=False)
+            cd_df = self._read_csv(self.content_documents_csv)
             
-            for _, row in cd_df.iterrows():
+            for row in cd_df.to_dict('records'):
                 doc_id = row['Id']
                 self._content_documents[doc_id] = {
                     'title': row.get('Title', ''),
@@ -241,110 +351,39 @@ class RawSalesforceExportConnector(FileSourceInterface):
         
         # Load ContentDocumentLinks (for Deal mapping fallback)
         self.logger.info(f"Loading ContentDocumentLinks from {self.content_document_links_csv}")
-        # Use utf-8-sig to handle BOM (Byte Order Mark) if present, fallback to latin1 for compatibility
-        try:
-            cdl_df = pd.read_csv(self.content_document_links_csv, encoding='utf-8-sig', low_memory=False)
-        except UnicodeDecodeError:
-            # Fallback to latin1 if utf-8-sig fails
-            self.logger.warning("utf-8-sig encoding failed, falling back to latin1")
-            cdl_df = pd.read_csv(self.content_document_links_csv, encoding='latin1', low_memory=False)
-        self._content_document_links = {}
+        cdl_df = self._read_csv(self.content_document_links_csv, usecols=['ContentDocumentId', 'LinkedEntityId'])
         
-        for _, row in cdl_df.iterrows():
-            doc_id = row['ContentDocumentId']
-            linked_entity_id = row['LinkedEntityId']
-            
-            # Handle NaN values
-            if pd.isna(linked_entity_id) or pd.isna(doc_id):
-                continue
-            
-            # Convert to string and check if linked entity is a Deal (Deal IDs start with 'a0W')
-            linked_entity_str = str(linked_entity_id).strip()
-            if linked_entity_str.startswith('a0W'):
-                if doc_id not in self._content_document_links:
-                    self._content_document_links[doc_id] = []
-                self._content_document_links[doc_id].append(linked_entity_str)
+        # Keep Deal links only (Deal IDs start with 'a0W'), skipping NaN values
+        cdl_df = cdl_df[cdl_df['ContentDocumentId'].notna() & cdl_df['LinkedEntityId'].notna()]
+        linked_entities = cdl_df['LinkedEntityId'].astype(str).str.strip()
+        is_deal_link = linked_entities.str.startswith('a0W')
+        
+        self._content_document_links = {}
+        for doc_id, linked_entity_str in zip(cdl_df['ContentDocumentId'][is_deal_link].tolist(),
+                                             linked_entities[is_deal_link].tolist()):
+            self._content_document_links.setdefault(doc_id, []).append(linked_entity_str)
         
         self.logger.info(f"Loaded {len(self._content_document_links)} ContentDocument to Deal links")
         
         # Build ContentVersion → Deal mapping
         self._build_cv_to_deal_mapping()
-        
+    
+    def _load_deal_mappings(self):
+        """Load Deal metadata plus optional client, vendor and deal number mappings"""
         # Load Deal metadata
         self.logger.info(f"Loading Deal metadata from {self.deal_metadata_csv}")
-        # Use utf-8-sig to handle BOM (Byte Order Mark) if present, fallback to latin1 for compatibility
-        try:
-            deal_df = pd.read_csv(self.deal_metadata_csv, encoding='utf-8-sig', low_memory=False)
-        except UnicodeDecodeError:
-            # Fallback to latin1 if utf-8-sig fails
-            deal_df = pd.read_csv(self.deal_metadata_csv, encoding='latin1', low_memory=False)
+        deal_df = self._read_csv(self.deal_metadata_csv)
         self._deal_metadata = {}
         
-        for _, row in deal_df.iterrows():
-            deal_id = row['Id']
-            deal_name = row.get('Name', '')
-            
-            self._deal_metadata[deal_id] = {
-                'deal_name': deal_name,
-                'subject': row.get('Subject__c', ''),
-                'status': row.get('Status__c', ''),
-                'deal_reason': row.get('Deal_Reason__c', ''),
-                'start_date': row.get('Start_Date__c', '') or row.get('CreatedDate', ''),
-                'creation_date': row.get('CreatedDate', ''),  # Direct CreatedDate from deal__cs.csv
-                'negotiated_by': row.get('Negotiated_By__c', ''),
-                
-                # Financial metrics - prefer new merged fields, fallback to old names
-                'proposed_amount': self._safe_float(row.get('Total_Proposed_Amount__c')),
-                'final_amount': (
-                    self._safe_float(row.get('Total_Final_Amount_Year_1__c')) or
-                    self._safe_float(row.get('Total_Final_Amount__c'))
-                ),
-                'savings_1yr': (
-                    self._safe_float(row.get('Actual_Savings_Year_1__c')) or
-                    self._safe_float(row.get('Total_Savings_1yr__c'))
-                ),
-                'savings_3yr': self._safe_float(row.get('Total_Savings_3yr__c')),
-                'savings_target': (
-                    self._safe_float(row.get('Initial_Quote_Year_1__c')) or
-                    self._safe_float(row.get('NPI_Savings_Target__c'))
-                ),
-                'savings_achieved': row.get('Savings_Achieved__c', ''),
-                'fixed_savings': self._safe_float(row.get('Fixed_Savings__c')),
-                'savings_target_full_term': (
-                    self._safe_float(row.get('Actual_Savings_Full_Contract_Term__c')) or
-                    self._safe_float(row.get('NPI_Savings_Target_Full_Contract_Term__c'))
-                ),
-                'final_amount_full_term': self._safe_float(row.get('Final_Amount_Full_Contract_Term__c')),
-                
-                # Relationships
-                'client_id': row.get('Client__c', ''),
-                'vendor_id': row.get('Primary_Deal_Vendor__c', ''),
-                
-                # Contract info
-                'contract_term': row.get('Term__c', ''),
-                'contract_start': row.get('Contract_Start_Date__c', ''),
-                'contract_end': row.get('Contract_Renewal_Date__c', ''),
-                'effort_level': row.get('Effort_Level__c', ''),
-                'has_fmv_report': row.get('Formal_PDF_FMV_Delivered__c') == 'Yes',
-                'deal_origin': row.get('Deal_Origin__c', ''),
-                
-                # Narrative content
-                'current_narrative': row.get('Current_Narrative__c', ''),
-                'customer_comments': row.get('Comments_To_Customer__c', ''),
-                
-                # Deal classification fields (added December 2025)
-                # Note: Description__c removed Dec 14 - long text not suitable for Pinecone filtering
-                'report_type': self._to_str_or_none(row.get('Report_Type__c')),
-                'project_type': self._to_str_or_none(row.get('Project_Type__c')),
-                'competition': self._to_str_or_none(row.get('Competition__c')),
-                'npi_analyst': self._to_str_or_none(row.get('NPI_Analyst__c')),
-                'dual_multi_sourcing': self._to_str_or_none(row.get('Dual_Multi_sourcing_strategy__c')),
-                'time_pressure': self._to_str_or_none(row.get('Time_Pressure__c')),
-                'advisor_network_used': self._to_str_or_none(row.get('Was_Advisor_Network_SME_Used__c'))
-            }
+        for row in deal_df.to_dict('records'):
+            self._deal_metadata[row['Id']] = self._deal_record(row)
         
         self.logger.info(f"Loaded {len(self._deal_metadata)} deal records")
         
+        self._load_name_mappings()
+    
+    def _load_name_mappings(self):
+        """Load optional client, vendor and deal number mappings"""
         # Load client mapping if available
         if self.client_mapping_csv:
             self.logger.info(f"Loading client mapping from {self.client_mapping_csv}")
@@ -372,7 +411,7 @@ class RawSalesforceExportConnector(FileSourceInterface):
             try:
                 deal_map_df = pd.read_csv(self.deal_mapping_csv, encoding='utf-8-sig', low_memory=False)
                 # Extract deal number from deal_name (e.g., "Deal-58773" from deal_name)
-                for _, row in deal_map_df.iterrows():
+                for row in deal_map_df.to_dict('records'):
                     sf_deal_id = row.get('deal_id', '')  # Raw Salesforce ID
                     deal_name = row.get('deal_name', '')  # User-friendly format like "Deal-58773"
                     if sf_deal_id and deal_name:
@@ -384,9 +423,123 @@ class RawSalesforceExportConnector(FileSourceInterface):
             except Exception as e:
                 self.logger.warning(f"Failed to load deal mapping from {self.deal_mapping_csv}: {e}")
                 self._deal_id_to_number = {}
+    
+    def _deal_record(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the deal metadata record for one deal CSV row"""
+        deal_name = row.get('Name', '')
         
-        # OPTIMIZATION: Pre-compute valid file paths using parallel I/O
-        self._precompute_valid_file_paths()
+        return {
+            'deal_name': deal_name,
+            'subject': row.get('Subject__c', ''),
+            'status': row.get('Status__c', ''),
+            'deal_reason': row.get('Deal_Reason__c', ''),
+            'start_date': row.get('Start_Date__c', '') or row.get('CreatedDate', ''),
+            'creation_date': row.get('CreatedDate', ''),  # Direct CreatedDate from deal__cs.csv
+            'negotiated_by': row.get('Negotiated_By__c', ''),
+        
+            # Financial metrics - prefer new merged fields, fallback to old names
+            'proposed_amount': self._safe_float(row.get('Total_Proposed_Amount__c')),
+            'final_amount': (
+                self._safe_float(row.get('Total_Final_Amount_Year_1__c')) or
+                self._safe_float(row.get('Total_Final_Amount__c'))
+            ),
+            'savings_1yr': (
+                self._safe_float(row.get('Actual_Savings_Year_1__c')) or
+                self._safe_float(row.get('Total_Savings_1yr__c'))
+            ),
+            'savings_3yr': self._safe_float(row.get('Total_Savings_3yr__c')),
+            'savings_target': (
+                self._safe_float(row.get('Initial_Quote_Year_1__c')) or
+                self._safe_float(row.get('NPI_Savings_Target__c'))
+            ),
+            'savings_achieved': row.get('Savings_Achieved__c', ''),
+            'fixed_savings': self._safe_float(row.get('Fixed_Savings__c')),
+            'savings_target_full_term': (
+                self._safe_float(row.get('Actual_Savings_Full_Contract_Term__c')) or
+                self._safe_float(row.get('NPI_Savings_Target_Full_Contract_Term__c'))
+            ),
+            'final_amount_full_term': self._safe_float(row.get('Final_Amount_Full_Contract_Term__c')),
+        
+            # Relationships
+            'client_id': row.get('Client__c', ''),
+            'vendor_id': row.get('Primary_Deal_Vendor__c', ''),
+        
+            # Contract info
+            'contract_term': row.get('Term__c', ''),
+            'contract_start': row.get('Contract_Start_Date__c', ''),
+            'contract_end': row.get('Contract_Renewal_Date__c', ''),
+            'effort_level': row.get('Effort_Level__c', ''),
+            'has_fmv_report': row.get('Formal_PDF_FMV_Delivered__c') == 'Yes',
+            'deal_origin': row.get('Deal_Origin__c', ''),
+        
+            # Narrative content
+            'current_narrative': row.get('Current_Narrative__c', ''),
+            'customer_comments': row.get('Comments_To_Customer__c', ''),
+        
+            # Deal classification fields (added December 2025)
+            # Note: Description__c removed Dec 14 - long text not suitable for Pinecone filtering
+            'report_type': self._to_str_or_none(row.get('Report_Type__c')),
+            'project_type': self._to_str_or_none(row.get('Project_Type__c')),
+            'competition': self._to_str_or_none(row.get('Competition__c')),
+            'npi_analyst': self._to_str_or_none(row.get('NPI_Analyst__c')),
+            'dual_multi_sourcing': self._to_str_or_none(row.get('Dual_Multi_sourcing_strategy__c')),
+            'time_pressure': self._to_str_or_none(row.get('Time_Pressure__c')),
+            'advisor_network_used': self._to_str_or_none(row.get('Was_Advisor_Network_SME_Used__c'))
+        }
+    
+    def _read_csv(self, csv_path: str, usecols: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read an export CSV, falling back from utf-8-sig (handles BOM) to latin1.
+        
+        Args:
+            csv_path: Path to CSV file
+            usecols: Optional column names to load (names missing from the file are ignored)
+        """
+        wanted = set(usecols) if usecols else None
+        read_kwargs = {'low_memory': False}
+        if wanted:
+            read_kwargs['usecols'] = lambda column: column in wanted
+        try:
+            return pd.read_csv(csv_path, encoding='utf-8-sig', **read_kwargs)
+        except UnicodeDecodeError:
+            self.logger.warning("utf-8-sig encoding failed, falling back to latin1")
+            return pd.read_csv(csv_path, encoding='latin1', **read_kwargs)
+    
+    @staticmethod
+    def _column(df: pd.DataFrame, name: str, default: Any) -> pd.Series:
+        """Column by name, or a constant Series when the export lacks it."""
+        if name in df.columns:
+            return df[name]
+        return pd.Series([default] * len(df), index=df.index, dtype=object)
+    
+    @staticmethod
+    def _lowered_strings(values: pd.Series) -> pd.Series:
+        """Lower-cased string values; NaN where the value is not a string."""
+        try:
+            return values.str.lower()
+        except AttributeError:
+            # Object column without any strings (e.g. bools mixed with NaN)
+            return pd.Series(float('nan'), index=values.index, dtype=object)
+    
+    @classmethod
+    def _is_latest_mask(cls, values: pd.Series) -> pd.Series:
+        """Vectorized IsLatest check: bool True, 'true'/'1'/'yes' (any case) or numeric 1."""
+        if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+            return values == 1
+        lowered = cls._lowered_strings(values)
+        return lowered.isin(['true', '1', 'yes']) | (lowered.isna() & (values == 1))
+    
+    @classmethod
+    def _boolean_series(cls, values: pd.Series) -> pd.Series:
+        """Vectorized _parse_boolean: 'true' (any case) or a truthy non-string, NaN/'' -> False."""
+        if pd.api.types.is_bool_dtype(values):
+            return values
+        if pd.api.types.is_numeric_dtype(values):
+            return values.notna() & (values != 0)
+        values = values.astype(object)
+        lowered = cls._lowered_strings(values)
+        non_string_true = lowered.isna() & values.notna() & values.fillna(False).astype(bool)
+        return (lowered == 'true') | non_string_true
     
     def _build_cv_to_deal_mapping(self):
         """Build mapping from ContentVersion ID to Deal ID"""
@@ -415,35 +568,31 @@ class RawSalesforceExportConnector(FileSourceInterface):
         
         self.logger.info(f"Built {len(self._cv_to_deal_mapping)} ContentVersion → Deal mappings")
     
-    def _precompute_valid_file_paths(self, max_workers: int = 16):
+    def _precompute_valid_file_paths(self):
         """
-        Pre-compute and validate file paths using parallel I/O.
+        Pre-compute file paths for all supported, non-deleted ContentVersions.
         
-        OPTIMIZATION: Instead of checking file existence in the main discovery loop,
-        we do it once upfront using parallel threads. This dramatically reduces
-        disk I/O wait time.
-        
-        Args:
-            max_workers: Number of parallel threads for file existence checks
+        OPTIMIZATION: Paths are resolved by dictionary lookups against the payload file
+        index (one directory scan, see _build_file_index), so no per-file exists() checks
+        are needed here or in the main discovery loop.
         """
-        self.logger.info("🚀 Pre-computing valid file paths (parallel I/O optimization)...")
+        if self._cached_mappings:
+            file_index_signature = self._file_index_signature()
+            if self._index_cache.get_meta('file_index_signature') == file_index_signature:
+                self._valid_file_paths = self._cached_mappings['valid_file_paths']
+                self.logger.info(f"⚡ Loaded {len(self._valid_file_paths):,} valid file paths from index cache")
+                return
+        
+        self.logger.info("🚀 Pre-computing valid file paths from payload file index...")
+        self._ensure_file_index()
         
-        # First, compute all potential file paths (CPU-bound, fast)
-        path_candidates = {}
+        self._valid_file_paths: Dict[str, Path] = {}
+        candidates = 0
         for cv_id, cv_data in self._content_versions.items():
-            # Skip deleted files early
-            if cv_data.get('is_deleted'):
-                continue
-            
-            # Skip unsupported file types early
-            filename = cv_data.get('path_on_client', '') or cv_data.get('title', '')
-            if pd.isna(filename):
-                filename = ''
-            else:
-                filename = str(filename).strip()
-            
-            if not filename or not self.is_supported_file_type(filename):
+            # Skip deleted files and unsupported file types early
+            if not self._is_discoverable(cv_data):
                 continue
+            candidates += 1
             
             # Get deal ID for path resolution
             deal_id = self._cv_to_deal_mapping.get(cv_id)
@@ -453,38 +602,171 @@ class RawSalesforceExportConnector(FileSourceInterface):
             else:
                 content_doc_id = str(content_doc_id).strip()
             
-            # Resolve path (still CPU-bound)
             file_path = self._resolve_file_path(cv_id, content_doc_id, deal_id)
             if file_path:
-                path_candidates[cv_id] = file_path
+                self._valid_file_paths[cv_id] = file_path
         
-        self.logger.info(f"   Resolved {len(path_candidates):,} potential file paths")
+        valid_count = len(self._valid_file_paths)
+        valid_pct = (valid_count / candidates * 100) if candidates else 0
+        self.logger.info(f"✅ Pre-computed {valid_count:,} valid file paths ({valid_pct:.1f}% resolution rate)")
         
-        # Now check existence in parallel (I/O-bound)
-        def check_exists(item):
-            cv_id, path = item
-            return cv_id, path.exists() if path else False
+        if self._cached_mappings:
+            # CSVs unchanged but the export's files changed: refresh just the path table
+            self._index_cache.update('valid_file_paths', self._relative_valid_paths(),
+                                     extra_meta={'file_index_signature': file_index_signature})
+    
+    def _relative_valid_paths(self) -> Dict[str, str]:
+        """Valid file paths relative to export_root_dir (for the index cache)."""
+        return {
+            cv_id: str(path.relative_to(self.export_root_dir))
+            for cv_id, path in self._valid_file_paths.items()
+        }
+    
+    def _is_discoverable(self, cv_data: Dict[str, Any]) -> bool:
+        """True for non-deleted ContentVersions with a supported file name"""
+        if cv_data.get('is_deleted'):
+            return False
         
-        self._valid_file_paths: Dict[str, Path] = {}
-        checked = 0
+        filename = cv_data.get('path_on_client', '') or cv_data.get('title', '')
+        if pd.isna(filename):
+            filename = ''
+        else:
+            filename = str(filename).strip()
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(check_exists, item): item[0] 
-                      for item in path_candidates.items()}
-            
-            for future in as_completed(futures):
-                cv_id, exists = future.result()
-                if exists:
-                    self._valid_file_paths[cv_id] = path_candidates[cv_id]
-                checked += 1
-                
-                # Progress update every 10,000 checks
-                if checked % 10000 == 0:
-                    self.logger.info(f"   Validated {checked:,}/{len(path_candidates):,} file paths...")
+        return bool(filename) and self.is_supported_file_type(filename)
+    
+    def _ensure_file_index(self) -> Dict[str, Dict[str, str]]:
+        """Build the payload file index on first use."""
+        if self._file_index is None:
+            self._file_index = self._build_file_index()
+        return self._file_index
+    
+    def _file_index_signature(self) -> Dict[str, Any]:
+        """
+        Modification times of the payload directories whose entries the index records.
+        
+        Adding or removing a ContentVersion, VersionData record, attachment, export
+        batch or deal folder changes one of these directories' mtimes and invalidates
+        the valid file paths persisted in the index cache. Only these few directories
+        are stat'ed (record directories are not scanned), so a file replaced inside an
+        existing VersionData/<Id>/ or deal folder is not detected; delete the index
+        cache to force a rescan. Computed once per connector, before the index is
+        built, so a change during the scan invalidates the next run.
+        """
+        if self._payload_signature is not None:
+            return self._payload_signature
+        
+        root = self.export_root_dir
+        dirs = [
+            root / 'ContentVersion',
+            root / 'ContentVersions' / 'VersionData',
+            root / 'Deal__cs',
+            root / 'Attachments' / 'Body',
+        ]
+        try:
+            with os.scandir(root / 'Deal__cs') as entries:
+                dirs.extend(sorted(Path(e.path) for e in entries
+                                   if e.name.startswith('0EM') and e.is_dir()))
+        except OSError:
+            pass
+        
+        signature: Dict[str, Any] = {}
+        for directory in dirs:
+            try:
+                signature[str(directory.relative_to(root))] = directory.stat().st_mtime_ns
+            except OSError:
+                continue
         
-        valid_count = len(self._valid_file_paths)
-        valid_pct = (valid_count / len(path_candidates) * 100) if path_candidates else 0
-        self.logger.info(f"✅ Pre-computed {valid_count:,} valid file paths ({valid_pct:.1f}% resolution rate)")
+        self._payload_signature = signature
+        return signature
+    
+    def _build_file_index(self) -> Dict[str, Dict[str, str]]:
+        """
+        Scan the payload directories once and index every resolvable file.
+        
+        Returns:
+            Dict of lookup tables (id -> path relative to export_root_dir):
+            'flat' (ContentVersion/<CvId>), 'version_data' (ContentVersions/VersionData/<CvId>/...),
+            'deal' (Deal__cs/<0EM batch>/<DealId>/...) and 'attachments' (Attachments/Body/<DocId>)
+        """
+        index: Dict[str, Dict[str, str]] = {
+            'flat': {}, 'version_data': {}, 'deal': {}, 'attachments': {}
+        }
+        for kind, record_id, rel_path in self._iter_payload_files():
+            index[kind].setdefault(record_id, rel_path)
+        
+        self.logger.info(
+            f"📂 Indexed payload files: {len(index['flat']):,} flat, "
+            f"{len(index['version_data']):,} VersionData, {len(index['deal']):,} deal folders, "
+            f"{len(index['attachments']):,} attachments"
+        )
+        return index
+    
+    def _iter_payload_files(self) -> Generator[tuple, None, None]:
+        """
+        Walk the payload directories with os.scandir.
+        
+        Yields:
+            (kind, record_id, path relative to export_root_dir) with kind one of 'flat',
+            'version_data', 'deal' or 'attachments'. The first entry per (kind, record_id)
+            is the one to use: for deal folders, the first export batch in directory order wins.
+        """
+        root = self.export_root_dir
+        
+        for kind, directory in (('flat', root / 'ContentVersion'),
+                                ('attachments', root / 'Attachments' / 'Body')):
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            yield kind, entry.name, os.path.relpath(entry.path, root)
+            except OSError:
+                pass
+        
+        for record_id, rel_path in self._iter_id_directories(root / 'ContentVersions' / 'VersionData'):
+            yield 'version_data', record_id, rel_path
+        
+        # Deal__cs/<exportId>/<DealId>/
+        try:
+            with os.scandir(root / 'Deal__cs') as entries:
+                batch_dirs = [Path(e.path) for e in entries if e.name.startswith('0EM') and e.is_dir()]
+        except OSError:
+            batch_dirs = []
+        for batch_dir in batch_dirs:
+            for record_id, rel_path in self._iter_id_directories(batch_dir):
+                yield 'deal', record_id, rel_path
+    
+    def _iter_id_directories(self, parent: Path) -> Generator[tuple, None, None]:
+        """
+        Yield (Id, relative path) for each <Id>/ subdirectory of parent, pointing at the
+        first non-hidden file beneath it.
+        
+        Files directly inside <Id>/ are preferred over files in nested directories.
+        """
+        root = self.export_root_dir
+        try:
+            with os.scandir(parent) as entries:
+                id_dirs = [(e.name, e.path) for e in entries if e.is_dir()]
+        except OSError:
+            return
+        
+        for record_id, record_dir in id_dirs:
+            pending = [record_dir]
+            found = None
+            while pending and found is None:
+                subdirs = []
+                try:
+                    with os.scandir(pending.pop(0)) as entries:
+                        for entry in entries:
+                            if entry.is_dir():
+                                subdirs.append(entry.path)
+                            elif found is None and entry.is_file() and not entry.name.startswith('.'):
+                                found = entry.path
+                except OSError:
+                    continue
+                pending[:0] = subdirs
+            if found is not None:
+                yield record_id, os.path.relpath(found, root)
     
     def _parse_boolean(self, value) -> bool:
         """Safely parse boolean value from CSV (handles bool, string 'true'/'false', etc.)"""
@@ -526,6 +808,8 @@ class RawSalesforceExportConnector(FileSourceInterface):
         2. Deal__cs/<exportId>/<DealId>/<filename> (Deal-specific location)
         3. Attachments/Body/<ContentDocumentId> (legacy attachments)
         
+        Lookups go through the payload file index, so no filesystem calls are made per file.
+        
         Returns Path object if found, None otherwise.
         """
         # Normalize content_document_id (handle NaN/float)
@@ -547,57 +831,80 @@ class RawSalesforceExportConnector(FileSourceInterface):
         else:
             deal_id = None
         
+        index = self._ensure_file_index()
+        
         # Strategy 0: ContentVersion/<ContentVersionId> (flat structure - file named by CV ID)
         # Some exports have files directly as ContentVersion/{ContentVersionId} without subdirs or extensions
-        if cv_id:
-            flat_file = self.export_root_dir / 'ContentVersion' / cv_id
-            if flat_file.exists() and flat_file.is_file():
-                return flat_file
-        
         # Strategy 1: ContentVersions/VersionData/<ContentVersionId>/ (primary location)
-        if cv_id:
-            cv_version_data_dir = self.export_root_dir / 'ContentVersions' / 'VersionData' / cv_id
-            if cv_version_data_dir.exists() and cv_version_data_dir.is_dir():
-                # Look for files in this ContentVersion directory
-                for file_path in cv_version_data_dir.rglob('*'):
-                    if file_path.is_file() and not file_path.name.startswith('.'):  # Skip hidden files
-                        return file_path
-        
         # Strategy 2: Deal__cs/<exportId>/<DealId>/ (Deal-specific location)
-        if deal_id:
-            deal_cs_dir = self.export_root_dir / 'Deal__cs'
-            if deal_cs_dir.exists():
-                # Find export batch directory (starts with 0EM)
-                for export_batch_dir in deal_cs_dir.iterdir():
-                    if export_batch_dir.is_dir() and export_batch_dir.name.startswith('0EM'):
-                        deal_dir = export_batch_dir / deal_id
-                        if deal_dir.exists():
-                            # Look for files in this deal directory
-                            for file_path in deal_dir.rglob('*'):
-                                if file_path.is_file() and not file_path.name.startswith('.'):  # Skip hidden files
-                                    return file_path
-        
         # Strategy 3: Attachments/Body/<ContentDocumentId> (legacy attachments)
-        if content_document_id:
-            attachments_dir = self.export_root_dir / 'Attachments' / 'Body' / content_document_id
-            if attachments_dir.exists() and attachments_dir.is_file():
-                return attachments_dir
-            
-            # Strategy 3b: Try ContentDocumentId as filename in Attachments/Body
-            attachments_body_dir = self.export_root_dir / 'Attachments' / 'Body'
-            if attachments_body_dir.exists():
-                # Check if there's a file with ContentDocumentId as name
-                potential_file = attachments_body_dir / content_document_id
-                if potential_file.exists() and potential_file.is_file():
-                    return potential_file
+        rel_path = (
+            (cv_id and (index['flat'].get(cv_id) or index['version_data'].get(cv_id))) or
+            (deal_id and index['deal'].get(deal_id)) or
+            (content_document_id and index['attachments'].get(content_document_id))
+        )
+        return self.export_root_dir / rel_path if rel_path else None
+    
+    def _enrich_with_deal_metadata(self, file_metadata: FileMetadata, deal_id: Optional[str] = None,
+                                   deal_data: Optional[Dict[str, Any]] = None) -> DocumentMetadata:
+        """Enrich file metadata with Deal information
         
-        return None
+        Args:
+            file_metadata: File to enrich
+            deal_id: Raw Salesforce Deal ID (None if unmapped)
+            deal_data: Deal record if already fetched (otherwise looked up by deal_id)
+        """
+        if deal_id and deal_data is None:
+            deal_data = self._deal_metadata.get(deal_id)
+        return self._document_metadata(file_metadata, self._deal_fields(deal_id, deal_data))
     
-    def _enrich_with_deal_metadata(self, file_metadata: FileMetadata, deal_id: Optional[str] = None) -> DocumentMetadata:
-        """Enrich file metadata with Deal information"""
+    def enrich_batch(self, files: List[FileMetadata], deal_ids: List[Optional[str]],
+                     cv_ids: Optional[List[str]] = None,
+                     deal_records: Optional[Dict[str, Dict[str, Any]]] = None) -> List[DocumentMetadata]:
+        """Enrich a batch of files with Deal metadata, deriving each deal's fields once
+        
+        Deal, client and vendor fields are derived once per distinct deal in the batch
+        (and memoized across batches), then looked up per file by deal id, instead of
+        being rebuilt document by document.
+        
+        Args:
+            files: Files to enrich
+            deal_ids: Raw Salesforce Deal ID per file (None/'' if unmapped)
+            cv_ids: Optional ContentVersion ID per file, stored as salesforce_content_version_id
+            deal_records: Deal records already fetched for this batch; deals missing from it have
+                          no metadata. When omitted, records come from the loaded deal metadata.
         
-        # Start with basic DocumentMetadata
-        doc_metadata = DocumentMetadata(
+        Returns:
+            DocumentMetadata per file, in input order
+        """
+        if not files:
+            return []
+        keys = [deal_id if deal_id else '' for deal_id in deal_ids]
+        
+        memo = self._deal_fields_memo if deal_records is None else {}
+        deal_fields: Dict[str, Dict[str, Any]] = {}
+        for key in dict.fromkeys(keys):
+            fields = memo.get(key)
+            if fields is None:
+                if not key:
+                    fields = self._deal_fields(None, None)
+                elif deal_records is None:
+                    fields = self._deal_fields(key, self._deal_metadata.get(key))
+                else:
+                    fields = self._deal_fields(key, deal_records.get(key) or {})
+                memo[key] = fields
+            deal_fields[key] = fields
+        
+        documents = [self._document_metadata(file_metadata, deal_fields[key])
+                     for file_metadata, key in zip(files, keys)]
+        if cv_ids is not None:
+            for doc_metadata, cv_id in zip(documents, cv_ids):
+                doc_metadata.salesforce_content_version_id = cv_id
+        return documents
+    
+    def _document_metadata(self, file_metadata: FileMetadata, deal_fields: Dict[str, Any]) -> DocumentMetadata:
+        """Build DocumentMetadata for a file plus the fields from _deal_fields()"""
+        return DocumentMetadata(
             path=file_metadata.path,
             name=file_metadata.name,
             size=file_metadata.size,
@@ -606,27 +913,29 @@ class RawSalesforceExportConnector(FileSourceInterface):
             modified_time=file_metadata.modified_time,
             full_path=file_metadata.full_source_path,
             content_hash=file_metadata.content_hash,
-            is_downloadable=file_metadata.is_downloadable
+            is_downloadable=file_metadata.is_downloadable,
+            **deal_fields
         )
+    
+    def _deal_fields(self, deal_id: Optional[str], deal_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """DocumentMetadata fields contributed by a Deal
         
+        Args:
+            deal_id: Raw Salesforce Deal ID (None if unmapped)
+            deal_data: Deal record (falsy if the deal has no metadata)
+        """
         if not deal_id:
-            doc_metadata.mapping_status = "unmapped"
-            doc_metadata.mapping_reason = "no_deal_association"
-            return doc_metadata
-        
-        # Get deal metadata
-        deal_data = self._deal_metadata.get(deal_id)
+            return {'mapping_status': "unmapped", 'mapping_reason': "no_deal_association"}
         
         if not deal_data:
             self.logger.debug(f"No deal metadata found for deal_id: {deal_id}")
             # Use deal_name from mapping CSV if available, otherwise fall back to raw ID
-            user_friendly_id = self._deal_id_to_number.get(deal_id, deal_id)
-            doc_metadata.deal_id = user_friendly_id
-            doc_metadata.salesforce_deal_id = deal_id  # Store raw ID for tracing
-            doc_metadata.mapping_status = "mapped_no_metadata"
-            return doc_metadata
+            return {
+                'deal_id': self._deal_id_to_number.get(deal_id, deal_id),
+                'salesforce_deal_id': deal_id,  # Store raw ID for tracing
+                'mapping_status': "mapped_no_metadata"
+            }
         
-        # Enrich with full deal metadata
         # Use Name field from deal CSV (e.g., "Deal-36801") as friendly ID
         # Prefer mapping CSV if provided, otherwise use Name field directly
         friendly_deal_name = deal_data.get('deal_name', deal_id)  # Name field has "Deal-XXXXX" format
@@ -634,86 +943,155 @@ class RawSalesforceExportConnector(FileSourceInterface):
             # If mapping CSV provided, use it (for backwards compatibility)
             friendly_deal_name = self._deal_id_to_number.get(deal_id, friendly_deal_name)
         
-        doc_metadata.deal_id = friendly_deal_name  # Use friendly "Deal-36801" format
-        doc_metadata.salesforce_deal_id = deal_id  # Store raw Salesforce ID for tracing
-        doc_metadata.deal_subject = deal_data['subject']
-        doc_metadata.deal_status = deal_data['status']
-        doc_metadata.deal_reason = deal_data['deal_reason']
-        doc_metadata.deal_start_date = deal_data['start_date']
-        # Add creation date for time-based filtering (from CreatedDate field in deal__cs.csv)
-        doc_metadata.deal_creation_date = deal_data.get('creation_date', '')
-        doc_metadata.negotiated_by = deal_data['negotiated_by']
-        
-        # Financial metrics
-        doc_metadata.proposed_amount = deal_data['proposed_amount']
-        doc_metadata.final_amount = deal_data['final_amount']
-        doc_metadata.savings_1yr = deal_data['savings_1yr']
-        doc_metadata.savings_3yr = deal_data['savings_3yr']
-        doc_metadata.savings_target = deal_data['savings_target']
-        doc_metadata.savings_percentage = self._calculate_savings_percentage(
-            deal_data['proposed_amount'],
-            deal_data['final_amount']
-        )
-        doc_metadata.savings_achieved = deal_data.get('savings_achieved')
-        doc_metadata.fixed_savings = deal_data.get('fixed_savings')
-        doc_metadata.savings_target_full_term = deal_data.get('savings_target_full_term')
-        doc_metadata.final_amount_full_term = deal_data.get('final_amount_full_term')
+        fields = {
+            'deal_id': friendly_deal_name,  # Use friendly "Deal-36801" format
+            'salesforce_deal_id': deal_id,  # Store raw Salesforce ID for tracing
+            'deal_subject': deal_data['subject'],
+            'deal_status': deal_data['status'],
+            'deal_reason': deal_data['deal_reason'],
+            'deal_start_date': deal_data['start_date'],
+            # Add creation date for time-based filtering (from CreatedDate field in deal__cs.csv)
+            'deal_creation_date': deal_data.get('creation_date', ''),
+            'negotiated_by': deal_data['negotiated_by'],
+            
+            # Financial metrics
+            'proposed_amount': deal_data['proposed_amount'],
+            'final_amount': deal_data['final_amount'],
+            'savings_1yr': deal_data['savings_1yr'],
+            'savings_3yr': deal_data['savings_3yr'],
+            'savings_target': deal_data['savings_target'],
+            'savings_percentage': self._calculate_savings_percentage(
+                deal_data['proposed_amount'],
+                deal_data['final_amount']
+            ),
+            'savings_achieved': deal_data.get('savings_achieved'),
+            'fixed_savings': deal_data.get('fixed_savings'),
+            'savings_target_full_term': deal_data.get('savings_target_full_term'),
+            'final_amount_full_term': deal_data.get('final_amount_full_term'),
+        }
         
         # Client/Vendor info - store both raw Salesforce IDs and friendly versions
         raw_client_id = self._to_str_or_none(deal_data['client_id'])
         raw_vendor_id = self._to_str_or_none(deal_data['vendor_id'])
         
         # Always store the raw Salesforce IDs for tracing
-        doc_metadata.salesforce_client_id = raw_client_id
-        doc_metadata.salesforce_vendor_id = raw_vendor_id
+        fields['salesforce_client_id'] = raw_client_id
+        fields['salesforce_vendor_id'] = raw_vendor_id
         
         # Try to get friendly names from mapping files
         if self._client_mapping and raw_client_id:
             client_name = self._client_mapping.get(raw_client_id)
-            doc_metadata.client_name = client_name
+            fields['client_name'] = client_name
             # Use friendly name as the client_id if available, otherwise use shortened raw ID
-            doc_metadata.client_id = client_name if client_name else f"Client-{raw_client_id[-8:]}"
+            fields['client_id'] = client_name if client_name else f"Client-{raw_client_id[-8:]}"
         else:
-            doc_metadata.client_id = f"Client-{raw_client_id[-8:]}" if raw_client_id else "Unknown Client"
+            fields['client_id'] = f"Client-{raw_client_id[-8:]}" if raw_client_id else "Unknown Client"
         
         if self._vendor_mapping and raw_vendor_id:
             vendor_name = self._vendor_mapping.get(raw_vendor_id)
-            doc_metadata.vendor_name = vendor_name
+            fields['vendor_name'] = vendor_name
             # Use friendly name as the vendor_id if available, otherwise use shortened raw ID
-            doc_metadata.vendor_id = vendor_name if vendor_name else f"Vendor-{raw_vendor_id[-8:]}"
+            fields['vendor_id'] = vendor_name if vendor_name else f"Vendor-{raw_vendor_id[-8:]}"
         else:
-            doc_metadata.vendor_id = f"Vendor-{raw_vendor_id[-8:]}" if raw_vendor_id else "Unknown Vendor"
-        
-        # Contract info
-        doc_metadata.contract_term = deal_data['contract_term']
-        doc_metadata.contract_start = deal_data['contract_start']
-        doc_metadata.contract_end = deal_data['contract_end']
-        doc_metadata.effort_level = deal_data['effort_level']
-        doc_metadata.has_fmv_report = deal_data['has_fmv_report']
-        doc_metadata.deal_origin = deal_data['deal_origin']
-        
-        # Rich Narrative Content
-        doc_metadata.current_narrative = deal_data.get('current_narrative')
-        doc_metadata.customer_comments = deal_data.get('customer_comments')
-        doc_metadata.content_source = "document_file"
-        
-        # Deal Classification Fields (added December 2025)
-        doc_metadata.report_type = deal_data.get('report_type')
-        doc_metadata.project_type = deal_data.get('project_type')
-        doc_metadata.competition = deal_data.get('competition')
-        doc_metadata.npi_analyst = deal_data.get('npi_analyst')
-        doc_metadata.dual_multi_sourcing = deal_data.get('dual_multi_sourcing')
-        doc_metadata.time_pressure = deal_data.get('time_pressure')
-        doc_metadata.advisor_network_used = deal_data.get('advisor_network_used')
-        
-        doc_metadata.mapping_status = "mapped"
-        doc_metadata.mapping_method = "raw_export_csv"
-        
-        return doc_metadata
+            fields['vendor_id'] = f"Vendor-{raw_vendor_id[-8:]}" if raw_vendor_id else "Unknown Vendor"
+        
+        fields.update({
+            # Contract info
+            'contract_term': deal_data['contract_term'],
+            'contract_start': deal_data['contract_start'],
+            'contract_end': deal_data['contract_end'],
+            'effort_level': deal_data['effort_level'],
+            'has_fmv_report': deal_data['has_fmv_report'],
+            'deal_origin': deal_data['deal_origin'],
+            
+            # Rich Narrative Content
+            'current_narrative': deal_data.get('current_narrative'),
+            'customer_comments': deal_data.get('customer_comments'),
+            'content_source': "document_file",
+            
+            # Deal Classification Fields (added December 2025)
+            'report_type': deal_data.get('report_type'),
+            'project_type': deal_data.get('project_type'),
+            'competition': deal_data.get('competition'),
+            'npi_analyst': deal_data.get('npi_analyst'),
+            'dual_multi_sourcing': deal_data.get('dual_multi_sourcing'),
+            'time_pressure': deal_data.get('time_pressure'),
+            'advisor_network_used': deal_data.get('advisor_network_used'),
+            
+            'mapping_status': "mapped",
+            'mapping_method': "raw_export_csv"
+        })
+        return fields
+    
+    def _normalized_extension(self, cv_data: Dict[str, Any]) -> str:
+        """Lower-case '.ext' for a ContentVersion record (handles NaN/float/string)"""
+        file_ext_raw = cv_data.get('file_extension', '')
+        if pd.isna(file_ext_raw) or not file_ext_raw:
+            file_ext = ''
+        else:
+            file_ext = str(file_ext_raw).lower().strip()
+        
+        if file_ext and not file_ext.startswith('.'):
+            file_ext = '.' + file_ext
+        return file_ext
+    
+    def _build_file_metadata(self, cv_id: str, cv_data: Dict[str, Any], file_path: Path, file_ext: str) -> FileMetadata:
+        """Build FileMetadata for a resolved ContentVersion file from its CSV record"""
+        # Create relative path for metadata
+        relative_path = str(file_path.relative_to(self.export_root_dir))
+        
+        # Create FileMetadata (normalize all string fields)
+        path_on_client = cv_data.get('path_on_client', '')
+        if pd.isna(path_on_client):
+            path_on_client = ''
+        else:
+            path_on_client = str(path_on_client).strip()
+        
+        title = cv_data.get('title', '')
+        if pd.isna(title):
+            title = ''
+        else:
+            title = str(title).strip()
+        
+        file_name = path_on_client or title or file_path.name
+        
+        # Use CSV data instead of disk stat() - OPTIMIZATION: avoids I/O per file
+        content_size = cv_data.get('content_size', 0)
+        if pd.isna(content_size):
+            content_size = 0
+        else:
+            content_size = int(content_size)
+        
+        content_modified_date = cv_data.get('content_modified_date', '')
+        if pd.isna(content_modified_date):
+            content_modified_date = ''
+        else:
+            content_modified_date = str(content_modified_date).strip()
+        
+        # Create FileMetadata using CSV data (no disk stat needed!)
+        return FileMetadata(
+            path=relative_path,
+            name=file_name,
+            size=content_size,  # From CSV - avoids stat() I/O
+            modified_time=content_modified_date,  # From CSV - avoids stat() I/O
+            file_type=file_ext,
+            source_id=cv_id,
+            source_type="salesforce_raw",
+            full_source_path=str(file_path),
+            content_hash=None,
+            is_downloadable=True
+        )
+    
+    def list_content_version_ids(self) -> List[str]:
+        """ContentVersion ids in discovery order, before per-document filters (used to shard discovery)."""
+        if not hasattr(self, '_valid_file_paths') or not self._valid_file_paths:
+            return list(self._content_versions.keys())
+        return list(self._valid_file_paths.keys())
     
     def list_documents(self, folder_path: str = "",
                       file_types: Optional[List[str]] = None,
-                      batch_size: Optional[int] = None) -> Generator[FileMetadata, None, None]:
+                      batch_size: Optional[int] = None,
+                      cv_ids: Optional[List[str]] = None) -> Generator[FileMetadata, None, None]:
         """
         List all documents from raw export with Deal metadata enrichment.
         
@@ -724,18 +1102,20 @@ class RawSalesforceExportConnector(FileSourceInterface):
             folder_path: Not used for raw exports (all files scanned)
             file_types: File extensions to filter (e.g., ['.pdf', '.docx'])
             batch_size: Not used in this implementation
+            cv_ids: Only list these ContentVersion ids (one shard of list_content_version_ids())
             
         Yields:
             FileMetadata objects for each discovered document
         """
         
-        self.logger.info(f"Discovering files from raw Salesforce export: {self.export_root_dir}")
+        if cv_ids is None:
+            self.logger.info(f"Discovering files from raw Salesforce export: {self.export_root_dir}")
         
         # Check if pre-computed paths are available
         if not hasattr(self, '_valid_file_paths') or not self._valid_file_paths:
             self.logger.warning("⚠️ Pre-computed file paths not available, falling back to on-demand resolution")
             self._valid_file_paths = {}
-        else:
+        elif cv_ids is None:
             self.logger.info(f"✅ Using {len(self._valid_file_paths):,} pre-validated file paths (optimized)")
         
         processed_count = 0
@@ -743,7 +1123,10 @@ class RawSalesforceExportConnector(FileSourceInterface):
         unmapped_count = 0
         
         # OPTIMIZATION: Iterate only over pre-validated files when available
-        cv_ids_to_process = self._valid_file_paths.keys() if self._valid_file_paths else self._content_versions.keys()
+        if cv_ids is not None:
+            cv_ids_to_process = cv_ids
+        else:
+            cv_ids_to_process = self._valid_file_paths.keys() if self._valid_file_paths else self._content_versions.keys()
         
         for cv_id in cv_ids_to_process:
             cv_data = self._content_versions.get(cv_id, {})
@@ -752,15 +1135,7 @@ class RawSalesforceExportConnector(FileSourceInterface):
             if cv_data.get('is_deleted'):
                 continue
             
-            # Get file extension (handle NaN/float/string)
-            file_ext_raw = cv_data.get('file_extension', '')
-            if pd.isna(file_ext_raw) or not file_ext_raw:
-                file_ext = ''
-            else:
-                file_ext = str(file_ext_raw).lower().strip()
-            
-            if file_ext and not file_ext.startswith('.'):
-                file_ext = '.' + file_ext
+            file_ext = self._normalized_extension(cv_data)
             
             # Filter by file type if specified
             if file_types and file_ext not in file_types:
@@ -789,50 +1164,7 @@ class RawSalesforceExportConnector(FileSourceInterface):
                 continue
                 
             try:
-                # Create relative path for metadata
-                relative_path = str(file_path.relative_to(self.export_root_dir))
-                
-                # Create FileMetadata (normalize all string fields)
-                path_on_client = cv_data.get('path_on_client', '')
-                if pd.isna(path_on_client):
-                    path_on_client = ''
-                else:
-                    path_on_client = str(path_on_client).strip()
-                
-                title = cv_data.get('title', '')
-                if pd.isna(title):
-                    title = ''
-                else:
-                    title = str(title).strip()
-                
-                file_name = path_on_client or title or file_path.name
-                
-                # Use CSV data instead of disk stat() - OPTIMIZATION: avoids I/O per file
-                content_size = cv_data.get('content_size', 0)
-                if pd.isna(content_size):
-                    content_size = 0
-                else:
-                    content_size = int(content_size)
-                
-                content_modified_date = cv_data.get('content_modified_date', '')
-                if pd.isna(content_modified_date):
-                    content_modified_date = ''
-                else:
-                    content_modified_date = str(content_modified_date).strip()
-                
-                # Create FileMetadata using CSV data (no disk stat needed!)
-                file_metadata = FileMetadata(
-                    path=relative_path,
-                    name=file_name,
-                    size=content_size,  # From CSV - avoids stat() I/O
-                    modified_time=content_modified_date,  # From CSV - avoids stat() I/O
-                    file_type=file_ext,
-                    source_id=cv_id,
-                    source_type="salesforce_raw",
-                    full_source_path=str(file_path),
-                    content_hash=None,
-                    is_downloadable=True
-                )
+                file_metadata = self._build_file_metadata(cv_id, cv_data, file_path, file_ext)
                 
                 processed_count += 1
                 if deal_id:
@@ -854,7 +1186,8 @@ class RawSalesforceExportConnector(FileSourceInterface):
                 continue
     
     def list_documents_as_metadata(self, folder_path: str = "", 
-                                  require_deal_association: bool = False) -> Generator[DocumentMetadata, None, None]:
+                                  require_deal_association: bool = False,
+                                  cv_ids: Optional[List[str]] = None) -> Generator[DocumentMetadata, None, None]:
         """List documents with Deal metadata enrichment
         
         Args:
@@ -862,20 +1195,19 @@ class RawSalesforceExportConnector(FileSourceInterface):
             require_deal_association: If True, only yield documents with valid deal associations.
                                      Useful for ensuring all metadata fields are populated.
                                      Default: False (returns all documents)
+            cv_ids: Only list these ContentVersion ids (one shard of list_content_version_ids())
         
         Yields:
             DocumentMetadata objects enriched with deal information
         """
         
         skipped_no_deal = 0
+        files: List[FileMetadata] = []
+        deal_ids: List[Optional[str]] = []
         
-        for file_metadata in self.list_documents(folder_path):
-            # Get ContentVersion ID from source_id
-            cv_id = file_metadata.source_id
-            cv_data = self._content_versions.get(cv_id, {})
-            
-            # Get Deal ID
-            deal_id = self._cv_to_deal_mapping.get(cv_id)
+        for file_metadata in self.list_documents(folder_path, cv_ids=cv_ids):
+            # Get Deal ID (ContentVersion ID is the source_id)
+            deal_id = self._cv_to_deal_mapping.get(file_metadata.source_id)
             
             # Filter: Skip documents without deal associations if required
             if require_deal_association:
@@ -885,13 +1217,15 @@ class RawSalesforceExportConnector(FileSourceInterface):
                         self.logger.debug(f"Skipped {skipped_no_deal} documents without deal associations")
                     continue
             
-            # Enrich with Deal metadata
-            doc_metadata = self._enrich_with_deal_metadata(file_metadata, deal_id)
-            
-            # Add Salesforce-specific fields
-            doc_metadata.salesforce_content_version_id = cv_id
-            
-            yield doc_metadata
+            files.append(file_metadata)
+            deal_ids.append(deal_id)
+            if len(files) >= ENRICHMENT_BATCH_SIZE:
+                # Enrich with Deal metadata, one join per batch
+                yield from self.enrich_batch(files, deal_ids, cv_ids=[f.source_id for f in files])
+                files, deal_ids = [], []
+        
+        if files:
+            yield from self.enrich_batch(files, deal_ids, cv_ids=[f.source_id for f in files])
         
         if require_deal_association and skipped_no_deal > 0:
             self.logger.info(f"ℹ️  Filtered out {skipped_no_deal:,} documents without deal associations")
@@ -2,402 +2,689 @@
 """
 Pure Streaming Raw Salesforce Export Connector
 
-This version uses NO pandas and streams everything from CSV files.
-Avoids all memory crashes by never loading more than necessary into RAM.
+Bounded-memory variant of RawSalesforceExportConnector, selected with
+`discover_documents.py --source salesforce_raw --streaming`.
+
+CSV files are streamed row by row (csv module, no pandas DataFrames) into a
+SQLite database. ContentVersion → Deal resolution and payload file resolution
+are SQL joins against indexed tables, and documents are enriched in batches
+with one `WHERE Id IN (...)` deal query per batch. Record building, file
+metadata and deal enrichment are shared with RawSalesforceExportConnector, so
+both connectors yield the same documents.
+
+Deal cells are typed per column the way pandas infers dtypes (int, float with
+NaN for missing cells, bool, else str), so deal records match the pandas
+connector. Other cells stay strings. Blank/NA cells read back as NaN, as they
+do with pandas.
 """
 
 import os
+import re
 import csv
 import sqlite3
+import threading
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Generator, Dict, Optional, List, Any
-from datetime import datetime
-import logging
+from typing import Generator, Dict, Optional, List, Any, Callable, Iterator, Tuple
 
-from .file_source_interface import FileSourceInterface, FileMetadata
+from .file_source_interface import FileMetadata
+from .raw_salesforce_export_connector import RawSalesforceExportConnector, FILETYPE_EXTENSIONS
 try:
     from models.document_models import DocumentMetadata
 except ImportError:
     import sys
-    import os
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
     from models.document_models import DocumentMetadata
 
 
-class PureStreamingConnector(FileSourceInterface):
-    """100% streaming connector - no pandas, no large memory allocations."""
-    
+# Cell values pandas.read_csv treats as missing by default
+_NA_VALUES = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+})
+
+_NAN = float('nan')
+
+# Rows per executemany() while indexing
+_INSERT_BATCH_SIZE = 5000
+
+# Columns of content_versions that mirror RawSalesforceExportConnector's record fields
+_CV_RECORD_COLUMNS = (
+    'content_document_id', 'title', 'path_on_client', 'file_type', 'file_extension',
+    'content_size', 'deal_c', 'content_modified_date', 'created_date', 'is_deleted'
+)
+
+
+def _cell(row: Dict[str, Any], column: str, default: Any = '') -> Any:
+    """CSV cell as pandas would read it: None for NA values (stored as NULL), default if the column is absent."""
+    if column not in row:
+        return default
+    value = row[column]
+    if value is None or value in _NA_VALUES:
+        return None
+    return value
+
+
+def _number(value: Any) -> Any:
+    """Numeric cell as int/float where it parses (pandas-style), else unchanged."""
+    if not isinstance(value, str):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+def _nan_if_null(value: Any) -> Any:
+    return _NAN if value is None else value
+
+
+# Cell spellings pandas.read_csv parses as int / float / bool by default
+_INT_RE = re.compile(r'[+-]?\d+')
+_FLOAT_RE = re.compile(r'[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?|[+-]?(inf|Inf|INF|infinity|Infinity)')
+_BOOL_VALUES = {'True': True, 'TRUE': True, 'true': True, 'False': False, 'FALSE': False, 'false': False}
+
+
+class _ColumnDtype:
+    """Infers a CSV column's pandas dtype from its cells, one cell at a time"""
+
+    def __init__(self):
+        self.ints = self.floats = self.bools = True
+        self.has_na = False
+
+    def observe(self, value: Optional[str]) -> None:
+        if value is None:
+            self.has_na = True
+            return
+        if self.bools and value not in _BOOL_VALUES:
+            self.bools = False
+        if self.ints and not _INT_RE.fullmatch(value):
+            self.ints = False
+        if self.floats and not _FLOAT_RE.fullmatch(value):
+            self.floats = False
+
+    def converter(self) -> Callable[[Any], Any]:
+        """Cell (None for NA) -> value as pandas would hold it (NaN for NA)."""
+        if self.bools:
+            return lambda value: _NAN if value is None else _BOOL_VALUES[value]
+        if self.ints and not self.has_na:
+            return int
+        if self.floats:
+            return lambda value: _NAN if value is None else float(value)
+        return _nan_if_null
+
+
+class _SqlView(Mapping):
+    """Read-only dict-like view over rows of a SQLite table, keyed by one column"""
+
+    def __init__(self, connector: 'PureStreamingConnector', table: str, key_column: str,
+                 value_columns: str, decode: Callable[[Tuple], Any], where: str = "1",
+                 multi: bool = False):
+        self._connector = connector
+        self._table = table
+        self._key = key_column
+        self._columns = value_columns
+        self._decode = decode
+        self._where = where
+        self._multi = multi
+        self._length: Optional[int] = None
+
+    def __getitem__(self, key: Any) -> Any:
+        rows = self._connector._query(
+            f"SELECT {self._columns} FROM {self._table} "
+            f"WHERE {self._key} = ? AND ({self._where}) ORDER BY rowid",
+            (key,)
+        )
+        if not rows:
+            raise KeyError(key)
+        if self._multi:
+            return [self._decode(row) for row in rows]
+        return self._decode(rows[-1])
+
+    def __contains__(self, key: Any) -> bool:
+        return bool(self._connector._query(
+            f"SELECT 1 FROM {self._table} WHERE {self._key} = ? AND ({self._where}) LIMIT 1", (key,)
+        ))
+
+    def __len__(self) -> int:
+        if self._length is None:
+            self._length = self._connector._query(
+                f"SELECT COUNT(DISTINCT {self._key}) FROM {self._table} WHERE {self._where}"
+            )[0][0]
+        return self._length
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._multi:
+            sql = (f"SELECT {self._key} FROM {self._table} WHERE {self._where} "
+                   f"GROUP BY {self._key} ORDER BY MIN(rowid)")
+        else:
+            sql = f"SELECT {self._key} FROM {self._table} WHERE {self._where} ORDER BY rowid"
+        for row in self._connector._iter_query(sql):
+            yield row[0]
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:  # type: ignore[override]
+        """Stream (key, value) pairs with one query instead of a lookup per key."""
+        if self._multi:
+            yield from ((key, self[key]) for key in self)
+            return
+        for row in self._connector._iter_query(
+            f"SELECT {self._key}, {self._columns} FROM {self._table} WHERE {self._where} ORDER BY rowid"
+        ):
+            yield row[0], self._decode(row[1:])
+
+    def values(self) -> Iterator[Any]:  # type: ignore[override]
+        """Stream values with one query instead of a lookup per key."""
+        for _, value in self.items():
+            yield value
+
+
+class PureStreamingConnector(RawSalesforceExportConnector):
+    """Bounded-memory raw export connector: all mappings live in SQLite"""
+
     def __init__(self,
                  export_root_dir: str,
                  content_versions_csv: str,
-                 content_documents_csv: str,
+                 content_documents_csv: Optional[str],
                  content_document_links_csv: str,
                  deal_metadata_csv: str,
                  client_mapping_csv: Optional[str] = None,
                  vendor_mapping_csv: Optional[str] = None,
-                 deal_mapping_csv: Optional[str] = None):
-        """Initialize with pure streaming (no pandas)."""
-        super().__init__()
-        
-        self.export_root_dir = Path(export_root_dir)
-        self.content_versions_csv = content_versions_csv
-        self.content_documents_csv = content_documents_csv
-        self.content_document_links_csv = content_document_links_csv
-        self.deal_metadata_csv = deal_metadata_csv
-        self.client_mapping_csv = client_mapping_csv
-        self.vendor_mapping_csv = vendor_mapping_csv
-        self.deal_mapping_csv = deal_mapping_csv
-        
-        self.logger = logging.getLogger(__name__)
-        
-        # Index deals in SQLite (disk-backed, no memory overhead)
-        db_path = f"{deal_metadata_csv}.deals.db"
-        if Path(db_path).exists():
-            Path(db_path).unlink()  # Clear old DB
-        
-        self.deal_db = sqlite3.connect(db_path)
-        self._index_deals_in_sqlite()
-        
-        # Build in-memory indexes for smaller files (streaming)
-        self._cv_index = {}  # ContentVersion ID → data
-        self._cd_index = {}  # ContentDocument ID → data
-        self._cd_to_deal = {}  # ContentDocument ID → Deal IDs
-        
-        self._validate_paths()
-        self._build_indexes()
-    
-    def _validate_paths(self):
-        """Validate paths exist."""
-        if not self.export_root_dir.exists():
-            raise FileNotFoundError(f"Export root not found: {self.export_root_dir}")
-        
-        for f in [self.content_versions_csv, self.content_documents_csv,
-                  self.content_document_links_csv, self.deal_metadata_csv]:
-            if not Path(f).exists():
-                raise FileNotFoundError(f"File not found: {f}")
-    
-    def _index_deals_in_sqlite(self):
-        """Build SQLite index from deal CSV (streaming, no memory overhead)."""
-        print(f"  📦 Indexing deals from {Path(self.deal_metadata_csv).name}...")
-        
-        cursor = self.deal_db.cursor()
-        
-        # Read header and create table
-        with open(self.deal_metadata_csv, 'r', encoding='utf-8-sig', errors='ignore') as f:
-            reader = csv.DictReader(f)
-            if not reader.fieldnames:
-                raise ValueError("Could not read CSV header")
-            
-            # Create table
-            columns = [f'"{field}" TEXT' for field in reader.fieldnames]
-            cursor.execute(f"CREATE TABLE deals ({', '.join(columns)})")
-            
-            # Stream rows (1000 at a time)
-            batch = []
-            batch_size = 1000
-            
-            for i, row in enumerate(reader):
-                batch.append(tuple(row.get(field, '') for field in reader.fieldnames))
-                
-                if len(batch) >= batch_size:
-                    placeholders = ','.join(['?' for _ in reader.fieldnames])
-                    sql = f"INSERT INTO deals VALUES ({placeholders})"
-                    cursor.executemany(sql, batch)
-                    batch = []
-                    
-                    if (i + 1) % 10000 == 0:
-                        print(f"    Indexed {i + 1} deals...", end='\r')
-            
-            # Flush remaining
-            if batch:
-                placeholders = ','.join(['?' for _ in reader.fieldnames])
-                sql = f"INSERT INTO deals VALUES ({placeholders})"
-                cursor.executemany(sql, batch)
-        
-        # Create index
-        cursor.execute("CREATE INDEX idx_deal_id ON deals(Id)")
-        self.deal_db.commit()
-        
-        # Count
-        cursor.execute("SELECT COUNT(*) FROM deals")
-        count = cursor.fetchone()[0]
-        print(f"    ✓ Indexed {count} deals")
-    
-    def _build_indexes(self):
-        """Build indexes for smaller files."""
-        self.logger.info("Building content indexes...")
-        
-        # Index content versions
-        self._index_content_versions()
-        
-        # Index content documents
-        self._index_content_documents()
-        
-        # Index content document links
-        self._index_content_document_links()
-    
-    def _index_content_versions(self):
-        """Index content versions (stream from CSV)."""
-        print(f"  📝 Indexing content versions...")
+                 deal_mapping_csv: Optional[str] = None,
+                 db_path: Optional[str] = None,
+                 lookup_batch_size: int = 500):
+        """
+        Initialize streaming connector.
+
+        Args:
+            export_root_dir: Path to raw Salesforce export root directory
+            content_versions_csv: Path to content_versions.csv
+            content_documents_csv: Optional path to content_documents.csv (if None, derived from ContentVersion)
+            content_document_links_csv: Path to content_document_links.csv
+            deal_metadata_csv: Path to deal CSV (deal__cs.csv or merged deal_merged_financial_data.csv)
+            client_mapping_csv: Optional path to Client ID -> Name mapping CSV
+            vendor_mapping_csv: Optional path to Vendor ID -> Name mapping CSV
+            deal_mapping_csv: Optional path to organized_files_to_deal_mapping.csv for user-friendly deal numbers
+            db_path: SQLite index file (default: <deal_metadata_csv>.streaming.db, rebuilt every run)
+            lookup_batch_size: Documents enriched per batched deal query
+        """
+        self.db_path = db_path or f"{deal_metadata_csv}.streaming.db"
+        self.lookup_batch_size = max(1, lookup_batch_size)
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        super().__init__(
+            export_root_dir=export_root_dir,
+            content_versions_csv=content_versions_csv,
+            content_documents_csv=content_documents_csv,
+            content_document_links_csv=content_document_links_csv,
+            deal_metadata_csv=deal_metadata_csv,
+            client_mapping_csv=client_mapping_csv,
+            vendor_mapping_csv=vendor_mapping_csv,
+            deal_mapping_csv=deal_mapping_csv
+        )
+
+    # ========== Index building ==========
+
+    def _load_all_mappings(self):
+        """Stream all CSVs into SQLite and expose the connector's mappings as views over it"""
+        self.logger.info(f"Indexing raw Salesforce export into {self.db_path} (streaming)...")
+
+        if Path(self.db_path).exists():
+            Path(self.db_path).unlink()  # Clear old DB
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute("PRAGMA mmap_size=17179869184")
+        self._create_tables()
+
+        self._ingest_csv(self.content_versions_csv, self._index_content_versions, ['content_versions'])
+        if self.content_documents_csv:
+            self._ingest_csv(self.content_documents_csv, self._index_content_documents, ['content_documents'])
+        else:
+            self._derive_content_documents()
+        self._ingest_csv(self.content_document_links_csv, self._index_content_document_links,
+                         ['content_document_links'])
+        self._ingest_csv(self.deal_metadata_csv, self._index_deals, ['deals'])
+        self._index_payload_files()
+        self._resolve_deals_and_paths()
+        self._db.commit()
+
+        self._content_versions = _SqlView(self, 'content_versions', 'id', ', '.join(_CV_RECORD_COLUMNS),
+                                          self._decode_content_version)
+        self._content_documents = _SqlView(self, 'content_documents', 'id',
+                                           'title, file_type, file_extension, content_size, created_date',
+                                           self._decode_content_document)
+        self._content_document_links = _SqlView(self, 'content_document_links', 'content_document_id', 'deal_id',
+                                                lambda row: row[0], multi=True)
+        self._cv_to_deal_mapping = _SqlView(self, 'content_versions', 'id', 'deal_id',
+                                            lambda row: row[0], where="deal_id IS NOT NULL")
+        self._valid_file_paths = _SqlView(self, 'content_versions', 'id', 'file_path',
+                                          lambda row: self.export_root_dir / row[0], where="file_path IS NOT NULL")
+        self._deal_metadata = _SqlView(self, 'deals', '"Id"', '*',
+                                       lambda row: self._deal_record(self._deal_row(row)))
+
+        self.logger.info(f"Indexed {len(self._content_versions):,} ContentVersion records (latest versions only), "
+                         f"{len(self._cv_to_deal_mapping):,} Deal mappings, "
+                         f"{len(self._valid_file_paths):,} valid file paths")
+
+        self._load_name_mappings()
+
+    def _create_tables(self):
+        """Create the index tables (deals is created from the CSV header)."""
+        self._db.executescript("""
+            CREATE TABLE content_versions (
+                id TEXT PRIMARY KEY,
+                content_document_id, title, path_on_client, file_type, file_extension,
+                content_size, deal_c, content_modified_date, created_date,
+                is_deleted INTEGER, discoverable INTEGER,
+                deal_id TEXT, file_path TEXT
+            );
+            CREATE TABLE content_documents (
+                id PRIMARY KEY, title, file_type, file_extension, content_size, created_date
+            );
+            CREATE TABLE content_document_links (content_document_id, deal_id TEXT);
+            CREATE TABLE payload_files (
+                kind TEXT, record_id TEXT, rel_path TEXT, PRIMARY KEY (kind, record_id)
+            ) WITHOUT ROWID;
+        """)
+
+    def _ingest_csv(self, csv_path: str, index_fn: Callable[[csv.DictReader], int], tables: List[str]):
+        """
+        Stream a CSV through index_fn, retrying with latin1 if it is not valid utf-8.
+
+        Args:
+            csv_path: CSV file to read
+            index_fn: Consumes the DictReader and returns the number of rows indexed
+            tables: Tables index_fn writes (cleared before a retry)
+        """
+        for encoding in ('utf-8-sig', 'latin1'):
+            try:
+                with open(csv_path, 'r', encoding=encoding, newline='') as f:
+                    count = index_fn(csv.DictReader(f))
+                self.logger.info(f"  ✓ Indexed {count:,} rows from {Path(csv_path).name}")
+                return
+            except UnicodeDecodeError:
+                self.logger.warning("utf-8-sig encoding failed, falling back to latin1")
+                for table in tables:
+                    self._db.execute(f"DROP TABLE IF EXISTS {table}" if table == 'deals' else f"DELETE FROM {table}")
+        raise ValueError(f"Could not decode {csv_path}")
+
+    def _insert_batches(self, sql: str, rows: Iterator[Tuple]) -> int:
+        """executemany() rows in fixed-size batches; returns the row count."""
         count = 0
-        
-        with open(self.content_versions_csv, 'r', encoding='utf-8-sig', errors='ignore') as f:
-            reader = csv.DictReader(f)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= _INSERT_BATCH_SIZE:
+                self._db.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self._db.executemany(sql, batch)
+            count += len(batch)
+        return count
+
+    def _index_content_versions(self, reader: csv.DictReader) -> int:
+        """Index latest ContentVersions with the same field derivation as the pandas loader."""
+        has_path_column = 'PathOnClient' in (reader.fieldnames or [])
+
+        def rows():
             for row in reader:
-                cv_id = row.get('Id', '')
-                if not cv_id:
+                cv_id = _cell(row, 'Id')
+                if cv_id is None:
                     continue
-                
-                # Only keep latest versions
-                is_latest = row.get('IsLatest', 'false').lower()
-                if is_latest not in ('true', '1'):
+
+                # Only process latest versions
+                is_latest = _cell(row, 'IsLatest', None)
+                if is_latest is None or is_latest.lower() not in ('true', '1', 'yes'):
                     continue
-                
-                # Extract deal ID safely
-                deal_c = row.get('Deal__c', '').strip() if row.get('Deal__c') else None
-                if deal_c == '' or deal_c is None:
-                    deal_c = None
-                
-                self._cv_index[cv_id] = {
-                    'content_document_id': row.get('ContentDocumentId', '').strip(),
-                    'title': row.get('Title', ''),
-                    'path_on_client': row.get('PathOnClient', ''),
-                    'file_type': row.get('FileType', ''),
-                    'file_extension': row.get('FileExtension', ''),
-                    'content_size': int(row.get('ContentSize', 0)) if row.get('ContentSize', '0').isdigit() else 0,
-                    'deal_id': deal_c,
-                    'content_modified_date': row.get('ContentModifiedDate', ''),
-                    'created_date': row.get('CreatedDate', ''),
+
+                deal_c = _cell(row, 'Deal__c', None)
+                if deal_c is not None:
+                    deal_c = deal_c.strip() or None
+
+                # PathOnClient falls back to Title only when the column is absent (NA cells stay NaN)
+                title = _cell(row, 'Title')
+                path_on_client = _cell(row, 'PathOnClient') if has_path_column else title
+                file_type = _cell(row, 'FileType')
+
+                path_value = _nan_if_null(path_on_client)
+                if path_value and '.' in str(path_value):
+                    file_ext = '.' + str(path_value).rsplit('.', 1)[-1].lower()
+                else:
+                    file_ext = FILETYPE_EXTENSIONS.get(str(_nan_if_null(file_type)).upper(), '')
+
+                is_deleted = _cell(row, 'IsDeleted', None)
+                is_deleted = bool(is_deleted) and is_deleted.lower() in ('true', '1')
+
+                record = {
+                    'path_on_client': path_value,
+                    'title': _nan_if_null(title),
+                    'is_deleted': is_deleted,
                 }
-                count += 1
-                
-                if count % 10000 == 0:
-                    print(f"    Indexed {count} content versions...", end='\r')
-        
-        print(f"    ✓ Indexed {count} content versions")
-    
-    def _index_content_documents(self):
-        """Index content documents."""
-        print(f"  📄 Indexing content documents...")
-        count = 0
-        
-        with open(self.content_documents_csv, 'r', encoding='utf-8-sig', errors='ignore') as f:
-            reader = csv.DictReader(f)
+                yield (
+                    cv_id, _cell(row, 'ContentDocumentId'), title, path_on_client, file_type, file_ext,
+                    _number(_cell(row, 'ContentSize', 0)), deal_c, _cell(row, 'ContentModifiedDate'),
+                    _cell(row, 'CreatedDate'), int(is_deleted), int(self._is_discoverable(record))
+                )
+
+        # Re-exported ContentVersions keep their first position but take the latest values
+        return self._insert_batches("""
+            INSERT INTO content_versions (id, content_document_id, title, path_on_client, file_type,
+                file_extension, content_size, deal_c, content_modified_date, created_date,
+                is_deleted, discoverable)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                content_document_id = excluded.content_document_id, title = excluded.title,
+                path_on_client = excluded.path_on_client, file_type = excluded.file_type,
+                file_extension = excluded.file_extension, content_size = excluded.content_size,
+                deal_c = excluded.deal_c, content_modified_date = excluded.content_modified_date,
+                created_date = excluded.created_date, is_deleted = excluded.is_deleted,
+                discoverable = excluded.discoverable
+        """, rows())
+
+    def _index_content_documents(self, reader: csv.DictReader) -> int:
+        """Index ContentDocument.csv rows."""
+        rows = (
+            (_cell(row, 'Id'), _cell(row, 'Title'), _cell(row, 'FileType'), _cell(row, 'FileExtension'),
+             _number(_cell(row, 'ContentSize', 0)), _cell(row, 'CreatedDate'))
+            for row in reader
+        )
+        return self._insert_batches(
+            "INSERT OR REPLACE INTO content_documents VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+
+    def _derive_content_documents(self):
+        """Derive ContentDocument records from ContentVersions (first version per document wins)."""
+        self._db.execute("""
+            INSERT OR IGNORE INTO content_documents
+            SELECT content_document_id, title, file_type, file_extension, content_size, created_date
+            FROM content_versions WHERE content_document_id IS NOT NULL ORDER BY rowid
+        """)
+
+    def _index_content_document_links(self, reader: csv.DictReader) -> int:
+        """Index ContentDocument → Deal links (Deal IDs start with 'a0W')."""
+        def rows():
             for row in reader:
-                doc_id = row.get('Id', '').strip()
-                if not doc_id:
+                doc_id = _cell(row, 'ContentDocumentId', None)
+                linked_entity_id = _cell(row, 'LinkedEntityId', None)
+                if doc_id is None or linked_entity_id is None:
                     continue
-                
-                self._cd_index[doc_id] = {
-                    'title': row.get('Title', ''),
-                    'file_type': row.get('FileType', ''),
-                    'file_extension': row.get('FileExtension', ''),
-                    'content_size': int(row.get('ContentSize', 0)) if row.get('ContentSize', '0').isdigit() else 0,
-                    'created_date': row.get('CreatedDate', ''),
-                }
-                count += 1
-        
-        print(f"    ✓ Indexed {count} content documents")
-    
-    def _index_content_document_links(self):
-        """Index content document to deal links."""
-        print(f"  🔗 Indexing document links...")
-        count = 0
-        
-        with open(self.content_document_links_csv, 'r', encoding='utf-8-sig', errors='ignore') as f:
-            reader = csv.DictReader(f)
+                linked_entity_str = linked_entity_id.strip()
+                if linked_entity_str.startswith('a0W'):
+                    yield doc_id, linked_entity_str
+
+        count = self._insert_batches("INSERT INTO content_document_links VALUES (?, ?)", rows())
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_links_document ON content_document_links(content_document_id)")
+        return count
+
+    def _index_deals(self, reader: csv.DictReader) -> int:
+        """Index deal rows in a table created from the CSV header (one row per Id, last wins)."""
+        if not reader.fieldnames or 'Id' not in reader.fieldnames:
+            raise ValueError(f"Deal CSV has no Id column: {self.deal_metadata_csv}")
+
+        fields = list(dict.fromkeys(reader.fieldnames))
+        quoted = [f'"{field}"' for field in fields]
+        self._db.execute("DROP TABLE IF EXISTS deals")
+        self._db.execute(f"CREATE TABLE deals ({', '.join(quoted)})")
+        self._db.execute('CREATE UNIQUE INDEX idx_deal_id ON deals("Id")')
+        self._deal_columns = fields
+
+        updates = ', '.join(f'{column} = excluded.{column}' for column in quoted if column != '"Id"')
+        dtypes = [_ColumnDtype() for _ in fields]
+
+        def rows():
             for row in reader:
-                doc_id = row.get('ContentDocumentId', '').strip()
-                entity_id = row.get('LinkedEntityId', '').strip()
-                
-                if not doc_id or not entity_id:
-                    continue
-                
-                # Only track deal links (start with 'a0W')
-                if entity_id.startswith('a0W'):
-                    if doc_id not in self._cd_to_deal:
-                        self._cd_to_deal[doc_id] = []
-                    self._cd_to_deal[doc_id].append(entity_id)
-                    count += 1
-        
-        print(f"    ✓ Indexed {count} document-to-deal links")
-    
-    def _get_deal_data(self, deal_id: str) -> Optional[Dict[str, str]]:
-        """Get deal data from SQLite index."""
-        cursor = self.deal_db.cursor()
-        cursor.execute("SELECT * FROM deals WHERE Id = ?", (deal_id,))
-        row = cursor.fetchone()
-        
-        if not row:
-            return None
-        
-        # Get column names
-        cursor.execute("PRAGMA table_info(deals)")
-        columns = [col[1] for col in cursor.fetchall()]
-        
-        return dict(zip(columns, row))
-    
-    def _safe_str(self, val) -> Optional[str]:
-        """Safely convert to string."""
-        if not val or val == '':
-            return None
-        return str(val).strip()
-    
-    def _safe_float(self, val) -> Optional[float]:
-        """Safely convert to float."""
-        if not val or val == '':
-            return None
+                cells = tuple(_cell(row, field) for field in fields)
+                for dtype, value in zip(dtypes, cells):
+                    dtype.observe(value)
+                yield cells
+
+        count = self._insert_batches(
+            f"INSERT INTO deals ({', '.join(quoted)}) VALUES ({', '.join('?' for _ in fields)}) "
+            f'ON CONFLICT("Id") DO {"UPDATE SET " + updates if updates else "NOTHING"}',
+            rows()
+        )
+        # Dtypes come from every row (as with pandas), including rows later replaced by a duplicate Id
+        self._deal_converters = [dtype.converter() for dtype in dtypes]
+        return count
+
+    def _index_payload_files(self):
+        """Record the payload directory scan in SQLite (first entry per kind/id wins)."""
+        count = self._insert_batches(
+            "INSERT OR IGNORE INTO payload_files VALUES (?, ?, ?)", self._iter_payload_files()
+        )
+        self.logger.info(f"  📂 Indexed {count:,} payload files")
+
+    def _resolve_deals_and_paths(self):
+        """Resolve ContentVersion → Deal and file paths with the connector's strategy order, in SQL."""
+        # Strategy 1: Direct Deal__c link; Strategy 2: first ContentDocumentLink to a Deal
+        self._db.execute("""
+            UPDATE content_versions SET deal_id = COALESCE(deal_c, (
+                SELECT l.deal_id FROM content_document_links l
+                WHERE l.content_document_id = content_versions.content_document_id
+                ORDER BY l.rowid LIMIT 1
+            ))
+        """)
+        self._db.execute("UPDATE content_versions SET deal_id = NULL WHERE TRIM(deal_id) = ''")
+
+        # Same order as _resolve_file_path: flat file, VersionData folder, deal folder, attachment
+        self._db.execute("""
+            UPDATE content_versions SET file_path = COALESCE(
+                (SELECT rel_path FROM payload_files WHERE kind = 'flat' AND record_id = content_versions.id),
+                (SELECT rel_path FROM payload_files WHERE kind = 'version_data' AND record_id = content_versions.id),
+                (SELECT rel_path FROM payload_files WHERE kind = 'deal' AND record_id = content_versions.deal_id),
+                (SELECT rel_path FROM payload_files WHERE kind = 'attachments'
+                    AND record_id = TRIM(content_versions.content_document_id))
+            )
+            WHERE discoverable = 1
+        """)
+
+    # ========== Row decoding ==========
+
+    def _decode_content_version(self, row: Tuple) -> Dict[str, Any]:
+        """content_versions row -> the record shape RawSalesforceExportConnector builds."""
+        (content_document_id, title, path_on_client, file_type, file_extension,
+         content_size, deal_c, content_modified_date, created_date, is_deleted) = row
+        return {
+            'content_document_id': _nan_if_null(content_document_id),
+            'title': _nan_if_null(title),
+            'path_on_client': _nan_if_null(path_on_client),
+            'file_type': _nan_if_null(file_type),
+            'file_extension': file_extension,
+            'content_size': _nan_if_null(content_size),
+            'deal_id': deal_c,  # Direct Deal__c link (see _cv_to_deal_mapping for the resolved Deal)
+            'content_modified_date': _nan_if_null(content_modified_date),
+            'created_date': _nan_if_null(created_date),
+            'is_deleted': bool(is_deleted)
+        }
+
+    @staticmethod
+    def _decode_content_document(row: Tuple) -> Dict[str, Any]:
+        title, file_type, file_extension, content_size, created_date = row
+        return {
+            'title': _nan_if_null(title),
+            'file_type': _nan_if_null(file_type),
+            'file_extension': _nan_if_null(file_extension),
+            'content_size': _nan_if_null(content_size),
+            'created_date': _nan_if_null(created_date)
+        }
+
+    def _deal_row(self, row: Tuple) -> Dict[str, Any]:
+        """deals row -> CSV row dict typed like pandas, NA cells as NaN (what _deal_record expects)."""
+        return {
+            column: convert(value)
+            for column, convert, value in zip(self._deal_columns, self._deal_converters, row)
+        }
+
+    # ========== Queries ==========
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._db_lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _iter_query(self, sql: str, params: Tuple = (), batch_size: int = 10000) -> Iterator[Tuple]:
+        """Stream query results in batches (holding the lock per batch only)."""
+        with self._db_lock:
+            cursor = self._db.cursor()
+            cursor.execute(sql, params)
         try:
-            return float(val)
-        except (ValueError, TypeError):
-            return None
-    
-    def list_documents_as_metadata(self,
-                                   require_deal_association: bool = False) -> Generator[DocumentMetadata, None, None]:
-        """Stream documents with metadata."""
-        print(f"  📋 Streaming documents (require_deal: {require_deal_association})...")
-        
-        doc_count = 0
-        
-        for cv_id, cv_data in self._cv_index.items():
-            # Get deal ID
-            deal_id = cv_data.get('deal_id')
-            if not deal_id:
-                cd_id = cv_data.get('content_document_id')
-                if cd_id in self._cd_to_deal:
-                    deal_id = self._cd_to_deal[cd_id][0]
-            
-            # Skip if filtering and no deal
-            if require_deal_association and not deal_id:
+            while True:
+                with self._db_lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+    def _fetch_deals(self, deal_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch deal records for many deals with one WHERE Id IN (...) query."""
+        if not deal_ids:
+            return {}
+        placeholders = ', '.join('?' for _ in deal_ids)
+        rows = self._query(f'SELECT * FROM deals WHERE "Id" IN ({placeholders})', tuple(deal_ids))
+        deals = {}
+        for row in rows:
+            record = self._deal_row(row)
+            deals[record['Id']] = self._deal_record(record)
+        return deals
+
+    # ========== Discovery ==========
+
+    def _iter_discoverable(self, file_types: Optional[List[str]] = None) -> Generator[Tuple[str, Optional[str], FileMetadata], None, None]:
+        """Yield (cv_id, deal_id, FileMetadata) for every resolved ContentVersion, in CSV order."""
+        processed_count = 0
+        mapped_count = 0
+
+        for row in self._iter_query(
+            f"SELECT id, {', '.join(_CV_RECORD_COLUMNS)}, deal_id, file_path FROM content_versions "
+            f"WHERE file_path IS NOT NULL AND is_deleted = 0 ORDER BY rowid"
+        ):
+            cv_id, deal_id, file_path = row[0], row[-2], row[-1]
+            cv_data = self._decode_content_version(row[1:-2])
+
+            file_ext = self._normalized_extension(cv_data)
+            if file_types and file_ext not in file_types:
                 continue
-            
-            # Get deal data from SQLite
-            deal_data = None
-            if deal_id:
-                deal_data = self._get_deal_data(deal_id)
-            
-            if require_deal_association and not deal_data:
+
+            try:
+                file_metadata = self._build_file_metadata(cv_id, cv_data, self.export_root_dir / file_path, file_ext)
+            except Exception as e:
+                self.logger.error(f"Error processing ContentVersion {cv_id}: {e}")
                 continue
-            
-            # Build metadata
-            doc = self._build_metadata(cv_id, cv_data, deal_id, deal_data)
-            if doc:
-                doc_count += 1
-                yield doc
-        
-        print(f"    ✓ Streamed {doc_count} documents")
-    
-    def _build_metadata(self, cv_id: str, cv_data: Dict,
-                       deal_id: Optional[str], deal_data: Optional[Dict]) -> Optional[DocumentMetadata]:
-        """Build DocumentMetadata with correct field names."""
-        try:
-            # Resolve file path
-            full_path = self._resolve_path(cv_id, cv_data, deal_id)
-            if not full_path:
-                return None
-            
-            # Extract title safely
-            title = cv_data.get('title', '')
-            file_ext = cv_data.get('file_extension', '')
-            
-            doc = DocumentMetadata(
-                path=full_path,
-                name=title,
-                size=cv_data.get('content_size', 0),
-                size_mb=cv_data.get('content_size', 0) / (1024 * 1024),
-                file_type=cv_data.get('file_type', ''),
-                modified_time=cv_data.get('content_modified_date', ''),
-                deal_creation_date=deal_data.get('CreatedDate', '') if deal_data else None,
-                deal_name=deal_data.get('Name', '') if deal_data else None,
-                full_path=full_path,
-                # Salesforce metadata
-                salesforce_deal_id=deal_id,
-                salesforce_client_id=self._safe_str(deal_data.get('Client__c')) if deal_data else None,
-                salesforce_vendor_id=self._safe_str(deal_data.get('Primary_Deal_Vendor__c')) if deal_data else None,
-                # Financial data
-                proposed_amount=self._safe_float(deal_data.get('Total_Proposed_Amount__c')) if deal_data else None,
-                final_amount=self._safe_float(deal_data.get('Total_Final_Amount__c')) if deal_data else None,
-                savings_1yr=self._safe_float(deal_data.get('Total_Savings_1yr__c')) if deal_data else None,
-                savings_3yr=self._safe_float(deal_data.get('Total_Savings_3yr__c')) if deal_data else None,
-                savings_target=self._safe_float(deal_data.get('NPI_Savings_Target__c')) if deal_data else None,
-                savings_target_full_term=self._safe_float(deal_data.get('NPI_Savings_Target_Full_Contract_Term__c')) if deal_data else None,
-                final_amount_full_term=self._safe_float(deal_data.get('Final_Amount_Full_Contract_Term__c')) if deal_data else None,
-            )
-            return doc
-        
-        except Exception as e:
-            self.logger.warning(f"Failed to build metadata for {cv_id}: {e}")
-            return None
-    
-    def _resolve_path(self, cv_id: str, cv_data: Dict, deal_id: Optional[str]) -> Optional[str]:
-        """Resolve file path."""
-        # Primary
-        primary = self.export_root_dir / "ContentVersions" / "VersionData" / cv_id
-        if primary.exists() and any(primary.iterdir()):
-            return str(primary.relative_to(self.export_root_dir))
-        
-        # Fallback
-        cd_id = cv_data.get('content_document_id')
-        if cd_id:
-            alt = self.export_root_dir / "Attachments" / "Body" / cd_id
-            if alt.exists() and any(alt.iterdir()):
-                return str(alt.relative_to(self.export_root_dir))
-        
-        return None
-    
-    def print_export_statistics(self):
-        """Print statistics."""
-        print(f"\n📊 Export Statistics:")
-        print(f"  Content Versions: {len(self._cv_index)}")
-        print(f"  Content Documents: {len(self._cd_index)}")
-        print(f"  Document→Deal Links: {len(self._cd_to_deal)}")
-    
-    # ========== Required abstract methods from FileSourceInterface ==========
-    
-    def list_documents(self, folder_path: str = "/", recursive: bool = True) -> Generator[FileMetadata, None, None]:
-        """List documents (compatibility method, use list_documents_as_metadata instead)."""
-        for doc in self.list_documents_as_metadata(require_deal_association=True):
-            yield FileMetadata(
-                name=doc.file_name,
-                path=doc.full_path or "",
-                size_bytes=doc.file_size_bytes or 0,
-                modified_date=datetime.now().isoformat()
+
+            processed_count += 1
+            if deal_id:
+                mapped_count += 1
+            if processed_count % 1000 == 0:
+                self.logger.info(f"📊 Discovery stats: {processed_count:,} files processed, "
+                                 f"{mapped_count:,} mapped ({mapped_count / processed_count * 100:.1f}%), "
+                                 f"{processed_count - mapped_count:,} unmapped")
+
+            yield cv_id, deal_id, file_metadata
+
+    def list_documents(self, folder_path: str = "",
+                      file_types: Optional[List[str]] = None,
+                      batch_size: Optional[int] = None) -> Generator[FileMetadata, None, None]:
+        """
+        List all documents from the SQLite index.
+
+        Args:
+            folder_path: Not used for raw exports (all files scanned)
+            file_types: File extensions to filter (e.g., ['.pdf', '.docx'])
+            batch_size: Not used in this implementation
+
+        Yields:
+            FileMetadata objects for each discovered document
+        """
+        self.logger.info(f"Discovering files from raw Salesforce export (streaming): {self.export_root_dir}")
+        for _, _, file_metadata in self._iter_discoverable(file_types):
+            yield file_metadata
+
+    def list_documents_as_metadata(self, folder_path: str = "",
+                                   require_deal_association: bool = False) -> Generator[DocumentMetadata, None, None]:
+        """List documents with Deal metadata enrichment, one deal query per batch of documents
+
+        Args:
+            folder_path: Optional path filter
+            require_deal_association: If True, only yield documents with valid deal associations.
+
+        Yields:
+            DocumentMetadata objects enriched with deal information
+        """
+        skipped_no_deal = 0
+        batch: List[Tuple[str, Optional[str], FileMetadata]] = []
+
+        def flush():
+            deals = self._fetch_deals(list({deal_id for _, deal_id, _ in batch if deal_id}))
+            yield from self.enrich_batch(
+                [file_metadata for _, _, file_metadata in batch],
+                [deal_id for _, deal_id, _ in batch],
+                cv_ids=[cv_id for cv_id, _, _ in batch],
+                deal_records=deals
             )
-    
-    def download_file(self, file_path: str) -> bytes:
-        """Download file content."""
-        abs_path = self.export_root_dir / file_path if not Path(file_path).is_absolute() else Path(file_path)
-        with open(abs_path, 'rb') as f:
-            return f.read()
-    
-    def validate_connection(self) -> bool:
-        """Validate connection (always true for local export)."""
-        return self.export_root_dir.exists()
-    
-    def get_file_content_hash(self, file_path: str) -> str:
-        """Get file content hash."""
-        import hashlib
-        content = self.download_file(file_path)
-        return hashlib.sha256(content).hexdigest()
-    
-    def file_exists(self, file_path: str) -> bool:
-        """Check if file exists."""
-        abs_path = self.export_root_dir / file_path if not Path(file_path).is_absolute() else Path(file_path)
-        return abs_path.exists()
-    
-    def get_source_info(self) -> Dict[str, Any]:
-        """Get source information."""
+            batch.clear()
+
+        for item in self._iter_discoverable():
+            if require_deal_association and not item[1]:
+                skipped_no_deal += 1
+                continue
+            batch.append(item)
+            if len(batch) >= self.lookup_batch_size:
+                yield from flush()
+        if batch:
+            yield from flush()
+
+        if require_deal_association and skipped_no_deal > 0:
+            self.logger.info(f"ℹ️  Filtered out {skipped_no_deal:,} documents without deal associations")
+
+    # ========== Statistics ==========
+
+    def get_export_statistics(self) -> Dict[str, Any]:
+        """Get comprehensive statistics about the export (computed in SQL)"""
+        total_files, files_with_deals, unique_deals = self._query("""
+            SELECT COUNT(*), COUNT(deal_id), COUNT(DISTINCT deal_id) FROM content_versions
+        """)[0]
+        deals_with_metadata = self._query("""
+            SELECT COUNT(*) FROM (SELECT DISTINCT deal_id FROM content_versions WHERE deal_id IS NOT NULL) d
+            WHERE EXISTS (SELECT 1 FROM deals WHERE deals."Id" = d.deal_id)
+        """)[0][0]
+        total_deal_records = self._query("SELECT COUNT(*) FROM deals")[0][0]
+
+        files_with_friendly_ids = 0
+        if self._deal_id_to_number:
+            for (deal_id,) in self._iter_query("SELECT deal_id FROM content_versions WHERE deal_id IS NOT NULL"):
+                if deal_id in self._deal_id_to_number:
+                    files_with_friendly_ids += 1
+
         return {
-            'source_type': 'raw_salesforce_export',
-            'export_root': str(self.export_root_dir),
-            'content_versions': len(self._cv_index),
-            'content_documents': len(self._cd_index),
-            'links': len(self._cd_to_deal),
-            'mode': 'pure_streaming'
+            'total_files': total_files,
+            'files_with_deals': files_with_deals,
+            'files_without_deals': total_files - files_with_deals,
+            'deal_association_rate': (files_with_deals / total_files * 100) if total_files else 0,
+            'unique_deals': unique_deals,
+            'deals_with_metadata': deals_with_metadata,
+            'files_with_friendly_ids': files_with_friendly_ids,
+            'total_deal_records': total_deal_records,
+            'deal_id_mappings': len(self._deal_id_to_number)
         }
-    
+
+    def get_source_info(self) -> Dict[str, Any]:
+        """Get information about the raw Salesforce export source"""
+        info = super().get_source_info()
+        info.update({'mode': 'pure_streaming', 'index_db': self.db_path})
+        return info
+
+    def close(self):
+        """Close the SQLite index."""
+        if getattr(self, '_db', None) is not None:
+            self._db.close()
+            self._db = None
+
     def __del__(self):
         """Cleanup."""
-        if hasattr(self, 'deal_db'):
-            self.deal_db.close()
-
+        self.close()
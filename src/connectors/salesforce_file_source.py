@@ -14,10 +14,12 @@ Features:
 """
 
 import os
+import re
 import csv
+from bisect import bisect_left
 import pandas as pd
 from pathlib import Path
-from typing import Generator, Dict, Optional, List, Any
+from typing import Generator, Dict, Optional, List, Any, Tuple
 from datetime import datetime
 import logging
 
@@ -31,6 +33,10 @@ except ImportError:
     from models.document_models import DocumentMetadata
 
 
+# Version/copy suffixes stripped by fuzzy filename matching (at most one can end a given stem)
+VERSION_SUFFIX_RE = re.compile(r'(?:_v2|_V2| v2| V2|_v3|_V3| v3| V3|_final|_Final|_FINAL|_copy|_Copy|_COPY)$')
+
+
 class SalesforceFileSource(FileSourceInterface):
     """File source for Salesforce exported and organized files with Deal metadata enrichment"""
     
@@ -67,6 +73,10 @@ class SalesforceFileSource(FileSourceInterface):
         
         # Loaded data caches
         self._file_to_deal_mapping: Optional[Dict] = None
+        self._relative_path_index: Dict[str, Dict] = {}
+        self._basename_index: Dict[str, Dict] = {}
+        self._reversed_paths: List[str] = []
+        self._reversed_path_entries: List[Tuple[int, Dict]] = []
         self._deal_metadata: Optional[Dict] = None
         self._client_mapping: Optional[Dict] = None
         self._vendor_mapping: Optional[Dict] = None
@@ -123,6 +133,7 @@ class SalesforceFileSource(FileSourceInterface):
             }
         
         self.logger.info(f"Loaded {len(self._file_to_deal_mapping)} file-to-deal mappings")
+        self._build_match_indexes()
         
         # Load Deal metadata
         self.logger.info(f"Loading Deal metadata from {self.deal_metadata_csv}")
@@ -251,20 +262,15 @@ class SalesforceFileSource(FileSourceInterface):
             match_method = "exact_filename"
         
         # Strategy 2: Exact relative path match
-        elif not deal_mapping:
-            for mapped_filename, mapping_data in self._file_to_deal_mapping.items():
-                if mapping_data['relative_path'] == file_metadata.path:
-                    deal_mapping = mapping_data
-                    match_method = "exact_path"
-                    break
+        elif file_metadata.path in self._relative_path_index:
+            deal_mapping = self._relative_path_index[file_metadata.path]
+            match_method = "exact_path"
         
         # Strategy 3: Endswith path match (for subdirectory scanning)
         if not deal_mapping:
-            for mapped_filename, mapping_data in self._file_to_deal_mapping.items():
-                if mapping_data['relative_path'].endswith(file_metadata.path):
-                    deal_mapping = mapping_data
-                    match_method = "endswith_path"
-                    break
+            deal_mapping = self._find_path_suffix_match(file_metadata.path)
+            if deal_mapping:
+                match_method = "endswith_path"
         
         # Strategy 4: Fuzzy filename matching (handle version suffixes)
         if not deal_mapping:
@@ -411,6 +417,42 @@ class SalesforceFileSource(FileSourceInterface):
         
         return doc_metadata
     
+    def _build_match_indexes(self):
+        """Index the file mappings by relative path, basename and reversed relative path
+        
+        Each index keeps the first mapping in _file_to_deal_mapping order, which is the
+        mapping the fallback strategies would find by scanning.
+        """
+        self._relative_path_index = {}
+        self._basename_index = {}
+        reversed_entries = []
+        
+        for rank, mapping_data in enumerate(self._file_to_deal_mapping.values()):
+            relative_path = mapping_data['relative_path']
+            if not isinstance(relative_path, str):
+                continue
+            self._relative_path_index.setdefault(relative_path, mapping_data)
+            self._basename_index.setdefault(os.path.basename(relative_path), mapping_data)
+            reversed_entries.append((relative_path[::-1], rank, mapping_data))
+        
+        # Paths ending with a given suffix are a contiguous run of the sorted reversed paths
+        reversed_entries.sort(key=lambda entry: (entry[0], entry[1]))
+        self._reversed_paths = [entry[0] for entry in reversed_entries]
+        self._reversed_path_entries = [(entry[1], entry[2]) for entry in reversed_entries]
+    
+    def _find_path_suffix_match(self, file_path: str) -> Optional[Dict]:
+        """First mapping (in mapping order) whose relative path ends with file_path"""
+        reversed_path = file_path[::-1]
+        best_rank, best_mapping = None, None
+        
+        i = bisect_left(self._reversed_paths, reversed_path)
+        while i < len(self._reversed_paths) and self._reversed_paths[i].startswith(reversed_path):
+            rank, mapping_data = self._reversed_path_entries[i]
+            if best_rank is None or rank < best_rank:
+                best_rank, best_mapping = rank, mapping_data
+            i += 1
+        return best_mapping
+    
     def _try_fuzzy_filename_match(self, filename: str) -> Optional[Dict]:
         """Try fuzzy matching for filename with common variations"""
         
@@ -418,13 +460,12 @@ class SalesforceFileSource(FileSourceInterface):
         name_without_ext, ext = os.path.splitext(filename)
         
         # Try without common suffixes
-        for suffix in ["_v2", "_V2", " v2", " V2", "_v3", "_V3", " v3", " V3", 
-                      "_final", "_Final", "_FINAL", "_copy", "_Copy", "_COPY"]:
-            if name_without_ext.endswith(suffix):
-                base_name = name_without_ext[:-len(suffix)] + ext
-                if base_name in self._file_to_deal_mapping:
-                    self.logger.debug(f"🔄 Fuzzy match: '{filename}' → '{base_name}'")
-                    return self._file_to_deal_mapping[base_name]
+        suffix_match = VERSION_SUFFIX_RE.search(name_without_ext)
+        if suffix_match:
+            base_name = name_without_ext[:suffix_match.start()] + ext
+            if base_name in self._file_to_deal_mapping:
+                self.logger.debug(f"🔄 Fuzzy match: '{filename}' → '{base_name}'")
+                return self._file_to_deal_mapping[base_name]
         
         # Try without extension
         if name_without_ext in self._file_to_deal_mapping:
@@ -436,20 +477,12 @@ class SalesforceFileSource(FileSourceInterface):
     def _try_path_similarity_match(self, file_path: str) -> Optional[Dict]:
         """Try matching based on path similarity for renamed/moved files"""
         
-        # Extract just the filename for backup matching
-        filename = os.path.basename(file_path)
-        
-        # Look for files with same filename in any directory  
-        for mapped_filename, mapping_data in self._file_to_deal_mapping.items():
-            mapped_path = mapping_data['relative_path']
-            mapped_filename_only = os.path.basename(mapped_path)
-            
+        # Look for files with same filename in any directory
+        mapping_data = self._basename_index.get(os.path.basename(file_path))
+        if mapping_data:
             # If filenames match but paths differ, it might be a moved file
-            if mapped_filename_only == filename:
-                self.logger.debug(f"🔄 Path similarity match: '{file_path}' → '{mapped_path}' (same filename)")
-                return mapping_data
-                
-        return None
+            self.logger.debug(f"🔄 Path similarity match: '{file_path}' → '{mapping_data['relative_path']}' (same filename)")
+        return mapping_data
     
     def get_mapping_statistics(self) -> Dict[str, Any]:
         """Get statistics about the file-to-deal mapping coverage"""
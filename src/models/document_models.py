@@ -136,8 +136,9 @@ class DocumentMetadata:
     
     def __post_init__(self):
         """Initialize default values and computed fields"""
-        # Set full_path from path
-        self.full_path = self.path
+        # Default full_path to path (sources pass the absolute payload path when they have one)
+        if not self.full_path:
+            self.full_path = self.path
         
         # Calculate size_mb if not already set
         if self.size:
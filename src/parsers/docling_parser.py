@@ -30,6 +30,7 @@ from typing import Any, Dict, List, Optional
 
 from src.parsers.pdfplumber_parser import ParsedContent
 from src.parsers.table_formatter import format_table_for_chunking
+from src.utils.spooled_document import spooled_path
 
 logger = logging.getLogger(__name__)
 
@@ -249,15 +250,19 @@ class DoclingParser:
                 signal.signal(signal.SIGALRM, old_handler)
 
         tmp_path: Optional[Path] = None
+        source_path = spooled_path(content)
 
         try:
-            # Write bytes to a temporary file for Docling.
-            with tempfile.NamedTemporaryFile(
-                suffix=".pdf", delete=False
-            ) as tmp_file:
-                tmp_file.write(content)
-                tmp_file.flush()
-                tmp_path = Path(tmp_file.name)
+            # Docling reads from a path: use the download's spool file if there
+            # is one, otherwise write the bytes to a temporary file.
+            if source_path is None:
+                with tempfile.NamedTemporaryFile(
+                    suffix=".pdf", delete=False
+                ) as tmp_file:
+                    tmp_file.write(content)
+                    tmp_file.flush()
+                    tmp_path = Path(tmp_file.name)
+                source_path = str(tmp_path)
 
             tables: List[Dict[str, Any]] = []
             page_info: List[Dict[str, Any]] = []
@@ -267,9 +272,9 @@ class DoclingParser:
 
                 self.logger.info(
                     "DoclingParser: converting PDF '%s'",
-                    metadata.get("name") or metadata.get("path") or tmp_path.name,
+                    metadata.get("name") or metadata.get("path") or Path(source_path).name,
                 )
-                result = self.converter.convert(str(tmp_path))
+                result = self.converter.convert(source_path)
                 doc = result.document
 
                 # Primary text representation
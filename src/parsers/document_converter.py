@@ -4,19 +4,34 @@ Converts various file types to PDF or extracts text for PDFPlumber processing
 """
 
 import io
+import csv
 import tempfile
 import subprocess
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Iterator, List
 import logging
 from PIL import Image
 from pdf2image import convert_from_bytes
 import openpyxl
 import pandas as pd
+import xlrd
 from docx import Document as DocxDocument
 import extract_msg
 from .powerpoint_parser import PowerPointParser
 from .enhanced_powerpoint_parser import EnhancedPowerPointParser
+from src.utils.spooled_document import DocumentContent, content_bytes, spooled_path
+
+
+SPREADSHEET_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+
+# Types convert_to_processable_content returns still spooled. Only the PDF parsers
+# (Docling, PDFPlumber, Mistral) open spooled content by path; every other type is
+# read into memory first (spreadsheets streamed by iter_spreadsheet_tables aside).
+SPOOLED_PASSTHROUGH_EXTENSIONS = ('.pdf',)
+
+# One streamed sheet: (sheet_name, header_line, separator_line, row_lines).
+# header_line/separator_line are None for an empty sheet.
+SpreadsheetTable = Tuple[str, Optional[str], Optional[str], Iterator[str]]
 
 
 class DocumentConverter:
@@ -70,7 +85,8 @@ class DocumentConverter:
         
         Args:
             file_path: Path to the file (may not have extension for Salesforce exports)
-            content: File content bytes
+            content: File content bytes, or a SpooledDocument (returned as is for
+                SPOOLED_PASSTHROUGH_EXTENSIONS, read into memory for every other type)
             file_name: Original filename with extension (used when file_path lacks extension)
         """
         # First try extension from file_path, then from file_name
@@ -79,10 +95,11 @@ class DocumentConverter:
             extension = Path(file_name).suffix.lower()
         
         try:
-            if extension == '.pdf':
+            if extension in SPOOLED_PASSTHROUGH_EXTENSIONS:
                 return content, 'pdf'
+            content = content_bytes(content)
             
-            elif extension in ['.xlsx', '.xls', '.csv']:
+            if extension in ['.xlsx', '.xls', '.csv']:
                 text_content = self._extract_excel_text(content, extension)
                 return text_content.encode('utf-8'), 'text'
             
@@ -147,9 +164,8 @@ class DocumentConverter:
                 text_parts.append(headers)
                 text_parts.append("-" * min(len(headers), 100))
                 
-                # Add data (limit rows to prevent huge text blocks)
-                max_rows = min(1000, len(df))
-                for idx, row in df.head(max_rows).iterrows():
+                # Add data (every row; the chunker splits large sheets with repeated headers)
+                for idx, row in df.iterrows():
                     try:
                         row_text = " | ".join(str(val) if pd.notna(val) else "" for val in row.values)
                         text_parts.append(row_text)
@@ -157,9 +173,6 @@ class DocumentConverter:
                         self.logger.warning(f"Error processing row {idx}: {e}")
                         continue
                 
-                if len(df) > 1000:
-                    text_parts.append(f"... and {len(df) - 1000} more rows")
-                
                 text_parts.append("")  # Empty line between sheets
             
             return "\n".join(text_parts)
@@ -168,6 +181,117 @@ class DocumentConverter:
             self.logger.error(f"Error extracting Excel text: {e}")
             return f"Error reading Excel file: {str(e)}"
     
+    def iter_spreadsheet_tables(self, content: DocumentContent, extension: str) -> Iterator[SpreadsheetTable]:
+        """
+        Stream spreadsheet sheets as formatted table lines without materializing them.
+        
+        .xlsx is read with openpyxl in read-only mode and .csv with the csv module, so
+        rows are produced one at a time; legacy .xls is opened with xlrd on demand, so
+        only the sheet being streamed is loaded. Spooled content is read from its file.
+        Lines use the unified table format consumed by SemanticChunker:
+        "col | col | col" with a dash separator under the header row.
+        
+        This is the streaming chunk path; _extract_excel_text keeps the pandas
+        rendering for the text path. The two differ: cells are the reader's raw
+        values (no pandas dtype inference), blank rows are skipped and trailing
+        empty cells are dropped.
+        
+        Args:
+            content: Spreadsheet file bytes or SpooledDocument
+            extension: File extension ('.xlsx', '.xls' or '.csv')
+            
+        Yields:
+            (sheet_name, header_line, separator_line, row_lines) per sheet; a sheet's
+            row_lines iterator must be consumed before advancing to the next sheet
+        """
+        path = spooled_path(content)
+        if extension == '.csv':
+            def csv_rows() -> Iterator[List[str]]:
+                with (open(path, 'rb') if path else io.BytesIO(content_bytes(content))) as raw:
+                    yield from csv.reader(io.TextIOWrapper(raw, encoding='utf-8', errors='replace', newline=''))
+            
+            yield self._format_sheet_rows('Sheet1', csv_rows())
+        elif extension == '.xls':
+            if path:
+                book = xlrd.open_workbook(filename=path, on_demand=True)
+            else:
+                book = xlrd.open_workbook(file_contents=content_bytes(content), on_demand=True)
+            try:
+                for sheet_name in book.sheet_names():
+                    try:
+                        sheet = book.sheet_by_name(sheet_name)
+                    except Exception as e:
+                        self.logger.warning(f"Could not parse sheet {sheet_name}: {e}")
+                        continue
+                    yield self._format_sheet_rows(sheet_name, self._xls_rows(book, sheet))
+                    book.unload_sheet(sheet_name)
+            finally:
+                book.release_resources()
+        else:
+            workbook = openpyxl.load_workbook(path or io.BytesIO(content_bytes(content)), read_only=True, data_only=True)
+            try:
+                for worksheet in workbook.worksheets:
+                    try:
+                        rows = worksheet.iter_rows(values_only=True)
+                    except Exception as e:
+                        self.logger.warning(f"Could not parse sheet {worksheet.title}: {e}")
+                        continue
+                    yield self._format_sheet_rows(worksheet.title, rows)
+            finally:
+                workbook.close()
+    
+    def _format_sheet_rows(self, sheet_name: str, rows: Iterator[Any]) -> SpreadsheetTable:
+        """Turn a sheet's raw row iterator into (name, header, separator, row_lines)."""
+        rows = iter(rows)
+        
+        # First non-empty row is the header
+        header_cells: List[str] = []
+        for row in rows:
+            header_cells = self._row_cells(row)
+            if any(header_cells):
+                break
+        else:
+            return sheet_name, None, None, iter(())
+        
+        # Name blank header cells the way pandas does
+        header_cells = [cell or f"Unnamed: {i}" for i, cell in enumerate(header_cells)]
+        header_line = " | ".join(header_cells)
+        separator_line = "-" * min(len(header_line), 100)
+        
+        def row_lines() -> Iterator[str]:
+            for row in rows:
+                cells = self._row_cells(row)
+                if any(cells):
+                    yield " | ".join(cells)
+        
+        return sheet_name, header_line, separator_line, row_lines()
+    
+    @staticmethod
+    def _xls_rows(book: Any, sheet: Any) -> Iterator[List[Any]]:
+        """Raw .xls cell values per row, typed the way openpyxl reports .xlsx cells."""
+        for r in range(sheet.nrows):
+            values = []
+            for cell in sheet.row(r):
+                if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+                    values.append(None)
+                elif cell.ctype == xlrd.XL_CELL_DATE:
+                    values.append(xlrd.xldate.xldate_as_datetime(cell.value, book.datemode))
+                elif cell.ctype == xlrd.XL_CELL_BOOLEAN:
+                    values.append(bool(cell.value))
+                elif cell.ctype == xlrd.XL_CELL_NUMBER and float(cell.value).is_integer():
+                    values.append(int(cell.value))
+                else:
+                    values.append(cell.value)
+            yield values
+    
+    @staticmethod
+    def _row_cells(row: Any) -> List[str]:
+        """Stringify a row's cells (one line per row), dropping trailing empty cells."""
+        cells = ["" if val is None else " ".join(str(val).split()) for val in row]
+        while cells and not cells[-1]:
+            cells.pop()
+        return cells
+    
     def _extract_docx_text(self, content: bytes) -> str:
         """Extract text from DOCX files"""
         try:
@@ -304,6 +428,7 @@ class DocumentConverter:
         Returns:
             Dictionary with essential email metadata fields only
         """
+        content = content_bytes(content)
         metadata = {
             "email_sender": None,
             "email_recipients_to": None,
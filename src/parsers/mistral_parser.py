@@ -24,6 +24,7 @@ from pypdf import PdfReader, PdfWriter
 
 from src.parsers.pdfplumber_parser import ParsedContent
 from src.parsers.table_formatter import format_table_for_chunking
+from src.utils.spooled_document import spooled_path
 
 logger = logging.getLogger(__name__)
 
@@ -188,25 +189,30 @@ class MistralParser:
             return self._parse_large_pdf_in_chunks(content=content, metadata=metadata)
 
         tmp_path: Optional[Path] = None
+        source_path = spooled_path(content)
 
         try:
-            with tempfile.NamedTemporaryFile(
-                suffix=".pdf", delete=False
-            ) as tmp_file:
-                tmp_file.write(content)
-                tmp_file.flush()
-                tmp_path = Path(tmp_file.name)
+            # Upload straight from the download's spool file when there is one
+            if source_path is None:
+                with tempfile.NamedTemporaryFile(
+                    suffix=".pdf", delete=False
+                ) as tmp_file:
+                    tmp_file.write(content)
+                    tmp_file.flush()
+                    tmp_path = Path(tmp_file.name)
+                source_path = str(tmp_path)
+            upload_path = Path(source_path)
 
             with timeout_context(self.timeout_seconds):
                 start_ts = time.time()
 
                 self.logger.info(
                     "MistralParser: uploading PDF '%s'",
-                    metadata.get("name") or metadata.get("path") or tmp_path.name,
+                    metadata.get("name") or metadata.get("path") or upload_path.name,
                 )
-                with tmp_path.open("rb") as f:
+                with upload_path.open("rb") as f:
                     uploaded_file = self.client.files.upload(
-                        file={"file_name": tmp_path.name, "content": f}, purpose="ocr"
+                        file={"file_name": upload_path.name, "content": f}, purpose="ocr"
                     )
 
                 signed_url = self.client.files.get_signed_url(file_id=uploaded_file.id)
@@ -324,7 +330,7 @@ class MistralParser:
             raise ValueError("split_pages_per_chunk must be > 0")
 
         try:
-            reader = PdfReader(io.BytesIO(content))
+            reader = PdfReader(spooled_path(content) or io.BytesIO(content))
             total_pages = len(reader.pages)
         except Exception as e:
             raise RuntimeError(
@@ -18,6 +18,7 @@ from contextlib import contextmanager
 import platform
 
 from src.parsers.table_formatter import format_table_for_chunking
+from src.utils.spooled_document import spooled_path
 
 
 @dataclass
@@ -117,7 +118,7 @@ class PDFPlumberParser:
             page_info = []
             
             with timeout_context(timeout_seconds=240):  # 4 minute timeout
-                with pdfplumber.open(io.BytesIO(content)) as pdf:
+                with pdfplumber.open(spooled_path(content) or io.BytesIO(content)) as pdf:
                     self.logger.info(f"Processing PDF with {len(pdf.pages)} pages")
                     
                     # Check for unusually large PDFs
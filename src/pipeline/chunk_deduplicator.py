@@ -0,0 +1,357 @@
+"""
+Cross-document chunk deduplication before embedding
+
+Email threads, forwarded attachments and re-uploaded contract versions produce
+byte-identical or near-identical chunks across documents of the same deal. The
+ChunkDeduplicator fingerprints each chunk (exact hash of normalized text plus a
+64-bit SimHash for near-duplicates) in a per-run index, so duplicates either
+reuse the vectors already generated for the first copy ("reuse") or are not
+embedded and upserted at all ("skip").
+
+The index is scoped (by deal id in the pipelines) so a duplicate is only matched
+against chunks that will be found by the same deal-filtered searches; chunks of
+a document without a deal are scoped to that document. A document's chunks are
+only recorded once the caller commits them after a successful upsert, so a
+failed upsert never leaves fingerprints behind that later copies would be
+skipped against.
+
+The index lives in the process that owns the deduplicator: the parallel
+pipeline has one per worker, so duplicates handled by different workers are
+embedded (and, under "skip", upserted) once per worker. It is bounded by an estimate of its memory use (max_index_mb, dominated by the stored
+vectors under "reuse") as well as an entry count; once either limit is reached,
+new chunks are embedded normally but no longer indexed.
+"""
+
+import hashlib
+import itertools
+import re
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEDUP_POLICIES = ("off", "reuse", "skip")
+
+_TOKEN_RE = re.compile(r'\w+')
+_SIMHASH_BITS = 64
+_SIMHASH_BANDS = 4  # 16-bit bands: Hamming distance <= 3 guarantees a shared band
+_BAND_BITS = _SIMHASH_BITS // _SIMHASH_BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+DEFAULT_DEDUP_INDEX_MB = 64
+# Rough per-entry costs for the memory estimate
+_ENTRY_OVERHEAD_BYTES = 400  # entry object, digest, exact-map slot and band-list slots
+_SPARSE_BYTES_PER_VALUE = 64  # boxed index + value and their list slots
+
+
+@dataclass(eq=False)
+class _IndexEntry:
+    """A chunk already seen this run, with its vectors once they are generated"""
+    simhash: int
+    digest: bytes
+    dense: Optional[array] = None
+    sparse: Optional[Dict[str, Any]] = None
+    nbytes: int = _ENTRY_OVERHEAD_BYTES
+    committed: bool = False  # Set once the first copy's upsert succeeded
+
+
+@dataclass
+class DedupResult:
+    """Per-document outcome of embedding with deduplication"""
+    dense_embeddings: List[Optional[List[float]]]
+    sparse_embeddings: List[Optional[Dict[str, Any]]]
+    keep: List[bool]  # False = duplicate dropped by the "skip" policy
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    embedded: int = 0
+    # Scope and entries first indexed by this document (see ChunkDeduplicator.commit)
+    scope: Optional[str] = None
+    new_entries: List[_IndexEntry] = field(default_factory=list, repr=False)
+
+    @property
+    def duplicates(self) -> int:
+        return self.exact_duplicates + self.near_duplicates
+
+
+@dataclass
+class DedupStats:
+    """Running totals for a deduplicator (one per process)"""
+    chunks_seen: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    embeddings_saved: int = 0
+    embedding_chars_saved: int = 0
+    vectors_skipped: int = 0
+    storage_bytes_saved: int = 0
+    chunks_not_indexed: int = 0
+    by_scope: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "chunks_seen": self.chunks_seen,
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates,
+            "embeddings_saved": self.embeddings_saved,
+            "embedding_chars_saved": self.embedding_chars_saved,
+            "vectors_skipped": self.vectors_skipped,
+            "storage_bytes_saved": self.storage_bytes_saved,
+            "chunks_not_indexed": self.chunks_not_indexed,
+        }
+
+
+class ChunkDeduplicator:
+    """Fingerprint index that lets duplicate chunks reuse or skip embeddings"""
+
+    def __init__(self, policy: str = "reuse", near_duplicates: bool = True,
+                 max_hamming_distance: int = 3, shingle_size: int = 3,
+                 max_entries: int = 200_000, max_index_mb: float = DEFAULT_DEDUP_INDEX_MB,
+                 dense_dimension: int = 1024):
+        """
+        Initialize deduplicator.
+
+        Args:
+            policy: "reuse" (duplicates get the first copy's vectors and are still upserted),
+                    "skip" (duplicates are neither embedded nor upserted) or "off"
+            near_duplicates: Also match near-identical chunks via SimHash
+            max_hamming_distance: SimHash bit distance treated as a near-duplicate (<= 3)
+            shingle_size: Words per shingle fed to SimHash
+            max_entries: Stop indexing new chunks after this many
+            max_index_mb: Stop indexing new chunks once the index (fingerprints plus
+                          stored vectors) is estimated to use this much memory
+            dense_dimension: Dense vector size, used for storage savings and index size estimates
+        """
+        if policy not in DEDUP_POLICIES:
+            raise ValueError(f"Unsupported dedup policy: {policy}")
+        if max_hamming_distance >= _SIMHASH_BANDS:
+            raise ValueError(f"max_hamming_distance must be below {_SIMHASH_BANDS}")
+
+        self.policy = policy
+        self.near_duplicates = near_duplicates
+        self.max_hamming_distance = max_hamming_distance
+        self.shingle_size = max(1, shingle_size)
+        self.max_entries = max_entries
+        self.max_index_bytes = int(max_index_mb * 1024 * 1024)
+        # Entries are counted with their dense vector up front so a large document
+        # cannot overshoot the bound before its vectors come back
+        self._entry_reserve_bytes = _ENTRY_OVERHEAD_BYTES + (dense_dimension * 4 if policy == "reuse" else 0)
+        self.dense_dimension = dense_dimension
+        self.stats = DedupStats()
+
+        # (scope, sha1) -> entry, and (scope, band index, band value) -> entries
+        self._exact: Dict[Tuple[str, bytes], _IndexEntry] = {}
+        self._bands: Dict[Tuple[str, int, int], List[_IndexEntry]] = {}
+        self._index_bytes = 0
+        self._anonymous_scopes = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return self.policy != "off"
+
+    @property
+    def index_size(self) -> int:
+        """Number of indexed chunks."""
+        return len(self._exact)
+
+    @property
+    def index_bytes(self) -> int:
+        """Estimated memory used by the index."""
+        return self._index_bytes
+
+    def embed_chunks(self, texts: List[str],
+                     embed_fn: Callable[[List[int]], Dict[str, List[Any]]],
+                     scope: Optional[str] = None,
+                     document_id: Optional[str] = None) -> DedupResult:
+        """
+        Embed a document's chunks, generating vectors only for chunks not seen before.
+
+        Chunks first seen here only match this document until commit() is called
+        with the result (after the upsert succeeded); call discard() if it failed.
+
+        Args:
+            texts: Chunk texts of one document
+            embed_fn: Called with the indices to embed; returns a dict with
+                      'dense_embeddings' and 'sparse_embeddings' aligned with those indices
+            scope: Dedup scope (e.g. deal id); chunks only match within the same scope
+            document_id: Scope used when scope is None (e.g. the document path), so
+                         documents without a deal never match each other
+
+        Returns:
+            DedupResult with vectors for every kept chunk
+        """
+        n = len(texts)
+        if not self.enabled:
+            embeddings = embed_fn(list(range(n)))
+            return DedupResult(embeddings["dense_embeddings"], embeddings["sparse_embeddings"],
+                               [True] * n, embedded=n)
+
+        if scope is None:
+            scope = f"document:{document_id}" if document_id is not None else f"call:{next(self._anonymous_scopes)}"
+        entries: List[Optional[_IndexEntry]] = [None] * n
+        new_entries: List[_IndexEntry] = []
+        to_embed: List[int] = []
+        exact = near = 0
+
+        for i, text in enumerate(texts):
+            digest, simhash = self._fingerprint(text)
+            entry = self._exact.get((scope, digest))
+            if entry is not None and not self._matchable(entry, new_entries):
+                entry = None
+            if entry is not None:
+                exact += 1
+            elif self.near_duplicates:
+                entry = self._find_near(scope, simhash, new_entries)
+                if entry is not None:
+                    near += 1
+            if entry is None:
+                # First copy: embed it and index it so later copies in this document
+                # (and, once committed, in later documents) can reuse its vectors
+                entry = _IndexEntry(simhash=simhash, digest=digest, nbytes=self._entry_reserve_bytes)
+                to_embed.append(i)
+                if self._add(scope, entry):
+                    new_entries.append(entry)
+            entries[i] = entry
+
+        dense: List[Optional[List[float]]] = [None] * n
+        sparse: List[Optional[Dict[str, Any]]] = [None] * n
+        if to_embed:
+            try:
+                embeddings = embed_fn(to_embed)
+            except Exception:
+                # Don't leave vector-less entries behind for later documents to "reuse"
+                for i in to_embed:
+                    self._remove(scope, entries[i])
+                raise
+            for i, d_vec, s_vec in zip(to_embed, embeddings["dense_embeddings"], embeddings["sparse_embeddings"]):
+                dense[i] = d_vec
+                sparse[i] = s_vec
+                if self.policy == "reuse" and self._is_indexed(scope, entries[i]):
+                    self._store_vectors(entries[i], d_vec, s_vec)
+
+        embedded = set(to_embed)
+        keep = [True] * n
+        for i in range(n):
+            if i in embedded:
+                continue
+            self.stats.embedding_chars_saved += len(texts[i])
+            if self.policy == "skip":
+                keep[i] = False
+                self.stats.vectors_skipped += 1
+                self.stats.storage_bytes_saved += self.dense_dimension * 4 + len(texts[i].encode('utf-8'))
+            else:
+                dense[i] = entries[i].dense.tolist()
+                sparse[i] = entries[i].sparse
+
+        self.stats.chunks_seen += n
+        self.stats.exact_duplicates += exact
+        self.stats.near_duplicates += near
+        self.stats.embeddings_saved += n - len(to_embed)
+        if exact or near:
+            self.stats.by_scope[scope] = self.stats.by_scope.get(scope, 0) + exact + near
+
+        return DedupResult(dense, sparse, keep, exact_duplicates=exact,
+                           near_duplicates=near, embedded=len(to_embed),
+                           scope=scope, new_entries=new_entries)
+
+    def commit(self, result: DedupResult) -> None:
+        """Make a document's new chunks matchable by later documents (call after its upsert succeeded)."""
+        for entry in result.new_entries:
+            entry.committed = True
+
+    def discard(self, result: DedupResult) -> None:
+        """Forget a document's new chunks (its upsert failed or its vectors were deleted)."""
+        for entry in result.new_entries:
+            self._remove(result.scope, entry)
+        result.new_entries = []
+
+    def summary(self) -> str:
+        """One-line human readable summary of savings so far."""
+        s = self.stats
+        dupes = s.exact_duplicates + s.near_duplicates
+        pct = (dupes / s.chunks_seen * 100) if s.chunks_seen else 0.0
+        text = (f"dedup[{self.policy}]: {dupes}/{s.chunks_seen} duplicate chunks ({pct:.1f}%; "
+                f"{s.exact_duplicates} exact, {s.near_duplicates} near), "
+                f"{s.embeddings_saved} embeddings saved, {s.vectors_skipped} vectors skipped "
+                f"(~{s.storage_bytes_saved / 1024 / 1024:.1f} MB)")
+        if s.chunks_not_indexed:
+            text += f", {s.chunks_not_indexed} chunks not indexed (index full)"
+        return text
+
+    def _fingerprint(self, text: str) -> Tuple[bytes, int]:
+        """Exact digest of whitespace/case-normalized text and its 64-bit SimHash."""
+        tokens = _TOKEN_RE.findall(text.lower())
+        digest = hashlib.sha1(" ".join(tokens).encode('utf-8')).digest()
+        simhash = self._simhash(tokens) if self.near_duplicates else 0
+        return digest, simhash
+
+    def _simhash(self, tokens: List[str]) -> int:
+        """64-bit SimHash over word shingles."""
+        k = self.shingle_size
+        shingles = [" ".join(tokens[i:i + k]) for i in range(max(1, len(tokens) - k + 1))]
+        weights = [0] * _SIMHASH_BITS
+        for shingle in shingles:
+            h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+            for bit in range(_SIMHASH_BITS):
+                weights[bit] += 1 if (h >> bit) & 1 else -1
+        value = 0
+        for bit, weight in enumerate(weights):
+            if weight > 0:
+                value |= 1 << bit
+        return value
+
+    def _find_near(self, scope: str, simhash: int, own_entries: List[_IndexEntry]) -> Optional[_IndexEntry]:
+        """Matchable indexed entry within max_hamming_distance of simhash, if any."""
+        for key in self._band_keys(scope, simhash):
+            for entry in self._bands.get(key, ()):
+                if (bin(entry.simhash ^ simhash).count('1') <= self.max_hamming_distance
+                        and self._matchable(entry, own_entries)):
+                    return entry
+        return None
+
+    @staticmethod
+    def _matchable(entry: _IndexEntry, own_entries: List[_IndexEntry]) -> bool:
+        """Committed entries match everywhere; uncommitted ones only in their own document."""
+        return entry.committed or any(entry is own for own in own_entries)
+
+    def _band_keys(self, scope: str, simhash: int) -> List[Tuple[str, int, int]]:
+        return [
+            (scope, band, (simhash >> (band * _BAND_BITS)) & _BAND_MASK)
+            for band in range(_SIMHASH_BANDS)
+        ]
+
+    def _add(self, scope: str, entry: _IndexEntry) -> bool:
+        """Index an entry; False once max_entries or max_index_mb is reached."""
+        stale = self._exact.get((scope, entry.digest))
+        if stale is not None:
+            # Left uncommitted by a document whose result was never committed
+            self._remove(scope, stale)
+        if len(self._exact) >= self.max_entries or self._index_bytes + entry.nbytes > self.max_index_bytes:
+            self.stats.chunks_not_indexed += 1
+            return False
+        self._exact[(scope, entry.digest)] = entry
+        self._index_bytes += entry.nbytes
+        if self.near_duplicates:
+            for key in self._band_keys(scope, entry.simhash):
+                self._bands.setdefault(key, []).append(entry)
+        return True
+
+    def _is_indexed(self, scope: str, entry: _IndexEntry) -> bool:
+        return self._exact.get((scope, entry.digest)) is entry
+
+    def _store_vectors(self, entry: _IndexEntry, dense: List[float], sparse: Optional[Dict[str, Any]]) -> None:
+        """Keep an indexed entry's vectors for reuse, counting them against the memory bound."""
+        entry.dense = array('f', dense)
+        entry.sparse = sparse
+        nbytes = _ENTRY_OVERHEAD_BYTES + entry.dense.itemsize * len(entry.dense)
+        if sparse:
+            nbytes += _SPARSE_BYTES_PER_VALUE * len(sparse.get('indices', ()))
+        self._index_bytes += nbytes - entry.nbytes
+        entry.nbytes = nbytes
+
+    def _remove(self, scope: str, entry: _IndexEntry) -> None:
+        """Drop an entry from the index (if it was indexed)."""
+        if self._is_indexed(scope, entry):
+            del self._exact[(scope, entry.digest)]
+            self._index_bytes -= entry.nbytes
+        for key in self._band_keys(scope, entry.simhash):
+            bucket = self._bands.get(key)
+            if bucket and entry in bucket:
+                bucket.remove(entry)
@@ -0,0 +1,292 @@
+"""
+Prefetching downloader for document processing loops
+
+Parsing a document cannot start until its bytes are downloaded, and for Dropbox
+sources every download is a full network round trip. The DocumentPrefetcher
+downloads the next few documents of a processing loop on background threads
+while the current one is parsed, holding finished downloads in memory up to a
+byte budget.
+
+A download whose size is known up front (submit's size_hint, e.g. the size
+recorded by discovery) reserves its share of the budget before it starts; when
+the budget is taken it waits until earlier documents are consumed, so memory
+stays bounded by the budget plus at most the next document in order. Downloads
+of unknown size are checked after they finish and spooled to a temporary file
+when over the budget; the consumer then gets that spool file as a
+SpooledDocument rather than reading it back into memory.
+
+Downloads the source client already returns as a SpooledDocument (large Dropbox
+files) are on disk and pass through untouched, without counting against the
+memory budget.
+
+Download errors are captured and re-raised by PrefetchedDocument.content(), so
+callers see them at the same point (and with the same exception) as an inline
+download.
+"""
+
+import itertools
+import logging
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Iterable, Iterator, Optional, Set, Tuple, TypeVar
+
+from src.utils.spooled_document import DocumentContent, SpooledDocument, release_content, spooled_path
+
+T = TypeVar("T")
+
+DEFAULT_PREFETCH_DEPTH = 4
+DEFAULT_PREFETCH_MEMORY_MB = 128
+
+
+class PrefetchedDocument:
+    """A download started ahead of time; content() waits for it and hands over the bytes"""
+
+    def __init__(self, prefetcher: "DocumentPrefetcher", path: str, sequence: int,
+                 future: "Future[Tuple[Optional[DocumentContent], Optional[str], int]]"):
+        self.path = path
+        self._prefetcher = prefetcher
+        self._sequence = sequence
+        self._future = future
+        self._consumed = False
+
+    def content(self) -> DocumentContent:
+        """
+        Document bytes, or a SpooledDocument for downloads held on disk (blocks until it finishes).
+
+        Raises:
+            Whatever the download function raised for this document
+        """
+        if self._consumed:
+            raise RuntimeError(f"Prefetched content already consumed: {self.path}")
+        self._consumed = True
+        try:
+            data, spool_path, size = self._future.result()
+        except BaseException:
+            self._prefetcher._forget(self._sequence)
+            raise
+        return self._prefetcher._take(self._sequence, data, spool_path, size)
+
+    def discard(self) -> None:
+        """Drop the download without reading it (frees its memory or spool file)."""
+        if self._consumed:
+            return
+        self._consumed = True
+        if self._future.cancel():
+            self._prefetcher._forget(self._sequence)
+            return
+        try:
+            data, spool_path, size = self._future.result()
+        except Exception:
+            self._prefetcher._forget(self._sequence)
+            return
+        self._prefetcher._release(self._sequence, data, spool_path)
+
+
+class DocumentPrefetcher:
+    """Downloads upcoming documents concurrently into a bounded memory/disk spool"""
+
+    def __init__(self, download_fn: Callable[..., bytes], depth: int = DEFAULT_PREFETCH_DEPTH,
+                 memory_budget_mb: float = DEFAULT_PREFETCH_MEMORY_MB, max_workers: Optional[int] = None,
+                 spool_dir: Optional[str] = None):
+        """
+        Initialize prefetcher.
+
+        Args:
+            download_fn: Called as download_fn(path, **kwargs) on a worker thread; must be thread-safe
+            depth: Documents downloaded ahead of the one being processed
+            memory_budget_mb: Downloaded bytes held in memory; downloads with a size hint wait
+                              for room, others spool to disk when over it
+            max_workers: Concurrent downloads (default: depth)
+            spool_dir: Directory for spool files (default: system temp dir)
+        """
+        self.download_fn = download_fn
+        self.depth = max(1, depth)
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.spool_dir = spool_dir
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or self.depth,
+                                            thread_name_prefix="prefetch")
+        self._lock = threading.Condition()
+        self._memory_bytes = 0
+        # Submission sequence numbers not yet consumed or discarded, and the bytes
+        # reserved or held in memory for each
+        self._outstanding: Set[int] = set()
+        self._held: Dict[int, int] = {}
+        self._sequence = itertools.count()
+        self.stats = {"prefetched": 0, "spooled": 0, "bytes": 0, "failed": 0, "waited": 0}
+
+    def submit(self, path: str, size_hint: Optional[int] = None, **kwargs) -> PrefetchedDocument:
+        """
+        Start downloading a document in the background.
+
+        Documents should be consumed (or discarded) in submission order: a download
+        waiting for memory budget only waits for documents submitted before it.
+
+        Args:
+            path: Path passed to download_fn
+            size_hint: Expected size in bytes, reserved against the memory budget before
+                       the download starts (None: checked once the download finishes)
+            **kwargs: Extra keyword arguments for download_fn
+
+        Returns:
+            PrefetchedDocument whose content() returns the document
+        """
+        with self._lock:
+            sequence = next(self._sequence)
+            self._outstanding.add(sequence)
+        future = self._executor.submit(self._download, sequence, path, size_hint, kwargs)
+        return PrefetchedDocument(self, path, sequence, future)
+
+    def iterate(self, items: Iterable[T],
+                request_fn: Callable[[T], Optional[Tuple[str, dict]]]) -> Iterator[Tuple[T, Optional[PrefetchedDocument]]]:
+        """
+        Yield items in order, each with its download already started depth items ahead.
+
+        Args:
+            items: Work items (consumed lazily, at most depth ahead)
+            request_fn: Item -> (path, download kwargs) or (path, download kwargs, size hint),
+                        or None to not download the item
+
+        Yields:
+            (item, PrefetchedDocument or None)
+        """
+        pending: Deque[Tuple[T, Optional[PrefetchedDocument]]] = deque()
+        iterator = iter(items)
+        exhausted = False
+        current = None
+        try:
+            while True:
+                while not exhausted and len(pending) <= self.depth:
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    request = request_fn(item)
+                    pending.append((item, self.submit(request[0], *request[2:], **request[1]) if request else None))
+                if not pending:
+                    return
+                current = pending.popleft()
+                yield current
+                # Frees the budget even if the consumer never read the content
+                if current[1] is not None:
+                    current[1].discard()
+        finally:
+            if current is not None and current[1] is not None:
+                current[1].discard()
+            for _, prefetched in pending:
+                if prefetched is not None:
+                    prefetched.discard()
+
+    def close(self) -> None:
+        """Stop the download threads (waits for downloads in flight)."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "DocumentPrefetcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _download(self, sequence: int, path: str, size_hint: Optional[int],
+                  kwargs: dict) -> Tuple[Optional[DocumentContent], Optional[str], int]:
+        """Worker thread: reserve budget, download, and keep in memory or spool."""
+        reserved = self._reserve(sequence, size_hint or 0)
+        try:
+            data = self.download_fn(path, **kwargs)
+        except Exception:
+            with self._lock:
+                self.stats["failed"] += 1
+            self._unhold(sequence)
+            raise
+        size = len(data) if data else 0
+        with self._lock:
+            self.stats["prefetched"] += 1
+            self.stats["bytes"] += size
+            others = self._memory_bytes - self._held.pop(sequence, 0)
+            on_disk = spooled_path(data) is not None
+            if on_disk:
+                self.stats["spooled"] += 1
+            # A reservation made for this document is honoured even if it was granted over the budget
+            in_memory = not on_disk and (size <= reserved or others + size <= self.memory_budget_bytes)
+            if in_memory:
+                self._held[sequence] = size
+            self._memory_bytes = others + (size if in_memory else 0)
+            self._lock.notify_all()
+        if in_memory or on_disk:
+            # Spooled by the source: hand over as is, outside the memory budget
+            return data, None, size
+
+        fd, spool_path = tempfile.mkstemp(prefix="prefetch_", suffix=os.path.splitext(path)[1],
+                                          dir=self.spool_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+        except Exception:
+            os.unlink(spool_path)
+            raise
+        with self._lock:
+            self.stats["spooled"] += 1
+        return None, spool_path, size
+
+    def _reserve(self, sequence: int, size: int) -> int:
+        """
+        Reserve size bytes of the memory budget for a download, waiting while it does not fit.
+
+        Only documents submitted earlier are waited for (they are consumed first), so the
+        earliest outstanding document always proceeds, even past the budget: memory stays
+        within the budget plus that one document.
+        """
+        if not size:
+            return 0
+        with self._lock:
+            waited = False
+            while (self._memory_bytes + size > self.memory_budget_bytes
+                   and any(earlier < sequence for earlier in self._outstanding)):
+                waited = True
+                self._lock.wait()
+            if waited:
+                self.stats["waited"] += 1
+            self._held[sequence] = size
+            self._memory_bytes += size
+        return size
+
+    def _take(self, sequence: int, data: Optional[DocumentContent], spool_path: Optional[str],
+              size: int) -> DocumentContent:
+        self._forget(sequence)
+        if spool_path is None:
+            return data
+        # The consumer owns the spool file from here (parsers read it by path)
+        return SpooledDocument(spool_path, size)
+
+    def _release(self, sequence: int, data: Optional[DocumentContent], spool_path: Optional[str]) -> None:
+        if spool_path is not None:
+            try:
+                os.unlink(spool_path)
+            except OSError:
+                pass
+        else:
+            release_content(data)
+        self._forget(sequence)
+
+    def _unhold(self, sequence: int) -> None:
+        """Return a document's reserved or held bytes to the budget."""
+        with self._lock:
+            self._memory_bytes -= self._held.pop(sequence, 0)
+            self._lock.notify_all()
+
+    def _forget(self, sequence: int) -> None:
+        """A document was consumed or discarded: later downloads no longer wait for it."""
+        with self._lock:
+            self._outstanding.discard(sequence)
+            self._memory_bytes -= self._held.pop(sequence, 0)
+            self._lock.notify_all()
+
+    def summary(self) -> str:
+        """One-line human readable summary."""
+        s = self.stats
+        return (f"prefetch: {s['prefetched']} documents ({s['bytes'] / 1024 / 1024:.1f} MB) downloaded ahead, "
+                f"{s['spooled']} spooled to disk, {s['waited']} waited for memory, {s['failed']} failed")
@@ -74,6 +74,7 @@ except ImportError:
     def is_mistral_available() -> bool:  # type: ignore[no-redef]
         return False
 from chunking.semantic_chunker import SemanticChunker, Chunk
+from src.utils.spooled_document import release_content
 # DiscoveryCache was archived in Dec 2025 - discovery now uses DiscoveryPersistence
 # Setting DiscoveryCache to None disables the old caching system
 DiscoveryCache = None
@@ -189,6 +190,8 @@ class DocumentProcessor:
             self.parser_backend = "pdfplumber"
         
         self.chunker = SemanticChunker(max_chunk_size=max_chunk_size, overlap_size=chunk_overlap)
+        self.deduplicator = None  # Optional ChunkDeduplicator (see set_deduplicator)
+        self.prefetcher = None  # Optional DocumentPrefetcher (see set_prefetcher)
         
         # Discovery cache system
         self.enable_discovery_cache = enable_discovery_cache
@@ -207,6 +210,8 @@ class DocumentProcessor:
             "documents_failed": 0,
             "documents_skipped": 0,
             "total_chunks_created": 0,
+            "chunks_deduplicated": 0,
+            "embeddings_saved": 0,
             "total_processing_time": 0.0,
             "total_size_processed_mb": 0.0,
             "batch_requests_collected": 0,
@@ -357,8 +362,13 @@ class DocumentProcessor:
         
         return optimized_dict
 
-    def process_document(self, doc_metadata: DocumentMetadata, namespace: str = "documents") -> Dict[str, Any]:
-        """Process a single document through the complete pipeline"""
+    def process_document(self, doc_metadata: DocumentMetadata, namespace: str = "documents",
+                         prefetched=None) -> Dict[str, Any]:
+        """Process a single document through the complete pipeline
+        
+        Args:
+            prefetched: Optional PrefetchedDocument already downloading this document
+        """
         
         start_time = time.time()
         result = {
@@ -369,6 +379,7 @@ class DocumentProcessor:
             "errors": [],
             "metadata": asdict(doc_metadata)
         }
+        content = None
         
         try:
             self.logger.info(f"Starting processing: {doc_metadata.path}")
@@ -380,9 +391,13 @@ class DocumentProcessor:
                 self.stats["documents_skipped"] += 1
                 return result
             
-            # Step 2: Download document from Dropbox
-            self.logger.debug(f"Downloading document: {doc_metadata.path}")
-            content = self.dropbox.download_document(doc_metadata.path)
+            # Step 2: Download document from Dropbox (or take the prefetched bytes);
+            # large files come back as a SpooledDocument that parsers read by path
+            if prefetched is not None:
+                content = prefetched.content()
+            else:
+                self.logger.debug(f"Downloading document: {doc_metadata.path}")
+                content = self.dropbox.download_document(doc_metadata.path)
             
             # Step 2.5: Extract email metadata for .msg files
             if doc_metadata.file_type.lower() == '.msg':
@@ -602,8 +617,32 @@ class DocumentProcessor:
             # Extract texts for embedding
             chunk_texts = [chunk['text'] for chunk in chunk_data]
             
-            # Use Pinecone's embedding service for correct dimensions
-            embeddings_result = self.pinecone._generate_embeddings(chunk_texts)
+            # Use Pinecone's embedding service for correct dimensions; dense vectors the
+            # chunker already computed (semantic chunking) are reused instead of re-embedded
+            precomputed_dense = [getattr(chunk, 'embedding', None) for chunk in chunks]
+            
+            def embed(indices):
+                return self.pinecone.generate_chunk_embeddings(
+                    [chunk_texts[i] for i in indices], [precomputed_dense[i] for i in indices]
+                )
+            
+            # Duplicate chunks seen earlier in this run (same deal, or this document when it
+            # has no deal) reuse or skip embeddings
+            keep = [True] * len(chunk_texts)
+            dedup = None
+            if self.deduplicator is not None:
+                dedup = self.deduplicator.embed_chunks(
+                    chunk_texts, embed, scope=doc_metadata.deal_id or None, document_id=doc_metadata.path
+                )
+                embeddings_result = {
+                    'dense_embeddings': dedup.dense_embeddings,
+                    'sparse_embeddings': dedup.sparse_embeddings,
+                }
+                keep = dedup.keep
+                self.stats["chunks_deduplicated"] += dedup.duplicates
+                self.stats["embeddings_saved"] += len(chunk_texts) - dedup.embedded
+            else:
+                embeddings_result = embed(list(range(len(chunk_texts))))
             
             # Prepare chunks with Pinecone embeddings
             embedded_chunks = []
@@ -613,6 +652,9 @@ class DocumentProcessor:
             doc_metadata_dict['parser_backend'] = self.parser_backend  # Add parser backend info
             
             for i, chunk in enumerate(chunk_data):
+                if not keep[i]:
+                    continue  # Duplicate skipped by dedup policy
+                
                 # Create merged metadata with only essential chunk fields + our 27 optimized fields
                 chunk_metadata = chunk['metadata']
                 
@@ -645,7 +687,19 @@ class DocumentProcessor:
             
             # Step 8: Upload to Pinecone
             self.logger.debug(f"Uploading to Pinecone: {doc_metadata.path}")
-            upload_success = self.pinecone.upsert_chunks(embedded_chunks, namespace)
+            try:
+                upload_success = self.pinecone.upsert_chunks(embedded_chunks, namespace) if embedded_chunks else True
+            except Exception:
+                if dedup is not None:
+                    self.deduplicator.discard(dedup)
+                raise
+            
+            if dedup is not None:
+                # Only chunks that reached the index may be skipped by later documents
+                if upload_success:
+                    self.deduplicator.commit(dedup)
+                else:
+                    self.deduplicator.discard(dedup)
             
             if not upload_success:
                 result["errors"].append("Failed to upload chunks to Pinecone")
@@ -701,6 +755,8 @@ class DocumentProcessor:
                 "processing_time": processing_time
             })
             self.stats["documents_failed"] += 1
+        finally:
+            release_content(content)
         
         return result
     
@@ -813,13 +869,21 @@ class DocumentProcessor:
                 documents = documents[:max_documents]
                 self.logger.info(f"Limited to {len(documents)} documents")
             
-            # Process each document
-            for i, doc_metadata in enumerate(documents, 1):
+            # Process each document (downloading the next ones ahead when a prefetcher is set)
+            if self.prefetcher is not None:
+                queued = self.prefetcher.iterate(
+                    documents,
+                    lambda doc: (doc.path, {}) if self.converter.can_process(doc.path, doc.name) else None
+                )
+            else:
+                queued = ((doc, None) for doc in documents)
+            
+            for i, (doc_metadata, prefetched) in enumerate(queued, 1):
                 self.logger.info(f"Processing document {i}/{len(documents)}: {doc_metadata.name}")
                 
                 try:
                     # Process individual document
-                    doc_result = self.process_document(doc_metadata, namespace)
+                    doc_result = self.process_document(doc_metadata, namespace, prefetched=prefetched)
                     results["documents"].append(doc_result)
                     
                     # Update summary
@@ -1081,4 +1145,14 @@ class DocumentProcessor:
     def set_chunker(self, chunker):
         """Sets the chunking strategy for the processor."""
         self.logger.info(f"Setting chunker to: {type(chunker).__name__}")
-        self.chunker = chunker 
\ No newline at end of file
+        self.chunker = chunker
+    
+    def set_deduplicator(self, deduplicator):
+        """Sets the cross-document chunk deduplicator used before embedding."""
+        self.logger.info(f"Setting chunk dedup policy to: {deduplicator.policy}")
+        self.deduplicator = deduplicator
+    
+    def set_prefetcher(self, prefetcher):
+        """Sets the DocumentPrefetcher that downloads upcoming documents during process_folder."""
+        self.logger.info(f"Prefetching {prefetcher.depth} documents ahead")
+        self.prefetcher = prefetcher 
\ No newline at end of file
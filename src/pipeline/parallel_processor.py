@@ -15,11 +15,14 @@ from __future__ import annotations
 
 import multiprocessing as mp
 from multiprocessing import Process, Queue, Value
+import itertools
+import math
 import signal
 import time
 import os
 import sys
-from typing import List, Dict, Any, Optional
+from collections import deque
+from typing import Callable, List, Dict, Any, Optional
 
 # Processing constants (must be defined before use in function defaults)
 DEFAULT_MAX_CHUNK_SIZE: int = 1500
@@ -29,7 +32,12 @@ WORKER_QUEUE_TIMEOUT_SECONDS: float = 1.0
 PROGRESS_UPDATE_INTERVAL: int = 10
 REDACTION_TIMEOUT_SECONDS: int = 300  # Hard timeout for redaction per document (OpenAI + span logic)
 CHUNKING_TIMEOUT_SECONDS: int = 300  # Hard timeout for chunking per document (table scanning can be expensive)
-CHUNKING_TIMEOUT_SECONDS_SPREADSHEETS: int = 60  # Spreadsheets are number-dense; fail fast + fallback chunking
+CHUNKING_TIMEOUT_SECONDS_SPREADSHEETS: int = 60  # Safety net only: spreadsheets stream row-by-row into table chunks
+STREAM_UPSERT_BATCH_CHUNKS: int = 64  # Streamed spreadsheet chunks embedded/upserted per batch
+
+from src.pipeline.document_prefetcher import (
+    DEFAULT_PREFETCH_DEPTH, DEFAULT_PREFETCH_MEMORY_MB, DocumentPrefetcher
+)
 
 
 def _truncate_text_for_metadata(text: str, max_bytes: int = METADATA_TEXT_MAX_BYTES) -> str:
@@ -106,6 +114,8 @@ class WorkerStats:
     documents_processed: int = 0
     documents_failed: int = 0
     total_chunks: int = 0
+    chunks_deduplicated: int = 0
+    embeddings_saved: int = 0
     total_time: float = 0.0
     errors: List[str] = field(default_factory=list)
 
@@ -118,7 +128,9 @@ def worker_initializer(
     openai_api_key: str,
     source_path: str,
     docling_kwargs: Optional[Dict[str, Any]] = None,
-    redaction_service: Optional[Any] = None
+    redaction_service: Optional[Any] = None,
+    max_chunk_tokens: Optional[int] = None,
+    dedup_policy: str = "off"
 ) -> Dict[str, Any]:
     """
     Initialize worker-local resources.
@@ -139,6 +151,7 @@ def worker_initializer(
     from src.connectors.local_filesystem_client import LocalFilesystemClient
     from src.chunking.semantic_chunker import SemanticChunker
     from src.parsers.document_converter import DocumentConverter
+    from src.pipeline.chunk_deduplicator import ChunkDeduplicator
     
     # Select parser based on backend
     if parser_backend == "docling":
@@ -189,7 +202,11 @@ def worker_initializer(
         "worker_id": worker_id,
         "parser": parser,
         "parser_backend": parser_backend,
-        "chunker": SemanticChunker(max_chunk_size=DEFAULT_MAX_CHUNK_SIZE, overlap_size=DEFAULT_CHUNK_OVERLAP),
+        "chunker": SemanticChunker(
+            max_chunk_size=DEFAULT_MAX_CHUNK_SIZE,
+            overlap_size=DEFAULT_CHUNK_OVERLAP,
+            max_chunk_tokens=max_chunk_tokens
+        ),
         "converter": DocumentConverter(),
         "pinecone": PineconeDocumentClient(
             api_key=pinecone_api_key,
@@ -200,6 +217,9 @@ def worker_initializer(
             openai_api_key=openai_api_key
         ),
         "redaction_service": redaction_service,  # PII redaction service
+        # Per-worker chunk fingerprint index (duplicates reuse or skip embeddings); it is
+        # not shared, so duplicates that land on different workers are not matched
+        "deduplicator": ChunkDeduplicator(policy=dedup_policy) if dedup_policy != "off" else None,
         "stats": WorkerStats(worker_id=worker_id)
     }
 
@@ -349,7 +369,8 @@ def _timeout_context(seconds: int):
 def process_single_document(
     doc_data: DocumentData,
     worker_ctx: Dict[str, Any],
-    namespace: str
+    namespace: str,
+    prefetched: Optional[Any] = None
 ) -> ProcessingResult:
     """
     Process a single document using worker-local resources.
@@ -365,6 +386,9 @@ def process_single_document(
     5. Generate embeddings via Pinecone
     6. Upsert to Pinecone
     
+    Args:
+        prefetched: Optional PrefetchedDocument already downloading this document
+    
     Returns:
         ProcessingResult with success status, chunks created, timing, errors
     """
@@ -412,12 +436,34 @@ def process_single_document(
             result["errors"].append(f"Unsupported file type: {file_type}")
             return result
         
-        # Step 2: Download content
-        content = filesystem.download_file(file_path)
+        # Step 2: Download content (prefetched by the worker loop, or inline; discovery's
+        # absolute path, when recorded, skips resolution)
+        if prefetched is not None:
+            content = prefetched.content()
+        else:
+            content = filesystem.download_file(file_path, **_download_kwargs(doc_data))
         if not content:
             result["errors"].append(f"Failed to download: {file_path}")
             return result
         
+        # Spreadsheets without redaction stream rows straight into table chunks
+        # (redaction needs the full text, so it keeps the text path below)
+        spreadsheet_ext = _spreadsheet_extension(file_path, file_name)
+        if spreadsheet_ext and not worker_ctx.get("redaction_service"):
+            streamed = _stream_spreadsheet(
+                converter, chunker, pinecone, content, spreadsheet_ext, file_name, file_type, file_path,
+                build_metadata_dict(doc_data), namespace, worker_ctx.get("deduplicator"), worker_id
+            )
+            if streamed is not None:
+                result.update(streamed["dedup"])
+                if streamed["success"]:
+                    result["success"] = True
+                    result["chunks_created"] = streamed["chunks_created"]
+                else:
+                    result["errors"].append(streamed["error"])
+                result["processing_time"] = time.time() - start_time
+                return result
+        
         # Step 3: Convert to processable format
         # Pass file_name for extension detection when file_path lacks extension (Salesforce exports)
         processed_content, content_type = converter.convert_to_processable_content(
@@ -545,34 +591,13 @@ def process_single_document(
             result["errors"].append("No chunks created from document")
             return result
         
-        # Step 6: Generate embeddings
-        chunk_texts = [c.text for c in chunks]
-        embeddings = pinecone._generate_embeddings(chunk_texts)
-        
-        # Step 7: Prepare for upsert with text field in metadata (truncated to 37KB)
-        embedded_chunks = []
-        for i, chunk in enumerate(chunks):
-            # Truncate text to 37KB for metadata (Pinecone has 40KB limit)
-            chunk_text = chunk.text
-            truncated_text = _truncate_text_for_metadata(chunk_text, max_bytes=37 * 1024)
-            
-            chunk_meta = {
-                **metadata_dict,
-                "chunk_index": i,
-                "text": truncated_text,  # Truncated text field (37KB max) for metadata searchability
-            }
-            embedded_chunks.append({
-                "id": f"{file_path}_{i}",
-                "text": chunk.text,
-                "dense_embedding": embeddings["dense_embeddings"][i],
-                "sparse_embedding": embeddings["sparse_embeddings"][i],
-                "metadata": chunk_meta
-            })
-        
-        # Step 8: Upsert to Pinecone
-        success = pinecone.upsert_chunks(embedded_chunks, namespace)
+        # Steps 6-8: Embed (deduplicated) and upsert
+        upsert = _embed_and_upsert_chunks(
+            chunks, pinecone, metadata_dict, file_path, namespace, worker_ctx.get("deduplicator")
+        )
+        result.update(upsert["dedup"])
         
-        if success:
+        if upsert["success"]:
             result["success"] = True
             result["chunks_created"] = len(chunks)
             
@@ -601,6 +626,270 @@ def process_single_document(
     return result
 
 
+def _download_kwargs(doc_data: DocumentData) -> Dict[str, Any]:
+    """Keyword arguments for LocalFilesystemClient.download_file from a discovery dict."""
+    return {"full_source_path": doc_data.get("source_metadata", {}).get("full_source_path")}
+
+
+def _next_documents(document_queue: Queue, pending: deque, depth: int,
+                    prefetch_fn: Callable[[DocumentData], Optional[Any]]) -> bool:
+    """
+    Top up a worker's lookahead from the shared queue.
+    
+    Blocks (up to WORKER_QUEUE_TIMEOUT_SECONDS) only when nothing is pending, so
+    documents already downloading are never held up waiting for more work.
+    
+    Args:
+        document_queue: Shared document queue
+        pending: (doc_data, PrefetchedDocument or None) entries, appended in queue order
+        depth: Documents to hold beyond the next one to process (0 = no lookahead)
+        prefetch_fn: Starts a document's download (None when not prefetched)
+    
+    Returns:
+        False once the poison pill (None) was received
+    """
+    while len(pending) <= depth:
+        try:
+            if pending:
+                doc_data = document_queue.get_nowait()
+            else:
+                doc_data = document_queue.get(timeout=WORKER_QUEUE_TIMEOUT_SECONDS)
+        except mp.queues.Empty:
+            return True
+        if doc_data is None:
+            return False
+        pending.append((doc_data, prefetch_fn(doc_data)))
+    return True
+
+
+def _spreadsheet_extension(file_path: str, file_name: str) -> Optional[str]:
+    """Return the spreadsheet extension of a document, or None if it isn't one."""
+    from src.parsers.document_converter import SPREADSHEET_EXTENSIONS
+    
+    _, ext = os.path.splitext(file_path)
+    if not ext and file_name:
+        _, ext = os.path.splitext(file_name)
+    ext = ext.lower()
+    return ext if ext in SPREADSHEET_EXTENSIONS else None
+
+
+def _stream_spreadsheet(
+    converter: Any,
+    chunker: Any,
+    pinecone: Any,
+    content: bytes,
+    extension: str,
+    file_name: str,
+    file_type: str,
+    file_path: str,
+    metadata_dict: Dict[str, Any],
+    namespace: str,
+    deduplicator: Optional[Any],
+    worker_id: Optional[int],
+) -> Optional[Dict[str, Any]]:
+    """
+    Stream spreadsheet rows into header-repeating table chunks, embedding and
+    upserting them every STREAM_UPSERT_BATCH_CHUNKS chunks.
+    
+    Rows go straight from the reader into chunks and out to Pinecone (no full-workbook
+    text, no row cap, no full chunk list). CHUNKING_TIMEOUT_SECONDS_SPREADSHEETS bounds
+    the time spent producing chunks; embedding/upsert time does not count against it.
+    
+    If the stream fails after some batches were upserted, the document's vectors
+    are deleted again so the index never holds a partial spreadsheet; the error
+    says whether that rollback succeeded.
+    
+    Returns:
+        Dict with "success", "chunks_created" and "dedup" counters, or None if the
+        stream failed before anything was upserted (the caller then uses the text path)
+    """
+    chunk_start = time.time()
+    chunk_iter = chunker.chunk_table_stream(
+        converter.iter_spreadsheet_tables(content, extension),
+        {
+            "document_name": file_name,
+            "file_type": file_type,
+            "document_path": file_path,
+        },
+    )
+    
+    chunking_elapsed = 0.0
+    chunks_created = 0
+    dedup_counts = {"chunks_deduplicated": 0, "embeddings_saved": 0}
+    upserted_dedup = []  # Committed dedup results, forgotten again on rollback
+    while True:
+        # Only chunk production counts against the spreadsheet chunking timeout
+        try:
+            timeout = CHUNKING_TIMEOUT_SECONDS_SPREADSHEETS
+            if timeout > 0:
+                remaining = timeout - chunking_elapsed
+                if remaining <= 0:
+                    raise TimeoutError(f"Stage timed out after {timeout} seconds")
+                timeout = max(1, math.ceil(remaining))
+            batch_start = time.time()
+            with _timeout_context(timeout):
+                batch = list(itertools.islice(chunk_iter, STREAM_UPSERT_BATCH_CHUNKS))
+            chunking_elapsed += time.time() - batch_start
+        except Exception as e:
+            if not chunks_created:
+                if worker_id is not None:
+                    print(f"[Worker {worker_id}] ⚠️ Streaming spreadsheet chunking failed for '{file_name}': {e}; using text path", flush=True)
+                return None
+            # Earlier batches are already in the index; re-chunking via the text path
+            # would leave them mixed with differently split chunks
+            error = f"Streaming spreadsheet chunking failed after {chunks_created} chunks: {e}"
+            for dedup in upserted_dedup:
+                deduplicator.discard(dedup)
+            return {
+                "success": False,
+                "chunks_created": 0,
+                "dedup": dedup_counts,
+                "error": _rollback_streamed_chunks(pinecone, file_path, namespace, chunks_created, error, worker_id),
+            }
+        if not batch:
+            break
+        
+        upsert = _embed_and_upsert_chunks(
+            batch, pinecone, metadata_dict, file_path, namespace, deduplicator, index_offset=chunks_created
+        )
+        for key, value in upsert["dedup"].items():
+            dedup_counts[key] += value
+        if not upsert["success"]:
+            # The failed batch may have been partly written, so roll it back too
+            for dedup in upserted_dedup:
+                deduplicator.discard(dedup)
+            return {
+                "success": False,
+                "chunks_created": 0,
+                "dedup": dedup_counts,
+                "error": _rollback_streamed_chunks(
+                    pinecone, file_path, namespace, chunks_created + len(batch), "Pinecone upsert failed", worker_id
+                ),
+            }
+        chunks_created += len(batch)
+        if upsert["dedup_result"] is not None:
+            upserted_dedup.append(upsert["dedup_result"])
+    
+    if not chunks_created:
+        return None
+    
+    if worker_id is not None:
+        print(
+            f"[Worker {worker_id}] ✂️ Streamed spreadsheet: name='{file_name}' chunks={chunks_created} "
+            f"chunking={chunking_elapsed:.2f}s elapsed={time.time() - chunk_start:.2f}s",
+            flush=True,
+        )
+    return {"success": True, "chunks_created": chunks_created, "dedup": dedup_counts}
+
+
+def _rollback_streamed_chunks(pinecone: Any, file_path: str, namespace: str, chunk_count: int,
+                              error: str, worker_id: Optional[int]) -> str:
+    """
+    Delete the first chunk_count vectors of a partly streamed document.
+    
+    Returns:
+        The error message, extended with the rollback outcome
+    """
+    ids = [f"{file_path}_{i}" for i in range(chunk_count)]
+    if not ids:
+        return error
+    if pinecone.delete_by_ids(ids, namespace=namespace):
+        return f"{error}; rolled back {len(ids)} upserted chunks"
+    if worker_id is not None:
+        print(f"[Worker {worker_id}] ❌ Rollback failed: up to {len(ids)} chunks of '{file_path}' remain in '{namespace}'", flush=True)
+    return f"{error}; rollback failed, up to {len(ids)} chunks remain in the index"
+
+
+def _embed_and_upsert_chunks(
+    chunks: List[Any],
+    pinecone: Any,
+    metadata_dict: Dict[str, Any],
+    file_path: str,
+    namespace: str,
+    deduplicator: Optional[Any] = None,
+    index_offset: int = 0,
+) -> Dict[str, Any]:
+    """
+    Generate embeddings for chunks and upsert them to Pinecone.
+    
+    With a deduplicator, chunks already seen in this worker's run (within the same
+    deal, or the same document when it has no deal) reuse the earlier vectors or are
+    skipped, depending on its policy. The chunks are recorded in its index only if
+    the upsert succeeds.
+    index_offset is the document-level index of chunks[0] when a document is
+    upserted in several batches (it keeps vector ids and chunk_index unique).
+    
+    Returns:
+        Dict with "success" (upsert succeeded), "dedup" counters for the result and
+        "dedup_result" (the DedupResult, or None without a deduplicator)
+    """
+    chunk_texts = [c.text for c in chunks]
+    precomputed_dense = [getattr(c, "embedding", None) for c in chunks]
+    
+    def embed(indices: List[int]) -> Dict[str, Any]:
+        # Reuses dense vectors computed during chunking, if any
+        return pinecone.generate_chunk_embeddings(
+            [chunk_texts[i] for i in indices], [precomputed_dense[i] for i in indices]
+        )
+    
+    dedup = None
+    if deduplicator is not None:
+        dedup = deduplicator.embed_chunks(
+            chunk_texts, embed, scope=metadata_dict.get("deal_id") or None, document_id=file_path
+        )
+        embeddings = {
+            "dense_embeddings": dedup.dense_embeddings,
+            "sparse_embeddings": dedup.sparse_embeddings,
+        }
+        keep = dedup.keep
+        dedup_counts = {
+            "chunks_deduplicated": dedup.duplicates,
+            "embeddings_saved": len(chunks) - dedup.embedded,
+        }
+    else:
+        embeddings = embed(list(range(len(chunks))))
+        keep = [True] * len(chunks)
+        dedup_counts = {"chunks_deduplicated": 0, "embeddings_saved": 0}
+    
+    # Prepare for upsert with text field in metadata (truncated to 37KB)
+    embedded_chunks = []
+    for i, chunk in enumerate(chunks):
+        if not keep[i]:
+            continue  # Duplicate skipped by dedup policy
+        
+        # Truncate text to 37KB for metadata (Pinecone has 40KB limit)
+        chunk_text = chunk.text
+        truncated_text = _truncate_text_for_metadata(chunk_text, max_bytes=37 * 1024)
+        
+        chunk_meta = {
+            **metadata_dict,
+            "chunk_index": index_offset + i,
+            "text": truncated_text,  # Truncated text field (37KB max) for metadata searchability
+        }
+        embedded_chunks.append({
+            "id": f"{file_path}_{index_offset + i}",
+            "text": chunk.text,
+            "dense_embedding": embeddings["dense_embeddings"][i],
+            "sparse_embedding": embeddings["sparse_embeddings"][i],
+            "metadata": chunk_meta
+        })
+    
+    # Upsert to Pinecone
+    try:
+        success = pinecone.upsert_chunks(embedded_chunks, namespace) if embedded_chunks else True
+    except Exception:
+        if dedup is not None:
+            deduplicator.discard(dedup)
+        raise
+    if dedup is not None:
+        # Skipped duplicates rely on the first copy being in the index
+        if success:
+            deduplicator.commit(dedup)
+        else:
+            deduplicator.discard(dedup)
+    return {"success": success, "dedup": dedup_counts, "dedup_result": dedup}
+
+
 def worker_main(
     worker_id: int,
     document_queue: Queue,
@@ -627,14 +916,20 @@ def worker_main(
         if config.get("enable_redaction") and config.get("client_redaction_csv"):
             try:
                 from src.redaction.client_registry import ClientRegistry
-                from src.redaction.llm_span_detector import LLMSpanDetector
+                from src.redaction.span_detector_factory import SpanDetectorFactory
                 from src.redaction.redaction_service import RedactionService
                 
-                client_registry = ClientRegistry(config["client_redaction_csv"])
-                llm_detector = LLMSpanDetector(
-                    api_key=config["openai_api_key"],
-                    model=config.get("redaction_model", "gpt-5-mini-2025-08-07")
-                )
+                # Attach to the registry loaded once by the coordinator; only fall back
+                # to parsing the CSV per worker when it wasn't provided.
+                client_registry = config.get("client_registry") or ClientRegistry(config["client_redaction_csv"])
+                llm_detector = SpanDetectorFactory.create_detector({
+                    "backend": config.get("redaction_backend", "llm"),
+                    "api_key": config["openai_api_key"],
+                    "model": config.get("redaction_model", "gpt-5-mini-2025-08-07"),
+                    "ner_engine": config.get("redaction_ner_engine"),
+                    "ner_model": config.get("redaction_ner_model"),
+                    "escalation_threshold": config.get("redaction_escalation_threshold", 0.85),
+                })
                 redaction_service = RedactionService(
                     client_registry=client_registry,
                     llm_span_detector=llm_detector,
@@ -653,29 +948,58 @@ def worker_main(
             openai_api_key=config["openai_api_key"],
             source_path=config["source_path"],
             docling_kwargs=config.get("docling_kwargs"),
-            redaction_service=redaction_service
+            redaction_service=redaction_service,
+            max_chunk_tokens=config.get("max_chunk_tokens"),
+            dedup_policy=config.get("dedup_policy", "off")
         )
         
         print(f"{worker_prefix} Ready for processing")
         
         namespace = config["namespace"]
         
+        # Download the next few queued documents while the current one is parsed
+        prefetch_depth = max(0, config.get("prefetch_depth", 0))
+        prefetcher = None
+        if prefetch_depth > 0:
+            prefetcher = DocumentPrefetcher(
+                ctx["filesystem"].download_file,
+                depth=prefetch_depth,
+                memory_budget_mb=config.get("prefetch_memory_mb", DEFAULT_PREFETCH_MEMORY_MB)
+            )
+        
+        def prefetch_fn(doc_data: DocumentData) -> Optional[Any]:
+            file_info = doc_data.get("file_info", {})
+            path = file_info.get("path", "unknown")
+            if prefetcher is None or not ctx["converter"].can_process(path, file_info.get("name", "")):
+                return None
+            return prefetcher.submit(path, file_info.get("size") or None, **_download_kwargs(doc_data))
+        
+        pending: deque = deque()
+        receiving = True
+        
         while not stop_flag.value:
+            prefetched = None
             try:
-                # Non-blocking get with timeout allows checking stop_flag
-                doc_data = document_queue.get(timeout=WORKER_QUEUE_TIMEOUT_SECONDS)
+                # Timed get (only while nothing is pending) allows checking stop_flag
+                if receiving:
+                    receiving = _next_documents(document_queue, pending, prefetch_depth, prefetch_fn)
                 
-                if doc_data is None:  # Poison pill - graceful shutdown
-                    break
+                if not pending:
+                    if receiving:
+                        continue
+                    break  # Poison pill received and lookahead drained - graceful shutdown
                 
                 # Process the document
+                doc_data, prefetched = pending.popleft()
                 doc_name = doc_data.get("file_info", {}).get("name", "unknown")
-                result = process_single_document(doc_data, ctx, namespace)
+                result = process_single_document(doc_data, ctx, namespace, prefetched)
                 
                 # Update local stats
                 if result["success"]:
                     ctx["stats"].documents_processed += 1
                     ctx["stats"].total_chunks += result.get("chunks_created", 0)
+                    ctx["stats"].chunks_deduplicated += result.get("chunks_deduplicated", 0)
+                    ctx["stats"].embeddings_saved += result.get("embeddings_saved", 0)
                 else:
                     ctx["stats"].documents_failed += 1
                     # Keep limited errors for debugging
@@ -692,6 +1016,8 @@ def worker_main(
                     "file_type": result.get("file_type", ""),
                     "success": result["success"],
                     "chunks_created": result["chunks_created"],
+                    "chunks_deduplicated": result.get("chunks_deduplicated", 0),
+                    "embeddings_saved": result.get("embeddings_saved", 0),
                     "processing_time": result["processing_time"],
                     "errors": result["errors"]
                 })
@@ -703,6 +1029,17 @@ def worker_main(
                 print(f"{worker_prefix} Error processing document: {e}")
                 # Continue processing other documents
                 continue
+            finally:
+                if prefetched is not None:
+                    prefetched.discard()
+        
+        # Documents still in the lookahead when stopped are left for --resume
+        for _, prefetched in pending:
+            if prefetched is not None:
+                prefetched.discard()
+        if prefetcher is not None:
+            prefetcher.close()
+            print(f"{worker_prefix} {prefetcher.summary()}")
         
         # Send final stats before exiting
         result_queue.put({
@@ -714,6 +1051,8 @@ def worker_main(
         print(f"{worker_prefix} Shutdown complete. "
               f"Processed: {ctx['stats'].documents_processed}, "
               f"Failed: {ctx['stats'].documents_failed}")
+        if ctx.get("deduplicator") is not None:
+            print(f"{worker_prefix} {ctx['deduplicator'].summary()}")
         
     except Exception as e:
         print(f"{worker_prefix} Fatal error: {e}")
@@ -765,6 +1104,14 @@ class ParallelDocumentProcessor:
         client_redaction_csv: Optional[str] = None,
         redaction_model: Optional[str] = None,
         enable_redaction: bool = False,
+        redaction_backend: str = "llm",
+        redaction_ner_engine: Optional[str] = None,
+        redaction_ner_model: Optional[str] = None,
+        redaction_escalation_threshold: float = 0.85,
+        max_chunk_tokens: Optional[int] = None,
+        dedup_policy: str = "off",
+        prefetch_depth: int = DEFAULT_PREFETCH_DEPTH,
+        prefetch_memory_mb: float = DEFAULT_PREFETCH_MEMORY_MB,
     ):
         self.discovery_file = Path(discovery_file)
         self.workers = min(workers, mp.cpu_count())  # Don't exceed CPU count
@@ -797,7 +1144,15 @@ class ParallelDocumentProcessor:
             "docling_kwargs": docling_kwargs,
             "client_redaction_csv": client_redaction_csv,
             "redaction_model": redaction_model or "gpt-5-mini-2025-08-07",
-            "enable_redaction": enable_redaction
+            "enable_redaction": enable_redaction,
+            "redaction_backend": redaction_backend,
+            "redaction_ner_engine": redaction_ner_engine,
+            "redaction_ner_model": redaction_ner_model,
+            "redaction_escalation_threshold": redaction_escalation_threshold,
+            "max_chunk_tokens": max_chunk_tokens,
+            "dedup_policy": dedup_policy,
+            "prefetch_depth": prefetch_depth,
+            "prefetch_memory_mb": prefetch_memory_mb,
         }
         
         # Validate configuration
@@ -817,6 +1172,8 @@ class ParallelDocumentProcessor:
         self.processed_count = 0
         self.failed_count = 0
         self.total_chunks = 0
+        self.total_chunks_deduplicated = 0
+        self.total_embeddings_saved = 0
         self.start_time: Optional[float] = None
         
         # Enhanced statistics for performance analysis
@@ -864,7 +1221,8 @@ class ParallelDocumentProcessor:
             # Setup signal handler for graceful shutdown
             self._setup_signal_handler()
             
-            # Start workers
+            # Load shared resources once, then start workers
+            self._load_client_registry()
             self._start_workers()
             
             # Feed documents and collect results
@@ -912,12 +1270,13 @@ class ParallelDocumentProcessor:
                     if part in ("ContentVersion", "ContentVersions"):
                         source_path = str(Path(*path_parts[:i]))
                         break
-            elif "ContentVersions/" in doc_path or "ContentVersion/" in doc_path:
-                # Can't infer reliably from a relative path without an explicit export root
-                source_path = os.getenv("SALESFORCE_EXPORT_ROOT") or os.getenv("EXPORT_DIR")
-            elif doc_path.startswith("/"):
-                # Absolute path - use parent directory
-                source_path = str(Path(doc_path).parent)
+            if not source_path:
+                if "ContentVersions/" in doc_path or "ContentVersion/" in doc_path:
+                    # Can't infer reliably from a relative path without an explicit export root
+                    source_path = os.getenv("SALESFORCE_EXPORT_ROOT") or os.getenv("EXPORT_DIR")
+                elif doc_path.startswith("/"):
+                    # Absolute path - use parent directory
+                    source_path = str(Path(doc_path).parent)
         
         self.config["source_path"] = source_path
         
@@ -984,6 +1343,24 @@ class ParallelDocumentProcessor:
         
         return documents
     
+    def _load_client_registry(self):
+        """
+        Load the redaction client registry once in the coordinator.
+        
+        The registry pickles to plain alias strings (compiled patterns are dropped and
+        rebuilt lazily per client), so workers receive it via their config instead of
+        each re-reading the CSV.
+        """
+        if not (self.config.get("enable_redaction") and self.config.get("client_redaction_csv")):
+            return
+        try:
+            from src.redaction.client_registry import ClientRegistry
+            registry = ClientRegistry(self.config["client_redaction_csv"])
+            self.config["client_registry"] = registry
+            print(f"🔐 Loaded client registry ({len(registry.clients)} clients) for workers")
+        except Exception as e:
+            print(f"⚠️ Failed to load client registry in coordinator, workers will load it: {e}")
+    
     def _start_workers(self):
         """Start worker processes"""
         print(f"🚀 Starting {self.workers} worker processes...")
@@ -1042,6 +1419,8 @@ class ParallelDocumentProcessor:
                 if result["success"]:
                     self.processed_count += 1
                     self.total_chunks += result["chunks_created"]
+                    self.total_chunks_deduplicated += result.get("chunks_deduplicated", 0)
+                    self.total_embeddings_saved += result.get("embeddings_saved", 0)
                 else:
                     self.failed_count += 1
                 
@@ -1217,6 +1596,9 @@ class ParallelDocumentProcessor:
         print(f"📊 Documents processed: {self.processed_count}")
         print(f"❌ Documents failed: {self.failed_count}")
         print(f"🧩 Total chunks created: {self.total_chunks}")
+        if self.config.get("dedup_policy", "off") != "off":
+            print(f"♻️  Duplicate chunks: {self.total_chunks_deduplicated} "
+                  f"({self.total_embeddings_saved} embeddings saved, policy={self.config['dedup_policy']})")
         print(f"⏱️  Total time: {elapsed/60:.1f} minutes ({elapsed/3600:.2f} hours)")
         
         if self.processed_count > 0:
@@ -1361,6 +1743,14 @@ def run_parallel_processing(
     client_redaction_csv: Optional[str] = None,
     redaction_model: Optional[str] = None,
     enable_redaction: bool = False,
+    redaction_backend: str = "llm",
+    redaction_ner_engine: Optional[str] = None,
+    redaction_ner_model: Optional[str] = None,
+    redaction_escalation_threshold: float = 0.85,
+    max_chunk_tokens: Optional[int] = None,
+    dedup_policy: str = "off",
+    prefetch_depth: int = DEFAULT_PREFETCH_DEPTH,
+    prefetch_memory_mb: float = DEFAULT_PREFETCH_MEMORY_MB,
 ) -> None:
     """
     Convenience function to run parallel processing.
@@ -1375,6 +1765,14 @@ def run_parallel_processing(
         deal_created_after: Only process documents with deal_creation_date on/after this date (YYYY-MM-DD)
         deal_created_before: Only process documents with deal_creation_date on/before this date
         docling_kwargs: Optional dict of DoclingParser initialization kwargs
+        redaction_backend: Span detector backend ("llm", "local" or "hybrid")
+        redaction_ner_engine: Local NER engine for local/hybrid ("spacy", "transformers", "onnx")
+        redaction_ner_model: Local NER model name (engine default when None)
+        redaction_escalation_threshold: Hybrid escalation score threshold
+        max_chunk_tokens: Token budget per chunk (enables token-budget chunking)
+        dedup_policy: Duplicate chunk handling before embedding ("off", "reuse", "skip")
+        prefetch_depth: Documents each worker downloads ahead of the one it is parsing (0 = off)
+        prefetch_memory_mb: Prefetched bytes each worker holds in memory before spooling to disk
     """
     processor = ParallelDocumentProcessor(
         discovery_file=discovery_file,
@@ -1383,6 +1781,10 @@ def run_parallel_processing(
         client_redaction_csv=client_redaction_csv,
         redaction_model=redaction_model,
         enable_redaction=enable_redaction,
+        redaction_backend=redaction_backend,
+        redaction_ner_engine=redaction_ner_engine,
+        redaction_ner_model=redaction_ner_model,
+        redaction_escalation_threshold=redaction_escalation_threshold,
         parser_backend=parser_backend,
         resume=resume,
         limit=limit,
@@ -1395,6 +1797,10 @@ def run_parallel_processing(
         min_size_kb=min_size_kb,
         max_size_mb=max_size_mb,
         docling_kwargs=docling_kwargs,
+        max_chunk_tokens=max_chunk_tokens,
+        dedup_policy=dedup_policy,
+        prefetch_depth=prefetch_depth,
+        prefetch_memory_mb=prefetch_memory_mb,
     )
     processor.run()
 
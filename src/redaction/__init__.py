@@ -8,11 +8,15 @@ phone numbers, and addresses from document text before chunking and embedding.
 from .redaction_context import RedactionContext, RedactionResult
 from .redaction_service import RedactionService
 from .client_registry import ClientRegistry
+from .base_span_detector import BaseSpanDetector
+from .span_detector_factory import SpanDetectorFactory
 
 __all__ = [
     'RedactionContext',
     'RedactionResult', 
     'RedactionService',
     'ClientRegistry',
+    'BaseSpanDetector',
+    'SpanDetectorFactory',
 ]
 
@@ -0,0 +1,226 @@
+"""
+Abstract base class for PERSON/ORG span detectors
+
+Defines the `detect_spans` interface used by RedactionService and the shared
+helpers (windowing, overlap merging, client ORG filtering) so LLM-backed and
+local NER backends can be swapped without touching the redaction pipeline.
+"""
+
+from abc import ABC, abstractmethod
+from typing import List, Dict, Tuple, Optional
+
+
+class BaseSpanDetector(ABC):
+    """Abstract base class for PERSON and ORG span detectors"""
+
+    # Placeholder tokens
+    PERSON_PLACEHOLDER = "<<PERSON>>"
+    ORG_PLACEHOLDER = "<<ORG>>"  # Will be replaced with client-specific token if matches client
+
+    # Subclasses set these in __init__
+    model: str = ""
+    window_size: int = 50_000
+    window_overlap: int = 300
+
+    @abstractmethod
+    def detect_spans(
+        self,
+        text: str,
+        client_name: Optional[str] = None,
+        client_variants: Optional[List[str]] = None,
+        vendor_name: Optional[str] = None,
+    ) -> List[Tuple[int, int, str, str]]:
+        """
+        Detect PERSON and ORG entities in text and return span offsets with entity types.
+
+        Args:
+            text: Text to analyze
+            client_name: Optional client name (context for the detector)
+            client_variants: Optional list of client variant aliases
+            vendor_name: Optional primary vendor name for this deal
+
+        Returns:
+            List of (start, end, entity_type, text) tuples for each entity found
+        """
+        pass
+
+    def detect_person_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Detect PERSON entities in text and return span offsets.
+
+        Args:
+            text: Text to analyze
+
+        Returns:
+            List of (start, end) tuples for each PERSON entity found
+        """
+        all_spans = self.detect_spans(text)
+        # Filter to only PERSON entities
+        person_spans = [(start, end) for start, end, entity_type, _ in all_spans if entity_type == 'PERSON']
+        return person_spans
+
+    def detect_spans_in_windows(
+        self,
+        windows: List[Dict[str, object]],
+        client_name: Optional[str] = None,
+        client_variants: Optional[List[str]] = None,
+        vendor_name: Optional[str] = None,
+    ) -> List[Tuple[int, int, str, str]]:
+        """
+        Detect spans in windows built by `_build_windows` (possibly from another detector).
+
+        Detectors that can check several windows per call override this.
+
+        Args:
+            windows: List of dicts with keys: window_id (int), global_offset (int), text (str)
+            client_name: Optional client name (context for the detector)
+            client_variants: Optional list of client variant aliases
+            vendor_name: Optional primary vendor name for this deal
+
+        Returns:
+            List of (start, end, entity_type, text) tuples with offsets into the full text
+        """
+        out: List[Tuple[int, int, str, str]] = []
+        for w in windows:
+            global_offset = int(w["global_offset"])
+            for start, end, entity_type, span_text in self.detect_spans(str(w["text"]), client_name, client_variants, vendor_name):
+                out.append((global_offset + start, global_offset + end, entity_type, span_text))
+        return out
+
+    def _build_windows(self, text: str) -> List[Dict[str, object]]:
+        """
+        Split text into overlapping windows.
+
+        Returns:
+            List of dicts with keys: window_id (int), global_offset (int), text (str)
+        """
+        windows: List[Dict[str, object]] = []
+        offset = 0
+        window_id = 0
+        while offset < len(text):
+            window_end = min(offset + self.window_size, len(text))
+            windows.append(
+                {
+                    "window_id": window_id,
+                    "global_offset": offset,
+                    "text": text[offset:window_end],
+                }
+            )
+            window_id += 1
+            if window_end >= len(text):
+                break
+            # Always advance, even if a misconfigured overlap exceeds the window size
+            offset = max(window_end - self.window_overlap, offset + 1)
+        return windows
+
+    def _merge_overlapping_spans_with_type(self, spans: List[Tuple[int, int, str, str]]) -> List[Tuple[int, int, str, str]]:
+        """
+        Merge overlapping spans, keeping the longest span when overlaps occur.
+
+        Args:
+            spans: List of (start, end, entity_type, text) tuples
+
+        Returns:
+            Merged list of non-overlapping spans
+        """
+        if not spans:
+            return []
+
+        # Sort by start position
+        sorted_spans = sorted(spans, key=lambda x: x[0])
+        merged = [sorted_spans[0]]
+
+        for current_start, current_end, current_type, current_text in sorted_spans[1:]:
+            last_start, last_end, last_type, last_text = merged[-1]
+
+            # Check for overlap
+            if current_start <= last_end:
+                # Overlap detected - keep the longer span
+                current_len = current_end - current_start
+                last_len = last_end - last_start
+
+                if current_len > last_len:
+                    merged[-1] = (current_start, current_end, current_type, current_text)
+                # Otherwise keep the existing span
+            else:
+                # No overlap - add new span
+                merged.append((current_start, current_end, current_type, current_text))
+
+        return merged
+
+    def apply_person_replacements(self, text: str, spans: List[Tuple[int, int]]) -> Tuple[str, int]:
+        """
+        Apply PERSON replacements to text based on detected spans.
+
+        Args:
+            text: Original text
+            spans: List of (start, end) tuples for PERSON entities
+
+        Returns:
+            Tuple of (redacted_text, replacement_count)
+        """
+        if not spans:
+            return text, 0
+
+        # Apply replacements from end to start to preserve offsets
+        redacted_text = text
+        replacement_count = 0
+
+        for start, end in reversed(spans):
+            # Validate span
+            if start < 0 or end > len(text) or start >= end:
+                continue
+
+            redacted_text = (
+                redacted_text[:start] +
+                self.PERSON_PLACEHOLDER +
+                redacted_text[end:]
+            )
+            replacement_count += 1
+
+        return redacted_text, replacement_count
+
+    def filter_org_spans_for_client(
+        self,
+        org_spans: List[Tuple[int, int, str, str]],
+        client_name: str,
+        client_aliases: List[str]
+    ) -> List[Tuple[int, int, str, str]]:
+        """
+        Filter ORG spans to only include those that match the client name or aliases.
+
+        This ensures we only redact client references, not vendors/competitors.
+
+        Args:
+            org_spans: List of (start, end, entity_type, text) tuples for ORG entities
+            client_name: Primary client name
+            client_aliases: List of client aliases
+
+        Returns:
+            Filtered list of ORG spans that match the client
+        """
+        if not org_spans:
+            return []
+
+        # Build set of client references (case-insensitive)
+        client_refs = {client_name.lower()}
+        client_refs.update(alias.lower() for alias in client_aliases if alias)
+
+        matching_spans = []
+        for start, end, entity_type, span_text in org_spans:
+            if entity_type != 'ORG':
+                continue
+
+            # Check if span text matches client name or any alias
+            span_lower = span_text.lower().strip()
+            if span_lower in client_refs:
+                matching_spans.append((start, end, entity_type, span_text))
+            else:
+                # Also check if any client reference is contained in the span text
+                # (handles cases like "Morgan Stanley Group" matching "Morgan Stanley")
+                for client_ref in client_refs:
+                    if client_ref in span_lower or span_lower in client_ref:
+                        matching_spans.append((start, end, entity_type, span_text))
+                        break
+
+        return matching_spans
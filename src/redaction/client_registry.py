@@ -26,7 +26,8 @@ class ClientRegistry:
         """
         self.logger = logging.getLogger(__name__)
         self.clients: Dict[str, Dict[str, str]] = {}  # salesforce_client_id -> {client_name, industry_label, aliases}
-        self.alias_patterns: Dict[str, List[re.Pattern]] = {}  # salesforce_client_id -> list of compiled regex patterns
+        self.alias_names: Dict[str, List[str]] = {}  # salesforce_client_id -> names to match (longest pattern first)
+        self.alias_patterns: Dict[str, List[re.Pattern]] = {}  # salesforce_client_id -> compiled regex patterns (built lazily on first use)
         self.generated_variants: Dict[str, List[str]] = {}  # salesforce_client_id -> list of generated variant strings
         
         if csv_path:
@@ -114,7 +115,7 @@ class ClientRegistry:
                         'aliases': aliases_list
                     }
                     
-                    # Generate deterministic aliases and compile patterns
+                    # Generate deterministic aliases (patterns compile lazily on first use)
                     self._generate_alias_patterns(client_id, client_name, aliases_list)
                     count += 1
                 
@@ -132,7 +133,11 @@ class ClientRegistry:
     
     def _generate_alias_patterns(self, client_id: str, client_name: str, explicit_aliases: List[str]) -> None:
         """
-        Generate deterministic aliases and compile regex patterns for matching.
+        Generate deterministic aliases for matching.
+        
+        Only the alias strings are stored here; regex patterns are compiled on first
+        use by `_get_alias_patterns`. Workers typically see a handful of clients out of
+        thousands, so compiling every client's patterns up front is wasted work.
         
         Args:
             client_id: Salesforce client ID
@@ -149,12 +154,29 @@ class ClientRegistry:
         # Store generated variants for LLM prompt examples and filtering
         self.generated_variants[client_id] = list(variants)
         
-        # Compile regex patterns (with word boundaries for safety)
-        patterns = []
-        for name in all_names:
-            if not name:
-                continue
+        # Sort by escaped length (longest first) to avoid partial matches
+        names = [name for name in all_names if name]
+        names.sort(key=lambda n: len(re.escape(n)), reverse=True)
+        
+        self.alias_names[client_id] = names
+        self.alias_patterns.pop(client_id, None)
+    
+    def _get_alias_patterns(self, client_id: str) -> List[re.Pattern]:
+        """
+        Get compiled alias patterns for a client, compiling them on first use.
+        
+        Args:
+            client_id: Salesforce client ID
             
+        Returns:
+            List of compiled patterns (longest first), empty if client is unknown
+        """
+        patterns = self.alias_patterns.get(client_id)
+        if patterns is not None:
+            return patterns
+        
+        patterns = []
+        for name in self.alias_names.get(client_id, []):
             # Escape special regex characters
             escaped = re.escape(name)
             # Use alnum-boundaries instead of \b so we still match tokens like:
@@ -164,10 +186,25 @@ class ClientRegistry:
             pattern = re.compile(r'(?<![A-Za-z0-9])' + escaped + r'(?![A-Za-z0-9])', re.IGNORECASE)
             patterns.append(pattern)
         
-        # Sort by length (longest first) to avoid partial matches
-        patterns.sort(key=lambda p: len(p.pattern), reverse=True)
-        
         self.alias_patterns[client_id] = patterns
+        return patterns
+    
+    def __getstate__(self) -> Dict[str, object]:
+        """
+        Pickle only the plain-data registry (no compiled patterns or logger).
+        
+        This lets the coordinator load the CSV once and hand the registry to worker
+        processes, which then compile patterns lazily for the clients they touch.
+        """
+        state = self.__dict__.copy()
+        state['alias_patterns'] = {}
+        state.pop('logger', None)
+        return state
+    
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        """Restore a pickled registry; patterns are recompiled on demand."""
+        self.__dict__.update(state)
+        self.logger = logging.getLogger(__name__)
     
     def _generate_variants(self, name: str) -> List[str]:
         """
@@ -278,14 +315,14 @@ class ClientRegistry:
         Returns:
             Tuple of (redacted_text, replacement_count)
         """
-        if salesforce_client_id not in self.alias_patterns:
+        if salesforce_client_id not in self.alias_names:
             return text, 0
         
         replacement_token = self.get_replacement_token(salesforce_client_id)
         if not replacement_token:
             return text, 0
         
-        patterns = self.alias_patterns[salesforce_client_id]
+        patterns = self._get_alias_patterns(salesforce_client_id)
         redacted_text = text
         replacement_count = 0
         
@@ -13,6 +13,8 @@ from typing import List, Dict, Tuple, Optional
 import openai
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from .base_span_detector import BaseSpanDetector
+
 
 # GPT-5 mini capabilities (documented by user for this repo’s configuration)
 # - Total context window: 400,000 tokens
@@ -82,13 +84,9 @@ BATCH_SPAN_DETECTION_SCHEMA = {
 }
 
 
-class LLMSpanDetector:
+class LLMSpanDetector(BaseSpanDetector):
     """Detects PERSON and ORG entities using GPT-5 mini with span-based output"""
     
-    # Placeholder tokens
-    PERSON_PLACEHOLDER = "<<PERSON>>"
-    ORG_PLACEHOLDER = "<<ORG>>"  # Will be replaced with client-specific token if matches client
-    
     def __init__(
         self,
         api_key: str,
@@ -123,21 +121,6 @@ class LLMSpanDetector:
         
         self.logger.info(f"Initialized LLM span detector with model: {model}")
     
-    def detect_person_spans(self, text: str) -> List[Tuple[int, int]]:
-        """
-        Detect PERSON entities in text and return span offsets.
-        
-        Args:
-            text: Text to analyze
-            
-        Returns:
-            List of (start, end) tuples for each PERSON entity found
-        """
-        all_spans = self.detect_spans(text)
-        # Filter to only PERSON entities
-        person_spans = [(start, end) for start, end, entity_type, _ in all_spans if entity_type == 'PERSON']
-        return person_spans
-    
     def detect_spans(self, text: str, client_name: Optional[str] = None, client_variants: Optional[List[str]] = None, vendor_name: Optional[str] = None) -> List[Tuple[int, int, str, str]]:
         """
         Detect PERSON and ORG entities in text and return span offsets with entity types.
@@ -155,23 +138,7 @@ class LLMSpanDetector:
             return []
         
         # Build windows (even for short texts) so we can optionally batch uniformly.
-        windows: List[Dict[str, object]] = []
-        offset = 0
-        window_id = 0
-        while offset < len(text):
-            window_end = min(offset + self.window_size, len(text))
-            window_text = text[offset:window_end]
-            windows.append(
-                {
-                    "window_id": window_id,
-                    "global_offset": offset,
-                    "text": window_text,
-                }
-            )
-            window_id += 1
-            if window_end >= len(text):
-                break
-            offset = window_end - self.window_overlap
+        windows = self._build_windows(text)
 
         # Detect spans windowed, using per-call batching when multiple windows exist.
         all_spans: List[Tuple[int, int, str, str]] = []
@@ -179,14 +146,14 @@ class LLMSpanDetector:
             w = windows[0]
             all_spans.extend(self._detect_spans_in_window(str(w["text"]), int(w["global_offset"]), client_name, client_variants, vendor_name))
         else:
-            all_spans.extend(self._detect_spans_batched(windows, client_name, client_variants, vendor_name))
+            all_spans.extend(self.detect_spans_in_windows(windows, client_name, client_variants, vendor_name))
         
         # Merge overlapping spans (keep longest)
         merged_spans = self._merge_overlapping_spans_with_type(all_spans)
         
         return merged_spans
 
-    def _detect_spans_batched(self, windows: List[Dict[str, object]], client_name: Optional[str] = None, client_variants: Optional[List[str]] = None) -> List[Tuple[int, int, str, str]]:
+    def detect_spans_in_windows(self, windows: List[Dict[str, object]], client_name: Optional[str] = None, client_variants: Optional[List[str]] = None, vendor_name: Optional[str] = None) -> List[Tuple[int, int, str, str]]:
         """
         Detect spans for multiple windows using per-call batching.
 
@@ -673,116 +640,3 @@ DETECTION REQUIREMENTS:
 WINDOWS:
 {joined}
 """.strip()
-    
-    def _merge_overlapping_spans_with_type(self, spans: List[Tuple[int, int, str, str]]) -> List[Tuple[int, int, str, str]]:
-        """
-        Merge overlapping spans, keeping the longest span when overlaps occur.
-        
-        Args:
-            spans: List of (start, end, entity_type, text) tuples
-            
-        Returns:
-            Merged list of non-overlapping spans
-        """
-        if not spans:
-            return []
-        
-        # Sort by start position
-        sorted_spans = sorted(spans, key=lambda x: x[0])
-        merged = [sorted_spans[0]]
-        
-        for current_start, current_end, current_type, current_text in sorted_spans[1:]:
-            last_start, last_end, last_type, last_text = merged[-1]
-            
-            # Check for overlap
-            if current_start <= last_end:
-                # Overlap detected - keep the longer span
-                current_len = current_end - current_start
-                last_len = last_end - last_start
-                
-                if current_len > last_len:
-                    merged[-1] = (current_start, current_end, current_type, current_text)
-                # Otherwise keep the existing span
-            else:
-                # No overlap - add new span
-                merged.append((current_start, current_end, current_type, current_text))
-        
-        return merged
-    
-    def apply_person_replacements(self, text: str, spans: List[Tuple[int, int]]) -> Tuple[str, int]:
-        """
-        Apply PERSON replacements to text based on detected spans.
-        
-        Args:
-            text: Original text
-            spans: List of (start, end) tuples for PERSON entities
-            
-        Returns:
-            Tuple of (redacted_text, replacement_count)
-        """
-        if not spans:
-            return text, 0
-        
-        # Apply replacements from end to start to preserve offsets
-        redacted_text = text
-        replacement_count = 0
-        
-        for start, end in reversed(spans):
-            # Validate span
-            if start < 0 or end > len(text) or start >= end:
-                continue
-            
-            redacted_text = (
-                redacted_text[:start] +
-                self.PERSON_PLACEHOLDER +
-                redacted_text[end:]
-            )
-            replacement_count += 1
-        
-        return redacted_text, replacement_count
-    
-    def filter_org_spans_for_client(
-        self, 
-        org_spans: List[Tuple[int, int, str, str]], 
-        client_name: str,
-        client_aliases: List[str]
-    ) -> List[Tuple[int, int, str, str]]:
-        """
-        Filter ORG spans to only include those that match the client name or aliases.
-        
-        This ensures we only redact client references, not vendors/competitors.
-        
-        Args:
-            org_spans: List of (start, end, entity_type, text) tuples for ORG entities
-            client_name: Primary client name
-            client_aliases: List of client aliases
-            
-        Returns:
-            Filtered list of ORG spans that match the client
-        """
-        if not org_spans:
-            return []
-        
-        # Build set of client references (case-insensitive)
-        client_refs = {client_name.lower()}
-        client_refs.update(alias.lower() for alias in client_aliases if alias)
-        
-        matching_spans = []
-        for start, end, entity_type, span_text in org_spans:
-            if entity_type != 'ORG':
-                continue
-            
-            # Check if span text matches client name or any alias
-            span_lower = span_text.lower().strip()
-            if span_lower in client_refs:
-                matching_spans.append((start, end, entity_type, span_text))
-            else:
-                # Also check if any client reference is contained in the span text
-                # (handles cases like "Morgan Stanley Group" matching "Morgan Stanley")
-                for client_ref in client_refs:
-                    if client_ref in span_lower or span_lower in client_ref:
-                        matching_spans.append((start, end, entity_type, span_text))
-                        break
-        
-        return matching_spans
-
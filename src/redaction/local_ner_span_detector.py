@@ -0,0 +1,277 @@
+"""
+Local (CPU-only) NER span detection for PERSON and ORG entities
+
+Runs a spaCy pipeline or a Hugging Face token-classification model
+in-process, batched across text windows, so bulk backfills don't pay a
+remote LLM call per window. Windows whose entities score below a
+confidence threshold, and windows where the model found nothing but the
+text has mid-sentence capitalized words (likely names it missed), can
+optionally be escalated to the LLMSpanDetector.
+
+ORG spans are returned unfiltered; RedactionService narrows them to the
+current client via `filter_org_spans_for_client`, exactly as for the LLM
+backend.
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base_span_detector import BaseSpanDetector
+
+
+# Supported local engines and their default models (CPU friendly)
+DEFAULT_NER_MODELS: Dict[str, str] = {
+    "spacy": "en_core_web_lg",
+    "transformers": "dslim/bert-base-NER",
+    "onnx": "dslim/bert-base-NER",
+}
+
+# Window sizes and overlaps: characters for spaCy, which handles long docs natively
+# and benefits from fewer, larger windows; tokenizer tokens for transformer engines,
+# whose encoders cap out at 512 tokens (special tokens included).
+DEFAULT_NER_WINDOW_SIZES: Dict[str, int] = {
+    "spacy": 10_000,
+    "transformers": 400,
+    "onnx": 400,
+}
+DEFAULT_NER_WINDOW_OVERLAPS: Dict[str, int] = {
+    "spacy": 200,
+    "transformers": 32,
+    "onnx": 32,
+}
+
+# A capitalized word following a lowercase word or clause punctuation, i.e. not
+# just a sentence start: a name the model may have missed
+NAME_CANDIDATE_PATTERN = re.compile(r"(?<=[a-z0-9,;:)] )[A-Z][A-Za-z'&.-]+")
+
+# Map engine-specific labels onto the detector's entity types
+NER_LABEL_MAP: Dict[str, str] = {
+    "PERSON": "PERSON",
+    "PER": "PERSON",
+    "ORG": "ORG",
+}
+
+
+class LocalNERSpanDetector(BaseSpanDetector):
+    """Detects PERSON and ORG entities with a local NER model (no network calls)"""
+
+    def __init__(
+        self,
+        engine: str = "spacy",
+        model_name: Optional[str] = None,
+        batch_size: int = 16,
+        escalation_detector: Optional[BaseSpanDetector] = None,
+        escalation_threshold: float = 0.85,
+        window_size: Optional[int] = None,
+        window_overlap: Optional[int] = None,
+        escalate_empty_windows: bool = True,
+    ):
+        """
+        Initialize local NER span detector.
+
+        Args:
+            engine: "spacy", "transformers" or "onnx" (transformers pipeline over an
+                    ONNX Runtime model via optimum)
+            model_name: spaCy package name or Hugging Face model id/path
+                        (defaults per engine, see DEFAULT_NER_MODELS)
+            batch_size: Number of windows sent through the model per batch
+            escalation_detector: Optional detector (typically LLMSpanDetector) used to
+                                 re-check low-confidence windows
+            escalation_threshold: Windows containing any entity scored below this
+                                  value are escalated (only when escalation_detector is set)
+            window_size: Window size, in characters for spacy and in tokens for
+                         transformer engines (defaults per engine)
+            window_overlap: Overlap between windows to avoid missing boundary spans
+                            (same unit as window_size, defaults per engine)
+            escalate_empty_windows: Also escalate windows with no entities that contain
+                                    name candidates (see NAME_CANDIDATE_PATTERN)
+        """
+        engine = (engine or "spacy").lower()
+        if engine not in DEFAULT_NER_MODELS:
+            raise ValueError(f"Unsupported NER engine: {engine}")
+        if engine == "spacy" and escalation_detector is not None:
+            # spaCy entities carry no score, so no window would ever be escalated
+            raise ValueError("Escalation needs a scored NER engine (transformers or onnx), not spacy")
+
+        self.engine = engine
+        self.model_name = model_name or DEFAULT_NER_MODELS[engine]
+        self.model = f"local-{engine}:{self.model_name}"
+        self.batch_size = max(1, batch_size)
+        self.escalation_detector = escalation_detector
+        self.escalation_threshold = escalation_threshold
+        self.window_size = window_size or DEFAULT_NER_WINDOW_SIZES[engine]
+        self.window_overlap = window_overlap if window_overlap is not None else DEFAULT_NER_WINDOW_OVERLAPS[engine]
+        self.escalate_empty_windows = escalate_empty_windows
+        self.logger = logging.getLogger(__name__)
+
+        # Escalation counters (useful for tuning the threshold on backfills)
+        self.windows_processed = 0
+        self.windows_escalated = 0
+
+        self._nlp = None
+        self._pipeline = None
+        if engine == "spacy":
+            self._nlp = self._load_spacy_model(self.model_name)
+        else:
+            self._pipeline = self._load_token_classification_pipeline(engine, self.model_name)
+
+        self.logger.info(f"Initialized local NER span detector: {self.model}")
+
+    def _load_spacy_model(self, model_name: str) -> Any:
+        """Load a spaCy pipeline with only the components NER needs."""
+        try:
+            import spacy
+        except ImportError as e:
+            raise ImportError(f"spaCy is required for the local NER detector: {e}")
+
+        nlp = spacy.load(model_name, disable=["parser", "lemmatizer"])
+        # Windows are bounded, but keep headroom for pathological whitespace-free text
+        nlp.max_length = max(nlp.max_length, self.window_size * 2)
+        return nlp
+
+    def _load_token_classification_pipeline(self, engine: str, model_name: str) -> Any:
+        """Load a CPU token-classification pipeline (PyTorch or ONNX Runtime)."""
+        try:
+            from transformers import AutoTokenizer, pipeline
+        except ImportError as e:
+            raise ImportError(f"transformers is required for the local NER detector: {e}")
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        if not getattr(tokenizer, "is_fast", False):
+            # Token windows are cut on character offsets, which only fast tokenizers report
+            raise ValueError(f"A fast tokenizer is required for the local NER detector: {model_name}")
+        if engine == "onnx":
+            try:
+                from optimum.onnxruntime import ORTModelForTokenClassification
+            except ImportError as e:
+                raise ImportError(f"optimum[onnxruntime] is required for the ONNX NER engine: {e}")
+            model = ORTModelForTokenClassification.from_pretrained(model_name, export=True)
+        else:
+            model = model_name
+
+        return pipeline(
+            "token-classification",
+            model=model,
+            tokenizer=tokenizer,
+            aggregation_strategy="simple",
+            device=-1,  # CPU only
+        )
+
+    def detect_spans(self, text: str, client_name: Optional[str] = None, client_variants: Optional[List[str]] = None, vendor_name: Optional[str] = None) -> List[Tuple[int, int, str, str]]:
+        """
+        Detect PERSON and ORG entities in text and return span offsets with entity types.
+
+        Client/vendor context is not used by the local model itself; it is forwarded
+        to the escalation detector for low-confidence or suspiciously empty windows.
+
+        Args:
+            text: Text to analyze
+            client_name: Optional client name (forwarded on escalation)
+            client_variants: Optional list of client variant aliases (forwarded on escalation)
+            vendor_name: Optional primary vendor name (forwarded on escalation)
+
+        Returns:
+            List of (start, end, entity_type, text) tuples for each entity found
+        """
+        if not text or len(text.strip()) == 0:
+            return []
+
+        windows = self._build_windows(text)
+        window_entities = self._run_ner([str(w["text"]) for w in windows])
+
+        all_spans: List[Tuple[int, int, str, str]] = []
+        escalate: List[Dict[str, object]] = []
+        for w, entities in zip(windows, window_entities):
+            global_offset = int(w["global_offset"])
+            w_text = str(w["text"])
+            low_confidence = False
+            found = False
+            for start, end, entity_type, score in entities:
+                if start < 0 or end <= start or end > len(w_text):
+                    continue
+                found = True
+                if score < self.escalation_threshold:
+                    low_confidence = True
+                all_spans.append((global_offset + start, global_offset + end, entity_type, w_text[start:end]))
+            if not found and self.escalate_empty_windows:
+                low_confidence = NAME_CANDIDATE_PATTERN.search(w_text) is not None
+            if low_confidence and self.escalation_detector is not None:
+                escalate.append(w)
+
+        self.windows_processed += len(windows)
+        if escalate:
+            self.windows_escalated += len(escalate)
+            self.logger.debug(f"Escalating {len(escalate)}/{len(windows)} low-confidence windows")
+            # Union with local spans: over-detection is the safe direction for redaction.
+            # LLMSpanDetector packs several windows into one call and maps offsets back itself.
+            all_spans.extend(self.escalation_detector.detect_spans_in_windows(escalate, client_name, client_variants, vendor_name))
+
+        return self._merge_overlapping_spans_with_type(all_spans)
+
+    def _build_windows(self, text: str) -> List[Dict[str, object]]:
+        """
+        Split text into overlapping windows (character windows for spaCy).
+
+        Transformer windows are cut on the pipeline tokenizer's offsets so each holds
+        at most window_size tokens, whatever the characters-per-token ratio of the text.
+
+        Returns:
+            List of dicts with keys: window_id (int), global_offset (int), text (str)
+        """
+        if self._pipeline is None:
+            return super()._build_windows(text)
+
+        offsets = [
+            (start, end)
+            for start, end in self._pipeline.tokenizer(
+                text, add_special_tokens=False, return_offsets_mapping=True
+            )["offset_mapping"]
+            if end > start
+        ]
+        windows: List[Dict[str, object]] = []
+        first = 0
+        while first < len(offsets):
+            last = min(first + self.window_size, len(offsets))
+            start, end = offsets[first][0], offsets[last - 1][1]
+            windows.append({"window_id": len(windows), "global_offset": start, "text": text[start:end]})
+            if last >= len(offsets):
+                break
+            # Always advance, even if a misconfigured overlap exceeds the window size
+            first = max(last - self.window_overlap, first + 1)
+        return windows
+
+    def _run_ner(self, texts: List[str]) -> List[List[Tuple[int, int, str, float]]]:
+        """
+        Run the local model over a batch of window texts.
+
+        Returns:
+            Per-window list of (start, end, entity_type, score) with window-relative offsets
+        """
+        results: List[List[Tuple[int, int, str, float]]] = []
+
+        if self._nlp is not None:
+            # spaCy's statistical NER does not expose per-entity scores; treat its
+            # predictions as confident (escalation applies to transformer engines).
+            for doc in self._nlp.pipe(texts, batch_size=self.batch_size):
+                entities = []
+                for ent in doc.ents:
+                    entity_type = NER_LABEL_MAP.get(ent.label_)
+                    if entity_type:
+                        entities.append((ent.start_char, ent.end_char, entity_type, 1.0))
+                results.append(entities)
+            return results
+
+        outputs = self._pipeline(texts, batch_size=self.batch_size)
+        # A single input returns a flat list of entities rather than a list of lists
+        if texts and len(texts) == 1 and outputs and isinstance(outputs[0], dict):
+            outputs = [outputs]
+        for window_output in outputs:
+            entities = []
+            for ent in window_output or []:
+                entity_type = NER_LABEL_MAP.get(str(ent.get("entity_group", "")).upper())
+                if not entity_type:
+                    continue
+                entities.append((int(ent["start"]), int(ent["end"]), entity_type, float(ent.get("score", 0.0))))
+            results.append(entities)
+        return results
@@ -10,7 +10,7 @@ from typing import Optional, List, Tuple
 from .redaction_context import RedactionContext, RedactionResult
 from .pii_patterns import PIIPatterns
 from .client_registry import ClientRegistry
-from .llm_span_detector import LLMSpanDetector
+from .base_span_detector import BaseSpanDetector
 from .validators import RedactionValidators
 
 
@@ -25,7 +25,7 @@ class RedactionService:
     def __init__(
         self,
         client_registry: ClientRegistry,
-        llm_span_detector: Optional[LLMSpanDetector] = None,
+        llm_span_detector: Optional[BaseSpanDetector] = None,
         strict_mode: bool = True
     ):
         """
@@ -33,7 +33,7 @@ class RedactionService:
         
         Args:
             client_registry: Client registry for client name redaction
-            llm_span_detector: LLM span detector for PERSON entities (optional)
+            llm_span_detector: Span detector for PERSON/ORG entities, LLM or local NER (optional)
             strict_mode: If True, fail documents when validation fails
         """
         self.client_registry = client_registry
@@ -0,0 +1,83 @@
+"""
+Span Detector Factory
+
+Creates the PERSON/ORG span detector used by RedactionService based on configuration.
+Supports three backends:
+- llm: OpenAI GPT-5 mini via LLMSpanDetector (default)
+- local: CPU-only local NER via LocalNERSpanDetector (no network calls)
+- hybrid: local NER, escalating low-confidence windows to the LLM detector
+"""
+
+import logging
+from typing import Any, Dict
+
+from .base_span_detector import BaseSpanDetector
+
+SPAN_DETECTOR_BACKENDS = ("llm", "local", "hybrid")
+
+# Default local NER engine per backend. Hybrid escalates on entity scores, which
+# only the transformer engines produce (spaCy entities have no confidence).
+DEFAULT_NER_ENGINES = {"local": "spacy", "hybrid": "transformers"}
+SCORED_NER_ENGINES = ("transformers", "onnx")
+
+
+class SpanDetectorFactory:
+    """Factory for creating redaction span detectors"""
+
+    @staticmethod
+    def create_detector(config: Dict[str, Any]) -> BaseSpanDetector:
+        """
+        Create a span detector based on configuration
+
+        Args:
+            config: Configuration dict. Expected keys:
+                    - backend: "llm" | "local" | "hybrid" (default: "llm")
+                    - api_key / model: OpenAI settings (llm, hybrid)
+                    - ner_engine / ner_model: local NER settings (local, hybrid); the
+                      engine defaults to spacy for local and transformers for hybrid
+                    - escalation_threshold: score below which hybrid escalates a window
+
+        Returns:
+            Configured span detector instance
+
+        Raises:
+            ValueError: If backend is unsupported or configuration is invalid (including
+                        hybrid with an engine that produces no confidence scores)
+            ImportError: If required dependencies are missing
+        """
+        backend = (config.get("backend") or "llm").lower()
+        logger = logging.getLogger(__name__)
+
+        if backend not in SPAN_DETECTOR_BACKENDS:
+            raise ValueError(f"Unsupported span detector backend: {backend}")
+
+        engine = (config.get("ner_engine") or DEFAULT_NER_ENGINES.get(backend, "spacy")).lower()
+        if backend == "hybrid" and engine not in SCORED_NER_ENGINES:
+            raise ValueError(
+                f"Hybrid span detection needs a NER engine with confidence scores "
+                f"({', '.join(SCORED_NER_ENGINES)}); '{engine}' would never escalate to the LLM"
+            )
+
+        llm_detector = None
+        if backend in ("llm", "hybrid"):
+            from .llm_span_detector import LLMSpanDetector
+
+            if not config.get("api_key"):
+                raise ValueError("OpenAI API key is required for the LLM span detector")
+            llm_detector = LLMSpanDetector(
+                api_key=config["api_key"],
+                model=config.get("model") or "gpt-5-mini",
+            )
+            if backend == "llm":
+                return llm_detector
+
+        from .local_ner_span_detector import LocalNERSpanDetector
+
+        detector = LocalNERSpanDetector(
+            engine=engine,
+            model_name=config.get("ner_model"),
+            escalation_detector=llm_detector,
+            escalation_threshold=float(config.get("escalation_threshold", 0.85)),
+        )
+        logger.info(f"✅ Created {backend} span detector: {detector.model}")
+        return detector
@@ -9,7 +9,9 @@ context-aware hypothetical documents that better match the target corpus.
 """
 
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
 import openai
@@ -21,6 +23,9 @@ from ..config.settings import Settings
 
 logger = logging.getLogger(__name__)
 
+# Hypothetical documents generated in parallel per query
+MAX_CONCURRENT_GENERATIONS = 8
+
 
 class HyDEStrategy(Enum):
     """Different HyDE generation strategies for business documents"""
@@ -237,19 +242,25 @@ Vendor Comparison:"""
         query: str, 
         business_context: Optional[Dict] = None,
         strategy: Optional[HyDEStrategy] = None,
-        num_documents: int = 1
+        num_documents: int = 1,
+        on_document: Optional[Callable[[int, str], None]] = None
     ) -> HyDEResult:
         """
         Transform a query into hypothetical documents for improved retrieval.
         
+        The documents are generated concurrently, so this takes about as long as
+        the slowest single generation.
+        
         Args:
             query: Original user query
             business_context: Business metadata from filters (vendor, client, document type)
             strategy: Specific HyDE strategy to use (auto-selected if None)
             num_documents: Number of hypothetical documents to generate
+            on_document: Called as on_document(index, document) from a worker thread as
+                soon as each document is ready (e.g. to start its search right away)
             
         Returns:
-            HyDEResult with generated hypothetical documents and metadata
+            HyDEResult with generated hypothetical documents (in index order) and metadata
         """
         start_time = time.time()
         
@@ -259,34 +270,45 @@ Vendor Comparison:"""
         
         logger.info(f"🔍 HyDE generating {num_documents} document(s) using strategy: {strategy.value}")
         
-        # Get prompt template
-        prompt_template = self.prompt_templates[strategy]
+        # Enhance prompt with business context if available
+        enhanced_query = self._enhance_query_with_context(query, business_context)
+        prompt = self.prompt_templates[strategy].format(query=enhanced_query)
         
         # Generate hypothetical documents
-        hypothetical_documents = []
+        generated: List[Optional[str]] = [None] * num_documents
         total_token_usage = {'input_tokens': 0, 'output_tokens': 0, 'total_tokens': 0}
+        usage_lock = threading.Lock()
         
-        for i in range(num_documents):
+        def generate(i: int) -> None:
             try:
-                # Enhance prompt with business context if available
-                enhanced_query = self._enhance_query_with_context(query, business_context)
-                prompt = prompt_template.format(query=enhanced_query)
-                
                 document, token_usage = self._generate_hypothetical_document(prompt)
-                hypothetical_documents.append(document)
-                
-                # Accumulate token usage
-                for key in total_token_usage:
-                    total_token_usage[key] += token_usage[key]
-                
-                logger.debug(f"📄 Generated hypothetical document {i+1}: {len(document)} chars")
-                
             except Exception as e:
                 logger.error(f"Failed to generate hypothetical document {i+1}: {str(e)}")
-                continue
+                return
+            generated[i] = document
+            
+            # Accumulate token usage
+            with usage_lock:
+                for key in total_token_usage:
+                    total_token_usage[key] += token_usage[key]
+            
+            logger.debug(f"📄 Generated hypothetical document {i+1}: {len(document)} chars")
+            if on_document is not None:
+                try:
+                    on_document(i, document)
+                except Exception as e:
+                    logger.error(f"HyDE on_document callback failed for document {i+1}: {str(e)}")
+        
+        if num_documents == 1:
+            generate(0)
+        elif num_documents > 1:
+            with ThreadPoolExecutor(max_workers=min(num_documents, MAX_CONCURRENT_GENERATIONS),
+                                    thread_name_prefix="hyde-gen") as executor:
+                list(executor.map(generate, range(num_documents)))
         
+        hypothetical_documents = [document for document in generated if document is not None]
         generation_time = time.time() - start_time
-        confidence_score = len(hypothetical_documents) / num_documents  # Success rate
+        confidence_score = len(hypothetical_documents) / num_documents if num_documents else 0.0  # Success rate
         
         logger.info(f"✅ HyDE completed: {len(hypothetical_documents)}/{num_documents} documents in {generation_time:.2f}s")
         
@@ -6,6 +6,8 @@ hybrid search system to provide improved retrieval performance for business docu
 """
 
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass
 from enum import Enum
@@ -17,6 +19,9 @@ from ..config.settings import Settings
 
 logger = logging.getLogger(__name__)
 
+# Reciprocal-rank fusion constant (score = sum of 1 / (k + rank) over result lists)
+DEFAULT_RRF_K = 60
+
 
 class RetrievalMode(Enum):
     """Different modes for HyDE retrieval"""
@@ -65,6 +70,7 @@ class HyDERetrievalManager:
         self.default_mode = getattr(settings, 'HYDE_RETRIEVAL_MODE', 'hyde_combined')
         self.include_original_query = getattr(settings, 'HYDE_INCLUDE_ORIGINAL_QUERY', True)
         self.num_hyde_documents = getattr(settings, 'HYDE_NUM_DOCUMENTS', 1)
+        self.rrf_k = getattr(settings, 'HYDE_RRF_K', DEFAULT_RRF_K)
         
         logger.info(f"🔍 HyDE Retrieval Manager initialized (enabled: {hyde_enabled}, mode: {self.default_mode})")
     
@@ -229,43 +235,51 @@ class HyDERetrievalManager:
         
         logger.debug("🔄 Executing HyDE combined search")
         
-        # Generate hypothetical documents
-        hyde_result = self.hyde_transformer.transform_query(
-            query=query,
-            business_context=business_context,
-            strategy=hyde_strategy,
-            num_documents=self.num_hyde_documents
-        )
-        
-        all_results = []
+        # The original-query search starts immediately and each hypothetical document's
+        # search starts as soon as that document is generated, so the whole search takes
+        # about one LLM call plus one search. Every list is fused by reciprocal rank.
+        hyde_futures: Dict[int, Future] = {}
+        futures_lock = threading.Lock()
         traditional_results = None
+        traditional_time = 0.0
         
-        # Search with original query if enabled
-        if self.include_original_query:
-            traditional_results = self.pinecone_client.hybrid_search_documents(
-                query=query,
+        def timed_search(search_query: str) -> Tuple[List[DocumentSearchResult], float]:
+            search_start = time.time()
+            results = self.pinecone_client.hybrid_search_documents(
+                query=search_query,
                 filter_metadata=filter_metadata,
-                top_k=top_k // 2,  # Split top_k between original and HyDE
+                top_k=top_k,
                 **search_kwargs
             )
-            all_results.extend(traditional_results)
+            return results, time.time() - search_start
         
-        # Search with HyDE documents
-        if hyde_result.hypothetical_documents:
-            remaining_k = top_k - len(all_results) if self.include_original_query else top_k
+        with ThreadPoolExecutor(max_workers=self.num_hyde_documents + 1,
+                                thread_name_prefix="hyde-search") as executor:
+            # Search with original query if enabled
+            original_future = executor.submit(timed_search, query) if self.include_original_query else None
             
-            for i, hyde_doc in enumerate(hyde_result.hypothetical_documents):
-                hyde_results = self.pinecone_client.hybrid_search_documents(
-                    query=hyde_doc,
-                    filter_metadata=filter_metadata,
-                    top_k=remaining_k // len(hyde_result.hypothetical_documents),
-                    **search_kwargs
-                )
-                all_results.extend(hyde_results)
+            def search_hyde_document(index: int, hyde_doc: str) -> None:
+                with futures_lock:
+                    hyde_futures[index] = executor.submit(timed_search, hyde_doc)
+            
+            # Generate hypothetical documents (searches start from the callback)
+            hyde_result = self.hyde_transformer.transform_query(
+                query=query,
+                business_context=business_context,
+                strategy=hyde_strategy,
+                num_documents=self.num_hyde_documents,
+                on_document=search_hyde_document
+            )
+            
+            ranked_lists = []
+            if original_future is not None:
+                traditional_results, traditional_time = original_future.result()
+                ranked_lists.append(traditional_results)
+            for index in sorted(hyde_futures):
+                ranked_lists.append(hyde_futures[index].result()[0])
         
-        # Remove duplicates and re-rank
-        unique_results = self._deduplicate_results(all_results)
-        final_results = unique_results[:top_k]
+        fused_results = self._reciprocal_rank_fusion(ranked_lists)
+        final_results = fused_results[:top_k]
         
         total_time = time.time() - start_time
         
@@ -277,12 +291,14 @@ class HyDERetrievalManager:
             total_time=total_time,
             performance_metrics={
                 'num_results': len(final_results),
-                'num_unique_results': len(unique_results),
-                'traditional_time': 0.0,  # Combined in total_time
+                'num_unique_results': len(fused_results),
+                'traditional_time': traditional_time,
                 'hyde_time': hyde_result.generation_time if hyde_result else 0.0,
                 'strategy_used': hyde_result.strategy_used.value if hyde_result else 'none',
                 'hyde_documents_generated': len(hyde_result.hypothetical_documents) if hyde_result else 0,
-                'hyde_tokens_used': hyde_result.token_usage['total_tokens'] if hyde_result else 0
+                'hyde_tokens_used': hyde_result.token_usage['total_tokens'] if hyde_result else 0,
+                'fusion': 'rrf',
+                'fused_lists': len(ranked_lists)
             }
         )
     
@@ -365,21 +381,38 @@ class HyDERetrievalManager:
         
         return business_context if business_context else None
     
-    def _deduplicate_results(self, results: List[DocumentSearchResult]) -> List[DocumentSearchResult]:
-        """Remove duplicate results based on document path, keeping highest scored"""
-        seen_paths = {}
-        unique_results = []
-        
-        for result in results:
-            path = getattr(result, 'document_path', result.file_name)
-            
-            if path not in seen_paths or result.pinecone_score > seen_paths[path].pinecone_score:
-                seen_paths[path] = result
+    def _reciprocal_rank_fusion(self, ranked_lists: List[List[DocumentSearchResult]]) -> List[DocumentSearchResult]:
+        """
+        Fuse ranked result lists by reciprocal rank, one result per document.
         
-        # Sort by score (highest first)
-        unique_results = sorted(seen_paths.values(), key=lambda x: x.pinecone_score, reverse=True)
+        Each document scores sum(1 / (rrf_k + rank)) over the lists it appears in,
+        ranked by its best chunk in each list. The document is represented by its
+        highest scored chunk.
         
-        return unique_results
+        Args:
+            ranked_lists: Result lists, each ordered best first
+            
+        Returns:
+            One result per document, highest fused score first
+        """
+        fused_scores: Dict[str, float] = {}
+        best: Dict[str, DocumentSearchResult] = {}
+        
+        for results in ranked_lists:
+            rank = 0
+            seen_in_list = set()
+            for result in results:
+                path = getattr(result, 'document_path', None) or result.file_name or result.id
+                if path not in best or result.pinecone_score > best[path].pinecone_score:
+                    best[path] = result
+                if path in seen_in_list:
+                    continue
+                seen_in_list.add(path)
+                rank += 1
+                fused_scores[path] = fused_scores.get(path, 0.0) + 1.0 / (self.rrf_k + rank)
+        
+        ordered = sorted(fused_scores, key=lambda path: (fused_scores[path], best[path].pinecone_score), reverse=True)
+        return [best[path] for path in ordered]
     
     def compare_retrieval_modes(
         self,
@@ -9,6 +9,7 @@ import json
 import math
 import os
 import shutil
+from bisect import bisect_left, insort
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Set, Union
@@ -85,6 +86,13 @@ class DiscoveryPersistence:
         self._pending_updates = 0
         self._batch_save_threshold = 50  # Save to disk every 50 document updates
         
+        # apply_changes' lower-cased path -> document position index (see _path_index)
+        self._paths: Dict[str, int] = {}
+        self._sorted_paths: List[str] = []
+        self._indexed_documents: Optional[List[Dict]] = None
+        self._indexed_count = 0
+        self._last_indexed: Optional[Dict] = None
+        
         # Initialize or load existing data
         self._initialize_storage()
     
@@ -436,6 +444,168 @@ class DiscoveryPersistence:
         except Exception as e:
             self.logger.error(f"Error saving progress: {e}")
     
+    def get_list_folder_cursor(self, folder_path: str) -> Optional[str]:
+        """Dropbox list_folder cursor saved by the last complete discovery of folder_path (None if none)."""
+        entry = self.data["discovery_metadata"].get("list_folder_cursors", {}).get(folder_path)
+        return entry.get("cursor") if entry else None
+    
+    def set_list_folder_cursor(self, folder_path: str, cursor: str):
+        """
+        Save the Dropbox list_folder cursor an incremental discovery continues from.
+        
+        Args:
+            folder_path: Folder the cursor lists (recursively)
+            cursor: Cursor from the end of a fully consumed listing
+        """
+        with self.lock:
+            self.data["discovery_metadata"].setdefault("list_folder_cursors", {})[folder_path] = {
+                "cursor": cursor,
+                "updated": datetime.now().isoformat()
+            }
+            self._atomic_save()
+    
+    def apply_changes(self, upserts: List[Union[Dict, Any]], deleted_paths: List[str]) -> Dict[str, int]:
+        """
+        Apply incremental discovery changes to the stored documents.
+        
+        Added files are appended; modified files (new content_hash) replace their
+        entry with a fresh processing_status so they are processed again; deleted
+        files (or everything under a deleted folder) are marked source_deleted and
+        skipped by filter_documents. Documents whose vectors are already in
+        Pinecone get a vector_cleanup record for the stale vectors.
+        
+        Args:
+            upserts: Added or modified documents (dicts or dataclasses)
+            deleted_paths: Deleted file or folder paths
+            
+        Returns:
+            Counts of added, modified, unchanged and deleted documents
+        """
+        self.flush_buffer()
+        counts = {"added": 0, "modified": 0, "unchanged": 0, "deleted": 0}
+        now = datetime.now().isoformat()
+        
+        with self.lock:
+            documents = self.data["documents"]
+            by_path = self._path_index()
+            
+            for document in upserts:
+                if is_dataclass(document):
+                    document = self._serialize_dataclass(document)
+                doc_data = self._ensure_document_structure(document)
+                path = (self._get_file_info(doc_data).get("path") or "").lower()
+                index = by_path.get(path)
+                if index is None:
+                    documents.append(doc_data)
+                    if path:
+                        self._index_path(path, len(documents) - 1)
+                    self._indexed_count = len(documents)
+                    self._last_indexed = doc_data
+                    counts["added"] += 1
+                    continue
+                
+                existing = documents[index]
+                existing_hash = self._get_file_info(existing).get("content_hash")
+                if (not existing.get("source_deleted") and existing_hash
+                        and existing_hash == self._get_file_info(doc_data).get("content_hash")):
+                    counts["unchanged"] += 1
+                    continue
+                
+                cleanup = self._vector_cleanup(existing, "modified", now)
+                if cleanup:
+                    doc_data["vector_cleanup"] = cleanup
+                documents[index] = doc_data
+                if index == self._indexed_count - 1:
+                    self._last_indexed = doc_data
+                counts["modified"] += 1
+            
+            for deleted_path in deleted_paths:
+                prefix = deleted_path.lower().rstrip("/")
+                # The path itself, plus everything under it: a contiguous run of the sorted paths
+                # ('0' sorts right after '/')
+                under = self._sorted_paths[bisect_left(self._sorted_paths, prefix + "/"):
+                                           bisect_left(self._sorted_paths, prefix + "0")]
+                for path in ([prefix] if prefix in by_path else []) + under:
+                    doc = documents[by_path[path]]
+                    if doc.get("source_deleted"):
+                        continue
+                    doc["source_deleted"] = {"deleted_at": now}
+                    cleanup = self._vector_cleanup(doc, "deleted", now)
+                    if cleanup:
+                        doc["vector_cleanup"] = cleanup
+                    counts["deleted"] += 1
+            
+            self.data["discovery_metadata"]["total_documents"] = len(documents)
+            self.data["discovery_progress"]["documents_discovered"] = len(documents)
+            self._atomic_save()
+        
+        self._save_progress()
+        self.logger.info(f"🔁 Applied changes: {counts['added']} added, {counts['modified']} modified, "
+                         f"{counts['deleted']} deleted, {counts['unchanged']} unchanged")
+        return counts
+    
+    def _path_index(self) -> Dict[str, int]:
+        """
+        Lower-cased file path -> position in data["documents"] (the last document wins).
+        
+        Built once and extended as documents are appended; rebuilt only if the list was
+        replaced or truncated behind the index's back.
+        """
+        documents = self.data["documents"]
+        count = self._indexed_count
+        if (documents is not self._indexed_documents or count > len(documents)
+                or (count and documents[count - 1] is not self._last_indexed)):
+            self._paths, self._sorted_paths = {}, []
+            self._indexed_documents, count = documents, 0
+        
+        new_paths = []
+        for i in range(count, len(documents)):
+            doc = documents[i]
+            path = self._get_file_info(doc).get("path") or doc.get("path")
+            if path:
+                path = path.lower()
+                if path not in self._paths:
+                    new_paths.append(path)
+                self._paths[path] = i
+        if new_paths:
+            # Sorted run appended to a sorted list: sort() merges the two in linear time
+            self._sorted_paths.extend(sorted(new_paths))
+            self._sorted_paths.sort()
+        self._indexed_count = len(documents)
+        self._last_indexed = documents[-1] if documents else None
+        return self._paths
+    
+    def _index_path(self, path: str, index: int) -> None:
+        if path not in self._paths:
+            insort(self._sorted_paths, path)
+        self._paths[path] = index
+    
+    @staticmethod
+    def _vector_cleanup(doc: Dict[str, Any], reason: str, marked_at: str) -> Optional[Dict[str, Any]]:
+        """Cleanup record for a document's stale vectors (None when nothing was upserted)."""
+        pending = doc.get("vector_cleanup")
+        if pending and not pending.get("completed"):
+            # Keep the original record: it names the vectors actually upserted
+            return pending
+        status = doc.get("processing_status", {})
+        if not status.get("processed"):
+            return None
+        return {
+            "required": True,
+            "reason": reason,
+            "marked_at": marked_at,
+            "document_path": DiscoveryPersistence._get_file_info(doc).get("path"),
+            "pinecone_namespace": status.get("pinecone_namespace"),
+            "completed": False
+        }
+    
+    def get_documents_pending_vector_cleanup(self) -> List[Dict]:
+        """Documents whose old vectors must be deleted (deleted or modified since processing)."""
+        return [
+            doc for doc in self.data["documents"]
+            if doc.get("vector_cleanup", {}).get("required") and not doc["vector_cleanup"].get("completed")
+        ]
+    
     def save_batch_job(self, job_id: str, document_count: int, estimated_cost: float = 0.0):
         """Save batch job information"""
         job_info = {
@@ -579,7 +749,8 @@ class DiscoveryPersistence:
             "source_metadata": {
                 "source_type": "salesforce" if hasattr(doc_metadata, 'deal_id') and doc_metadata.deal_id else "dropbox",
                 "source_id": doc_dict.get("dropbox_id", "") or doc_dict.get("salesforce_content_version_id", ""),
-                "source_path": doc_dict.get("path", "")
+                "source_path": doc_dict.get("path", ""),
+                "full_source_path": doc_dict.get("full_path") or None
             },
             "file_info": {
                 "path": doc_dict.get("path", ""),
@@ -804,6 +975,7 @@ class DiscoveryPersistence:
 
         stats = {
             "input_total": len(documents),
+            "excluded_source_deleted": 0,
             "excluded_processed": 0,
             "excluded_file_type": 0,
             "excluded_modified_time_missing_or_invalid": 0,
@@ -820,6 +992,11 @@ class DiscoveryPersistence:
         filtered: List[Dict[str, Any]] = []
 
         for doc in documents:
+            # Removed from the source by an incremental discovery
+            if doc.get("source_deleted"):
+                stats["excluded_source_deleted"] += 1
+                continue
+            
             if not include_processed:
                 if doc.get("processing_status", {}).get("processed", False):
                     stats["excluded_processed"] += 1
@@ -40,6 +40,7 @@ class DiscoveryProgress:
     started_at: str = ""
     last_updated: str = ""
     errors: List[str] = None
+    changes_cursor: Optional[str] = None  # Cursor at the end of the last complete listing
     
     def __post_init__(self):
         if self.errors is None:
@@ -202,6 +203,7 @@ class ProgressiveDiscovery:
                     self.logger.success(f"✅ Discovery complete: {self.progress.total_discovered} total documents")
                     self.progress.discovery_complete = True
                     self.progress.current_cursor = None
+                    self.progress.changes_cursor = result.cursor
                     break
                 
                 # Continue to next page
@@ -233,6 +235,31 @@ class ProgressiveDiscovery:
             self._save_progress()
             raise
     
+    def discover_changes(self, longpoll_timeout: Optional[int] = None) -> Generator[Tuple[str, object], None, None]:
+        """Changes since the last complete discovery, instead of listing the folder again
+        
+        Args:
+            longpoll_timeout: Wait up to this many seconds for a change first (None = don't wait)
+            
+        Yields:
+            ("upsert", DocumentMetadata) and ("delete", path) tuples (see DropboxClient.list_changes)
+            
+        Raises:
+            ListFolderCursorReset: Dropbox invalidated the cursor; clear_progress() and discover again
+        """
+        cursor = self.progress.changes_cursor
+        if not cursor:
+            raise ValueError("No completed discovery to continue from; run discover_with_resume() first")
+        
+        if longpoll_timeout and not self.dropbox.wait_for_changes(cursor, timeout=longpoll_timeout):
+            return
+        
+        yield from self.dropbox.list_changes(cursor, self.folder_path)
+        
+        # Only advance once every change was consumed
+        self.progress.changes_cursor = self.dropbox.last_cursor
+        self._save_progress()
+    
     def _save_current_batch(self, documents: List[DocumentMetadata]) -> None:
         """Save current batch of documents"""
         if not documents:
@@ -0,0 +1,161 @@
+"""
+Disk-backed document content for large downloads
+
+A scanned PDF can be hundreds of megabytes. Instead of returning such a file as
+one bytes object, source clients stream it into a spool file and return a
+SpooledDocument. Only two consumers read spooled content by path: the PDF
+parsers (Docling, PDFPlumber, Mistral), which DocumentConverter hands PDFs to
+still spooled, and DocumentConverter.iter_spreadsheet_tables. Every other
+file type is read into memory with content_bytes() before it is converted.
+
+The Dropbox content hash is computed while the chunks are written, so a
+truncated or corrupted download is caught without reading the file back.
+"""
+
+import hashlib
+import os
+import tempfile
+import weakref
+from typing import Iterable, Optional, Union
+
+# Dropbox hashes files in 4 MB blocks (https://www.dropbox.com/developers/reference/content-hash)
+DROPBOX_HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class ContentHashMismatchError(IOError):
+    """Downloaded bytes do not match the content hash reported by the source"""
+
+
+class DropboxContentHasher:
+    """Incremental Dropbox content_hash: SHA-256 of the concatenated SHA-256 of each 4 MB block"""
+
+    def __init__(self):
+        self._overall = hashlib.sha256()
+        self._block = hashlib.sha256()
+        self._block_pos = 0
+
+    def update(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            take = min(DROPBOX_HASH_BLOCK_SIZE - self._block_pos, len(view))
+            self._block.update(view[:take])
+            self._block_pos += take
+            view = view[take:]
+            if self._block_pos == DROPBOX_HASH_BLOCK_SIZE:
+                self._overall.update(self._block.digest())
+                self._block = hashlib.sha256()
+                self._block_pos = 0
+
+    def hexdigest(self) -> str:
+        overall = self._overall.copy()
+        if self._block_pos:
+            overall.update(self._block.digest())
+        return overall.hexdigest()
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class SpooledDocument:
+    """Document content held in a temporary file instead of memory"""
+
+    def __init__(self, path: str, size: int):
+        """
+        Initialize spooled document (takes ownership of the file).
+
+        Args:
+            path: Spool file path; removed by cleanup() or when the object is collected
+            size: File size in bytes
+        """
+        self.path = path
+        self.size = size
+        self._finalizer = weakref.finalize(self, _unlink, path)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def read_bytes(self) -> bytes:
+        """Load the whole file into memory (for consumers that only accept bytes)."""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def cleanup(self) -> None:
+        """Remove the spool file (safe to call more than once)."""
+        self._finalizer()
+
+    def __enter__(self) -> "SpooledDocument":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cleanup()
+
+    def __repr__(self) -> str:
+        return f"SpooledDocument({self.path!r}, size={self.size})"
+
+
+DocumentContent = Union[bytes, SpooledDocument]
+
+
+def content_bytes(content: DocumentContent) -> bytes:
+    """Document content as bytes, reading it from disk if it was spooled."""
+    if isinstance(content, SpooledDocument):
+        return content.read_bytes()
+    return content
+
+
+def spooled_path(content: DocumentContent) -> Optional[str]:
+    """Spool file path of spooled content, or None for in-memory bytes."""
+    if isinstance(content, SpooledDocument):
+        return content.path
+    return None
+
+
+def release_content(content: Optional[DocumentContent]) -> None:
+    """Remove the spool file behind spooled content (no-op for bytes)."""
+    if spooled_path(content) is not None:
+        content.cleanup()
+
+
+def spool_chunks(chunks: Iterable[bytes], suffix: str = "", spool_dir: Optional[str] = None,
+                 expected_hash: Optional[str] = None) -> SpooledDocument:
+    """
+    Write streamed chunks to a spool file, verifying the Dropbox content hash on the fly.
+
+    Args:
+        chunks: Document bytes in order
+        suffix: Spool file suffix (keep the document's extension for parsers that sniff it)
+        spool_dir: Directory for the spool file (default: system temp dir)
+        expected_hash: Dropbox content_hash to verify against (None skips verification)
+
+    Returns:
+        SpooledDocument owning the spool file
+
+    Raises:
+        ContentHashMismatchError: If the written bytes do not match expected_hash
+    """
+    hasher = DropboxContentHasher() if expected_hash else None
+    fd, path = tempfile.mkstemp(prefix="spool_", suffix=suffix, dir=spool_dir)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                f.write(chunk)
+                size += len(chunk)
+                if hasher:
+                    hasher.update(chunk)
+        if hasher:
+            actual = hasher.hexdigest()
+            if actual != expected_hash:
+                raise ContentHashMismatchError(
+                    f"Content hash mismatch after {size} bytes: expected {expected_hash}, got {actual}"
+                )
+    except BaseException:
+        _unlink(path)
+        raise
+    return SpooledDocument(path, size)
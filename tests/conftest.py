@@ -0,0 +1,103 @@
+"""
+Shared fixtures for the unit tests
+"""
+
+import csv
+import importlib
+import sys
+import types
+
+import pytest
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def raw_export(tmp_path):
+    """
+    Small raw Salesforce export on disk; returns RawSalesforceExportConnector kwargs.
+
+    Payloads cover every resolution strategy:
+    - 068A: ContentVersions/VersionData/068A/a.pdf (deal from Deal__c)
+    - 068B: VersionData (deal from ContentDocumentLink)
+    - 068C: flat ContentVersion/068C
+    - 068D: Deal__cs/0EMbatch/a0W2/
+    - 068E: no payload
+    """
+    root = tmp_path / "export"
+    for directory in ("ContentVersions/VersionData/068A", "ContentVersions/VersionData/068B",
+                      "ContentVersion", "Deal__cs/0EMbatch/a0W2", "Attachments/Body"):
+        (root / directory).mkdir(parents=True)
+    (root / "ContentVersions/VersionData/068A/a.pdf").write_bytes(b"%PDF-a")
+    (root / "ContentVersions/VersionData/068B/b.docx").write_bytes(b"docx-b")
+    (root / "ContentVersion/068C").write_bytes(b"%PDF-c")
+    (root / "Deal__cs/0EMbatch/a0W2/d.pdf").write_bytes(b"%PDF-d")
+
+    _write_csv(root / "content_versions.csv",
+               ["Id", "ContentDocumentId", "Title", "PathOnClient", "FileType", "ContentSize",
+                "Deal__c", "ContentModifiedDate", "CreatedDate", "IsLatest", "IsDeleted"],
+               [["068A", "069A", "Quote A", "a.pdf", "PDF", "6", "a0W1", "2025-01-02", "2025-01-01", "true", "false"],
+                ["068B", "069B", "Order B", "b.docx", "WORD_X", "6", "", "2025-01-03", "2025-01-01", "true", "false"],
+                ["068C", "069C", "Contract C", "c.pdf", "PDF", "6", "a0W1", "2025-01-04", "2025-01-01", "1", "0"],
+                ["068D", "069D", "Deck D", "d.pdf", "PDF", "6", "a0W2", "2025-01-05", "2025-01-01", "true", "false"],
+                ["068E", "069E", "Missing E", "e.pdf", "PDF", "6", "a0W2", "2025-01-06", "2025-01-01", "true", "false"],
+                ["068F", "069F", "Old F", "f.pdf", "PDF", "6", "a0W2", "2025-01-06", "2025-01-01", "false", "false"]])
+    _write_csv(root / "content_document_links.csv",
+               ["ContentDocumentId", "LinkedEntityId"],
+               [["069B", "a0W2"], ["069B", "005USER"]])
+    _write_csv(root / "deal__cs.csv",
+               ["Id", "Name", "Subject__c", "Status__c", "CreatedDate", "Total_Proposed_Amount__c",
+                "Total_Final_Amount_Year_1__c", "Client__c", "Primary_Deal_Vendor__c", "Term__c",
+                "Formal_PDF_FMV_Delivered__c", "Report_Type__c", "Current_Narrative__c"],
+               [["a0W1", "Deal-100", "Renewal", "Closed", "2024-12-01", "1000", "800", "001C", "001V",
+                 "36", "Yes", "Benchmark", "Negotiated down"],
+                ["a0W2", "Deal-200", "New purchase", "Open", "2024-12-02", "", "", "001C", "",
+                 "", "No", "", ""]])
+
+    return {
+        "export_root_dir": str(root),
+        "content_versions_csv": str(root / "content_versions.csv"),
+        "content_documents_csv": None,
+        "content_document_links_csv": str(root / "content_document_links.csv"),
+        "deal_metadata_csv": str(root / "deal__cs.csv"),
+    }
+
+
+class FakeInference:
+    """Stands in for pc.inference: dense [len(text), 1.0], sparse {1: 1.0}; records every call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, model, inputs, parameters):
+        self.calls.append((model, list(inputs), parameters["input_type"]))
+        if model == "pinecone-sparse-english-v0":
+            return [{"sparse_indices": [1], "sparse_values": [1.0]} for _ in inputs]
+        return [{"values": [float(len(text)), 1.0]} for text in inputs]
+
+
+@pytest.fixture
+def pinecone_client_module(monkeypatch):
+    """src.connectors.pinecone_client imported against a fake pinecone package"""
+    pinecone = types.ModuleType("pinecone")
+    exceptions = types.ModuleType("pinecone.exceptions")
+    exceptions.PineconeApiException = type("PineconeApiException", (Exception,), {})
+
+    class Pinecone:
+        def __init__(self, api_key):
+            self.inference = FakeInference()
+
+        def Index(self, name):
+            return types.SimpleNamespace(name=name)
+
+    pinecone.Pinecone = Pinecone
+    pinecone.exceptions = exceptions
+    monkeypatch.setitem(sys.modules, "pinecone", pinecone)
+    monkeypatch.setitem(sys.modules, "pinecone.exceptions", exceptions)
+    monkeypatch.delitem(sys.modules, "src.connectors.pinecone_client", raising=False)
+    return importlib.import_module("src.connectors.pinecone_client")
@@ -0,0 +1,253 @@
+"""
+Unit tests for ChunkDeduplicator
+"""
+
+import types
+
+import pytest
+
+from src.pipeline import parallel_processor
+from src.pipeline.chunk_deduplicator import ChunkDeduplicator
+
+CLAUSE = ("The supplier shall deliver all hardware listed in schedule A to the customer site "
+          "within thirty days of the purchase order date, and shall bear all shipping costs.")
+LONG_CLAUSE = (CLAUSE + " " + CLAUSE.replace("hardware", "software").replace("supplier", "vendor")
+               + " Invoices are payable within forty five days of receipt by the customer accounts team.")
+
+
+class _Embedder:
+    """embed_fn that records which texts were embedded"""
+
+    def __init__(self, texts, dimension=8):
+        self.texts = texts
+        self.dimension = dimension
+        self.embedded = []
+
+    def __call__(self, indices):
+        self.embedded.extend(self.texts[i] for i in indices)
+        return {
+            "dense_embeddings": [[float(len(self.embedded))] * self.dimension for _ in indices],
+            "sparse_embeddings": [{"indices": [i], "values": [1.0]} for i in indices],
+        }
+
+
+def _embed(dedup, texts, scope="deal-1", document_id=None, commit=True):
+    """Embed one document's chunks and, by default, commit them as after a successful upsert"""
+    embedder = _Embedder(texts)
+    result = dedup.embed_chunks(texts, embedder, scope=scope, document_id=document_id)
+    if commit:
+        dedup.commit(result)
+    return result, embedder
+
+
+class TestDuplicateMatching:
+    """Exact and near-duplicate hits"""
+
+    def test_exact_duplicate_reuses_vectors(self):
+        dedup = ChunkDeduplicator(policy="reuse")
+        first, _ = _embed(dedup, [CLAUSE])
+
+        # Case and whitespace are normalized away
+        result, embedder = _embed(dedup, ["  " + CLAUSE.upper().replace(" ", "\n")])
+
+        assert embedder.embedded == []
+        assert result.exact_duplicates == 1
+        assert result.dense_embeddings == first.dense_embeddings
+        assert result.sparse_embeddings == first.sparse_embeddings
+        assert result.keep == [True]
+
+    def test_near_duplicate_is_matched(self):
+        dedup = ChunkDeduplicator(policy="reuse")
+        _embed(dedup, [LONG_CLAUSE])
+
+        result, embedder = _embed(dedup, [LONG_CLAUSE.replace("costs.", "costs and insurance.", 1)])
+
+        assert embedder.embedded == []
+        assert result.near_duplicates == 1
+
+    def test_unrelated_text_is_embedded(self):
+        dedup = ChunkDeduplicator(policy="reuse")
+        _embed(dedup, [CLAUSE])
+
+        result, embedder = _embed(dedup, ["Pricing is fixed for the first two renewal terms of the agreement."])
+
+        assert result.duplicates == 0
+        assert len(embedder.embedded) == 1
+
+    def test_duplicates_only_match_within_scope(self):
+        dedup = ChunkDeduplicator(policy="reuse")
+        _embed(dedup, [CLAUSE], scope="deal-1")
+
+        result, embedder = _embed(dedup, [CLAUSE], scope="deal-2")
+
+        assert result.duplicates == 0
+        assert embedder.embedded == [CLAUSE]
+
+    def test_skip_policy_drops_duplicates(self):
+        dedup = ChunkDeduplicator(policy="skip")
+
+        result, embedder = _embed(dedup, [CLAUSE, CLAUSE])
+
+        assert embedder.embedded == [CLAUSE]
+        assert result.keep == [True, False]
+        assert dedup.stats.vectors_skipped == 1
+
+    def test_failed_embedding_is_not_reused(self):
+        dedup = ChunkDeduplicator(policy="reuse")
+
+        def failing(indices):
+            raise RuntimeError("inference down")
+
+        with pytest.raises(RuntimeError):
+            dedup.embed_chunks([CLAUSE], failing, scope="deal-1")
+        result, embedder = _embed(dedup, [CLAUSE])
+
+        assert embedder.embedded == [CLAUSE]
+        assert dedup.index_size == 1
+        assert result.duplicates == 0
+
+
+class TestIndexBounds:
+    """The index stops growing at its entry and memory limits"""
+
+    @staticmethod
+    def _distinct(n):
+        return [f"Line item {i} covers invoice {i * 7919} for region {i % 13} and quarter {i % 4}." for i in range(n)]
+
+    def test_entry_cap(self):
+        dedup = ChunkDeduplicator(policy="reuse", max_entries=5)
+
+        _embed(dedup, self._distinct(8))
+
+        assert dedup.index_size == 5
+        assert dedup.stats.chunks_not_indexed == 3
+
+    def test_memory_cap_counts_stored_vectors(self):
+        dedup = ChunkDeduplicator(policy="reuse", max_index_mb=0.01, dense_dimension=8)
+        texts = self._distinct(200)
+
+        result, embedder = _embed(dedup, texts)
+
+        assert len(embedder.embedded) == 200
+        assert all(d is not None for d in result.dense_embeddings)
+        assert 0 < dedup.index_size < 200
+        # Only the sparse vectors are not reserved up front (64 bytes each here)
+        assert dedup.index_bytes <= dedup.max_index_bytes + 64 * dedup.index_size
+        assert dedup.stats.chunks_not_indexed == 200 - dedup.index_size
+
+    def test_unindexed_chunks_are_still_embedded_on_repeat(self):
+        dedup = ChunkDeduplicator(policy="reuse", max_entries=1)
+        texts = self._distinct(2)
+        _embed(dedup, texts)
+
+        result, embedder = _embed(dedup, texts)
+
+        assert result.exact_duplicates == 1
+        assert embedder.embedded == [texts[1]]
+
+    def test_default_policy_bound_is_well_below_entry_cap(self):
+        dedup = ChunkDeduplicator(policy="reuse")
+
+        # 1024-dim float32 vectors: the memory bound, not max_entries, limits the index
+        assert dedup.max_index_bytes // dedup._entry_reserve_bytes < dedup.max_entries // 10
+
+    def test_skip_policy_stores_no_vectors(self):
+        dedup = ChunkDeduplicator(policy="skip")
+
+        _embed(dedup, self._distinct(10))
+
+        assert all(entry.dense is None for entry in dedup._exact.values())
+        assert dedup.index_bytes == 10 * dedup._entry_reserve_bytes
+
+
+class TestScopes:
+    """Documents without a deal only match themselves"""
+
+    def test_documents_without_deal_do_not_match_each_other(self):
+        dedup = ChunkDeduplicator(policy="skip")
+        _embed(dedup, [CLAUSE], scope=None, document_id="a.pdf")
+
+        result, embedder = _embed(dedup, [CLAUSE], scope=None, document_id="b.pdf")
+
+        assert result.duplicates == 0
+        assert result.keep == [True]
+        assert embedder.embedded == [CLAUSE]
+
+    def test_document_scope_matches_within_the_document(self):
+        dedup = ChunkDeduplicator(policy="skip")
+        _embed(dedup, [CLAUSE], scope=None, document_id="a.pdf")
+
+        result, embedder = _embed(dedup, [CLAUSE, CLAUSE], scope=None, document_id="a.pdf")
+
+        assert result.keep == [False, False]
+        assert embedder.embedded == []
+
+    def test_calls_without_scope_or_document_never_match(self):
+        dedup = ChunkDeduplicator(policy="reuse")
+        _embed(dedup, [CLAUSE], scope=None)
+
+        result, embedder = _embed(dedup, [CLAUSE], scope=None)
+
+        assert result.duplicates == 0
+        assert embedder.embedded == [CLAUSE]
+
+
+class TestCommit:
+    """Chunks are matchable by later documents only after their upsert succeeded"""
+
+    def test_uncommitted_chunks_are_not_skipped_against(self):
+        dedup = ChunkDeduplicator(policy="skip")
+        _embed(dedup, [CLAUSE], commit=False)
+
+        result, embedder = _embed(dedup, [CLAUSE])
+
+        assert result.keep == [True]
+        assert embedder.embedded == [CLAUSE]
+        assert dedup.index_size == 1
+
+    def test_discarded_chunks_are_forgotten(self):
+        dedup = ChunkDeduplicator(policy="skip")
+        first, _ = _embed(dedup, [CLAUSE, LONG_CLAUSE])
+
+        dedup.discard(first)
+        result, embedder = _embed(dedup, [CLAUSE])
+
+        assert dedup.index_size == 1
+        assert result.keep == [True]
+        assert embedder.embedded == [CLAUSE]
+
+    def test_failed_upsert_is_not_recorded(self):
+        dedup = ChunkDeduplicator(policy="skip")
+        chunks = [types.SimpleNamespace(text=CLAUSE)]
+
+        first = parallel_processor._embed_and_upsert_chunks(
+            chunks, _FakePinecone(ok=False), {"deal_id": "deal-1"}, "a.pdf", "documents", dedup
+        )
+        pinecone = _FakePinecone()
+        second = parallel_processor._embed_and_upsert_chunks(
+            chunks, pinecone, {"deal_id": "deal-1"}, "b.pdf", "documents", dedup
+        )
+        third = parallel_processor._embed_and_upsert_chunks(
+            chunks, pinecone, {"deal_id": "deal-1"}, "c.pdf", "documents", dedup
+        )
+
+        assert not first["success"]
+        assert [chunk["id"] for chunk in pinecone.upserted] == ["b.pdf_0"]
+        assert third["dedup"]["chunks_deduplicated"] == 1
+        assert second["success"] and third["success"]
+
+
+class _FakePinecone:
+    """Upserts succeed unless ok=False; records upserted chunks"""
+
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.upserted = []
+
+    def generate_chunk_embeddings(self, texts, precomputed_dense=None):
+        return {"dense_embeddings": [[1.0]] * len(texts), "sparse_embeddings": [{}] * len(texts)}
+
+    def upsert_chunks(self, chunks, namespace):
+        if self.ok:
+            self.upserted.extend(chunks)
+        return self.ok
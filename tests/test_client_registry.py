@@ -0,0 +1,77 @@
+"""
+Unit tests for ClientRegistry lazy pattern compilation and pickling
+"""
+
+import pickle
+
+import pytest
+
+from src.redaction.client_registry import ClientRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    path = tmp_path / "clients.csv"
+    path.write_text(
+        "salesforce_client_id,client_name,industry_label,aliases\n"
+        "001A,Morgan Stanley,Investment Banking,Morgan Stanley Group|MS\n"
+        "001B,American Family Insurance,Insurance,\n"
+        "001C,Acme (US) Inc.,Manufacturing,\n",
+        encoding="utf-8",
+    )
+    return ClientRegistry(str(path))
+
+
+TEXT = "Morgan Stanley Group and MS renewed; American Family Insurance did not. Acme (US) Inc. pending."
+
+
+class TestLazyPatterns:
+    """Patterns compile per client on first use"""
+
+    def test_no_patterns_compiled_at_load(self, registry):
+        assert registry.alias_patterns == {}
+        assert set(registry.alias_names) == {"001A", "001B", "001C"}
+
+    def test_only_used_client_is_compiled(self, registry):
+        registry.replace_client_names(TEXT, "001B")
+
+        assert set(registry.alias_patterns) == {"001B"}
+
+    def test_longest_alias_wins(self, registry):
+        redacted, count = registry.replace_client_names(TEXT, "001A")
+
+        assert redacted.startswith("<<CLIENT: Investment Banking>> and <<CLIENT: Investment Banking>> renewed")
+        assert "Group" not in redacted
+        assert count == 2
+
+    def test_special_characters_are_escaped(self, registry):
+        redacted, count = registry.replace_client_names(TEXT, "001C")
+
+        assert redacted.endswith("<<CLIENT: Manufacturing>> pending.")
+        assert count == 1
+
+    def test_unknown_client_is_unchanged(self, registry):
+        assert registry.replace_client_names(TEXT, "001Z") == (TEXT, 0)
+
+
+class TestPickling:
+    """The registry pickles as plain data for worker processes"""
+
+    def test_pickled_state_has_no_compiled_patterns(self, registry):
+        registry.replace_client_names(TEXT, "001A")
+
+        state = registry.__getstate__()
+
+        assert state["alias_patterns"] == {}
+        assert "logger" not in state
+        assert registry.alias_patterns  # the original keeps its compiled patterns
+
+    @pytest.mark.parametrize("client_id", ["001A", "001B", "001C"])
+    def test_unpickled_registry_redacts_identically(self, registry, client_id):
+        expected = registry.replace_client_names(TEXT, client_id)
+
+        restored = pickle.loads(pickle.dumps(registry))
+
+        assert restored.replace_client_names(TEXT, client_id) == expected
+        assert restored.get_generated_variants(client_id) == registry.get_generated_variants(client_id)
+        restored.logger.debug("logger restored")
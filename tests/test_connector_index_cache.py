@@ -0,0 +1,202 @@
+"""
+Unit tests for ConnectorIndexCache and its use by RawSalesforceExportConnector
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from src.connectors.connector_index_cache import ConnectorIndexCache
+from src.connectors.raw_salesforce_export_connector import RawSalesforceExportConnector
+
+
+def _later(path):
+    """Move a path's mtime forward (changes made within one timestamp tick look unchanged)"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+MAPPINGS = {
+    "content_versions": {"068A": {"title": "Quote", "content_size": 6, "is_deleted": False}},
+    "content_documents": {},
+    "content_document_links": {"069B": ["a0W2", "a0W3"]},
+    "cv_to_deal": {"068A": "a0W1", "068B": "a0W2"},
+    "valid_file_paths": {"068A": "ContentVersions/VersionData/068A/a.pdf"},
+}
+
+
+@pytest.fixture
+def source_csv(tmp_path):
+    path = tmp_path / "content_versions.csv"
+    path.write_text("Id\n068A\n")
+    return path
+
+
+class TestConnectorIndexCache:
+    """Round trip, staleness and in-place table updates"""
+
+    def test_round_trip(self, tmp_path, source_csv):
+        cache = ConnectorIndexCache(str(tmp_path / "index.sqlite"))
+        signature = ConnectorIndexCache.source_signature([str(source_csv), None])
+        cache.save(signature, MAPPINGS, extra_meta={"file_index_signature": {"a": 1}})
+
+        loaded = ConnectorIndexCache(str(tmp_path / "index.sqlite"))
+        tables = loaded.load(signature)
+
+        assert dict(tables["cv_to_deal"]) == MAPPINGS["cv_to_deal"]
+        assert tables["content_versions"]["068A"] == MAPPINGS["content_versions"]["068A"]
+        assert tables["content_document_links"]["069B"] == ["a0W2", "a0W3"]
+        assert len(tables["content_documents"]) == 0
+        assert "068B" in tables["cv_to_deal"] and "068Z" not in tables["cv_to_deal"]
+        assert list(tables["cv_to_deal"].values()) == ["a0W1", "a0W2"]
+        assert loaded.get_meta("file_index_signature") == {"a": 1}
+        with pytest.raises(KeyError):
+            tables["cv_to_deal"][object()]
+
+    def test_decoder_applies_to_values(self, tmp_path, source_csv):
+        cache = ConnectorIndexCache(str(tmp_path / "index.sqlite"))
+        signature = ConnectorIndexCache.source_signature([str(source_csv)])
+        cache.save(signature, MAPPINGS)
+
+        tables = cache.load(signature, decoders={"valid_file_paths": lambda rel: Path("/export") / rel})
+
+        assert tables["valid_file_paths"]["068A"] == Path("/export/ContentVersions/VersionData/068A/a.pdf")
+
+    def test_changed_source_is_stale(self, tmp_path, source_csv):
+        cache = ConnectorIndexCache(str(tmp_path / "index.sqlite"))
+        cache.save(ConnectorIndexCache.source_signature([str(source_csv)]), MAPPINGS)
+
+        source_csv.write_text("Id\n068A\n068B\n")
+
+        assert cache.load(ConnectorIndexCache.source_signature([str(source_csv)])) is None
+
+    def test_missing_cache_file(self, tmp_path):
+        assert ConnectorIndexCache(str(tmp_path / "absent.sqlite")).load({"version": [1]}) is None
+
+    def test_update_replaces_one_table(self, tmp_path, source_csv):
+        path = str(tmp_path / "index.sqlite")
+        signature = ConnectorIndexCache.source_signature([str(source_csv)])
+        ConnectorIndexCache(path).save(signature, MAPPINGS, extra_meta={"file_index_signature": {"a": 1}})
+
+        ConnectorIndexCache(path).update("valid_file_paths", {"068B": "b.docx"},
+                                         extra_meta={"file_index_signature": {"a": 2}})
+        cache = ConnectorIndexCache(path)
+        tables = cache.load(signature)
+
+        assert dict(tables["valid_file_paths"]) == {"068B": "b.docx"}
+        assert dict(tables["cv_to_deal"]) == MAPPINGS["cv_to_deal"]
+        assert cache.get_meta("file_index_signature") == {"a": 2}
+
+    def test_update_rejects_unknown_table(self, tmp_path):
+        with pytest.raises(ValueError):
+            ConnectorIndexCache(str(tmp_path / "index.sqlite")).update("deals", {})
+
+
+class TestConnectorWithIndexCache:
+    """The connector reuses cached mappings and refreshes stale valid file paths"""
+
+    @pytest.fixture
+    def connector_factory(self, raw_export, tmp_path):
+        def make():
+            return RawSalesforceExportConnector(**raw_export, index_cache=str(tmp_path / "index.sqlite"))
+        return make
+
+    def test_cached_run_matches_fresh_run(self, connector_factory, monkeypatch):
+        fresh = connector_factory()
+
+        monkeypatch.setattr(RawSalesforceExportConnector, "_load_content_mappings",
+                            lambda self: pytest.fail("CSV mappings re-parsed for an unchanged export"))
+        monkeypatch.setattr(RawSalesforceExportConnector, "_load_deal_mappings",
+                            lambda self: pytest.fail("deal CSV re-parsed for an unchanged export"))
+        monkeypatch.setattr(RawSalesforceExportConnector, "_build_file_index",
+                            lambda self: pytest.fail("file index rebuilt for an unchanged export"))
+        cached = connector_factory()
+
+        assert dict(cached._cv_to_deal_mapping) == dict(fresh._cv_to_deal_mapping)
+        assert dict(cached._valid_file_paths) == dict(fresh._valid_file_paths)
+        # Deal records keep NaN for blank cells, so compare them as encoded
+        assert json.dumps(dict(cached._deal_metadata)) == json.dumps(fresh._deal_metadata)
+        assert [d.path for d in cached.list_documents()] == [d.path for d in fresh.list_documents()]
+        assert (json.dumps([vars(d) for d in cached.list_documents_as_metadata()], default=str)
+                == json.dumps([vars(d) for d in fresh.list_documents_as_metadata()], default=str))
+
+    def test_changed_deal_csv_refreshes_deal_tables(self, connector_factory, raw_export, monkeypatch):
+        connector_factory()
+        with open(raw_export["deal_metadata_csv"], "a", encoding="utf-8") as f:
+            f.write("a0W3,Deal-300,Expansion,Open,2024-12-03,,,001C,,,No,,\n")
+
+        monkeypatch.setattr(RawSalesforceExportConnector, "_load_content_mappings",
+                            lambda self: pytest.fail("ContentVersion CSVs re-parsed"))
+        refreshed = connector_factory()
+        monkeypatch.setattr(RawSalesforceExportConnector, "_load_deal_mappings",
+                            lambda self: pytest.fail("deal CSV re-parsed after the refresh"))
+        reopened = connector_factory()
+
+        assert refreshed._deal_metadata["a0W3"]["subject"] == "Expansion"
+        assert json.dumps(reopened._deal_metadata["a0W3"]) == json.dumps(refreshed._deal_metadata["a0W3"])
+
+    def test_new_record_directory_refreshes_paths(self, connector_factory, raw_export, monkeypatch):
+        version_data = Path(raw_export["export_root_dir"]) / "ContentVersions/VersionData"
+        # No payload of its own yet: 068E falls back to its deal folder
+        assert connector_factory()._valid_file_paths["068E"].name == "d.pdf"
+        (version_data / "068E").mkdir()
+        (version_data / "068E/e.pdf").write_bytes(b"%PDF-e")
+        _later(version_data)
+
+        # CSVs are unchanged, so only the path table is rebuilt
+        monkeypatch.setattr(RawSalesforceExportConnector, "_load_content_mappings",
+                            lambda self: pytest.fail("CSV mappings re-parsed"))
+        refreshed = connector_factory()
+        reopened = connector_factory()
+
+        assert refreshed._valid_file_paths["068E"] == version_data / "068E/e.pdf"
+        assert reopened._valid_file_paths["068E"] == version_data / "068E/e.pdf"
+
+    def test_new_deal_folder_refreshes_paths(self, connector_factory, raw_export):
+        deal_dir = Path(raw_export["export_root_dir"]) / "Deal__cs/0EMbatch/a0W2"
+        (deal_dir / "d.pdf").unlink()
+        deal_dir.rmdir()
+        assert "068D" not in connector_factory()._valid_file_paths
+
+        deal_dir.mkdir()
+        (deal_dir / "d.pdf").write_bytes(b"%PDF-d")
+        _later(deal_dir.parent)
+        connector = connector_factory()
+
+        assert connector._valid_file_paths["068D"] == deal_dir / "d.pdf"
+
+    def test_cache_hit_does_not_scan_record_directories(self, connector_factory, raw_export, monkeypatch):
+        connector_factory()
+        scanned = []
+        original = os.scandir
+
+        def recording_scandir(path):
+            scanned.append(os.path.relpath(path, raw_export["export_root_dir"]))
+            return original(path)
+
+        monkeypatch.setattr(os, "scandir", recording_scandir)
+        connector_factory()
+
+        # Only the export batch list is read for the payload signature
+        assert scanned == ["Deal__cs"]
+
+    def test_signature_is_computed_once(self, connector_factory, monkeypatch):
+        connector = connector_factory()
+        monkeypatch.setattr(os, "scandir", lambda path: pytest.fail("payload signature recomputed"))
+
+        assert connector._file_index_signature() == connector._file_index_signature()
+
+    def test_changed_csv_rebuilds_everything(self, connector_factory, raw_export):
+        connector_factory()
+        with open(raw_export["content_versions_csv"], "a", encoding="utf-8") as f:
+            f.write("068G,069G,Late G,g.pdf,PDF,6,a0W1,2025-01-07,2025-01-01,true,false\n")
+        record_dir = Path(raw_export["export_root_dir"]) / "ContentVersions/VersionData/068G"
+        record_dir.mkdir()
+        (record_dir / "g.pdf").write_bytes(b"%PDF-g")
+
+        connector = connector_factory()
+
+        assert connector._cv_to_deal_mapping["068G"] == "a0W1"
+        assert connector._valid_file_paths["068G"] == record_dir / "g.pdf"
@@ -0,0 +1,203 @@
+"""
+Crash/resume tests for discover_documents.py
+
+A discovery run is interrupted by making DiscoveryPersistence.add_batch fail
+part-way through; a second run with --resume must finish with every document
+stored exactly once, in discovery order.
+"""
+
+import argparse
+import json
+from datetime import datetime
+
+import pytest
+
+import discover_documents
+from discover_documents import DocumentDiscovery
+from src.connectors.dropbox_client import ROOT_PARTITION, ListingPage
+from src.connectors.raw_salesforce_export_connector import RawSalesforceExportConnector
+from src.models.document_models import DocumentMetadata
+from src.utils.discovery_persistence import DiscoveryPersistence
+
+
+class _Crash(Exception):
+    """Simulated interruption"""
+
+
+def _crash_on_batch(persistence, monkeypatch, crash_at):
+    """Make the crash_at-th add_batch call fail (earlier calls are written normally)"""
+    original = persistence.add_batch
+    calls = []
+
+    def add_batch(documents, batch_num):
+        calls.append(batch_num)
+        if len(calls) == crash_at:
+            raise _Crash(f"interrupted at batch {batch_num}")
+        original(documents, batch_num)
+
+    monkeypatch.setattr(persistence, "add_batch", add_batch)
+
+
+def _paths(output):
+    return [doc["file_info"]["path"] for doc in DiscoveryPersistence(str(output)).data["documents"]]
+
+
+class TestShardedDiscoveryResume:
+    """Sharded salesforce_raw discovery (process pool, single writer)"""
+
+    @pytest.fixture
+    def run(self, raw_export, tmp_path):
+        output = tmp_path / "discovery.json"
+
+        def run(resume=False, shard_size=2, monkeypatch=None, crash_at=None):
+            discovery = DocumentDiscovery()
+            discovery.persistence = DiscoveryPersistence(str(output))
+            discovery.source_client = RawSalesforceExportConnector(**raw_export)
+            discovery.connector_args = raw_export
+            if crash_at:
+                _crash_on_batch(discovery.persistence, monkeypatch, crash_at)
+            args = argparse.Namespace(resume=resume, shard_size=shard_size, workers=2, batch_size=1,
+                                      max_docs=None, require_deal_association=False)
+            discovery._run_sharded_discovery(args, datetime.now())
+            discovery.persistence.mark_discovery_complete()
+            return _paths(output)
+
+        run.output = output
+        return run
+
+    @pytest.fixture
+    def expected(self, raw_export):
+        return [doc.path for doc in RawSalesforceExportConnector(**raw_export).list_documents()]
+
+    def test_uninterrupted_run(self, run, expected):
+        assert run() == expected
+
+    @pytest.mark.parametrize("crash_at", [1, 2, 3, 4, 5])
+    def test_resume_after_crash_stores_each_document_once(self, run, expected, monkeypatch, crash_at):
+        with pytest.raises(_Crash):
+            run(monkeypatch=monkeypatch, crash_at=crash_at)
+        monkeypatch.undo()
+
+        assert run(resume=True) == expected
+
+    def test_rerun_without_resume_replaces_documents(self, run, expected):
+        run()
+
+        assert run() == expected
+
+    def test_changed_shard_plan_restarts_from_scratch(self, run, expected, monkeypatch):
+        with pytest.raises(_Crash):
+            run(monkeypatch=monkeypatch, crash_at=4)
+        monkeypatch.undo()
+
+        assert run(resume=True, shard_size=3) == expected
+
+
+class TestShardWorkerIndex:
+    """Shard workers open the index the main process built instead of re-parsing the export"""
+
+    def _discovery(self, connector_args):
+        discovery = DocumentDiscovery()
+        discovery.source_client = RawSalesforceExportConnector(**connector_args)
+        discovery.connector_args = connector_args
+        return discovery
+
+    def test_worker_reuses_temporary_cache(self, raw_export, tmp_path, monkeypatch):
+        discovery = self._discovery(raw_export)
+        worker_args = discovery._shard_worker_args(str(tmp_path))
+        assert worker_args["index_cache"].startswith(str(tmp_path))
+
+        for method in ("_load_content_mappings", "_load_deal_mappings", "_build_file_index"):
+            monkeypatch.setattr(RawSalesforceExportConnector, method,
+                                lambda self, method=method: pytest.fail(f"worker ran {method}"))
+        discover_documents._init_shard_worker(worker_args)
+        cv_ids = discovery.source_client.list_content_version_ids()
+        _, documents = discover_documents._discover_shard(0, cv_ids, False)
+
+        expected = [
+            discover_documents._metadata_to_dict(doc, "salesforce_raw")
+            for doc in discovery.source_client.list_documents_as_metadata(cv_ids=cv_ids)
+        ]
+        # Compared as persisted (the cached deal records hold fresh NaN objects)
+        assert json.dumps(documents) == json.dumps(expected)
+
+    def test_configured_cache_is_passed_through(self, raw_export, tmp_path):
+        connector_args = {**raw_export, "index_cache": str(tmp_path / "index.sqlite")}
+
+        assert self._discovery(connector_args)._shard_worker_args(str(tmp_path / "scratch")) == connector_args
+
+
+class _FakePartitionedDropbox:
+    """list_documents_partitioned over a fixed listing; page cursors are "<partition>#<next page>"."""
+
+    LISTING = {
+        ROOT_PARTITION: [["/deals/r1.pdf"], ["/deals/r2.pdf", "/deals/r3.pdf"]],
+        "/deals/a": [["/deals/a/1.pdf", "/deals/a/2.pdf", "/deals/a/3.pdf"], ["/deals/a/4.pdf"]],
+        "/deals/b": [[], ["/deals/b/1.pdf", "/deals/b/2.pdf"]],
+    }
+
+    def __init__(self):
+        self.last_cursor = None
+
+    @classmethod
+    def expected(cls):
+        return [path for pages in cls.LISTING.values() for page in pages for path in page]
+
+    def _pages(self, partition, position):
+        pages = self.LISTING[partition]
+        start = int(position["cursor"].split("#")[1]) if position["cursor"] else 0
+        for i in range(start, len(pages)):
+            complete = i == len(pages) - 1
+            subfolders = [p for p in self.LISTING if p != ROOT_PARTITION] if partition == ROOT_PARTITION and complete else []
+            documents = [DocumentMetadata(path=path, name=path.rsplit("/", 1)[1], size=1, size_mb=0.0,
+                                          file_type=".pdf", modified_time="2025-01-01") for path in pages[i]]
+            yield ListingPage(partition, documents, f"{partition}#{i + 1}", complete, subfolders)
+
+    def list_documents_partitioned(self, folder_path, max_workers=4, state=None):
+        state.setdefault("folder", folder_path)
+        state.setdefault("root", {"cursor": None, "complete": False})
+        state.setdefault("partitions", {})
+        if not state["root"]["complete"]:
+            yield from self._pages(ROOT_PARTITION, state["root"])
+        for partition in [p for p in self.LISTING if p != ROOT_PARTITION]:
+            position = state["partitions"].get(partition, {"cursor": None, "complete": False})
+            if not position["complete"]:
+                yield from self._pages(partition, position)
+        self.last_cursor = "latest"
+
+
+class TestPartitionedDropboxDiscoveryResume:
+    """Partitioned Dropbox discovery (per-subfolder cursors flushed with each page)"""
+
+    @pytest.fixture
+    def run(self, tmp_path):
+        output = tmp_path / "discovery.json"
+
+        def run(resume=False, batch_size=2, monkeypatch=None, crash_at=None):
+            discovery = DocumentDiscovery()
+            discovery.persistence = DiscoveryPersistence(str(output))
+            discovery.source_client = _FakePartitionedDropbox()
+            if crash_at:
+                _crash_on_batch(discovery.persistence, monkeypatch, crash_at)
+            args = argparse.Namespace(resume=resume, workers=2, batch_size=batch_size, max_docs=None)
+            discovery._run_partitioned_dropbox_discovery(args, "/deals", datetime.now())
+            discovery.persistence.mark_discovery_complete()
+            return _paths(output)
+
+        return run
+
+    def test_uninterrupted_run(self, run):
+        assert run() == _FakePartitionedDropbox.expected()
+
+    @pytest.mark.parametrize("crash_at", [1, 2, 3, 4, 5, 6])
+    def test_resume_after_crash_stores_each_document_once(self, run, monkeypatch, crash_at):
+        with pytest.raises(_Crash):
+            run(monkeypatch=monkeypatch, crash_at=crash_at)
+        monkeypatch.undo()
+
+        assert run(resume=True) == _FakePartitionedDropbox.expected()
+
+    def test_rerun_without_resume_replaces_documents(self, run):
+        run()
+
+        assert run() == _FakePartitionedDropbox.expected()
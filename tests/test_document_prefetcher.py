@@ -0,0 +1,269 @@
+"""
+Unit tests for DocumentPrefetcher
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from src.pipeline.document_prefetcher import DocumentPrefetcher
+from src.utils.spooled_document import SpooledDocument
+
+
+def _bytes_budget(n):
+    """memory_budget_mb that allows exactly n bytes"""
+    return n / (1024 * 1024)
+
+
+def _download(path):
+    if path.startswith("bad"):
+        raise FileNotFoundError(path)
+    return path.encode() * 2
+
+
+class TestIterate:
+    """Order, skipped items and the read-ahead bound"""
+
+    def test_yields_items_in_order_with_their_content(self):
+        items = [f"doc{i}" for i in range(10)]
+        with DocumentPrefetcher(_download, depth=3) as prefetcher:
+            results = [(item, prefetched.content())
+                       for item, prefetched in prefetcher.iterate(items, lambda item: (item, {}))]
+
+        assert results == [(item, item.encode() * 2) for item in items]
+        assert prefetcher.stats["prefetched"] == 10
+        assert prefetcher._memory_bytes == 0
+
+    def test_items_without_request_are_not_downloaded(self):
+        calls = []
+
+        def download(path):
+            calls.append(path)
+            return b"x"
+
+        with DocumentPrefetcher(download, depth=2) as prefetcher:
+            results = [(item, prefetched and prefetched.content()) for item, prefetched in
+                       prefetcher.iterate(["a", "skip", "b"], lambda item: None if item == "skip" else (item, {}))]
+
+        assert results == [("a", b"x"), ("skip", None), ("b", b"x")]
+        assert sorted(calls) == ["a", "b"]
+
+    def test_download_kwargs_are_passed(self):
+        seen = []
+
+        def download(path, **kwargs):
+            seen.append((path, kwargs))
+            return b"x"
+
+        with DocumentPrefetcher(download, depth=1) as prefetcher:
+            for _, prefetched in prefetcher.iterate(["a"], lambda item: (item, {"expected_hash": "h"})):
+                prefetched.content()
+
+        assert seen == [("a", {"expected_hash": "h"})]
+
+    def test_reads_at_most_depth_items_ahead(self):
+        pulled = []
+
+        def items():
+            for i in range(20):
+                pulled.append(i)
+                yield f"doc{i}"
+
+        with DocumentPrefetcher(_download, depth=3) as prefetcher:
+            for index, (_, prefetched) in enumerate(prefetcher.iterate(items(), lambda item: (item, {}))):
+                assert len(pulled) <= index + 1 + 3
+                prefetched.content()
+
+    def test_unread_content_is_released(self, tmp_path):
+        with DocumentPrefetcher(_download, depth=2, memory_budget_mb=_bytes_budget(10),
+                                spool_dir=str(tmp_path)) as prefetcher:
+            for _ in prefetcher.iterate([f"doc{i}" for i in range(6)], lambda item: (item, {})):
+                pass
+
+        assert prefetcher._memory_bytes == 0
+        assert list(tmp_path.iterdir()) == []
+
+    def test_abandoned_iteration_releases_pending_downloads(self, tmp_path):
+        with DocumentPrefetcher(_download, depth=4, memory_budget_mb=_bytes_budget(10),
+                                spool_dir=str(tmp_path)) as prefetcher:
+            iteration = prefetcher.iterate([f"doc{i}" for i in range(6)], lambda item: (item, {}))
+            next(iteration)
+            iteration.close()
+
+        assert prefetcher._memory_bytes == 0
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestContent:
+    """Errors, memory budget and spooled passthrough"""
+
+    def test_download_error_is_reraised_by_content(self):
+        with DocumentPrefetcher(_download, depth=2) as prefetcher:
+            prefetched = prefetcher.submit("bad.pdf")
+
+            with pytest.raises(FileNotFoundError, match="bad.pdf"):
+                prefetched.content()
+
+        assert prefetcher.stats["failed"] == 1
+
+    def test_error_does_not_stop_iteration(self):
+        outcomes = []
+        with DocumentPrefetcher(_download, depth=2) as prefetcher:
+            for item, prefetched in prefetcher.iterate(["a", "bad", "b"], lambda item: (item, {})):
+                try:
+                    outcomes.append(prefetched.content())
+                except FileNotFoundError:
+                    outcomes.append(None)
+
+        assert outcomes == [b"aa", None, b"bb"]
+
+    def test_content_can_be_read_once(self):
+        with DocumentPrefetcher(_download) as prefetcher:
+            prefetched = prefetcher.submit("a")
+            prefetched.content()
+
+            with pytest.raises(RuntimeError):
+                prefetched.content()
+
+    def test_downloads_over_budget_are_spooled(self, tmp_path):
+        # One worker, so downloads finish in submission order: 8 bytes fit, the rest spool
+        prefetcher = DocumentPrefetcher(_download, depth=3, max_workers=1,
+                                        memory_budget_mb=_bytes_budget(10), spool_dir=str(tmp_path))
+        documents = [prefetcher.submit(path) for path in ("doc1", "doc2", "doc3")]
+        prefetcher.close()
+
+        assert prefetcher._memory_bytes == 8
+        assert len(list(tmp_path.iterdir())) == 2
+        contents = [d.content() for d in documents]
+        assert contents[0] == b"doc1doc1"
+        # Spool files are handed over as SpooledDocuments, not read back into memory
+        assert all(isinstance(content, SpooledDocument) for content in contents[1:])
+        assert [content.read_bytes() for content in contents[1:]] == [b"doc2doc2", b"doc3doc3"]
+        assert prefetcher._memory_bytes == 0
+        assert prefetcher.stats["spooled"] == 2
+        for content in contents[1:]:
+            content.cleanup()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_spooled_download_passes_through(self, tmp_path):
+        path = tmp_path / "large.pdf"
+        path.write_bytes(b"%PDF-large")
+        spooled = SpooledDocument(str(path), 10)
+        with DocumentPrefetcher(lambda p: spooled, memory_budget_mb=_bytes_budget(1),
+                                spool_dir=str(tmp_path)) as prefetcher:
+            content = prefetcher.submit("large.pdf").content()
+
+        assert content is spooled
+        assert prefetcher._memory_bytes == 0
+        assert prefetcher.stats["spooled"] == 1
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_discarded_spooled_download_is_removed(self, tmp_path):
+        path = tmp_path / "large.pdf"
+        path.write_bytes(b"%PDF-large")
+        spooled = SpooledDocument(str(path), 10)
+        with DocumentPrefetcher(lambda p: spooled) as prefetcher:
+            prefetched = prefetcher.submit("large.pdf")
+            prefetched._future.result()
+            prefetched.discard()
+
+        assert not path.exists()
+
+    def test_discard_before_download_starts_cancels_it(self):
+        release = threading.Event()
+        calls = []
+
+        def download(path):
+            calls.append(path)
+            release.wait(5)
+            return b"x"
+
+        with DocumentPrefetcher(download, depth=1, max_workers=1) as prefetcher:
+            first = prefetcher.submit("first")
+            second = prefetcher.submit("second")
+            second.discard()
+            release.set()
+            first.content()
+
+        assert calls == ["first"]
+
+
+class TestMemoryBudget:
+    """Size hints reserve budget before downloading; spool files are not read back"""
+
+    def test_hinted_download_waits_for_earlier_documents(self):
+        started = []
+
+        def download(path):
+            started.append(path)
+            return b"x" * 8
+
+        with DocumentPrefetcher(download, depth=3, max_workers=3,
+                                memory_budget_mb=_bytes_budget(10)) as prefetcher:
+            first = prefetcher.submit("a", size_hint=8)
+            second = prefetcher.submit("b", size_hint=8)
+            first._future.result()
+            time.sleep(0.05)
+
+            # b does not fit next to a, so it has not started downloading
+            assert started == ["a"]
+            assert first.content() == b"x" * 8
+            assert second.content() == b"x" * 8
+
+        assert started == ["a", "b"]
+        assert prefetcher.stats["waited"] == 1
+        assert prefetcher._memory_bytes == 0
+
+    def test_earliest_document_never_waits_for_later_ones(self):
+        prefetcher = DocumentPrefetcher(_download, memory_budget_mb=_bytes_budget(10))
+        prefetcher._outstanding = {0, 1}
+        # The later document won the race to reserve
+        prefetcher._reserve(1, 8)
+        reserved = threading.Thread(target=prefetcher._reserve, args=(0, 8))
+
+        reserved.start()
+        reserved.join(timeout=5)
+
+        assert not reserved.is_alive()
+        assert prefetcher._memory_bytes == 16
+        prefetcher.close()
+
+    def test_memory_stays_within_budget(self):
+        peak = []
+        sizes = {f"doc{i}": 3 + i % 5 for i in range(30)}
+
+        def download(path):
+            peak.append(prefetcher._memory_bytes)
+            return b"x" * sizes[path]
+
+        with DocumentPrefetcher(download, depth=6, max_workers=6,
+                                memory_budget_mb=_bytes_budget(16)) as prefetcher:
+            for item, prefetched in prefetcher.iterate(sizes, lambda item: (item, {}, sizes[item])):
+                assert prefetched.content() == b"x" * sizes[item]
+
+        # The budget, plus at most the earliest outstanding document (7 bytes) past it
+        assert max(peak) <= 16 + 7
+        assert prefetcher.stats["waited"] > 0
+        assert prefetcher._memory_bytes == 0
+
+    def test_failed_download_releases_its_reservation(self):
+        with DocumentPrefetcher(_download, memory_budget_mb=_bytes_budget(10)) as prefetcher:
+            with pytest.raises(FileNotFoundError):
+                prefetcher.submit("bad.pdf", size_hint=8).content()
+
+        assert prefetcher._memory_bytes == 0
+        assert prefetcher._held == {} and prefetcher._outstanding == set()
+
+    def test_spool_file_keeps_the_extension(self, tmp_path, monkeypatch):
+        with DocumentPrefetcher(_download, max_workers=1, memory_budget_mb=0,
+                                spool_dir=str(tmp_path)) as prefetcher:
+            monkeypatch.setattr(SpooledDocument, "read_bytes",
+                                lambda self: pytest.fail("spool file read back into memory"))
+            content = prefetcher.submit("scan.pdf").content()
+
+        assert isinstance(content, SpooledDocument)
+        assert content.path.endswith(".pdf") and os.path.getsize(content.path) == 16
+        content.cleanup()
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,81 @@
+"""
+Tests for the discovery -> processing full_source_path hand-off
+
+Discovery records each document's absolute payload path in
+source_metadata.full_source_path; processing passes it to
+LocalFilesystemClient.download_file, which reads it directly instead of
+resolving a ContentVersion id by walking the export's payload directories.
+"""
+
+import os
+
+import pytest
+
+import discover_documents
+from src.connectors.local_filesystem_client import LocalFilesystemClient
+from src.connectors.raw_salesforce_export_connector import RawSalesforceExportConnector
+from src.pipeline import parallel_processor
+from src.utils.discovery_persistence import DiscoveryPersistence
+
+
+@pytest.fixture
+def discovered(raw_export):
+    """Discovery dicts for the fixture export, keyed by ContentVersion id"""
+    connector = RawSalesforceExportConnector(**raw_export)
+    return {
+        doc.salesforce_content_version_id: discover_documents._metadata_to_dict(doc, "salesforce_raw")
+        for doc in connector.list_documents_as_metadata()
+    }
+
+
+def _no_walk(monkeypatch):
+    def fail(*args, **kwargs):
+        pytest.fail("payload directories walked despite full_source_path")
+
+    monkeypatch.setattr(os, "scandir", fail)
+    monkeypatch.setattr(LocalFilesystemClient, "_resolve_content_version", fail)
+
+
+class TestFullSourcePath:
+    """Discovery persists the payload path and downloads use it"""
+
+    def test_discovery_records_absolute_payload_paths(self, raw_export, discovered):
+        root = raw_export["export_root_dir"]
+
+        assert discovered["068A"]["source_metadata"]["full_source_path"] == \
+            os.path.join(root, "ContentVersions", "VersionData", "068A", "a.pdf")
+        # Deal-folder fallback payloads are recorded the same way
+        assert discovered["068E"]["source_metadata"]["full_source_path"] == \
+            os.path.join(root, "Deal__cs", "0EMbatch", "a0W2", "d.pdf")
+
+    def test_persistence_serializes_full_source_path(self, raw_export, tmp_path):
+        doc_metadata = next(RawSalesforceExportConnector(**raw_export).list_documents_as_metadata())
+        persistence = DiscoveryPersistence(str(tmp_path / "discovery.json"))
+
+        serialized = persistence._serialize_document_metadata(doc_metadata)
+
+        assert serialized["source_metadata"]["full_source_path"] == doc_metadata.full_path
+
+    def test_download_skips_directory_walk(self, raw_export, discovered, monkeypatch):
+        client = LocalFilesystemClient(raw_export["export_root_dir"])
+        doc_data = discovered["068B"]
+        _no_walk(monkeypatch)
+
+        content = client.download_file("ContentVersion/068B", **parallel_processor._download_kwargs(doc_data))
+
+        assert content == b"docx-b"
+
+    def test_stale_full_source_path_falls_back_to_resolution(self, raw_export):
+        client = LocalFilesystemClient(raw_export["export_root_dir"])
+
+        content = client.download_file("ContentVersion/068A", full_source_path="/moved/elsewhere/a.pdf")
+
+        assert content == b"%PDF-a"
+        assert "068A" in client._resolved_content_versions
+
+    def test_resolved_payload_is_cached(self, raw_export, monkeypatch):
+        client = LocalFilesystemClient(raw_export["export_root_dir"])
+        client.download_file("ContentVersion/068A")
+        monkeypatch.setattr(os, "scandir", lambda path: pytest.fail("payload resolved twice"))
+
+        assert client.download_file("ContentVersion/068A") == b"%PDF-a"
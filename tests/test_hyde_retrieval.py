@@ -0,0 +1,207 @@
+"""
+Unit tests for HyDE generation callbacks and reciprocal rank fusion
+
+BusinessDocumentHyDETransformer.transform_query generates hypothetical
+documents concurrently and reports each one through on_document as soon as it
+is ready; HyDERetrievalManager starts a search from that callback and fuses
+the result lists by reciprocal rank. openai is not installed here, so the
+modules are imported against an empty stand-in and generation is faked.
+"""
+
+import importlib
+import sys
+import threading
+import types
+
+import pytest
+
+
+@pytest.fixture
+def hyde(monkeypatch, pinecone_client_module):
+    """(hyde_query_transformer, hyde_retrieval_integration) imported against a fake openai package"""
+    openai = types.ModuleType("openai")
+    openai.OpenAI = lambda api_key=None: types.SimpleNamespace(api_key=api_key)
+    monkeypatch.setitem(sys.modules, "openai", openai)
+    for name in ("src.retrieval", "src.retrieval.hyde_query_transformer", "src.retrieval.hyde_retrieval_integration"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    return (importlib.import_module("src.retrieval.hyde_query_transformer"),
+            importlib.import_module("src.retrieval.hyde_retrieval_integration"))
+
+
+def _result(module, path, score, chunk=0):
+    return module.DocumentSearchResult(id=f"{path}#{chunk}", text="", pinecone_score=score, document_path=path)
+
+
+class _FlakyGenerator:
+    """_generate_hypothetical_document stand-in whose fail_on-th call raises"""
+
+    def __init__(self, fail_on=()):
+        self.fail_on = set(fail_on)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call in self.fail_on:
+            raise RuntimeError("rate limited")
+        return f"hypothetical {call}", {"input_tokens": 10, "output_tokens": 5, "total_tokens": 15}
+
+
+@pytest.fixture
+def transformer(hyde, monkeypatch):
+    transformer_module, _ = hyde
+    settings = types.SimpleNamespace(OPENAI_API_KEY="test")
+    return transformer_module.BusinessDocumentHyDETransformer(settings)
+
+
+class TestReciprocalRankFusion:
+    """Documents are ranked by summed reciprocal rank, ties by their best chunk score"""
+
+    @pytest.fixture
+    def fuse(self, hyde):
+        _, integration = hyde
+        manager = integration.HyDERetrievalManager.__new__(integration.HyDERetrievalManager)
+        manager.rrf_k = integration.DEFAULT_RRF_K
+        return manager._reciprocal_rank_fusion
+
+    def test_documents_in_several_lists_rank_first(self, hyde, fuse):
+        module = hyde[1]
+        lists = [
+            [_result(module, "a", 0.9), _result(module, "b", 0.8)],
+            [_result(module, "b", 0.7), _result(module, "c", 0.6)],
+        ]
+
+        fused = fuse(lists)
+
+        # b: 1/62 + 1/61; a: 1/61; c: 1/62
+        assert [r.document_path for r in fused] == ["b", "a", "c"]
+
+    def test_repeated_chunks_take_one_rank_and_keep_the_best(self, hyde, fuse):
+        module = hyde[1]
+        lists = [
+            [_result(module, "a", 0.9, 0), _result(module, "a", 0.8, 1), _result(module, "b", 0.4, 0)],
+            [_result(module, "c", 0.5, 0), _result(module, "b", 0.95, 1)],
+        ]
+
+        fused = fuse(lists)
+
+        # b is second in both lists (a's second chunk does not push it down)
+        assert [r.document_path for r in fused] == ["b", "a", "c"]
+        assert [r.id for r in fused] == ["b#1", "a#0", "c#0"]
+
+    def test_ties_break_by_best_score_then_first_seen(self, hyde, fuse):
+        module = hyde[1]
+        lists = [
+            [_result(module, "low", 0.2), _result(module, "x", 0.5)],
+            [_result(module, "high", 0.3), _result(module, "y", 0.5)],
+        ]
+
+        fused = fuse(lists)
+
+        # low/high and x/y tie on fused score; x and y also tie on score
+        assert [r.document_path for r in fused] == ["high", "low", "x", "y"]
+
+    def test_identity_falls_back_to_file_name_then_id(self, hyde, fuse):
+        module = hyde[1]
+        named = module.DocumentSearchResult(id="n#0", text="", pinecone_score=0.5, file_name="n.pdf")
+        named_again = module.DocumentSearchResult(id="n#1", text="", pinecone_score=0.6, file_name="n.pdf")
+        bare = module.DocumentSearchResult(id="z#0", text="", pinecone_score=0.9)
+
+        fused = fuse([[named, bare], [named_again]])
+
+        assert [r.id for r in fused] == ["n#1", "z#0"]
+
+    def test_empty_lists(self, fuse):
+        assert fuse([]) == []
+        assert fuse([[], []]) == []
+
+
+class TestOnDocumentCallback:
+    """Each generated document is reported once; failed generations are skipped"""
+
+    def _collect(self):
+        received = []
+        lock = threading.Lock()
+
+        def on_document(index, document):
+            with lock:
+                received.append((index, document))
+
+        return received, on_document
+
+    def test_failed_generation_is_not_reported(self, transformer, monkeypatch):
+        generator = _FlakyGenerator(fail_on={2})
+        monkeypatch.setattr(transformer, "_generate_hypothetical_document", generator)
+        received, on_document = self._collect()
+
+        result = transformer.transform_query("renewal terms", num_documents=3, on_document=on_document)
+
+        assert len(received) == 2
+        assert len({index for index, _ in received}) == 2
+        # Documents come back in index order, without the failed one
+        assert result.hypothetical_documents == [document for _, document in sorted(received)]
+        assert result.confidence_score == pytest.approx(2 / 3)
+        assert result.token_usage == {"input_tokens": 20, "output_tokens": 10, "total_tokens": 30}
+
+    def test_single_failed_generation(self, transformer, monkeypatch):
+        monkeypatch.setattr(transformer, "_generate_hypothetical_document", _FlakyGenerator(fail_on={1}))
+        received, on_document = self._collect()
+
+        result = transformer.transform_query("renewal terms", num_documents=1, on_document=on_document)
+
+        assert received == []
+        assert (result.hypothetical_documents, result.confidence_score) == ([], 0.0)
+
+    def test_failing_callback_keeps_the_document(self, transformer, monkeypatch):
+        monkeypatch.setattr(transformer, "_generate_hypothetical_document", _FlakyGenerator())
+        received, collect = self._collect()
+
+        def on_document(index, document):
+            collect(index, document)
+            if index == 0:
+                raise ValueError("search could not be submitted")
+
+        result = transformer.transform_query("renewal terms", num_documents=3, on_document=on_document)
+
+        assert sorted(index for index, _ in received) == [0, 1, 2]
+        assert len(result.hypothetical_documents) == 3
+
+
+class _FakeSearchClient:
+    """hybrid_search_documents returning one document per query"""
+
+    def __init__(self, module):
+        self.module = module
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def hybrid_search_documents(self, query, filter_metadata=None, top_k=100, **kwargs):
+        with self._lock:
+            self.queries.append(query)
+        return [_result(self.module, f"doc for {query}", 0.5)]
+
+
+class TestCombinedSearch:
+    """The combined search fuses the original query with every generated document"""
+
+    def test_failed_generation_drops_its_list(self, hyde, transformer, monkeypatch):
+        _, integration = hyde
+        monkeypatch.setattr(transformer, "_generate_hypothetical_document", _FlakyGenerator(fail_on={1}))
+        manager = integration.HyDERetrievalManager.__new__(integration.HyDERetrievalManager)
+        manager.pinecone_client = _FakeSearchClient(integration)
+        manager.hyde_transformer = transformer
+        manager.include_original_query = True
+        manager.num_hyde_documents = 3
+        manager.rrf_k = integration.DEFAULT_RRF_K
+
+        result = manager.search_documents("renewal terms", mode=integration.RetrievalMode.HYDE_COMBINED, top_k=5)
+
+        generated = result.hyde_result.hypothetical_documents
+        assert len(generated) == 2
+        assert sorted(manager.pinecone_client.queries) == sorted(["renewal terms"] + generated)
+        assert result.performance_metrics["fused_lists"] == 3
+        # The original query's list comes first, so it wins the fused-score tie
+        assert [r.document_path for r in result.documents][0] == "doc for renewal terms"
+        assert len(result.documents) == 3
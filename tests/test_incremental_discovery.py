@@ -0,0 +1,343 @@
+"""
+Tests for incremental (list_folder cursor) discovery
+
+DiscoveryPersistence.apply_changes applies added, modified and deleted files
+to the stored documents through a path index it keeps between calls;
+DropboxClient.list_changes turns list_folder_continue pages into change
+tuples; DocumentDiscovery applies them from the saved cursor and falls back
+to reconciling a full listing when there is no cursor or Dropbox resets it.
+"""
+
+import argparse
+import copy
+import json
+import logging
+import random
+from datetime import datetime
+
+import dropbox
+import pytest
+
+from discover_documents import DocumentDiscovery
+from src.connectors.dropbox_client import BusinessMetadataExtractor, DropboxClient, ListFolderCursorReset
+from src.models.document_models import DocumentMetadata
+from src.utils.discovery_persistence import DiscoveryPersistence
+
+
+def _doc(path, content_hash="h1", processed=False):
+    doc = {"file_info": {"path": path, "name": path.rsplit("/", 1)[-1], "content_hash": content_hash}}
+    if processed:
+        doc["processing_status"] = {"processed": True, "pinecone_namespace": "deals"}
+    return doc
+
+
+def _reference_apply(persistence, documents, upserts, deleted_paths):
+    """apply_changes as it was before the persistent index (path map rebuilt per call, prefix scan per delete)"""
+    counts = {"added": 0, "modified": 0, "unchanged": 0, "deleted": 0}
+    now = "now"
+    by_path = {}
+    for i, doc in enumerate(documents):
+        path = persistence._get_file_info(doc).get("path") or doc.get("path")
+        if path:
+            by_path[path.lower()] = i
+
+    for document in upserts:
+        doc_data = persistence._ensure_document_structure(document)
+        path = (persistence._get_file_info(doc_data).get("path") or "").lower()
+        index = by_path.get(path)
+        if index is None:
+            by_path[path] = len(documents)
+            documents.append(doc_data)
+            counts["added"] += 1
+            continue
+        existing = documents[index]
+        existing_hash = persistence._get_file_info(existing).get("content_hash")
+        if (not existing.get("source_deleted") and existing_hash
+                and existing_hash == persistence._get_file_info(doc_data).get("content_hash")):
+            counts["unchanged"] += 1
+            continue
+        cleanup = persistence._vector_cleanup(existing, "modified", now)
+        if cleanup:
+            doc_data["vector_cleanup"] = cleanup
+        documents[index] = doc_data
+        counts["modified"] += 1
+
+    for deleted_path in deleted_paths:
+        prefix = deleted_path.lower().rstrip("/")
+        for path, index in by_path.items():
+            if path != prefix and not path.startswith(prefix + "/"):
+                continue
+            doc = documents[index]
+            if doc.get("source_deleted"):
+                continue
+            doc["source_deleted"] = {"deleted_at": now}
+            cleanup = persistence._vector_cleanup(doc, "deleted", now)
+            if cleanup:
+                doc["vector_cleanup"] = cleanup
+            counts["deleted"] += 1
+    return counts
+
+
+def _normalized(documents):
+    """Documents with the change timestamps blanked out"""
+    documents = copy.deepcopy(documents)
+    for doc in documents:
+        if doc.get("source_deleted"):
+            doc["source_deleted"]["deleted_at"] = "now"
+        if doc.get("vector_cleanup"):
+            doc["vector_cleanup"]["marked_at"] = "now"
+    return json.dumps(documents, sort_keys=True, default=str)
+
+
+@pytest.fixture
+def persistence(tmp_path):
+    return DiscoveryPersistence(str(tmp_path / "discovery.json"))
+
+
+def _stored(persistence):
+    return {doc["file_info"]["path"]: doc for doc in persistence.data["documents"]}
+
+
+class TestApplyChanges:
+    """Added, modified and deleted files are applied to the stored documents"""
+
+    def test_added_unchanged_and_modified(self, persistence):
+        persistence.add_batch([_doc("/deals/a.pdf"), _doc("/deals/b.pdf", processed=True)], 1)
+
+        counts = persistence.apply_changes(
+            [_doc("/deals/c.pdf"), _doc("/Deals/A.pdf"), _doc("/deals/b.pdf", content_hash="h2")], [])
+
+        assert counts == {"added": 1, "modified": 1, "unchanged": 1, "deleted": 0}
+        stored = _stored(persistence)
+        assert list(stored) == ["/deals/a.pdf", "/deals/b.pdf", "/deals/c.pdf"]
+        # The modified file is processed again; its old vectors are queued for cleanup
+        assert stored["/deals/b.pdf"]["file_info"]["content_hash"] == "h2"
+        assert stored["/deals/b.pdf"]["processing_status"]["processed"] is False
+        assert stored["/deals/b.pdf"]["vector_cleanup"]["reason"] == "modified"
+
+    def test_deleted_file(self, persistence):
+        persistence.add_batch([_doc("/deals/a.pdf", processed=True), _doc("/deals/b.pdf")], 1)
+
+        counts = persistence.apply_changes([], ["/DEALS/a.pdf", "/deals/missing.pdf"])
+
+        assert counts["deleted"] == 1
+        stored = _stored(persistence)
+        assert stored["/deals/a.pdf"]["source_deleted"]
+        assert stored["/deals/a.pdf"]["vector_cleanup"]["reason"] == "deleted"
+        assert "source_deleted" not in stored["/deals/b.pdf"]
+        filtered = persistence.filter_documents(persistence.data["documents"], include_processed=True)
+        assert filtered["documents"] == [stored["/deals/b.pdf"]]
+
+    def test_deleted_folder_leaves_siblings_with_the_same_prefix(self, persistence):
+        paths = ["/deals/a/1.pdf", "/deals/a/sub/2.pdf", "/deals/a.pdf", "/deals/a-b/3.pdf",
+                 "/deals/ab/4.pdf", "/deals/b/5.pdf"]
+        persistence.add_batch([_doc(path) for path in paths], 1)
+
+        counts = persistence.apply_changes([], ["/deals/A/"])
+
+        assert counts["deleted"] == 2
+        deleted = [path for path, doc in _stored(persistence).items() if doc.get("source_deleted")]
+        assert deleted == ["/deals/a/1.pdf", "/deals/a/sub/2.pdf"]
+        # Deleting again finds nothing new
+        assert persistence.apply_changes([], ["/deals/a"])["deleted"] == 0
+
+    def test_readded_file_replaces_the_deleted_entry(self, persistence):
+        persistence.add_batch([_doc("/deals/a.pdf")], 1)
+        persistence.apply_changes([], ["/deals"])
+
+        counts = persistence.apply_changes([_doc("/deals/a.pdf")], [])
+
+        assert counts["modified"] == 1
+        assert [doc.get("source_deleted") for doc in persistence.data["documents"]] == [None]
+
+    def test_index_follows_appends_and_truncation(self, persistence):
+        persistence.add_batch([_doc("/deals/a.pdf"), _doc("/deals/b.pdf")], 1)
+        persistence.apply_changes([_doc("/deals/c.pdf")], [])
+        persistence.add_batch([_doc("/deals/d.pdf")], 2)
+
+        assert persistence.apply_changes([_doc("/deals/d.pdf")], [])["unchanged"] == 1
+        assert persistence.apply_changes([], ["/deals/c.pdf"])["deleted"] == 1
+
+        # A resume truncates the stored documents behind the index's back
+        del persistence.data["documents"][1:]
+        persistence.add_batch([_doc("/deals/x.pdf")], 3)
+
+        counts = persistence.apply_changes([_doc("/deals/c.pdf"), _doc("/deals/x.pdf")], ["/deals/d.pdf"])
+
+        assert counts == {"added": 1, "modified": 0, "unchanged": 1, "deleted": 0}
+        assert list(_stored(persistence)) == ["/deals/a.pdf", "/deals/x.pdf", "/deals/c.pdf"]
+
+    def test_random_changes_match_reference(self, tmp_path):
+        rng = random.Random(45)
+        folders = ["/deals", "/deals/a", "/deals/a/sub", "/deals/ab", "/Deals/A", "/other"]
+        names = ["1.pdf", "2.PDF", "a.pdf", "sub"]
+        for iteration in range(40):
+            persistence = DiscoveryPersistence(str(tmp_path / f"discovery{iteration}.json"))
+            reference = []
+            for step in range(12):
+                action = rng.random()
+                if action < 0.15 and reference:
+                    keep = rng.randint(0, len(reference))
+                    del persistence.data["documents"][keep:]
+                    del reference[keep:]
+                elif action < 0.3:
+                    batch = [_doc(f"{rng.choice(folders)}/{rng.choice(names)}") for _ in range(rng.randint(1, 3))]
+                    persistence.add_batch(copy.deepcopy(batch), step)
+                    reference.extend(copy.deepcopy(persistence.data["documents"][len(reference):]))
+                else:
+                    for i in rng.sample(range(len(reference)), min(len(reference), 2)):
+                        for doc in (reference[i], persistence.data["documents"][i]):
+                            doc.setdefault("processing_status", {})["processed"] = True
+                    upserts = [_doc(f"{rng.choice(folders)}/{rng.choice(names)}", rng.choice(["h1", "h2", None]))
+                               for _ in range(rng.randint(0, 4))]
+                    deletes = [rng.choice(folders + [f"{rng.choice(folders)}/{rng.choice(names)}"]) + rng.choice(["", "/"])
+                               for _ in range(rng.randint(0, 2))]
+
+                    expected = _reference_apply(persistence, reference, copy.deepcopy(upserts), deletes)
+                    actual = persistence.apply_changes(copy.deepcopy(upserts), deletes)
+
+                    assert actual == expected, (iteration, step)
+                assert _normalized(persistence.data["documents"]) == _normalized(reference), (iteration, step)
+
+
+class _FakeDropboxApi:
+    """files_list_folder_continue over fixed pages; page cursors are "page-<n>"."""
+
+    def __init__(self, pages, reset=False):
+        self.pages = pages
+        self.reset = reset
+        self.cursors = []
+
+    def files_list_folder_continue(self, cursor):
+        self.cursors.append(cursor)
+        if self.reset:
+            error = dropbox.files.ListFolderContinueError.reset
+            raise dropbox.exceptions.ApiError("req", error, "reset", None)
+        page = 0 if cursor == "saved" else int(cursor.split("-")[1])
+        return dropbox.files.ListFolderResult(entries=self.pages[page], cursor=f"page-{page + 1}",
+                                              has_more=page + 1 < len(self.pages))
+
+
+def _file_entry(path, content_hash="a" * 64):
+    modified = datetime(2025, 1, 2, 3, 4, 5)
+    return dropbox.files.FileMetadata(name=path.rsplit("/", 1)[1], id="id:" + path, path_display=path,
+                                      path_lower=path.lower(), client_modified=modified,
+                                      server_modified=modified, rev="0123456789", size=2048,
+                                      content_hash=content_hash)
+
+
+def _client(api):
+    client = DropboxClient.__new__(DropboxClient)
+    client.logger = logging.getLogger(__name__)
+    client.metadata_extractor = BusinessMetadataExtractor()
+    client.client = api
+    client.last_cursor = None
+    return client
+
+
+class TestListChanges:
+    """list_changes yields upserts and deletes across pages and keeps the final cursor"""
+
+    def test_pages_become_change_tuples(self):
+        api = _FakeDropboxApi([
+            [_file_entry("/Deals/2024 Deal Docs/quote.pdf"), dropbox.files.DeletedMetadata(name="old", path_lower="/deals/old")],
+            [dropbox.files.FolderMetadata(name="new", id="id:new", path_lower="/deals/new"),
+             dropbox.files.DeletedMetadata(name="x.pdf", path_lower="/deals/x.pdf", path_display="/Deals/X.pdf")],
+        ])
+        client = _client(api)
+
+        changes = list(client.list_changes("saved", "/Deals"))
+
+        assert [(kind, payload if kind == "delete" else payload.path) for kind, payload in changes] == [
+            ("upsert", "/Deals/2024 Deal Docs/quote.pdf"), ("delete", "/deals/old"), ("delete", "/Deals/X.pdf")]
+        assert changes[0][1].content_hash == "a" * 64
+        assert api.cursors == ["saved", "page-1"]
+        assert client.last_cursor == "page-2"
+
+    def test_reset_cursor_raises(self):
+        client = _client(_FakeDropboxApi([], reset=True))
+
+        with pytest.raises(ListFolderCursorReset):
+            list(client.list_changes("saved", "/Deals"))
+        assert client.last_cursor is None
+
+
+class _FakeDropboxSource:
+    """list_changes/list_documents over fixed listings, with an optional cursor reset."""
+
+    def __init__(self, changes=(), listing=(), reset=False):
+        self.changes = list(changes)
+        self.listing = list(listing)
+        self.reset = reset
+        self.last_cursor = None
+        self.listed = False
+
+    def list_changes(self, cursor, folder_path=""):
+        if self.reset:
+            raise ListFolderCursorReset("list_folder cursor was reset by Dropbox")
+        yield from self.changes
+        self.last_cursor = "after-changes"
+
+    def list_documents(self, folder_path=""):
+        self.listed = True
+        for path, content_hash in self.listing:
+            yield _metadata(path, content_hash)
+        self.last_cursor = "after-listing"
+
+
+def _metadata(path, content_hash="h1"):
+    return DocumentMetadata(path=path, name=path.rsplit("/", 1)[1], size=1, size_mb=0.0, file_type=".pdf",
+                            modified_time="2025-01-01", content_hash=content_hash)
+
+
+class TestCursorReconcile:
+    """Incremental discovery continues from the saved cursor or reconciles a full listing"""
+
+    @pytest.fixture
+    def run(self, tmp_path):
+        output = tmp_path / "discovery.json"
+        seeded = DiscoveryPersistence(str(output))
+        seeded.add_batch([_doc("/deals/a.pdf"), _doc("/deals/b.pdf", processed=True),
+                          _doc("/deals/old/c.pdf"), _doc("/elsewhere/d.pdf")], 1)
+
+        def run(source, cursor="saved"):
+            discovery = DocumentDiscovery()
+            discovery.persistence = DiscoveryPersistence(str(output))
+            if cursor:
+                discovery.persistence.set_list_folder_cursor("/deals", cursor)
+            discovery.source_client = source
+            args = argparse.Namespace(folder="/deals", longpoll=None, batch_size=2, output=str(output))
+            discovery._run_incremental_discovery(args)
+            return DiscoveryPersistence(str(output))
+
+        return run
+
+    def test_changes_since_the_cursor(self, run):
+        source = _FakeDropboxSource(changes=[
+            ("upsert", _metadata("/deals/b.pdf", "h2")), ("delete", "/deals/old"),
+            ("upsert", _metadata("/deals/old/c.pdf")), ("upsert", _metadata("/deals/e.pdf")),
+        ])
+
+        persistence = run(source)
+
+        stored = _stored(persistence)
+        assert list(stored) == ["/deals/a.pdf", "/deals/b.pdf", "/deals/old/c.pdf", "/elsewhere/d.pdf", "/deals/e.pdf"]
+        assert stored["/deals/b.pdf"]["vector_cleanup"]["reason"] == "modified"
+        # Deleted, then re-added in a later batch
+        assert not any(doc.get("source_deleted") for doc in stored.values())
+        assert not source.listed
+        assert persistence.get_list_folder_cursor("/deals") == "after-changes"
+
+    @pytest.mark.parametrize("cursor,reset", [(None, False), ("saved", True)])
+    def test_full_listing_marks_missing_documents_deleted(self, run, cursor, reset):
+        source = _FakeDropboxSource(listing=[("/Deals/A.pdf", "h1"), ("/deals/f.pdf", "h1")], reset=reset)
+
+        persistence = run(source, cursor=cursor)
+
+        stored = _stored(persistence)
+        assert source.listed
+        assert [path for path, doc in stored.items() if doc.get("source_deleted")] == ["/deals/b.pdf", "/deals/old/c.pdf"]
+        # Outside the discovered folder nothing is touched
+        assert "source_deleted" not in stored["/elsewhere/d.pdf"]
+        assert "/deals/f.pdf" in stored
+        assert persistence.get_list_folder_cursor("/deals") == "after-listing"
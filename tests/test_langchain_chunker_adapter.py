@@ -0,0 +1,135 @@
+"""
+Unit tests for the embedding-similarity chunker adapter and chunk embedding
+
+Covers breakpoint grouping in LangchainChunkerAdapter, the opt-in pooled chunk
+embeddings, and PineconeDocumentClient.generate_chunk_embeddings (chunk text is
+embedded unless a dense vector was handed over).
+"""
+
+import numpy as np
+import pytest
+
+from src.chunking.langchain_chunker_adapter import LangchainChunkerAdapter
+
+
+PRICING = [
+    "The unit price is fixed for the first year.",
+    "Any price change needs written approval.",
+    "The list price excludes local taxes.",
+    "Volume tiers lower the price per seat.",
+]
+LEGAL = [
+    "The liability clause caps damages.",
+    "A termination clause allows exit with notice.",
+    "The renewal clause is automatic.",
+    "The audit clause covers two years.",
+]
+CONTENT = " ".join(PRICING + LEGAL)
+
+
+class _FakeEmbeddingClient:
+    """Dense vectors counting 'price' and 'clause'; records every embedding call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def _generate_embeddings(self, texts, input_type=None, include_dense=True, include_sparse=True):
+        self.calls.append((list(texts), input_type, include_sparse))
+        return {
+            "dense_embeddings": [[text.count("price"), text.count("clause")] for text in texts],
+            "sparse_embeddings": [],
+        }
+
+
+class TestSemanticBreakpoints:
+    """Sentence windows are embedded once and split at the largest topic shift"""
+
+    def test_chunks_split_at_topic_shift(self):
+        client = _FakeEmbeddingClient()
+        adapter = LangchainChunkerAdapter(client)
+
+        chunks = adapter.chunk_document(CONTENT, {"document_name": "deal.pdf"})
+
+        assert [chunk.text for chunk in chunks] == [" ".join(PRICING), " ".join(LEGAL)]
+        for chunk in chunks:
+            assert CONTENT[chunk.start_index:chunk.end_index] == chunk.text
+        assert [chunk.metadata["chunk_index"] for chunk in chunks] == [0, 1]
+        assert len(client.calls) == 1
+        windows, input_type, include_sparse = client.calls[0]
+        assert len(windows) == len(PRICING) + len(LEGAL)
+        assert windows[0] == " ".join(PRICING[:2])
+        assert (input_type, include_sparse) == ("passage", False)
+
+    def test_short_content_is_not_chunked(self):
+        client = _FakeEmbeddingClient()
+
+        assert LangchainChunkerAdapter(client).chunk_document("Too short.", {}) == []
+        assert client.calls == []
+
+
+class TestChunkEmbeddings:
+    """Chunks are embedded from their text unless pooling is switched on"""
+
+    def test_chunks_carry_no_embedding_by_default(self):
+        chunks = LangchainChunkerAdapter(_FakeEmbeddingClient()).chunk_document(CONTENT, {})
+
+        assert [chunk.embedding for chunk in chunks] == [None, None]
+
+    def test_pooling_is_opt_in(self):
+        adapter = LangchainChunkerAdapter(_FakeEmbeddingClient(), pool_chunk_embeddings=True)
+
+        chunks = adapter.chunk_document(CONTENT, {})
+
+        # Only windows entirely inside a chunk are pooled: pure pricing, pure legal
+        assert chunks[0].embedding == pytest.approx([1.0, 0.0])
+        assert chunks[1].embedding == pytest.approx([0.0, 1.0])
+
+    def test_pooling_skips_chunks_without_an_inner_window(self):
+        adapter = LangchainChunkerAdapter(_FakeEmbeddingClient(), pool_chunk_embeddings=True)
+        embeddings = np.eye(6, dtype=np.float32)
+
+        # Windows 2 and 3 each reach into a neighbouring chunk
+        assert adapter._pooled_embedding(embeddings, 2, 4) is None
+        assert adapter._pooled_embedding(embeddings, 0, 2) == pytest.approx([1, 0, 0, 0, 0, 0])
+        assert adapter._pooled_embedding(embeddings, 4, 6) == pytest.approx([0, 0, 0, 0, 0, 1])
+
+
+class TestGenerateChunkEmbeddings:
+    """Dense vectors are requested only for chunks that have none"""
+
+    def _client(self, module):
+        return module.PineconeDocumentClient(api_key="test", query_cache=module.QueryEmbeddingCache())
+
+    def test_chunk_text_is_embedded_when_no_vectors_are_given(self, pinecone_client_module):
+        client = self._client(pinecone_client_module)
+        texts = ["alpha", "beta gamma"]
+
+        result = client.generate_chunk_embeddings(texts, [None, None])
+
+        assert result["dense_embeddings"] == [[5.0, 1.0], [10.0, 1.0]]
+        assert len(result["sparse_embeddings"]) == 2
+        assert client.pc.inference.calls == [
+            ("multilingual-e5-large", texts, "passage"),
+            ("pinecone-sparse-english-v0", texts, "passage"),
+        ]
+
+    def test_given_vectors_are_reused(self, pinecone_client_module):
+        client = self._client(pinecone_client_module)
+        texts = ["alpha", "beta gamma"]
+
+        result = client.generate_chunk_embeddings(texts, [[0.5, 0.5], None])
+
+        assert result["dense_embeddings"] == [[0.5, 0.5], [10.0, 1.0]]
+        assert len(result["sparse_embeddings"]) == 2
+        assert sorted(client.pc.inference.calls) == [
+            ("multilingual-e5-large", ["beta gamma"], "passage"),
+            ("pinecone-sparse-english-v0", texts, "passage"),
+        ]
+
+    def test_skipped_model_is_not_called(self, pinecone_client_module):
+        client = self._client(pinecone_client_module)
+
+        result = client._generate_embeddings(["alpha"], include_dense=False)
+
+        assert result["dense_embeddings"] == []
+        assert [call[0] for call in client.pc.inference.calls] == ["pinecone-sparse-english-v0"]
@@ -0,0 +1,165 @@
+"""
+Unit tests for LocalFilesystemClient's scandir discovery
+
+The scanner must list the same documents, in the same order, as the original
+os.walk loop, whether directories are listed serially or on a thread pool. It
+yields one batch per directory, spreads directory listings across threads at
+every level and stops listing once the consumer stops reading.
+"""
+
+import importlib.util
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from src.connectors.local_filesystem_client import LocalFilesystemClient
+
+
+def _reference_list(client, search_path):
+    """The original os.walk listing (metadata fields that do not depend on the clock)"""
+    documents = []
+    for root, _, files in os.walk(search_path):
+        root_path = Path(root)
+        for file_name in files:
+            if file_name.startswith('.') or not client.is_supported_file_type(file_name):
+                continue
+            file_path = root_path / file_name
+            stat = file_path.stat()
+            documents.append((
+                str(file_path.relative_to(client.base_path)), file_name, stat.st_size,
+                datetime.fromtimestamp(stat.st_mtime).isoformat(), os.path.splitext(file_name)[1].lower(),
+                f"local_{stat.st_ino}", str(file_path)
+            ))
+    return documents
+
+
+def _listed(documents):
+    return [(doc.path, doc.name, doc.size, doc.modified_time, doc.file_type, doc.source_id, doc.full_source_path)
+            for doc in documents]
+
+
+def _random_tree(rng, root, depth=0):
+    root.mkdir(parents=True, exist_ok=True)
+    for i in range(rng.randint(0, 4)):
+        name = rng.choice(["doc", "Deal", ".hidden", "notes"]) + f"{i}" + rng.choice([".pdf", ".docx", ".tmp", ".XLSX", ""])
+        (root / name).write_bytes(b"x" * rng.randint(0, 20))
+    if depth < 4:
+        for i in range(rng.randint(0, 3)):
+            _random_tree(rng, root / f"{rng.choice(['Week', 'Vendor', 'Deal'])}{i}", depth + 1)
+
+
+def _deep_tree(root, width=12):
+    """One top-level directory holding width deal folders of two documents each"""
+    for i in range(width):
+        deal_dir = root / "Week1-2024" / f"Deal-{i}"
+        deal_dir.mkdir(parents=True)
+        (deal_dir / "quote.pdf").write_bytes(b"%PDF")
+        (deal_dir / "order.docx").write_bytes(b"docx")
+
+
+class TestScanParity:
+    """scandir scanning matches the original os.walk listing"""
+
+    @pytest.mark.parametrize("scan_workers", [1, 3])
+    def test_random_trees_match_walk(self, tmp_path, scan_workers):
+        rng = random.Random(42)
+        for iteration in range(15):
+            root = tmp_path / f"tree{iteration}"
+            _random_tree(rng, root)
+            client = LocalFilesystemClient(str(root), scan_workers=scan_workers)
+
+            assert _listed(client.list_documents()) == _reference_list(client, root), iteration
+
+    def test_subfolder_and_file_type_filter(self, tmp_path):
+        _deep_tree(tmp_path)
+        client = LocalFilesystemClient(str(tmp_path), scan_workers=4)
+
+        documents = list(client.list_documents("Week1-2024", file_types=[".pdf"]))
+
+        deal_folders = [entry.name for entry in os.scandir(tmp_path / "Week1-2024")]
+        assert [doc.path for doc in documents] == [
+            os.path.join("Week1-2024", name, "quote.pdf") for name in deal_folders
+        ]
+
+
+class TestConcurrentScan:
+    """Directories are listed on the thread pool at every level and only as far as the consumer reads"""
+
+    def _recording(self, client, monkeypatch, delay=0.0):
+        listed = []
+        original = client._scan_directory
+
+        def scan_directory(path, relative_path, file_types=None):
+            listed.append((relative_path, threading.current_thread().name))
+            time.sleep(delay)
+            return original(path, relative_path, file_types)
+
+        monkeypatch.setattr(client, "_scan_directory", scan_directory)
+        return listed
+
+    def test_batches_are_per_directory(self, tmp_path):
+        _deep_tree(tmp_path)
+        client = LocalFilesystemClient(str(tmp_path), scan_workers=4)
+
+        batches = list(client._scan_batches(tmp_path))
+
+        assert len(batches) == 12
+        assert all(len({os.path.dirname(doc.path) for doc in batch}) == 1 for batch in batches)
+
+    def test_single_top_level_directory_is_scanned_in_parallel(self, tmp_path, monkeypatch):
+        _deep_tree(tmp_path)
+        client = LocalFilesystemClient(str(tmp_path), scan_workers=4)
+        listed = self._recording(client, monkeypatch, delay=0.01)
+
+        assert len(list(client.list_documents())) == 24
+        deal_threads = {thread for relative_path, thread in listed if "Deal-" in relative_path}
+        assert len(deal_threads) > 1
+
+    @pytest.mark.parametrize("scan_workers", [1, 2])
+    def test_early_stop_leaves_the_tree_unread(self, tmp_path, monkeypatch, scan_workers):
+        _deep_tree(tmp_path, width=30)
+        client = LocalFilesystemClient(str(tmp_path), scan_workers=scan_workers)
+        listed = self._recording(client, monkeypatch)
+
+        documents = client.list_documents()
+        next(documents)
+        documents.close()
+
+        # Root, Week1-2024, the first deal folder and at most a prefetch window beyond it
+        assert len(listed) <= 3 + 2 * scan_workers
+
+
+class TestBenchmarkTree:
+    """The benchmark only ever deletes trees it built"""
+
+    @pytest.fixture
+    def benchmark(self):
+        path = Path(__file__).resolve().parent.parent / "scripts" / "benchmark_local_discovery.py"
+        spec = importlib.util.spec_from_file_location("benchmark_local_discovery", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def test_refuses_non_empty_directory_without_marker(self, benchmark, tmp_path):
+        (tmp_path / "precious.txt").write_text("keep me")
+
+        with pytest.raises(SystemExit):
+            benchmark.build_tree(tmp_path, 10)
+        assert (tmp_path / "precious.txt").read_text() == "keep me"
+
+    def test_rebuilds_its_own_tree(self, benchmark, tmp_path, monkeypatch):
+        monkeypatch.setattr(benchmark, "WEEKS", 1)
+        monkeypatch.setattr(benchmark, "VENDORS_PER_WEEK", 2)
+        root = tmp_path / "bench"
+        root.mkdir()
+        benchmark.build_tree(root, 4)
+
+        benchmark.build_tree(root, 6)
+
+        assert (root / ".tree_6").exists() and not (root / ".tree_4").exists()
+        assert len(list(root.rglob("doc_*"))) == 6
@@ -0,0 +1,212 @@
+"""
+Unit tests for the local NER span detector and SpanDetectorFactory
+
+The NER models are replaced by fake pipelines so the tests run without spaCy,
+transformers or network access.
+"""
+
+import re
+import sys
+import types
+
+import pytest
+
+from src.redaction.base_span_detector import BaseSpanDetector
+from src.redaction.local_ner_span_detector import LocalNERSpanDetector
+from src.redaction.span_detector_factory import SpanDetectorFactory
+
+
+class _FakeTokenizer:
+    """Fast-tokenizer stand-in: one token per whitespace-separated word"""
+
+    def __call__(self, text, add_special_tokens=True, return_offsets_mapping=False):
+        return {"offset_mapping": [m.span() for m in re.finditer(r"\S+", text)]}
+
+
+class _FakeTokenPipeline:
+    """Stands in for a transformers token-classification pipeline"""
+
+    def __init__(self, entities_by_word):
+        # word -> (entity_group, score)
+        self.entities_by_word = entities_by_word
+        self.tokenizer = _FakeTokenizer()
+        self.calls = []
+
+    def __call__(self, texts, batch_size=16):
+        self.calls.append(list(texts))
+        outputs = []
+        for text in texts:
+            entities = []
+            for word, (group, score) in self.entities_by_word.items():
+                start = text.find(word)
+                if start >= 0:
+                    entities.append({"entity_group": group, "start": start, "end": start + len(word), "score": score})
+            outputs.append(entities)
+        return outputs
+
+
+class _RecordingDetector(BaseSpanDetector):
+    """Escalation detector that records the windows it was asked about"""
+
+    def __init__(self, spans=None):
+        self.calls = []
+        self.spans = spans or []
+
+    def detect_spans(self, text, client_name=None, client_variants=None, vendor_name=None):
+        self.calls.append(text)
+        return [(text.find(word), text.find(word) + len(word), entity_type, word)
+                for word, entity_type in self.spans if word in text]
+
+
+class _BatchingDetector(_RecordingDetector):
+    """Escalation detector with its own multi-window entry point (like LLMSpanDetector)"""
+
+    def __init__(self, spans=None):
+        super().__init__(spans)
+        self.window_batches = []
+
+    def detect_spans_in_windows(self, windows, client_name=None, client_variants=None, vendor_name=None):
+        self.window_batches.append([w["window_id"] for w in windows])
+        return super().detect_spans_in_windows(windows, client_name, client_variants, vendor_name)
+
+
+def _detector(monkeypatch, entities_by_word, escalation_detector=None, threshold=0.85, **kwargs):
+    monkeypatch.setattr(
+        LocalNERSpanDetector, "_load_token_classification_pipeline",
+        lambda self, engine, model_name: _FakeTokenPipeline(entities_by_word),
+    )
+    return LocalNERSpanDetector(engine="transformers", escalation_detector=escalation_detector,
+                                escalation_threshold=threshold, **kwargs)
+
+
+class TestHybridEscalation:
+    """Low-confidence windows are re-checked by the escalation detector"""
+
+    def test_low_confidence_span_escalates(self, monkeypatch):
+        llm = _RecordingDetector(spans=[("Jordan", "PERSON")])
+        detector = _detector(monkeypatch, {"Acme Corp": ("ORG", 0.99), "Jordan": ("PER", 0.40)}, llm)
+
+        spans = detector.detect_spans("Acme Corp signed with Jordan last week.")
+
+        assert len(llm.calls) == 1
+        assert detector.windows_escalated == 1
+        assert ("PERSON", "Jordan") in {(s[2], s[3]) for s in spans}
+        assert ("ORG", "Acme Corp") in {(s[2], s[3]) for s in spans}
+
+    def test_confident_spans_do_not_escalate(self, monkeypatch):
+        llm = _RecordingDetector()
+        detector = _detector(monkeypatch, {"Acme Corp": ("ORG", 0.99), "Jordan": ("PER", 0.97)}, llm)
+
+        spans = detector.detect_spans("Acme Corp signed with Jordan last week.")
+
+        assert llm.calls == []
+        assert detector.windows_escalated == 0
+        assert len(spans) == 2
+
+    def test_window_without_entities_but_name_candidates_escalates(self, monkeypatch):
+        llm = _RecordingDetector(spans=[("Priya Raman", "PERSON")])
+        detector = _detector(monkeypatch, {}, llm)
+
+        spans = detector.detect_spans("The renewal was approved by Priya Raman on Friday.")
+
+        assert detector.windows_escalated == 1
+        assert [(s[2], s[3]) for s in spans] == [("PERSON", "Priya Raman")]
+
+    def test_window_without_name_candidates_is_not_escalated(self, monkeypatch):
+        llm = _RecordingDetector()
+        detector = _detector(monkeypatch, {}, llm)
+
+        detector.detect_spans("Total: 1,200 units at 4.50 per unit. Renewal term 36 months.")
+
+        assert llm.calls == []
+
+    def test_empty_window_escalation_can_be_disabled(self, monkeypatch):
+        llm = _RecordingDetector()
+        detector = _detector(monkeypatch, {}, llm, escalate_empty_windows=False)
+
+        detector.detect_spans("The renewal was approved by Priya Raman on Friday.")
+
+        assert llm.calls == []
+
+    def test_escalated_windows_go_to_detector_in_one_call(self, monkeypatch):
+        llm = _BatchingDetector(spans=[("Jordan", "PERSON")])
+        detector = _detector(monkeypatch, {"Jordan": ("PER", 0.40)}, llm, window_size=5, window_overlap=0)
+        text = "Jordan met the vendor today. Later Jordan signed the order form."
+
+        spans = detector.detect_spans(text)
+
+        assert llm.window_batches == [[0, 1]]
+        assert [(s[0], s[3]) for s in spans] == [(0, "Jordan"), (35, "Jordan")]
+
+    def test_spacy_engine_rejects_escalation(self):
+        with pytest.raises(ValueError):
+            LocalNERSpanDetector(engine="spacy", escalation_detector=_RecordingDetector())
+
+
+class TestTokenWindows:
+    """Transformer windows are sized in tokenizer tokens"""
+
+    def test_windows_hold_at_most_window_size_tokens(self, monkeypatch):
+        detector = _detector(monkeypatch, {}, window_size=50, window_overlap=5)
+        words = [f"w{i}" * (1 + i % 7) for i in range(1000)]
+        text = " ".join(words)
+
+        windows = detector._build_windows(text)
+
+        assert all(len(str(w["text"]).split()) <= 50 for w in windows)
+        assert windows[0]["global_offset"] == 0
+        assert str(windows[-1]["text"]).endswith(words[-1])
+        for w in windows:
+            offset = int(w["global_offset"])
+            assert text[offset:offset + len(str(w["text"]))] == w["text"]
+        # Consecutive windows share window_overlap tokens
+        assert str(windows[1]["text"]).split()[:5] == str(windows[0]["text"]).split()[-5:]
+
+    def test_entity_offsets_are_global(self, monkeypatch):
+        detector = _detector(monkeypatch, {"Acme": ("ORG", 0.99)}, window_size=4, window_overlap=1)
+        text = "one two three four five six Acme seven"
+
+        assert detector.detect_spans(text) == [(28, 32, "ORG", "Acme")]
+
+    def test_spacy_windows_stay_in_characters(self, monkeypatch):
+        monkeypatch.setattr(LocalNERSpanDetector, "_load_spacy_model", lambda self, model_name: object())
+        detector = LocalNERSpanDetector(engine="spacy", window_size=100, window_overlap=10)
+
+        windows = detector._build_windows("x" * 250)
+
+        assert [len(str(w["text"])) for w in windows] == [100, 100, 70]
+
+
+class TestSpanDetectorFactory:
+    """Backend/engine selection"""
+
+    @pytest.fixture
+    def fake_llm_module(self, monkeypatch):
+        module = types.ModuleType("src.redaction.llm_span_detector")
+
+        class LLMSpanDetector(_RecordingDetector):
+            def __init__(self, api_key, model):
+                super().__init__()
+                self.model = model
+
+        module.LLMSpanDetector = LLMSpanDetector
+        monkeypatch.setitem(sys.modules, "src.redaction.llm_span_detector", module)
+        monkeypatch.setattr(
+            LocalNERSpanDetector, "_load_token_classification_pipeline",
+            lambda self, engine, model_name: _FakeTokenPipeline({}),
+        )
+        return module
+
+    def test_hybrid_defaults_to_scored_engine(self, fake_llm_module):
+        detector = SpanDetectorFactory.create_detector({"backend": "hybrid", "api_key": "sk-test"})
+
+        assert detector.engine == "transformers"
+        assert isinstance(detector.escalation_detector, fake_llm_module.LLMSpanDetector)
+
+    def test_hybrid_with_spacy_is_rejected(self, fake_llm_module):
+        with pytest.raises(ValueError, match="confidence scores"):
+            SpanDetectorFactory.create_detector({"backend": "hybrid", "api_key": "sk-test", "ner_engine": "spacy"})
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            SpanDetectorFactory.create_detector({"backend": "regex"})
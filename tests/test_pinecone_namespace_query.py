@@ -0,0 +1,120 @@
+"""
+Unit tests for PineconeDocumentClient's concurrent namespace queries
+
+_query_namespaces queries every namespace on a thread pool and merges the
+matches into one top_k by score. Per-namespace timings are returned with the
+matches so concurrent searches through one client do not overwrite each other.
+"""
+
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+def _match(match_id, score):
+    return types.SimpleNamespace(id=match_id, score=score, metadata={"file_name": f"{match_id}.pdf"})
+
+
+class _FakeIndex:
+    """index.query over fixed per-namespace matches (highest score first, like Pinecone)"""
+
+    def __init__(self, matches, failing=(), barrier=None):
+        self.matches = matches
+        self.failing = set(failing)
+        self.barrier = barrier
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def query(self, namespace, top_k, vector, sparse_vector, include_metadata, filter):
+        with self._lock:
+            self.queries.append((namespace, top_k, filter))
+        if self.barrier:
+            self.barrier.wait(timeout=5)
+        if namespace in self.failing:
+            raise ConnectionError(f"{namespace} unavailable")
+        return {"matches": self.matches.get(namespace, [])[:top_k]}
+
+
+MATCHES = {
+    "documents": [_match("d1", 0.9), _match("d2", 0.5), _match("d3", 0.1)],
+    "salesforce": [_match("s1", 0.8), _match("s2", 0.7), _match("s3", 0.6)],
+    "archive": [_match("a1", None), _match("a2", 0.05)],
+}
+
+
+@pytest.fixture
+def client(pinecone_client_module):
+    client = pinecone_client_module.PineconeDocumentClient(
+        api_key="test", query_cache=pinecone_client_module.QueryEmbeddingCache())
+    client.index = _FakeIndex(MATCHES)
+    return client
+
+
+def _query(client, namespaces, top_k, filter=None):
+    return client._query_namespaces(namespaces, top_k, [1.0, 0.0], {"indices": [1], "values": [1.0]}, filter)
+
+
+class TestNamespaceMerge:
+    """Matches from every namespace compete for one global top_k"""
+
+    def test_global_top_k_across_namespaces(self, client):
+        matches, timings = _query(client, ["documents", "salesforce"], 3)
+
+        assert [(m.id, m.score) for m in matches] == [("d1", 0.9), ("s1", 0.8), ("s2", 0.7)]
+        # Each namespace is asked for the full top_k, since any one of them may hold all of it
+        assert sorted(client.index.queries) == [("documents", 3, None), ("salesforce", 3, None)]
+        assert {ns: t["matches"] for ns, t in timings.items()} == {"documents": 3, "salesforce": 3}
+
+    def test_one_namespace_can_fill_the_top_k(self, client):
+        client.index = _FakeIndex({"documents": MATCHES["documents"], "salesforce": [_match("s1", 0.01)]})
+
+        matches, _ = _query(client, ["salesforce", "documents"], 2)
+
+        assert [m.id for m in matches] == ["d1", "d2"]
+
+    def test_fewer_matches_than_top_k(self, client):
+        matches, _ = _query(client, ["documents", "archive"], 10)
+
+        # Matches without a score sort last
+        assert [m.id for m in matches] == ["d1", "d2", "d3", "a2", "a1"]
+
+    def test_duplicate_namespaces_are_queried_once(self, client):
+        _, timings = _query(client, ["documents", "documents"], 2)
+
+        assert [query[0] for query in client.index.queries] == ["documents"]
+        assert list(timings) == ["documents"]
+
+    def test_failed_namespace_is_skipped(self, client):
+        client.index = _FakeIndex(MATCHES, failing={"salesforce"})
+
+        matches, timings = _query(client, ["documents", "salesforce"], 2)
+
+        assert [m.id for m in matches] == ["d1", "d2"]
+        assert timings["salesforce"]["matches"] == 0
+        assert "unavailable" in timings["salesforce"]["error"]
+        assert timings["documents"]["error"] is None
+
+
+class TestConcurrentSearches:
+    """Searches sharing a client each get their own timings"""
+
+    def test_overlapping_searches_keep_their_timings(self, client):
+        # All four namespace queries are in flight at once
+        client.index = _FakeIndex(MATCHES, barrier=threading.Barrier(4))
+        searches = [["documents", "salesforce"], ["archive", "other"]]
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(lambda namespaces: _query(client, namespaces, 2), searches))
+
+        assert [sorted(timings) for _, timings in results] == [["documents", "salesforce"], ["archive", "other"]]
+        assert [[m.id for m in matches] for matches, _ in results] == [["d1", "s1"], ["a2", "a1"]]
+
+    def test_hybrid_search_merges_namespaces(self, client):
+        results = client.hybrid_search_documents("renewal terms", top_k=4,
+                                                 namespaces=["documents", "salesforce"], rerank=False)
+
+        assert [r.id for r in results] == ["d1", "s1", "s2", "s3"]
+        assert [r.file_name for r in results] == ["d1.pdf", "s1.pdf", "s2.pdf", "s3.pdf"]
+        assert not hasattr(client, "last_namespace_timings")
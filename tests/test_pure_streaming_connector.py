@@ -0,0 +1,96 @@
+"""
+Parity tests: PureStreamingConnector vs RawSalesforceExportConnector
+
+Both connectors read the same synthetic export (see conftest.raw_export) and
+must yield the same documents, deal mappings and deal metadata.
+"""
+
+import csv
+import dataclasses
+import math
+
+import pytest
+
+from src.connectors.raw_salesforce_export_connector import RawSalesforceExportConnector
+from src.connectors.raw_salesforce_export_connector_pure_streaming import PureStreamingConnector
+
+
+def _normalize(value):
+    """NaN-aware comparable form (NaN != NaN otherwise)"""
+    if isinstance(value, float) and math.isnan(value):
+        return "NaN"
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def _record(obj):
+    return _normalize(dataclasses.asdict(obj) if dataclasses.is_dataclass(obj) else vars(obj))
+
+
+def _rewrite_deals(raw_export, header, rows):
+    with open(raw_export["deal_metadata_csv"], "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def connectors(raw_export, tmp_path):
+    def make():
+        pandas_connector = RawSalesforceExportConnector(**raw_export)
+        streaming_connector = PureStreamingConnector(**raw_export, db_path=str(tmp_path / "streaming.db"))
+        return pandas_connector, streaming_connector
+    return make
+
+
+class TestStreamingParity:
+    """Same documents and metadata from both connectors"""
+
+    def test_mappings_match(self, connectors):
+        pandas_connector, streaming_connector = connectors()
+
+        assert dict(streaming_connector._cv_to_deal_mapping) == dict(pandas_connector._cv_to_deal_mapping)
+        assert dict(streaming_connector._valid_file_paths) == dict(pandas_connector._valid_file_paths)
+        assert ({k: _normalize(v) for k, v in streaming_connector._content_versions.items()}
+                == {k: _normalize(v) for k, v in pandas_connector._content_versions.items()})
+
+    def test_documents_match(self, connectors):
+        pandas_connector, streaming_connector = connectors()
+
+        expected = [_record(d) for d in pandas_connector.list_documents()]
+
+        assert [_record(d) for d in streaming_connector.list_documents()] == expected
+        assert len(expected) == 5
+
+    def test_enriched_metadata_matches(self, connectors):
+        pandas_connector, streaming_connector = connectors()
+
+        expected = [_record(d) for d in pandas_connector.list_documents_as_metadata()]
+
+        assert [_record(d) for d in streaming_connector.list_documents_as_metadata()] == expected
+
+    def test_numeric_deal_column_with_blanks_is_float(self, connectors):
+        pandas_connector, streaming_connector = connectors()
+
+        record = streaming_connector._deal_metadata["a0W1"]
+
+        assert record["contract_term"] == 36.0 and isinstance(record["contract_term"], float)
+        assert _normalize(record) == _normalize(pandas_connector._deal_metadata["a0W1"])
+
+    def test_deal_column_types_follow_pandas(self, connectors, raw_export):
+        _rewrite_deals(raw_export,
+                       ["Id", "Name", "Term__c", "Subject__c", "Effort_Level__c", "Report_Type__c", "Deal_Origin__c"],
+                       [["a0W1", "Deal-100", "36", "007", "true", "1.5", "x"],
+                        ["a0W2", "Deal-200", "24", "Renewal", "False", "2", ""],
+                        ["a0W1", "Deal-101", "+12", "8", "TRUE", "", "NA"]])
+        pandas_connector, streaming_connector = connectors()
+
+        for deal_id in ("a0W1", "a0W2"):
+            streamed = streaming_connector._deal_metadata[deal_id]
+            expected = pandas_connector._deal_metadata[deal_id]
+            assert _normalize(streamed) == _normalize(expected), deal_id
+            for field in ("contract_term", "subject", "effort_level"):
+                assert type(streamed[field]) is type(expected[field]), (deal_id, field)
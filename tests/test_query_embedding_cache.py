@@ -0,0 +1,198 @@
+"""
+Unit tests for the query embedding cache
+
+QueryEmbeddingCache keeps query embeddings in an in-memory LRU with a TTL and
+an optional SQLite layer shared across instances and processes. The clock is
+replaced so expiry is tested without sleeping.
+"""
+
+import types
+
+import pytest
+
+from src.connectors import query_embedding_cache
+from src.connectors.query_embedding_cache import QueryEmbeddingCache, get_shared_query_cache, normalize_query
+
+
+DENSE = {"dense": [0.1, 0.2], "sparse": {"indices": [3, 7], "values": [0.5, 0.25]}}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Settable time.time() for the cache module"""
+    fake = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(query_embedding_cache, "time", types.SimpleNamespace(time=lambda: fake.now))
+    return fake
+
+
+class TestNormalizeQuery:
+    """Keys ignore whitespace and Unicode composition but keep case"""
+
+    def test_whitespace_and_nfc(self):
+        assert normalize_query("  payment\tterms \n  net 30 ") == "payment terms net 30"
+        assert normalize_query("cafe\u0301") == "caf\u00e9"
+
+    def test_case_is_kept(self):
+        cache = QueryEmbeddingCache()
+        cache.put("m", "Net 30", DENSE)
+
+        assert cache.get("m", " Net   30") == DENSE
+        assert cache.get("m", "net 30") is None
+
+
+class TestLruEviction:
+    """The in-memory layer keeps the most recently used max_entries embeddings"""
+
+    def test_least_recently_used_is_evicted(self):
+        cache = QueryEmbeddingCache(max_entries=2)
+        cache.put("m", "a", [1])
+        cache.put("m", "b", [2])
+        assert cache.get("m", "a") == [1]
+
+        cache.put("m", "c", [3])
+
+        assert cache.get("m", "b") is None
+        assert (cache.get("m", "a"), cache.get("m", "c")) == ([1], [3])
+        stats = cache.get_stats()
+        assert (stats["size"], stats["evictions"], stats["hits"], stats["misses"]) == (2, 1, 3, 1)
+
+    def test_storing_again_refreshes_without_evicting(self):
+        cache = QueryEmbeddingCache(max_entries=2)
+        cache.put("m", "a", [1])
+        cache.put("m", "b", [2])
+        cache.put("m", "a", [10])
+
+        cache.put("m", "c", [3])
+
+        assert cache.get("m", "a") == [10]
+        assert cache.get("m", "b") is None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_models_are_separate_entries(self):
+        cache = QueryEmbeddingCache(max_entries=4)
+        cache.put("dense-model", "q", [1])
+
+        assert cache.get("sparse-model", "q") is None
+        assert cache.get("dense-model", "q") == [1]
+
+    def test_zero_entries_disables_memory_layer(self):
+        cache = QueryEmbeddingCache(max_entries=0)
+        cache.put("m", "a", [1])
+
+        assert cache.get("m", "a") is None
+        assert cache.get_stats()["size"] == 0
+
+
+class TestTtlExpiry:
+    """Entries older than ttl_seconds are treated as missing"""
+
+    def test_entry_expires_after_ttl(self, clock):
+        cache = QueryEmbeddingCache(ttl_seconds=60)
+        cache.put("m", "q", DENSE)
+
+        clock.now += 60
+        assert cache.get("m", "q") == DENSE
+        clock.now += 1
+        assert cache.get("m", "q") is None
+        # The expired entry is dropped, so the next lookup is a plain miss
+        assert cache.get("m", "q") is None
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["expired"], stats["misses"], stats["size"]) == (1, 1, 1, 0)
+
+    def test_zero_ttl_never_expires(self, clock):
+        cache = QueryEmbeddingCache(ttl_seconds=0)
+        cache.put("m", "q", DENSE)
+
+        clock.now += 10 * 365 * 24 * 3600
+
+        assert cache.get("m", "q") == DENSE
+
+    def test_put_restarts_the_ttl(self, clock):
+        cache = QueryEmbeddingCache(ttl_seconds=60)
+        cache.put("m", "q", [1])
+        clock.now += 50
+        cache.put("m", "q", [2])
+        clock.now += 50
+
+        assert cache.get("m", "q") == [2]
+
+    def test_expired_disk_entry_is_not_served(self, clock, tmp_path):
+        path = tmp_path / "queries.sqlite"
+        QueryEmbeddingCache(ttl_seconds=60, cache_path=str(path)).put("m", "q", DENSE)
+        clock.now += 61
+
+        cache = QueryEmbeddingCache(ttl_seconds=60, cache_path=str(path))
+
+        assert cache.get("m", "q") is None
+        assert cache.get_stats()["expired"] == 1
+
+
+class TestSqlitePersistence:
+    """The SQLite layer survives restarts and is shared between instances"""
+
+    def test_entries_survive_a_new_instance(self, tmp_path):
+        path = tmp_path / "cache" / "queries.sqlite"
+        first = QueryEmbeddingCache(cache_path=str(path))
+        first.put("m", "payment  terms", DENSE)
+        first.close()
+
+        second = QueryEmbeddingCache(cache_path=str(path))
+
+        assert second.get("m", "payment terms") == DENSE
+        # Served from memory once loaded from disk
+        assert second.get("m", "payment terms") == DENSE
+        stats = second.get_stats()
+        assert (stats["disk_hits"], stats["hits"], stats["hit_rate"]) == (1, 1, 1.0)
+
+    def test_open_instances_see_each_others_writes(self, tmp_path):
+        path = str(tmp_path / "queries.sqlite")
+        writer = QueryEmbeddingCache(cache_path=path)
+        reader = QueryEmbeddingCache(cache_path=path)
+
+        writer.put("m", "q", [1, 2])
+
+        assert reader.get("m", "q") == [1, 2]
+
+    def test_disk_layer_outlives_memory_eviction(self, tmp_path):
+        cache = QueryEmbeddingCache(max_entries=1, cache_path=str(tmp_path / "queries.sqlite"))
+        cache.put("m", "a", [1])
+        cache.put("m", "b", [2])
+
+        assert cache.get("m", "a") == [1]
+        assert cache.get_stats()["disk_hits"] == 1
+
+    def test_clear_empties_both_layers(self, tmp_path):
+        path = str(tmp_path / "queries.sqlite")
+        cache = QueryEmbeddingCache(cache_path=path)
+        cache.put("m", "q", [1])
+
+        cache.clear()
+
+        assert cache.get("m", "q") is None
+        assert QueryEmbeddingCache(cache_path=path).get("m", "q") is None
+
+    def test_unusable_path_falls_back_to_memory(self, tmp_path):
+        # A directory cannot be opened as a database
+        cache = QueryEmbeddingCache(cache_path=str(tmp_path))
+        cache.put("m", "q", [1])
+
+        assert cache.get("m", "q") == [1]
+        assert cache.get_stats()["disk_hits"] == 0
+
+
+class TestSharedCache:
+    """The process-wide cache is configured from the environment once"""
+
+    def test_environment_configuration(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(query_embedding_cache, "_shared_cache", None)
+        monkeypatch.setenv("QUERY_EMBEDDING_CACHE_SIZE", "8")
+        monkeypatch.setenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", "30")
+        monkeypatch.setenv("QUERY_EMBEDDING_CACHE_PATH", str(tmp_path / "shared.sqlite"))
+
+        cache = get_shared_query_cache()
+
+        assert (cache.max_entries, cache.ttl_seconds) == (8, 30.0)
+        assert cache.get_stats()["cache_path"] == str(tmp_path / "shared.sqlite")
+        assert get_shared_query_cache() is cache
+        cache.close()
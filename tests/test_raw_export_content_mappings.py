@@ -0,0 +1,238 @@
+"""
+Parity tests for the vectorised ContentVersion CSV loading
+
+RawSalesforceExportConnector._load_content_mappings builds the ContentVersion,
+ContentDocument, ContentDocumentLink and ContentVersion -> Deal mappings with
+column-wise pandas operations. These tests compare it with the original
+row-by-row (iterrows) loader on randomly generated exports, so IsLatest and
+IsDeleted in every dtype pandas infers, the PathOnClient/Title fallback and
+Deal__c normalisation all keep their old results.
+"""
+
+import csv
+import logging
+import math
+import random
+
+import pandas as pd
+
+from src.connectors.raw_salesforce_export_connector import RawSalesforceExportConnector
+
+
+FILETYPE_MAP = {
+    'PDF': '.pdf', 'WORD_X': '.docx', 'WORD': '.doc',
+    'EXCEL_X': '.xlsx', 'EXCEL': '.xls',
+    'POWER_POINT_X': '.pptx', 'POWER_POINT': '.ppt',
+    'MSG': '.msg', 'EML': '.eml',
+    'TEXT': '.txt', 'CSV': '.csv',
+    'PNG': '.png', 'JPEG': '.jpg', 'GIF': '.gif',
+    'HTML': '.html', 'XML': '.xml', 'JSON': '.json'
+}
+
+
+def _reference_parse_boolean(value):
+    if isinstance(value, bool):
+        return value
+    if pd.isna(value) or value == '':
+        return False
+    if isinstance(value, str):
+        return value.lower() == 'true'
+    return bool(value)
+
+
+def _reference_load(content_versions_csv, content_document_links_csv):
+    """The loader as it was before vectorisation (ContentDocuments derived from ContentVersions)"""
+    cv_df = pd.read_csv(content_versions_csv, encoding='utf-8-sig', low_memory=False)
+    content_versions = {}
+    for _, row in cv_df.iterrows():
+        cv_id = row['Id']
+        is_latest = row.get('IsLatest', False)
+        if isinstance(is_latest, bool):
+            if not is_latest:
+                continue
+        elif isinstance(is_latest, str):
+            if is_latest.lower() not in ['true', '1', 'yes']:
+                continue
+        elif isinstance(is_latest, (int, float)):
+            if is_latest != 1:
+                continue
+        else:
+            continue
+
+        deal_c_value = row.get('Deal__c', '')
+        if pd.isna(deal_c_value):
+            deal_c_value = None
+        elif deal_c_value:
+            deal_c_value = str(deal_c_value).strip()
+
+        path_on_client = row.get('PathOnClient', '') or row.get('Title', '')
+        file_type_raw = row.get('FileType', '')
+        file_ext = ''
+        if path_on_client and '.' in str(path_on_client):
+            file_ext = '.' + str(path_on_client).rsplit('.', 1)[-1].lower()
+        if not file_ext and file_type_raw:
+            file_ext = FILETYPE_MAP.get(str(file_type_raw).upper(), '')
+
+        content_versions[cv_id] = {
+            'content_document_id': row.get('ContentDocumentId', ''),
+            'title': row.get('Title', ''),
+            'path_on_client': path_on_client,
+            'file_type': file_type_raw,
+            'file_extension': file_ext,
+            'content_size': row.get('ContentSize', 0),
+            'deal_id': deal_c_value,
+            'content_modified_date': row.get('ContentModifiedDate', ''),
+            'created_date': row.get('CreatedDate', ''),
+            'is_deleted': _reference_parse_boolean(row.get('IsDeleted', False))
+        }
+
+    content_documents = {}
+    for cv_data in content_versions.values():
+        content_doc_id = cv_data.get('content_document_id')
+        if content_doc_id and content_doc_id not in content_documents:
+            content_documents[content_doc_id] = {
+                'title': cv_data.get('title', ''),
+                'file_type': cv_data.get('file_type', ''),
+                'file_extension': cv_data.get('file_extension', ''),
+                'content_size': cv_data.get('content_size', 0),
+                'created_date': cv_data.get('created_date', '')
+            }
+
+    cdl_df = pd.read_csv(content_document_links_csv, encoding='utf-8-sig', low_memory=False)
+    links = {}
+    for _, row in cdl_df.iterrows():
+        doc_id = row['ContentDocumentId']
+        linked_entity_id = row['LinkedEntityId']
+        if pd.isna(linked_entity_id) or pd.isna(doc_id):
+            continue
+        linked_entity_str = str(linked_entity_id).strip()
+        if linked_entity_str.startswith('a0W'):
+            links.setdefault(doc_id, []).append(linked_entity_str)
+
+    cv_to_deal = {}
+    for cv_id, cv_data in content_versions.items():
+        deal_id = None
+        cv_deal = cv_data.get('deal_id')
+        if cv_deal and not pd.isna(cv_deal) and str(cv_deal).strip():
+            deal_id = str(cv_deal).strip()
+        if not deal_id:
+            doc_id = cv_data.get('content_document_id')
+            if doc_id and doc_id in links and links[doc_id]:
+                deal_id = links[doc_id][0]
+        if deal_id and not pd.isna(deal_id) and str(deal_id).strip():
+            cv_to_deal[cv_id] = str(deal_id).strip()
+
+    return content_versions, content_documents, links, cv_to_deal
+
+
+def _vectorised_load(content_versions_csv, content_document_links_csv):
+    connector = RawSalesforceExportConnector.__new__(RawSalesforceExportConnector)
+    connector.content_versions_csv = content_versions_csv
+    connector.content_documents_csv = None
+    connector.content_document_links_csv = content_document_links_csv
+    connector.logger = logging.getLogger(__name__)
+    connector._load_content_mappings()
+    return (connector._content_versions, connector._content_documents,
+            connector._content_document_links, connector._cv_to_deal_mapping)
+
+
+def _same(a, b):
+    """Equality that treats NaN as equal to NaN and bool as distinct from int (dicts in insertion order)"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return _same(list(a.items()), list(b.items()))
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    if isinstance(a, bool) != isinstance(b, bool):
+        return False
+    return a == b
+
+
+# Value pools per column style; a style is picked per file so pandas infers
+# bool, integer, float (blank cells) and object dtypes across runs
+BOOLEAN_STYLES = [
+    ["true", "false"],
+    ["True", "FALSE", "true"],
+    ["1", "0"],
+    ["1", "0", ""],
+    ["true", "false", ""],
+    ["yes", "no", "true", "1", "0", "Yes", ""],
+    ["1.0", "0.0"],
+    [""],
+]
+PATHS = ["quote.pdf", "Quote.PDF", "contract.v2.docx", "notes", "archive.", "", " ", ".hidden"]
+TITLES = ["Quote", "Deck.pptx", "", "Summary.XLSX"]
+FILE_TYPES = ["PDF", "WORD_X", "excel_x", "UNKNOWN", "", "MSG"]
+DEALS = ["a0W1", " a0W2 ", "", "a0W3", "0", "  "]
+LINKED = ["a0W1", " a0W9", "005USER", "", "a0Wz ", "001ACC"]
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _random_export(rng, tmp_path):
+    latest_pool = rng.choice(BOOLEAN_STYLES)
+    deleted_pool = rng.choice(BOOLEAN_STYLES)
+    columns = ["Id", "ContentDocumentId", "Title", "PathOnClient", "FileType", "ContentSize",
+               "Deal__c", "ContentModifiedDate", "CreatedDate", "IsLatest", "IsDeleted"]
+    # Exports do not always carry every optional column
+    optional = ["Title", "PathOnClient", "FileType", "Deal__c", "IsDeleted"]
+    dropped = {column for column in optional if rng.random() < 0.15}
+    header = [column for column in columns if column not in dropped]
+
+    doc_ids = [f"069D{i}" for i in range(6)] + [""]
+    rows = []
+    for i in range(rng.randint(0, 25)):
+        values = {
+            "Id": f"068V{i:03d}",
+            "ContentDocumentId": rng.choice(doc_ids),
+            "Title": rng.choice(TITLES),
+            "PathOnClient": rng.choice(PATHS),
+            "FileType": rng.choice(FILE_TYPES),
+            "ContentSize": rng.choice(["6", "1024", ""]),
+            "Deal__c": rng.choice(DEALS),
+            "ContentModifiedDate": rng.choice(["2025-01-02", ""]),
+            "CreatedDate": "2025-01-01",
+            "IsLatest": rng.choice(latest_pool),
+            "IsDeleted": rng.choice(deleted_pool),
+        }
+        rows.append([values[column] for column in header])
+    cv_csv = tmp_path / "content_versions.csv"
+    _write_csv(cv_csv, header, rows)
+
+    links = [[rng.choice(doc_ids), rng.choice(LINKED)] for _ in range(rng.randint(0, 12))]
+    links_csv = tmp_path / "content_document_links.csv"
+    _write_csv(links_csv, ["ContentDocumentId", "LinkedEntityId"], links)
+    return str(cv_csv), str(links_csv)
+
+
+class TestContentMappingParity:
+    """The vectorised loader reproduces the iterrows loader"""
+
+    def test_random_exports_match_reference(self, tmp_path):
+        rng = random.Random(36)
+        for iteration in range(200):
+            cv_csv, links_csv = _random_export(rng, tmp_path)
+
+            expected = _reference_load(cv_csv, links_csv)
+            actual = _vectorised_load(cv_csv, links_csv)
+
+            for name, want, got in zip(("content_versions", "content_documents", "links", "cv_to_deal"),
+                                       expected, actual):
+                assert _same(got, want), f"iteration {iteration}: {name} differs\n{got}\n!=\n{want}"
+
+    def test_fixture_export_matches_reference(self, raw_export):
+        expected = _reference_load(raw_export["content_versions_csv"], raw_export["content_document_links_csv"])
+        actual = _vectorised_load(raw_export["content_versions_csv"], raw_export["content_document_links_csv"])
+
+        assert all(_same(got, want) for got, want in zip(actual, expected))
+        content_versions, _, _, cv_to_deal = actual
+        # 068F is not the latest version; 068C uses "1"/"0" booleans; 068B maps through its link
+        assert "068F" not in content_versions
+        assert content_versions["068C"]["is_deleted"] is False
+        assert cv_to_deal["068B"] == "a0W2"
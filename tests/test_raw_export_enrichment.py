@@ -0,0 +1,179 @@
+"""
+Parity tests for batched Deal enrichment
+
+RawSalesforceExportConnector.enrich_batch derives each deal's fields once per
+batch and builds DocumentMetadata from them. These tests compare it with the
+original per-document _enrich_with_deal_metadata on random batches mixing
+unmapped files, deals without metadata and fully mapped deals, with and
+without the client, vendor and deal number mapping CSVs.
+"""
+
+import json
+import random
+
+from src.connectors.file_source_interface import FileMetadata
+from src.connectors.raw_salesforce_export_connector import RawSalesforceExportConnector
+from src.models.document_models import DocumentMetadata
+
+
+def _reference_enrich(connector, file_metadata, deal_id=None, deal_data=None):
+    """Per-document enrichment as it was before batching (deal_data overrides the lookup)"""
+    doc_metadata = DocumentMetadata(
+        path=file_metadata.path,
+        name=file_metadata.name,
+        size=file_metadata.size,
+        size_mb=file_metadata.size_mb,
+        file_type=file_metadata.file_type,
+        modified_time=file_metadata.modified_time,
+        full_path=file_metadata.full_source_path,
+        content_hash=file_metadata.content_hash,
+        is_downloadable=file_metadata.is_downloadable
+    )
+
+    if not deal_id:
+        doc_metadata.mapping_status = "unmapped"
+        doc_metadata.mapping_reason = "no_deal_association"
+        return doc_metadata
+
+    if deal_data is None:
+        deal_data = connector._deal_metadata.get(deal_id)
+
+    if not deal_data:
+        doc_metadata.deal_id = connector._deal_id_to_number.get(deal_id, deal_id)
+        doc_metadata.salesforce_deal_id = deal_id
+        doc_metadata.mapping_status = "mapped_no_metadata"
+        return doc_metadata
+
+    friendly_deal_name = deal_data.get('deal_name', deal_id)
+    if connector._deal_id_to_number:
+        friendly_deal_name = connector._deal_id_to_number.get(deal_id, friendly_deal_name)
+
+    doc_metadata.deal_id = friendly_deal_name
+    doc_metadata.salesforce_deal_id = deal_id
+    doc_metadata.deal_subject = deal_data['subject']
+    doc_metadata.deal_status = deal_data['status']
+    doc_metadata.deal_reason = deal_data['deal_reason']
+    doc_metadata.deal_start_date = deal_data['start_date']
+    doc_metadata.deal_creation_date = deal_data.get('creation_date', '')
+    doc_metadata.negotiated_by = deal_data['negotiated_by']
+
+    doc_metadata.proposed_amount = deal_data['proposed_amount']
+    doc_metadata.final_amount = deal_data['final_amount']
+    doc_metadata.savings_1yr = deal_data['savings_1yr']
+    doc_metadata.savings_3yr = deal_data['savings_3yr']
+    doc_metadata.savings_target = deal_data['savings_target']
+    doc_metadata.savings_percentage = connector._calculate_savings_percentage(
+        deal_data['proposed_amount'],
+        deal_data['final_amount']
+    )
+    doc_metadata.savings_achieved = deal_data.get('savings_achieved')
+    doc_metadata.fixed_savings = deal_data.get('fixed_savings')
+    doc_metadata.savings_target_full_term = deal_data.get('savings_target_full_term')
+    doc_metadata.final_amount_full_term = deal_data.get('final_amount_full_term')
+
+    raw_client_id = connector._to_str_or_none(deal_data['client_id'])
+    raw_vendor_id = connector._to_str_or_none(deal_data['vendor_id'])
+    doc_metadata.salesforce_client_id = raw_client_id
+    doc_metadata.salesforce_vendor_id = raw_vendor_id
+
+    if connector._client_mapping and raw_client_id:
+        client_name = connector._client_mapping.get(raw_client_id)
+        doc_metadata.client_name = client_name
+        doc_metadata.client_id = client_name if client_name else f"Client-{raw_client_id[-8:]}"
+    else:
+        doc_metadata.client_id = f"Client-{raw_client_id[-8:]}" if raw_client_id else "Unknown Client"
+
+    if connector._vendor_mapping and raw_vendor_id:
+        vendor_name = connector._vendor_mapping.get(raw_vendor_id)
+        doc_metadata.vendor_name = vendor_name
+        doc_metadata.vendor_id = vendor_name if vendor_name else f"Vendor-{raw_vendor_id[-8:]}"
+    else:
+        doc_metadata.vendor_id = f"Vendor-{raw_vendor_id[-8:]}" if raw_vendor_id else "Unknown Vendor"
+
+    doc_metadata.contract_term = deal_data['contract_term']
+    doc_metadata.contract_start = deal_data['contract_start']
+    doc_metadata.contract_end = deal_data['contract_end']
+    doc_metadata.effort_level = deal_data['effort_level']
+    doc_metadata.has_fmv_report = deal_data['has_fmv_report']
+    doc_metadata.deal_origin = deal_data['deal_origin']
+
+    doc_metadata.current_narrative = deal_data.get('current_narrative')
+    doc_metadata.customer_comments = deal_data.get('customer_comments')
+    doc_metadata.content_source = "document_file"
+
+    doc_metadata.report_type = deal_data.get('report_type')
+    doc_metadata.project_type = deal_data.get('project_type')
+    doc_metadata.competition = deal_data.get('competition')
+    doc_metadata.npi_analyst = deal_data.get('npi_analyst')
+    doc_metadata.dual_multi_sourcing = deal_data.get('dual_multi_sourcing')
+    doc_metadata.time_pressure = deal_data.get('time_pressure')
+    doc_metadata.advisor_network_used = deal_data.get('advisor_network_used')
+
+    doc_metadata.mapping_status = "mapped"
+    doc_metadata.mapping_method = "raw_export_csv"
+    return doc_metadata
+
+
+def _encoded(documents):
+    """Documents as persisted (NaN cells from the deal CSV compare equal this way)"""
+    return [json.dumps(vars(doc), sort_keys=True, default=str) for doc in documents]
+
+
+def _file(i):
+    return FileMetadata(path=f"ContentVersions/VersionData/068X{i}/f{i}.pdf", name=f"f{i}.pdf",
+                        size=1024 * i, modified_time="2025-01-02", file_type=".pdf",
+                        source_id=f"068X{i}", source_type="salesforce_raw",
+                        full_source_path=f"/export/f{i}.pdf", content_hash=f"h{i}")
+
+
+MAPPING_SETUPS = [
+    (None, None, {}),
+    ({"001C": "Acme Corp"}, {"001V": "Vendor Co"}, {}),
+    ({"001X": "Other"}, {}, {"a0W1": "Deal-1001", "a0W9": "Deal-9009"}),
+]
+DEALS = [None, "", "a0W1", "a0W2", "a0W9"]
+
+
+class TestEnrichBatchParity:
+    """enrich_batch reproduces _enrich_with_deal_metadata document by document"""
+
+    def test_random_batches_match_reference(self, raw_export):
+        rng = random.Random(40)
+        for client_mapping, vendor_mapping, deal_numbers in MAPPING_SETUPS:
+            connector = RawSalesforceExportConnector(**raw_export)
+            connector._client_mapping = client_mapping
+            connector._vendor_mapping = vendor_mapping
+            connector._deal_id_to_number = deal_numbers
+            for _ in range(30):
+                size = rng.randint(1, 12)
+                files = [_file(i) for i in range(size)]
+                deal_ids = [rng.choice(DEALS) for _ in range(size)]
+
+                expected = [_reference_enrich(connector, f, deal_id) for f, deal_id in zip(files, deal_ids)]
+                actual = connector.enrich_batch(files, deal_ids)
+
+                assert _encoded(actual) == _encoded(expected), (client_mapping, deal_ids)
+
+    def test_prefetched_deal_records_match_reference(self, raw_export):
+        connector = RawSalesforceExportConnector(**raw_export)
+        records = {"a0W2": connector._deal_metadata["a0W2"]}
+        files = [_file(i) for i in range(4)]
+        deal_ids = ["a0W1", "a0W2", None, "a0W2"]
+
+        expected = [_reference_enrich(connector, f, deal_id, records.get(deal_id) or {})
+                    for f, deal_id in zip(files, deal_ids)]
+        actual = connector.enrich_batch(files, deal_ids, deal_records=records)
+
+        assert _encoded(actual) == _encoded(expected)
+        # a0W1 is loaded but absent from the prefetched records
+        assert [doc.mapping_status for doc in actual] == ["mapped_no_metadata", "mapped", "unmapped", "mapped"]
+
+    def test_documents_do_not_share_state(self, raw_export):
+        connector = RawSalesforceExportConnector(**raw_export)
+
+        first, second = connector.enrich_batch([_file(1), _file(2)], ["a0W1", "a0W1"],
+                                               cv_ids=["068X1", "068X2"])
+        first.parsing_errors.append("bad page")
+
+        assert second.parsing_errors == []
+        assert (first.salesforce_content_version_id, second.salesforce_content_version_id) == ("068X1", "068X2")
@@ -0,0 +1,125 @@
+"""
+Unit tests for SalesforceFileSource's file-to-deal fallback matching
+
+_build_match_indexes replaces the linear scans over the file mapping with a
+relative path index, a basename index and a sorted reversed-path index. These
+tests cover the path suffix, version suffix and no-match cases and compare the
+indexed lookups with the original scans on random mappings.
+"""
+
+import logging
+import os
+import random
+
+from src.connectors.salesforce_file_source import SalesforceFileSource
+
+
+def _source(mappings):
+    """SalesforceFileSource over {filename: relative_path} without loading any CSV"""
+    source = SalesforceFileSource.__new__(SalesforceFileSource)
+    source.logger = logging.getLogger(__name__)
+    source._file_to_deal_mapping = {
+        filename: {'deal_name': f"Deal-{i}", 'relative_path': relative_path}
+        for i, (filename, relative_path) in enumerate(mappings.items())
+    }
+    source._build_match_indexes()
+    return source
+
+
+def _reference_suffix_match(source, file_path):
+    for mapping_data in source._file_to_deal_mapping.values():
+        if mapping_data['relative_path'].endswith(file_path):
+            return mapping_data
+    return None
+
+
+def _reference_path_similarity_match(source, file_path):
+    filename = os.path.basename(file_path)
+    for mapping_data in source._file_to_deal_mapping.values():
+        if os.path.basename(mapping_data['relative_path']) == filename:
+            return mapping_data
+    return None
+
+
+MAPPINGS = {
+    "quote.pdf": "Acme/Deal-1/quote.pdf",
+    "quote (1).pdf": "Beta/Deal-2/quote.pdf",
+    "Contract.docx": "Beta/Deal-2/Contract.docx",
+    "Pricing": "Gamma/Deal-3/Pricing.xlsx",
+}
+
+
+class TestPathSuffixMatch:
+    """_find_path_suffix_match returns the first mapping whose path ends with the file path"""
+
+    def test_suffix_of_one_path(self):
+        source = _source(MAPPINGS)
+
+        assert source._find_path_suffix_match("Deal-2/Contract.docx")['deal_name'] == "Deal-2"
+
+    def test_several_matches_keep_mapping_order(self):
+        source = _source(MAPPINGS)
+
+        # Both quote.pdf paths end with the suffix; the first mapping wins
+        assert source._find_path_suffix_match("quote.pdf")['deal_name'] == "Deal-0"
+        assert source._find_path_suffix_match("2/quote.pdf")['deal_name'] == "Deal-1"
+
+    def test_full_path_matches_itself(self):
+        source = _source(MAPPINGS)
+
+        assert source._find_path_suffix_match("Gamma/Deal-3/Pricing.xlsx")['deal_name'] == "Deal-3"
+
+    def test_no_match(self):
+        source = _source(MAPPINGS)
+
+        assert source._find_path_suffix_match("Deal-9/quote.pdf") is None
+        assert source._find_path_suffix_match("Acme/Deal-1/quote.pdf/extra") is None
+        assert _source({})._find_path_suffix_match("quote.pdf") is None
+
+    def test_mappings_without_relative_path_are_skipped(self):
+        source = _source({"a.pdf": float("nan"), "b.pdf": "Deal-1/b.pdf"})
+
+        assert source._find_path_suffix_match("b.pdf")['deal_name'] == "Deal-1"
+        assert source._try_path_similarity_match("x/a.pdf") is None
+
+
+class TestFuzzyFilenameMatch:
+    """Version suffixes and missing extensions fall back to the base filename"""
+
+    def test_version_suffixes(self):
+        source = _source(MAPPINGS)
+
+        for filename in ("quote_v2.pdf", "quote V3.pdf", "quote_FINAL.pdf", "quote_copy.pdf"):
+            assert source._try_fuzzy_filename_match(filename)['deal_name'] == "Deal-0", filename
+
+    def test_extension_match(self):
+        source = _source(MAPPINGS)
+
+        assert source._try_fuzzy_filename_match("Pricing.xlsx")['deal_name'] == "Deal-3"
+
+    def test_no_match(self):
+        source = _source(MAPPINGS)
+
+        assert source._try_fuzzy_filename_match("quote_v4.pdf") is None
+        assert source._try_fuzzy_filename_match("quote_v2_draft.pdf") is None
+        assert source._try_fuzzy_filename_match("unknown_final.pdf") is None
+
+
+class TestIndexedMatchParity:
+    """Indexed lookups return the same mapping as the original linear scans"""
+
+    def test_random_mappings_match_reference(self):
+        rng = random.Random(41)
+        parts = ["a", "b", "ab", "Deal-1", "Deal-12", "x.pdf", "bx.pdf", "x.PDF", ""]
+        for _ in range(200):
+            mappings = {
+                f"file{i}": "/".join(rng.choice(parts) for _ in range(rng.randint(1, 3)))
+                for i in range(rng.randint(0, 12))
+            }
+            source = _source(mappings)
+            for _ in range(20):
+                file_path = "/".join(rng.choice(parts) for _ in range(rng.randint(1, 2)))
+
+                assert source._find_path_suffix_match(file_path) is _reference_suffix_match(source, file_path)
+                assert (source._try_path_similarity_match(file_path)
+                        is _reference_path_similarity_match(source, file_path))
@@ -0,0 +1,82 @@
+"""
+Unit tests for SemanticChunker source offsets (Chunk.start_index/end_index)
+"""
+
+import re
+
+import pytest
+
+from src.chunking.semantic_chunker import SemanticChunker
+
+
+def _collapse(text):
+    return re.sub(r"\s+", " ", text).strip()
+
+
+DOCUMENT = """Executive Summary
+The customer requested a   three year renewal of the analytics platform.
+Pricing was benchmarked against five comparable enterprise deals this quarter.
+The vendor initially proposed a twelve percent uplift on the existing rate.
+
+Pricing
+=== Quote ===
+Item | Qty | Unit Price
+------------------------
+Analytics seats | 250 | 1,200
+Support plan | 1 | 45,000
+
+After negotiation the uplift was reduced to four percent per year.
+Payment terms moved from net thirty to net forty five days for all invoices.
+"""
+
+
+@pytest.fixture
+def chunker():
+    return SemanticChunker(max_chunk_size=160, overlap_size=40)
+
+
+class TestChunkOffsets:
+    """Chunk offsets index into the text passed to chunk_document"""
+
+    def test_text_chunks_cover_their_sentences(self, chunker):
+        chunks = chunker.chunk_document(DOCUMENT, {})
+        text_chunks = [c for c in chunks if "===" not in c.text]
+
+        assert len(text_chunks) >= 3
+        for chunk in text_chunks:
+            assert _collapse(DOCUMENT[chunk.start_index:chunk.end_index]) == chunk.text
+
+    def test_overlapping_chunks_overlap_in_source(self):
+        chunker = SemanticChunker(max_chunk_size=160, overlap_size=70)
+        content = " ".join(f"Sentence number {i} describes the rollout of the new platform." for i in range(8))
+
+        chunks = chunker.chunk_document(content, {})
+
+        assert len(chunks) > 2
+        for previous, chunk in zip(chunks, chunks[1:]):
+            assert chunk.start_index < previous.end_index
+            assert _collapse(content[chunk.start_index:chunk.end_index]) == chunk.text
+
+    def test_table_chunk_spans_source_block(self, chunker):
+        table = next(c for c in chunker.chunk_document(DOCUMENT, {}) if "===" in c.text)
+        source = DOCUMENT[table.start_index:table.end_index]
+
+        assert source.startswith("=== Quote ===")
+        assert source.rstrip().endswith("Support plan | 1 | 45,000")
+
+    def test_offsets_follow_document_order(self, chunker):
+        chunks = chunker.chunk_document(DOCUMENT, {})
+
+        starts = [c.start_index for c in chunks]
+        assert starts == sorted(starts)
+        assert all(0 <= c.start_index < c.end_index <= len(DOCUMENT) for c in chunks)
+
+    def test_fallback_chunks_cover_their_words(self, chunker, monkeypatch):
+        monkeypatch.setattr(chunker, "_scan_lines", lambda content: 1 / 0)
+        content = "word " * 30 + "\n\n" + "other  text " * 40
+
+        chunks = chunker.chunk_document(content, {})
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert _collapse(content[chunk.start_index:chunk.end_index]) == chunk.text
@@ -0,0 +1,218 @@
+"""
+Parity tests for SemanticChunker section detection and text/table segmentation
+
+The single-pass line scanner must produce the same sections and segments as the
+original per-line implementation, which is kept here as the reference. The
+reference omits the original 20,000-line guardrail (which skipped table
+detection on long sections), so long inputs are compared on the detection
+itself, and it stops on markdown blocks with all-empty header cells, on which
+the original looped forever.
+"""
+
+import random
+
+import pytest
+
+from src.chunking.semantic_chunker import SemanticChunker
+
+
+def _reference_sections(chunker, content):
+    """Original section detection: substring scan of every boundary per line"""
+    sections = {}
+    current_section = "main"
+    current_content = []
+    for line in content.split('\n'):
+        line_lower = line.lower().strip()
+        section_found = False
+        for boundary in chunker.section_boundaries:
+            if boundary in line_lower and len(line.strip()) < 100:
+                if current_content:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = boundary.replace(' ', '_')
+                current_content = [line]
+                section_found = True
+                break
+        if not section_found:
+            current_content.append(line)
+    if current_content:
+        sections[current_section] = '\n'.join(current_content)
+    return sections
+
+
+def _is_title(line):
+    return line.strip().startswith('===') and line.strip().endswith('===')
+
+
+def _reference_unified_block(lines, start_i):
+    table_lines = [lines[start_i]]
+    i = start_i + 1
+    if i < len(lines) and '|' in lines[i]:
+        table_lines.append(lines[i])
+        i += 1
+    if i < len(lines) and lines[i].strip().startswith('-'):
+        table_lines.append(lines[i])
+        i += 1
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if _is_title(line):
+            break
+        if stripped.startswith('|') and i + 1 < len(lines):
+            next_stripped = lines[i + 1].strip()
+            if next_stripped.startswith('|') or (next_stripped.startswith('-') and '|' in next_stripped):
+                break
+        if '|' in line or not stripped:
+            table_lines.append(line)
+            i += 1
+        else:
+            break
+    return table_lines, i
+
+
+def _reference_markdown_at(lines, start_i):
+    if start_i >= len(lines):
+        return [], start_i
+    header_line = lines[start_i].strip()
+    if not header_line.startswith('|') or header_line.count('|') < 2:
+        return [], start_i
+    if start_i + 1 >= len(lines):
+        return [], start_i
+    separator_line = lines[start_i + 1].strip()
+    if not (separator_line.startswith('|') or separator_line.startswith('-')) or '|' not in separator_line:
+        return [], start_i
+    table_lines = [lines[start_i], lines[start_i + 1]]
+    i = start_i + 2
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if _is_title(line):
+            break
+        if stripped.startswith('|') and stripped.count('|') >= 2:
+            table_lines.append(line)
+            i += 1
+        elif not stripped:
+            j = i + 1
+            while j < len(lines) and not lines[j].strip():
+                j += 1
+            if j < len(lines) and lines[j].strip().startswith('|'):
+                table_lines.append(line)
+                i += 1
+            else:
+                break
+        else:
+            break
+    if len(table_lines) >= 3:
+        return table_lines, i
+    return [], start_i
+
+
+def _reference_segments(chunker, content):
+    """Original segmentation (re-measures tables per line, no guardrail)"""
+    segments = []
+    lines = content.split('\n')
+    i = 0
+    while i < len(lines):
+        if _is_title(lines[i]):
+            table_lines, i = _reference_unified_block(lines, i)
+            segments.append(("table", "\n".join(table_lines)))
+            continue
+        markdown_lines, next_i = _reference_markdown_at(lines, i)
+        if markdown_lines:
+            normalized = chunker._normalize_markdown_table(markdown_lines)
+            if normalized:
+                segments.append(("table", normalized))
+                i = next_i
+                continue
+        text_lines = []
+        if markdown_lines:
+            # Unnormalizable markdown block: kept as text (the original never advanced here)
+            text_lines, i = markdown_lines, next_i
+        while i < len(lines):
+            if _is_title(lines[i]) or _reference_markdown_at(lines, i)[0]:
+                break
+            text_lines.append(lines[i])
+            i += 1
+        text_content = "\n".join(text_lines).strip()
+        if text_content:
+            segments.append(("text", text_content))
+    return segments if segments else [("text", content)]
+
+
+LINE_KINDS = [
+    lambda rng: "The vendor agreed to revised pricing for the renewal term.",
+    lambda rng: "Executive Summary",
+    lambda rng: "Payment terms " + "are net thirty days " * rng.randint(0, 8),
+    lambda rng: "",
+    lambda rng: "   ",
+    lambda rng: "=== Sheet%d ===" % rng.randint(1, 3),
+    lambda rng: "=== unterminated",
+    lambda rng: "| " + " | ".join(rng.choice(["Item", "Qty", "", "Price"]) for _ in range(rng.randint(1, 4))) + " |",
+    lambda rng: "|---|---|",
+    lambda rng: "| --- | --- |",
+    lambda rng: "-" * rng.randint(1, 40),
+    lambda rng: "--- | ---",
+    lambda rng: "Item | Qty | Price",
+    lambda rng: "|",
+    lambda rng: "| Total | 1,200",
+    lambda rng: "  | indented | row |  ",
+    lambda rng: "Schedule B - Services and Fees",
+]
+
+
+def _random_document(rng, n_lines):
+    return "\n".join(rng.choice(LINE_KINDS)(rng) for _ in range(n_lines))
+
+
+@pytest.fixture
+def chunker():
+    return SemanticChunker()
+
+
+class TestSegmentParity:
+    """Same segments as the original implementation"""
+
+    def test_random_documents(self, chunker):
+        rng = random.Random(31)
+        for _ in range(400):
+            content = _random_document(rng, rng.randint(1, 60))
+
+            assert chunker._split_section_into_segments(content) == _reference_segments(chunker, content), content
+            assert chunker._identify_business_sections(content) == _reference_sections(chunker, content), content
+
+    def test_long_spreadsheet_dump(self, chunker):
+        rows = [f"{i} | Widget {i % 97} | {i * 3.5:.2f}" for i in range(25_000)]
+        content = "\n".join(["Quote details", "=== Sheet1 ===", "Id | Item | Price", "-" * 30]
+                            + rows + ["", "Notes follow the table."])
+
+        segments = chunker._split_section_into_segments(content)
+
+        assert segments == _reference_segments(chunker, content)
+        assert [kind for kind, _ in segments] == ["text", "table", "text"]
+
+    def test_long_markdown_table_with_blank_runs(self, chunker):
+        lines = ["| A | B |", "|---|---|"]
+        for i in range(300):
+            lines += ["| %d | x |" % i] + [""] * 20
+        content = "\n".join(lines + ["trailing text after the table"])
+
+        assert chunker._split_section_into_segments(content) == _reference_segments(chunker, content)
+
+    def test_many_table_starts(self, chunker):
+        # Every other line could start a markdown table, none has a valid separator
+        content = "\n".join("| a | b |" if i % 2 else "plain line" for i in range(20_000))
+
+        assert chunker._split_section_into_segments(content) == [("text", content)]
+        assert chunker._split_section_into_segments(content) == _reference_segments(chunker, content)
+
+    def test_unnormalizable_markdown_block_is_text(self, chunker):
+        content = "| | |\n|---|---|\n| 1 | 2 |\nafter"
+
+        assert chunker._split_section_into_segments(content) == [("text", content)]
+
+    def test_offsets_map_back_to_source(self, chunker):
+        rng = random.Random(7)
+        content = _random_document(rng, 400)
+
+        for kind, text, start, end in chunker._segment_section(content):
+            if kind == "text" or not content[start:end].lstrip().startswith("|"):
+                assert content[start:end] == text
@@ -0,0 +1,85 @@
+"""
+Unit tests for SemanticChunker sentence splitting
+
+The offset-based splitter must return the same sentences as the original
+re.split implementation, which is kept here as the reference.
+"""
+
+import random
+import re
+
+import pytest
+
+from src.chunking.semantic_chunker import SemanticChunker
+
+
+def _reference_split(chunker, text):
+    """Original split: collapse whitespace, re.split on [.!?], check each running sentence"""
+    text = re.sub(r'\s+', ' ', text).strip()
+    sentences = []
+    current = ""
+    for part in re.split(r'([.!?])', text):
+        current += part
+        if re.match(r'[.!?]', part) and chunker._is_sentence_boundary(current):
+            sentences.append(current.strip())
+            current = ""
+    if current.strip():
+        sentences.append(current.strip())
+    return [s for s in sentences if len(s.split()) > 3]
+
+
+@pytest.fixture
+def chunker():
+    return SemanticChunker()
+
+
+class TestSplitIntoSentences:
+    """Business-aware sentence boundaries"""
+
+    def test_abbreviation_does_not_end_sentence(self, chunker):
+        sentences = chunker._split_into_sentences("Acme Inc. signed the renewal today. The term is three years.")
+
+        assert sentences == ["Acme Inc. signed the renewal today.", "The term is three years."]
+
+    def test_numbered_list_does_not_end_sentence(self, chunker):
+        sentences = chunker._split_into_sentences("Pricing terms are listed in section 4. They apply to all regions now.")
+
+        assert sentences == ["Pricing terms are listed in section 4. They apply to all regions now."]
+
+    def test_short_fragments_join_the_next_sentence(self, chunker):
+        sentences = chunker._split_into_sentences("Approved. The vendor signed today. Thanks.")
+
+        assert sentences == ["Approved. The vendor signed today."]
+
+    def test_whitespace_is_collapsed(self, chunker):
+        sentences = chunker._split_into_sentences("  The  vendor\n\nagreed to   the\tterms today!  ")
+
+        assert sentences == ["The vendor agreed to the terms today!"]
+
+    def test_spans_point_into_original_text(self, chunker):
+        text = "Header line\n\nThe vendor agreed to terms. Payment is due in thirty days."
+        spans = chunker._split_into_sentence_spans(text)
+
+        assert [text[s:e] for s, e in spans] == [
+            "Header line\n\nThe vendor agreed to terms.",
+            "Payment is due in thirty days.",
+        ]
+
+
+class TestReferenceEquivalence:
+    """Randomized comparison against the original implementation"""
+
+    WORDS = ["the", "vendor", "Inc.", "corp.", "No.", "3.", "12.", "fig.", "price", "term",
+             "renewal", "etc.", "vs.", "Q3", "done!", "why?", "a.b", "x.", "...", "end."]
+    SEPARATORS = [" ", "  ", "\n", "\t", "\n\n", ""]
+
+    def test_matches_reference(self, chunker):
+        rng = random.Random(1234)
+        for _ in range(500):
+            parts = []
+            for _ in range(rng.randint(0, 40)):
+                parts.append(rng.choice(self.WORDS))
+                parts.append(rng.choice(self.SEPARATORS))
+            text = rng.choice(["", " ", "\n"]) + "".join(parts)
+
+            assert chunker._split_into_sentences(text) == _reference_split(chunker, text), repr(text)
@@ -0,0 +1,150 @@
+"""
+Unit tests for spooled document content and the Dropbox content hasher
+"""
+
+import hashlib
+import os
+import random
+
+import pytest
+
+from src.utils import spooled_document
+from src.utils.spooled_document import (
+    DropboxContentHasher,
+    SpooledDocument,
+    content_bytes,
+    release_content,
+    spool_chunks,
+    spooled_path,
+)
+
+
+def _reference_hash(data, block_size):
+    """Dropbox content_hash computed in one pass over whole blocks"""
+    blocks = [data[i:i + block_size] for i in range(0, len(data), block_size)]
+    return hashlib.sha256(b"".join(hashlib.sha256(block).digest() for block in blocks)).hexdigest()
+
+
+def _split(data, rng):
+    """Cut data into random-sized chunks (including empty ones)"""
+    chunks, pos = [], 0
+    while pos < len(data):
+        size = rng.randint(0, 23)
+        chunks.append(data[pos:pos + size])
+        pos += size
+    return chunks
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    """Shrink the hash block so block boundaries are exercised with small inputs"""
+    monkeypatch.setattr(spooled_document, "DROPBOX_HASH_BLOCK_SIZE", 16)
+    return 16
+
+
+class TestDropboxContentHasher:
+    """Incremental hashing matches the block-wise definition"""
+
+    def test_empty_input(self):
+        assert DropboxContentHasher().hexdigest() == hashlib.sha256(b"").hexdigest()
+
+    @pytest.mark.parametrize("length", [1, 15, 16, 17, 32, 33, 100])
+    def test_chunking_does_not_change_hash(self, small_blocks, length):
+        rng = random.Random(length)
+        data = bytes(rng.getrandbits(8) for _ in range(length))
+        hasher = DropboxContentHasher()
+        for chunk in _split(data, rng):
+            hasher.update(chunk)
+
+        assert hasher.hexdigest() == _reference_hash(data, small_blocks)
+
+    def test_real_block_size(self):
+        data = os.urandom(spooled_document.DROPBOX_HASH_BLOCK_SIZE + 1000)
+        hasher = DropboxContentHasher()
+        hasher.update(data[:1000])
+        hasher.update(data[1000:])
+
+        assert hasher.hexdigest() == _reference_hash(data, spooled_document.DROPBOX_HASH_BLOCK_SIZE)
+
+    def test_hexdigest_does_not_finalize(self, small_blocks):
+        hasher = DropboxContentHasher()
+        hasher.update(b"x" * 20)
+        hasher.hexdigest()
+        hasher.update(b"y" * 20)
+
+        assert hasher.hexdigest() == _reference_hash(b"x" * 20 + b"y" * 20, small_blocks)
+
+
+class TestSpoolChunks:
+    """Streaming chunks to a spool file"""
+
+    def test_writes_chunks_and_verifies_hash(self, tmp_path, small_blocks):
+        data = b"0123456789" * 7
+        expected = _reference_hash(data, small_blocks)
+
+        with spool_chunks([data[:5], b"", data[5:]], suffix=".pdf", spool_dir=str(tmp_path),
+                          expected_hash=expected) as spooled:
+            assert spooled.path.endswith(".pdf")
+            assert len(spooled) == len(data)
+            assert spooled.read_bytes() == data
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_hash_mismatch_raises_and_removes_file(self, tmp_path):
+        with pytest.raises(IOError, match="Content hash mismatch"):
+            spool_chunks([b"truncated"], spool_dir=str(tmp_path), expected_hash="0" * 64)
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_failing_source_removes_file(self, tmp_path):
+        def chunks():
+            yield b"partial"
+            raise ConnectionError("stream reset")
+
+        with pytest.raises(ConnectionError):
+            spool_chunks(chunks(), spool_dir=str(tmp_path))
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestSpooledDocument:
+    """Ownership of the spool file and the bytes/spooled helpers"""
+
+    @pytest.fixture
+    def spooled(self, tmp_path):
+        path = tmp_path / "doc.bin"
+        path.write_bytes(b"payload")
+        return SpooledDocument(str(path), 7)
+
+    def test_cleanup_is_idempotent(self, spooled):
+        spooled.cleanup()
+        spooled.cleanup()
+
+        assert not os.path.exists(spooled.path)
+
+    def test_file_removed_when_collected(self, tmp_path):
+        path = tmp_path / "collected.bin"
+        path.write_bytes(b"payload")
+        SpooledDocument(str(path), 7)
+
+        assert not path.exists()
+
+    def test_helpers_on_spooled_content(self, spooled):
+        assert content_bytes(spooled) == b"payload"
+        assert spooled_path(spooled) == spooled.path
+
+        release_content(spooled)
+
+        assert not os.path.exists(spooled.path)
+
+    def test_source_clients_share_the_class(self):
+        from src.connectors import dropbox_client
+        from src.pipeline import document_prefetcher
+
+        assert dropbox_client.SpooledDocument is document_prefetcher.SpooledDocument is SpooledDocument
+
+    @pytest.mark.parametrize("content", [b"payload", bytearray(b"payload"), None])
+    def test_helpers_on_in_memory_content(self, content):
+        assert content_bytes(content) is content
+        assert spooled_path(content) is None
+        release_content(content)
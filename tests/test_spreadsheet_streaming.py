@@ -0,0 +1,358 @@
+"""
+Unit tests for the streaming spreadsheet path
+
+Covers SemanticChunker.chunk_table_stream, the batched embed/upsert in the
+parallel worker, and the two DocumentConverter spreadsheet renderings. Parser
+dependencies that are not installed (PIL, pdf2image, docx, ...) are replaced by
+empty modules for the converter import; .xls reading runs against a fake xlrd.
+"""
+
+import datetime
+import importlib
+import sys
+import types
+
+import pytest
+
+from src.chunking.semantic_chunker import SemanticChunker
+from src.pipeline import parallel_processor
+from src.pipeline.chunk_deduplicator import ChunkDeduplicator
+from src.utils.spooled_document import spool_chunks
+
+
+def _render(tables):
+    """The text chunk offsets refer to: title, header, separator, rows; blank line between sheets"""
+    parts = []
+    for sheet_name, header_line, separator_line, row_lines in tables:
+        parts.append(f"=== {sheet_name} ===")
+        if header_line is None:
+            parts.append("(Empty sheet)")
+            continue
+        parts.extend([header_line, separator_line] + list(row_lines))
+        parts.append("")
+    return "\n".join(parts)
+
+
+def _sheet(name, row_count, words_per_row=4):
+    header = " | ".join(f"col{i}" for i in range(words_per_row))
+    rows = [" | ".join(f"r{r}c{i}" for i in range(words_per_row)) for r in range(row_count)]
+    return name, header, "-" * len(header), rows
+
+
+class _CountingRows:
+    """Row iterator that records how many rows have been pulled"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.pulled = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.pulled += 1
+            yield row
+
+
+class TestChunkTableStream:
+    """Header-repeating table chunks from streamed rows"""
+
+    def test_small_sheet_is_one_chunk(self):
+        chunker = SemanticChunker(excel_sheet_max_size=2000)
+        sheet = _sheet("Pricing", 5)
+
+        chunks = list(chunker.chunk_table_stream([sheet], {"document_name": "p.xlsx"}))
+
+        assert len(chunks) == 1
+        text = _render([sheet])
+        assert chunks[0].text == text.strip()
+        assert text[chunks[0].start_index:chunks[0].end_index] == text.strip()
+
+    def test_large_sheet_splits_with_repeated_header(self):
+        chunker = SemanticChunker(excel_sheet_max_size=100)
+        name, header, separator, rows = _sheet("Deals", 200)
+
+        chunks = list(chunker.chunk_table_stream([(name, header, separator, rows)], {}))
+
+        assert len(chunks) > 1
+        streamed_rows = []
+        for i, chunk in enumerate(chunks):
+            lines = chunk.text.split("\n")
+            assert lines[:3] == [f"=== Deals (part {i + 1}) ===", header, separator]
+            assert chunk.metadata["chunk_index"] == i
+            streamed_rows.extend(lines[3:])
+        assert streamed_rows == rows
+
+    def test_part_offsets_cover_their_rows(self):
+        chunker = SemanticChunker(excel_sheet_max_size=100)
+        sheets = [_sheet("Empty", 0), ("Blank", None, None, iter(())), _sheet("Deals", 120)]
+        text = _render(sheets)
+
+        chunks = list(chunker.chunk_table_stream(sheets, {}))
+
+        for chunk in chunks[1:]:
+            assert text[chunk.start_index:chunk.end_index] == "\n".join(chunk.text.split("\n")[3:])
+
+    def test_is_lazy(self):
+        chunker = SemanticChunker(excel_sheet_max_size=100)
+        name, header, separator, rows = _sheet("Deals", 5000)
+        counting = _CountingRows(rows)
+
+        stream = chunker.chunk_table_stream([(name, header, separator, counting)], {})
+        next(stream)
+
+        # One 512-row packing batch at most, not the whole sheet
+        assert counting.pulled <= 512
+
+
+class _FakePinecone:
+    """Records upsert batches; optionally fails the nth upsert"""
+
+    def __init__(self, fail_on=None, delete_ok=True):
+        self.upserts = []
+        self.deleted = []
+        self.fail_on = fail_on
+        self.delete_ok = delete_ok
+
+    def generate_chunk_embeddings(self, texts, precomputed_dense=None):
+        return {"dense_embeddings": [[0.0]] * len(texts), "sparse_embeddings": [{}] * len(texts)}
+
+    def upsert_chunks(self, chunks, namespace):
+        self.upserts.append(chunks)
+        return len(self.upserts) != self.fail_on
+
+    def delete_by_ids(self, ids, namespace="documents"):
+        self.deleted.extend(ids)
+        return self.delete_ok
+
+
+class _FakeConverter:
+    def __init__(self, tables):
+        self.tables = tables
+
+    def iter_spreadsheet_tables(self, content, extension):
+        return iter(self.tables)
+
+
+class TestStreamSpreadsheet:
+    """Chunks are embedded and upserted in fixed-size batches"""
+
+    def _stream(self, pinecone, chunker, tables, deduplicator=None):
+        return parallel_processor._stream_spreadsheet(
+            _FakeConverter(tables), chunker, pinecone, b"", ".csv", "deals.csv", ".csv",
+            "/exports/deals.csv", {"deal_id": "D1"}, "ns", deduplicator, None,
+        )
+
+    def test_upserts_in_batches_with_global_ids(self, monkeypatch):
+        monkeypatch.setattr(parallel_processor, "STREAM_UPSERT_BATCH_CHUNKS", 3)
+        pinecone = _FakePinecone()
+        chunker = SemanticChunker(excel_sheet_max_size=60)
+
+        result = self._stream(pinecone, chunker, [_sheet("Deals", 100)])
+
+        assert result["success"]
+        assert all(len(batch) <= 3 for batch in pinecone.upserts)
+        ids = [c["id"] for batch in pinecone.upserts for c in batch]
+        assert ids == [f"/exports/deals.csv_{i}" for i in range(result["chunks_created"])]
+        assert len(pinecone.upserts) > 1
+
+    def test_failure_before_any_upsert_falls_back(self):
+        def broken_tables():
+            raise ValueError("bad workbook")
+            yield
+
+        result = self._stream(_FakePinecone(), SemanticChunker(), broken_tables())
+
+        assert result is None
+
+    def test_failed_upsert_rolls_back_the_document(self, monkeypatch):
+        monkeypatch.setattr(parallel_processor, "STREAM_UPSERT_BATCH_CHUNKS", 2)
+        pinecone = _FakePinecone(fail_on=2)
+
+        result = self._stream(pinecone, SemanticChunker(excel_sheet_max_size=60), [_sheet("Deals", 100)])
+
+        assert not result["success"]
+        assert result["chunks_created"] == 0
+        assert result["error"] == "Pinecone upsert failed; rolled back 4 upserted chunks"
+        assert pinecone.deleted == [c["id"] for batch in pinecone.upserts for c in batch]
+
+    def test_chunking_failure_after_upserts_rolls_back(self, monkeypatch):
+        monkeypatch.setattr(parallel_processor, "STREAM_UPSERT_BATCH_CHUNKS", 2)
+        pinecone = _FakePinecone()
+
+        def failing_rows():
+            yield from _sheet("Deals", 600)[3]
+            raise ValueError("corrupt row")
+
+        name, header, separator, _ = _sheet("Deals", 0)
+        result = self._stream(pinecone, SemanticChunker(excel_sheet_max_size=60),
+                              [(name, header, separator, failing_rows())])
+
+        upserted = [c["id"] for batch in pinecone.upserts for c in batch]
+        assert not result["success"]
+        assert upserted and pinecone.deleted == upserted
+        assert result["error"].endswith(f"corrupt row; rolled back {len(upserted)} upserted chunks")
+
+    def test_failed_rollback_is_reported(self, monkeypatch):
+        monkeypatch.setattr(parallel_processor, "STREAM_UPSERT_BATCH_CHUNKS", 2)
+        pinecone = _FakePinecone(fail_on=2, delete_ok=False)
+
+        result = self._stream(pinecone, SemanticChunker(excel_sheet_max_size=60), [_sheet("Deals", 100)])
+
+        assert result["error"] == "Pinecone upsert failed; rollback failed, up to 4 chunks remain in the index"
+
+    def test_rollback_forgets_dedup_entries(self, monkeypatch):
+        monkeypatch.setattr(parallel_processor, "STREAM_UPSERT_BATCH_CHUNKS", 2)
+        deduplicator = ChunkDeduplicator(policy="skip")
+
+        self._stream(_FakePinecone(fail_on=2), SemanticChunker(excel_sheet_max_size=60),
+                     [_sheet("Deals", 100)], deduplicator)
+
+        # The deleted chunks must not be skipped when another document repeats them
+        assert deduplicator.index_size == 0
+
+
+class _FakeCell:
+    def __init__(self, ctype, value):
+        self.ctype = ctype
+        self.value = value
+
+
+class _FakeXlsBook:
+    """xlrd Book stand-in recording which sheets are loaded"""
+
+    datemode = 0
+
+    def __init__(self, sheets):
+        self.sheets = sheets
+        self.loaded = set()
+        self.max_loaded = 0
+        self.released = False
+
+    def sheet_names(self):
+        return list(self.sheets)
+
+    def sheet_by_name(self, name):
+        self.loaded.add(name)
+        self.max_loaded = max(self.max_loaded, len(self.loaded))
+        rows = self.sheets[name]
+        return types.SimpleNamespace(nrows=len(rows), row=lambda r: rows[r])
+
+    def unload_sheet(self, name):
+        self.loaded.discard(name)
+
+    def release_resources(self):
+        self.released = True
+
+
+def _fake_xlrd():
+    module = types.ModuleType("xlrd")
+    (module.XL_CELL_EMPTY, module.XL_CELL_TEXT, module.XL_CELL_NUMBER, module.XL_CELL_DATE,
+     module.XL_CELL_BOOLEAN, module.XL_CELL_ERROR, module.XL_CELL_BLANK) = range(7)
+    module.xldate = types.SimpleNamespace(
+        xldate_as_datetime=lambda value, datemode: datetime.datetime(1899, 12, 30) + datetime.timedelta(days=value)
+    )
+    module.opened = []
+
+    def open_workbook(filename=None, file_contents=None, on_demand=False):
+        assert on_demand
+        book = module.book_factory()
+        module.opened.append((filename, file_contents, book))
+        return book
+
+    module.open_workbook = open_workbook
+    return module
+
+
+@pytest.fixture
+def converter(monkeypatch):
+    monkeypatch.setitem(sys.modules, "xlrd", _fake_xlrd())
+    for name in ("PIL", "pdf2image", "openpyxl", "docx", "extract_msg"):
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            module = types.ModuleType(name)
+            module.Image = None
+            module.convert_from_bytes = None
+            module.Document = None
+            monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.delitem(sys.modules, "src.parsers.document_converter", raising=False)
+    module = importlib.import_module("src.parsers.document_converter")
+    return module.DocumentConverter()
+
+
+class TestSpreadsheetRenderings:
+    """Text path keeps the pandas rendering; both paths emit every row"""
+
+    CSV = b"Deal,Amount,Notes\nA,10,\nB,,x\n,,\n" + b"".join(b"R%d,%d,\n" % (i, i) for i in range(1200))
+
+    def test_text_path_keeps_pandas_output_without_row_cap(self, converter):
+        text = converter._extract_excel_text(self.CSV, ".csv")
+        lines = text.split("\n")
+
+        assert lines[:5] == ["=== Sheet1 ===", "Deal | Amount | Notes", "-" * 21, "A | 10.0 | ", "B |  | x"]
+        assert " |  | " in lines[5]
+        assert lines[-2] == "R1199 | 1199.0 | "
+        assert len(lines) == 3 + 1203 + 1
+        assert not any(line.startswith("... and") for line in lines)
+
+    def test_streaming_path_emits_all_rows(self, converter):
+        tables = list(converter.iter_spreadsheet_tables(self.CSV, ".csv"))
+        assert len(tables) == 1
+        sheet_name, header_line, separator_line, row_lines = tables[0]
+        rows = list(row_lines)
+
+        assert (sheet_name, header_line) == ("Sheet1", "Deal | Amount | Notes")
+        assert rows[:2] == ["A | 10", "B |  | x"]
+        assert len(rows) == 1202
+        assert rows[-1] == "R1199 | 1199"
+
+    def test_streaming_reads_spooled_content(self, converter, tmp_path):
+        spooled = spool_chunks([self.CSV[:100], self.CSV[100:]], suffix=".csv", spool_dir=str(tmp_path))
+
+        (_, header_line, _, row_lines), = converter.iter_spreadsheet_tables(spooled, ".csv")
+
+        assert header_line == "Deal | Amount | Notes"
+        assert len(list(row_lines)) == 1202
+
+    def test_xls_sheets_load_one_at_a_time(self, converter):
+        xlrd = sys.modules["xlrd"]
+        sheets = {
+            "Deals": [
+                [_FakeCell(xlrd.XL_CELL_TEXT, "Deal"), _FakeCell(xlrd.XL_CELL_TEXT, "Signed"),
+                 _FakeCell(xlrd.XL_CELL_TEXT, "Amount"), _FakeCell(xlrd.XL_CELL_TEXT, "Won")],
+                [_FakeCell(xlrd.XL_CELL_TEXT, "A"), _FakeCell(xlrd.XL_CELL_DATE, 45292.0),
+                 _FakeCell(xlrd.XL_CELL_NUMBER, 10.0), _FakeCell(xlrd.XL_CELL_BOOLEAN, 1)],
+                [_FakeCell(xlrd.XL_CELL_TEXT, "B"), _FakeCell(xlrd.XL_CELL_EMPTY, ""),
+                 _FakeCell(xlrd.XL_CELL_NUMBER, 2.5), _FakeCell(xlrd.XL_CELL_ERROR, 42)],
+            ],
+            "Notes": [[_FakeCell(xlrd.XL_CELL_TEXT, "Note")], [_FakeCell(xlrd.XL_CELL_TEXT, "ok")]],
+        }
+        xlrd.book_factory = lambda: _FakeXlsBook(sheets)
+
+        streamed = [(name, header, list(rows)) for name, header, _, rows
+                    in converter.iter_spreadsheet_tables(b"xls-bytes", ".xls")]
+
+        assert streamed == [
+            ("Deals", "Deal | Signed | Amount | Won", ["A | 2024-01-01 00:00:00 | 10 | True", "B |  | 2.5"]),
+            ("Notes", "Note", ["ok"]),
+        ]
+        _, file_contents, book = xlrd.opened[0]
+        assert file_contents == b"xls-bytes"
+        assert book.max_loaded == 1 and book.loaded == set() and book.released
+
+
+class TestSpooledConversion:
+    """Only PDFs leave convert_to_processable_content still spooled"""
+
+    def test_pdf_is_passed_through(self, converter, tmp_path):
+        spooled = spool_chunks([b"%PDF-1.7"], suffix=".pdf", spool_dir=str(tmp_path))
+
+        content, content_type = converter.convert_to_processable_content("deal/quote.pdf", spooled)
+
+        assert (content, content_type) == (spooled, "pdf")
+
+    def test_other_types_are_read_into_memory(self, converter, tmp_path):
+        spooled = spool_chunks([b"plain ", b"text"], suffix=".txt", spool_dir=str(tmp_path))
+
+        content, content_type = converter.convert_to_processable_content("ContentVersion/068A", spooled, "notes.txt")
+
+        assert (content, content_type) == (b"plain text", "text")
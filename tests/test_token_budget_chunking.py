@@ -0,0 +1,130 @@
+"""
+Unit tests for token-budget chunking (TokenCounter and SemanticChunker max_chunk_tokens)
+
+A fake tokenizer stands in for the Hugging Face one: one token per started
+4 characters of each whitespace-separated word, so a long unbroken "word"
+(e.g. a base64 blob) is many tokens.
+"""
+
+import math
+import re
+
+import pytest
+
+from src.chunking.semantic_chunker import SemanticChunker
+from src.chunking.token_counter import TokenCounter
+
+
+class _FakeTokenizer:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts, add_special_tokens=False, return_attention_mask=False, return_token_type_ids=False):
+        self.batches.append(list(texts))
+        input_ids = []
+        for text in texts:
+            n = sum(math.ceil(len(word) / 4) for word in text.split())
+            input_ids.append(list(range(n + (2 if add_special_tokens else 0))))
+        return {"input_ids": input_ids}
+
+
+def _tokens(text):
+    return sum(math.ceil(len(word) / 4) for word in text.split())
+
+
+@pytest.fixture
+def counter():
+    return TokenCounter(tokenizer=_FakeTokenizer(), cache_size=3)
+
+
+def _chunker(counter, budget, overlap=None):
+    return SemanticChunker(max_chunk_tokens=budget, overlap_tokens=overlap, token_counter=counter)
+
+
+class TestTokenCounter:
+    """Batched, LRU-cached counting"""
+
+    def test_reserves_prefix_and_special_tokens(self, counter):
+        # "passage:" is 2 tokens, plus <s> and </s>
+        assert counter.reserved_tokens == 4
+        assert counter.max_content_tokens == 512 - 4
+
+    def test_misses_are_tokenized_in_one_batch(self, counter):
+        tokenizer = counter._tokenizer
+        tokenizer.batches.clear()
+
+        assert counter.count_batch(["abcd efgh", "abcdefgh", "abcd efgh"]) == [2, 2, 2]
+        assert tokenizer.batches == [["abcd efgh", "abcdefgh"]]
+        assert (counter.hits, counter.misses) == (0, 2)
+
+    def test_lru_eviction(self, counter):
+        counter.count_batch(["a", "b", "c"])
+        counter.count("a")  # refresh "a"
+        counter.count("d")  # evicts "b"
+
+        assert list(counter._cache) == ["c", "a", "d"]
+        counter._tokenizer.batches.clear()
+        counter.count_batch(["a", "b"])
+        assert counter._tokenizer.batches == [["b"]]
+
+
+class TestTokenBudgetChunks:
+    """Chunks stay within max_chunk_tokens"""
+
+    def test_budget_is_clamped_to_model_window(self, counter):
+        assert _chunker(counter, 10_000).max_chunk_tokens == counter.max_content_tokens
+
+    def test_text_chunks_fit_budget(self, counter):
+        chunker = _chunker(counter, 40, overlap=20)
+        content = " ".join(f"Clause {i} sets the renewal pricing for regional subsidiaries." for i in range(30))
+
+        chunks = chunker.chunk_document(content, {})
+
+        assert len(chunks) > 5
+        assert all(_tokens(c.text) <= 40 for c in chunks)
+        # Consecutive chunks share overlap sentences
+        assert chunks[1].start_index < chunks[0].end_index
+
+    def test_overlong_sentence_is_split_at_words(self, counter):
+        chunker = _chunker(counter, 30)
+        sentence = " ".join(f"term{i}" for i in range(200)) + "."
+        content = "The contract reads as follows in full. " + sentence
+
+        chunks = chunker.chunk_document(content, {})
+        words = " ".join(c.text for c in chunks).replace(".", "").split()
+
+        assert all(_tokens(c.text) <= 30 for c in chunks)
+        assert all(f"term{i}" in words for i in range(200))
+
+    def test_unsplittable_word_gets_its_own_chunk(self, counter):
+        chunker = _chunker(counter, 30)
+        blob = "QUJD" * 100  # 100 tokens, no spaces
+        content = f"The attachment payload follows below here. {blob} The signature page is attached at the end."
+
+        chunks = chunker.chunk_document(content, {})
+        over_budget = [c for c in chunks if _tokens(c.text) > 30]
+
+        # The blob can't be split at word boundaries, so it is emitted alone
+        assert [c.text for c in over_budget] == [blob]
+        assert any("signature page" in c.text for c in chunks)
+
+    def test_large_table_parts_fit_budget(self, counter):
+        chunker = _chunker(counter, 60)
+        rows = [f"Product {i} | {i * 10} | {i * 3.25:.2f}" for i in range(80)]
+        content = "\n".join(["Quote attached below.", "=== Quote ===", "Item | Qty | Price", "-" * 20] + rows)
+
+        tables = [c for c in chunker.chunk_document(content, {}) if c.text.startswith("=== Quote")]
+
+        assert len(tables) > 3
+        assert all(_tokens(c.text) <= 60 for c in tables)
+        assert all(c.text.split("\n")[1] == "Item | Qty | Price" for c in tables)
+        assert sum(len(c.text.split("\n")) - 3 for c in tables) == len(rows)
+
+    def test_small_table_stays_whole(self, counter):
+        chunker = _chunker(counter, 200)
+        content = "\n".join(["Quote attached below.", "=== Quote ===", "Item | Qty | Price", "-" * 20,
+                             "Seats | 10 | 100.00", "Support | 1 | 50.00"])
+
+        tables = [c for c in chunker.chunk_document(content, {}) if c.text.startswith("=== Quote")]
+
+        assert len(tables) == 1